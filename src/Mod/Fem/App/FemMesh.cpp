@@ -1499,6 +1499,56 @@ void FemMesh::transformGeometry(const Base::Matrix4D& rclTrf)
     }
 }
 
+void FemMesh::addNodes(const std::vector<double> &coords, const std::vector<int> &ids)
+{
+    std::size_t numNodes = coords.size() / 3;
+    if (coords.size() % 3 != 0)
+        throw Base::ValueError("Number of coordinates is not a multiple of 3");
+    if (!ids.empty() && ids.size() != numNodes)
+        throw Base::ValueError("Number of node ids does not match the number of nodes");
+
+    SMESHDS_Mesh* meshDS = myMesh->GetMeshDS();
+    for (std::size_t i = 0; i < numNodes; i++) {
+        const double* c = &coords[3 * i];
+        SMDS_MeshNode* node = ids.empty() ? meshDS->AddNode(c[0], c[1], c[2])
+                                          : meshDS->AddNodeWithID(c[0], c[1], c[2], ids[i]);
+        if (!node)
+            throw Base::RuntimeError("Failed to add node");
+    }
+}
+
+void FemMesh::addElements(int dim, const std::vector<int> &nodes, int nodesPerElement, const std::vector<int> &ids)
+{
+    SMDSAbs_ElementType type;
+    switch (dim) {
+        case 1: type = SMDSAbs_Edge; break;
+        case 2: type = SMDSAbs_Face; break;
+        case 3: type = SMDSAbs_Volume; break;
+        default: throw Base::ValueError("Unknown element dimension, [1|2|3] are allowed");
+    }
+    if (nodesPerElement <= 0 || nodes.size() % nodesPerElement != 0)
+        throw Base::ValueError("Number of element nodes is not a multiple of the nodes per element");
+    std::size_t numElements = nodes.size() / nodesPerElement;
+    if (!ids.empty() && ids.size() != numElements)
+        throw Base::ValueError("Number of element ids does not match the number of elements");
+
+    SMESHDS_Mesh* meshDS = myMesh->GetMeshDS();
+    SMESH_MeshEditor editor(myMesh);
+    SMESH_MeshEditor::ElemFeatures elemFeat(type);
+    std::vector<const SMDS_MeshNode*> elemNodes(nodesPerElement);
+    for (std::size_t i = 0; i < numElements; i++) {
+        for (int j = 0; j < nodesPerElement; j++) {
+            elemNodes[j] = meshDS->FindNode(nodes[i * nodesPerElement + j]);
+            if (!elemNodes[j])
+                throw Base::ValueError("Failed to get node of the given indices");
+        }
+        elemFeat.SetID(ids.empty() ? -1 : ids[i]);
+        if (!editor.AddElement(elemNodes, elemFeat))
+            throw Base::RuntimeError("Failed to add element, check the number of nodes per element");
+        editor.ClearLastCreated();
+    }
+}
+
 void FemMesh::setTransform(const Base::Matrix4D& rclTrf)
 {
     // Placement handling, no geometric transformation
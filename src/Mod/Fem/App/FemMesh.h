@@ -122,6 +122,12 @@ public:
     //@{
     /// Applies a transformation on the real geometric data type
     void transformGeometry(const Base::Matrix4D &rclMat);
+    /// add nodes in bulk, coords holds x, y, z of every node, ids may be empty
+    void addNodes(const std::vector<double> &coords, const std::vector<int> &ids);
+    /** add elements of one dimension (1 edges, 2 faces, 3 volumes) in bulk,
+     *  nodes holds the nodesPerElement node ids of every element, ids may be empty
+     */
+    void addElements(int dim, const std::vector<int> &nodes, int nodesPerElement, const std::vector<int> &ids);
     //@}
 
     struct FemMeshInfo {
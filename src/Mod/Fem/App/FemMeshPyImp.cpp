@@ -591,6 +591,196 @@ PyObject* FemMeshPy::addVolume(PyObject *args)
     return 0;
 }
 
+namespace {
+
+template <typename S, typename T>
+void copyBufferValues(const Py_buffer& view, std::vector<T>& values)
+{
+    const S* begin = static_cast<const S*>(view.buf);
+    values.assign(begin, begin + view.len / view.itemsize);
+}
+
+// reads a C contiguous (N) or (N, k) buffer (e. g. a numpy array) into values
+// returns false if the object does not provide such a buffer
+template <typename T>
+bool getBufferValues(PyObject* obj, std::vector<T>& values, int& columns)
+{
+    if (!PyObject_CheckBuffer(obj))
+        return false;
+    Py_buffer view;
+    if (PyObject_GetBuffer(obj, &view, PyBUF_C_CONTIGUOUS | PyBUF_FORMAT) != 0) {
+        PyErr_Clear();
+        return false;
+    }
+    const char* format = view.format ? view.format : "B";
+    if (*format == '@' || *format == '=' || *format == '<')
+        format++;
+    bool known = view.ndim >= 1 && view.ndim <= 2 && format[0] != '\0' && format[1] == '\0';
+    if (known) {
+        switch (format[0]) {
+            case 'd': copyBufferValues<double>(view, values); break;
+            case 'f': copyBufferValues<float>(view, values); break;
+            case 'b': copyBufferValues<signed char>(view, values); break;
+            case 'B': copyBufferValues<unsigned char>(view, values); break;
+            case 'h': copyBufferValues<short>(view, values); break;
+            case 'H': copyBufferValues<unsigned short>(view, values); break;
+            case 'i': copyBufferValues<int>(view, values); break;
+            case 'I': copyBufferValues<unsigned int>(view, values); break;
+            case 'l': copyBufferValues<long>(view, values); break;
+            case 'L': copyBufferValues<unsigned long>(view, values); break;
+            case 'q': copyBufferValues<long long>(view, values); break;
+            case 'Q': copyBufferValues<unsigned long long>(view, values); break;
+            default: known = false;
+        }
+    }
+    if (known)
+        columns = view.ndim == 2 ? static_cast<int>(view.shape[1]) : 1;
+    PyBuffer_Release(&view);
+    return known;
+}
+
+double getNumber(PyObject* item, double)
+{
+    double value = PyFloat_AsDouble(item);
+    if (value == -1.0 && PyErr_Occurred())
+        throw Py::Exception();
+    return value;
+}
+
+int getNumber(PyObject* item, int)
+{
+#if PY_MAJOR_VERSION >= 3
+    long value = PyLong_AsLong(item);
+#else
+    long value = PyInt_AsLong(item);
+#endif
+    if (value == -1 && PyErr_Occurred())
+        throw Py::Exception();
+    return static_cast<int>(value);
+}
+
+// reads a (N) or (N, k) array or a sequence of N numbers or of N sequences of k numbers
+// into the flat vector values, columns is set to k (1 for numbers)
+template <typename T>
+void getValues(PyObject* obj, std::vector<T>& values, int& columns)
+{
+    values.clear();
+    columns = 0;
+    if (getBufferValues(obj, values, columns))
+        return;
+    Py::Sequence rows(obj);
+    values.reserve(rows.size());
+    for (Py::Sequence::iterator it = rows.begin(); it != rows.end(); ++it) {
+        Py::Object row(*it);
+        if (PySequence_Check(row.ptr())) {
+            Py::Sequence items(row);
+            if (it == rows.begin())
+                columns = static_cast<int>(items.size());
+            else if (static_cast<int>(items.size()) != columns)
+                throw Base::ValueError("All rows must have the same length");
+            for (Py::Sequence::iterator jt = items.begin(); jt != items.end(); ++jt)
+                values.push_back(getNumber(Py::Object(*jt).ptr(), T()));
+        }
+        else {
+            if (it == rows.begin())
+                columns = 1;
+            else if (columns != 1)
+                throw Base::ValueError("All rows must have the same length");
+            values.push_back(getNumber(row.ptr(), T()));
+        }
+    }
+}
+
+void getIds(PyObject* obj, std::vector<int>& ids)
+{
+    if (!obj || obj == Py_None)
+        return;
+    int columns;
+    getValues(obj, ids, columns);
+    if (!ids.empty() && columns != 1)
+        throw Base::ValueError("Ids must be a sequence of numbers");
+}
+
+PyObject* addElements(FemMesh* mesh, int dim, PyObject *args)
+{
+    PyObject *nodesObj;
+    PyObject *idsObj = 0;
+    if (!PyArg_ParseTuple(args, "O|O", &nodesObj, &idsObj))
+        return 0;
+
+    try {
+        std::vector<int> nodes;
+        std::vector<int> ids;
+        int nodesPerElement;
+        getValues(nodesObj, nodes, nodesPerElement);
+        getIds(idsObj, ids);
+        if (!nodes.empty())
+            mesh->addElements(dim, nodes, nodesPerElement, ids);
+        else if (!ids.empty())
+            throw Base::ValueError("Number of element ids does not match the number of elements");
+    }
+    catch (const Base::Exception& e) {
+        PyErr_SetString(Base::BaseExceptionFreeCADError, e.what());
+        return 0;
+    }
+    catch (const std::exception& e) {
+        PyErr_SetString(Base::BaseExceptionFreeCADError, e.what());
+        return 0;
+    }
+    catch (const Py::Exception&) {
+        return 0;
+    }
+    Py_Return;
+}
+
+}
+
+PyObject* FemMeshPy::addNodes(PyObject *args)
+{
+    PyObject *coordsObj;
+    PyObject *idsObj = 0;
+    if (!PyArg_ParseTuple(args, "O|O", &coordsObj, &idsObj))
+        return 0;
+
+    try {
+        std::vector<double> coords;
+        std::vector<int> ids;
+        int columns;
+        getValues(coordsObj, coords, columns);
+        if (!coords.empty() && columns != 3)
+            throw Base::ValueError("Coordinates must be given as (x, y, z) rows");
+        getIds(idsObj, ids);
+        getFemMeshPtr()->addNodes(coords, ids);
+    }
+    catch (const Base::Exception& e) {
+        PyErr_SetString(Base::BaseExceptionFreeCADError, e.what());
+        return 0;
+    }
+    catch (const std::exception& e) {
+        PyErr_SetString(Base::BaseExceptionFreeCADError, e.what());
+        return 0;
+    }
+    catch (const Py::Exception&) {
+        return 0;
+    }
+    Py_Return;
+}
+
+PyObject* FemMeshPy::addEdges(PyObject *args)
+{
+    return addElements(getFemMeshPtr(), 1, args);
+}
+
+PyObject* FemMeshPy::addFaces(PyObject *args)
+{
+    return addElements(getFemMeshPtr(), 2, args);
+}
+
+PyObject* FemMeshPy::addVolumes(PyObject *args)
+{
+    return addElements(getFemMeshPtr(), 3, args);
+}
+
 PyObject* FemMeshPy::copy(PyObject *args)
 {
     if (!PyArg_ParseTuple(args, ""))
@@ -31,6 +31,7 @@ import FreeCAD
 import Fem
 import FemMeshTools
 import Units
+import os
 import subprocess
 import tempfile
 from platform import system
@@ -126,8 +127,23 @@ class FemGmshTools():
         self.get_gmsh_command()
         self.get_group_data()
         self.write_part_file()
+        mesh_cache = get_mesh_cache()
+        if mesh_cache:
+            cache_key = mesh_cache.get_key(self.temp_file_geometry, self.get_mesh_parameters())
+            cached_mesh = mesh_cache.get(cache_key)
+            if cached_mesh:
+                FreeCAD.Console.PrintMessage('  GMSH mesh cache hit, mesh of unchanged geometry and parameters is used: ' + cached_mesh + '\n')
+                self.error = False
+                self.temp_file_mesh = cached_mesh
+                self.read_and_set_new_mesh()
+                return ''
+            if os.path.isfile(self.temp_file_mesh):
+                # the mesh of a former run must not be added to the cache if GMSH fails
+                os.remove(self.temp_file_mesh)
         self.write_geo()
         error = self.run_gmsh_with_geo()
+        if mesh_cache and not self.error and os.path.isfile(self.temp_file_mesh):
+            mesh_cache.add(cache_key, self.temp_file_mesh)
         self.read_and_set_new_mesh()
         return error
 
@@ -306,6 +322,27 @@ class FemGmshTools():
         print('  {}'.format(self.ele_length_map))
         print('  {}'.format(self.ele_node_map))
 
+    # everything the mesh depends on besides the geometry, used for the key of the mesh cache
+    def get_mesh_parameters(self):
+        parameters = {
+            'gmsh': self.gmsh_bin,
+            'clmax': self.clmax,
+            'clmin': self.clmin,
+            'geotol': self.geotol,
+            'order': self.order,
+            'dimension': self.dimension,
+            'algorithm2D': self.algorithm2D,
+            'algorithm3D': self.algorithm3D,
+            'groups': sorted((group, sorted(elements)) for group, elements in self.group_elements.items()),
+            'save_groups_of_nodes': bool(self.analysis and self.group_elements),
+            'ele_length_map': sorted(self.ele_length_map.items()),
+            'ele_node_map': sorted((e, sorted(n)) for e, n in self.ele_node_map.items()),
+        }
+        for prop in ('RecombineAll', 'OptimizeStd', 'OptimizeNetgen', 'HighOrderOptimize', 'CoherenceMesh'):
+            if hasattr(self.mesh_obj, prop):
+                parameters[prop] = getattr(self.mesh_obj, prop)
+        return parameters
+
     def write_part_file(self):
         self.part_obj.Shape.exportBrep(self.temp_file_geometry)
 
@@ -441,4 +478,76 @@ class FemGmshTools():
         del self.temp_file_geometry
         del self.temp_file_mesh
 
+
+def get_mesh_cache():
+    gmsh_prefs = FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/Fem/Gmsh")
+    if not gmsh_prefs.GetBool("UseMeshCache", True):
+        return None
+    cache_dir = gmsh_prefs.GetString("MeshCacheDir", "")
+    if not cache_dir:
+        cache_dir = os.path.join(tempfile.gettempdir(), 'FreeCAD_GmshMeshCache')
+    return GmshMeshCache(cache_dir, gmsh_prefs.GetInt("MeshCacheSize", 200) * 1024 * 1024)
+
+
+## content addressed cache of GMSH meshes
+#  The key of a mesh is a hash of the brep file of the shape and of the mesh parameters,
+#  if the cache is bigger than max_size the least recently used meshes are removed.
+class GmshMeshCache():
+    def __init__(self, cache_dir, max_size):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+
+    def get_key(self, brep_file, parameters):
+        import hashlib
+        key = hashlib.sha1()
+        with open(brep_file, 'rb') as f:
+            for data in iter(lambda: f.read(1 << 20), b''):
+                key.update(data)
+        key.update(repr(sorted(parameters.items())).encode('utf-8'))
+        return key.hexdigest()
+
+    def get_file(self, key):
+        return os.path.join(self.cache_dir, key + '.unv')
+
+    def get(self, key):
+        cached_mesh = self.get_file(key)
+        if not os.path.isfile(cached_mesh):
+            return None
+        # the modification time is the last use for the eviction
+        os.utime(cached_mesh, None)
+        return cached_mesh
+
+    def add(self, key, mesh_file):
+        import shutil
+        if not os.path.isdir(self.cache_dir):
+            try:
+                os.makedirs(self.cache_dir)
+            except OSError:
+                FreeCAD.Console.PrintError('GMSH mesh cache directory {} could not be created.\n'.format(self.cache_dir))
+                return
+        if os.path.getsize(mesh_file) > self.max_size:
+            FreeCAD.Console.PrintMessage('  The mesh is bigger than the GMSH mesh cache, it is not cached.\n')
+            return
+        # copy to a temporary file first, thus there is never an incomplete mesh in the cache
+        tmp_file = self.get_file(key) + '.tmp'
+        shutil.copyfile(mesh_file, tmp_file)
+        if os.path.isfile(self.get_file(key)):
+            os.remove(self.get_file(key))
+        os.rename(tmp_file, self.get_file(key))
+        self.evict()
+
+    def evict(self):
+        meshes = []
+        for file_name in os.listdir(self.cache_dir):
+            if file_name.endswith('.unv'):
+                f = os.path.join(self.cache_dir, file_name)
+                meshes.append((os.path.getmtime(f), os.path.getsize(f), f))
+        size = sum(m[1] for m in meshes)
+        for mtime, file_size, f in sorted(meshes):
+            if size <= self.max_size:
+                break
+            os.remove(f)
+            size -= file_size
+            print('  Removed from GMSH mesh cache: ' + f)
+
 ##  @}
@@ -76,16 +76,28 @@ class FemInputWriter():
         self.ccx_efaces = 'Efaces'
         self.ccx_eedges = 'Eedges'
         self.ccx_elsets = []
-        self.femmesh = self.mesh_object.FemMesh
+        self.constraint_conflict_nodes = []
+        # the mesh topology is searched once per write and shared by all constraints and element sets
+        self.femmesh_topology = FemMeshTools.FemMeshTopologyCache(self.mesh_object)
+        self.invalidate_femmesh_topology()
+
+    def invalidate_femmesh_topology(self):
+        # has to be called if the FemMesh of the mesh object was changed
+        self.femmesh_topology.invalidate()
+        self.femmesh = self.femmesh_topology.femmesh
         self.femnodes_mesh = {}
         self.femelement_table = {}
-        self.constraint_conflict_nodes = []
-        self.femnodes_ele_table = {}
+        self.femnodes_ele_index = None
+
+    def get_femelement_table_and_index(self):
+        # the femelement_table and the node element index are built once and shared by all constraints and element sets
+        self.femelement_table = self.femmesh_topology.get_femelement_table()
+        self.femnodes_ele_index = self.femmesh_topology.get_femnodes_ele_index()
 
     def get_constraints_fixed_nodes(self):
         # get nodes
         for femobj in self.fixed_objects:  # femobj --> dict, FreeCAD document object is femobj['Object']
-            femobj['Nodes'] = FemMeshTools.get_femnodes_by_femobj_with_references(self.femmesh, femobj)
+            femobj['Nodes'] = FemMeshTools.get_femnodes_by_femobj_with_references(self.femmesh, femobj, self.femmesh_topology)
             # add nodes to constraint_conflict_nodes, needed by constraint plane rotation
             for node in femobj['Nodes']:
                 self.constraint_conflict_nodes.append(node)
@@ -93,7 +105,7 @@ class FemInputWriter():
     def get_constraints_displacement_nodes(self):
         # get nodes
         for femobj in self.displacement_objects:  # femobj --> dict, FreeCAD document object is femobj['Object']
-            femobj['Nodes'] = FemMeshTools.get_femnodes_by_femobj_with_references(self.femmesh, femobj)
+            femobj['Nodes'] = FemMeshTools.get_femnodes_by_femobj_with_references(self.femmesh, femobj, self.femmesh_topology)
             # add nodes to constraint_conflict_nodes, needed by constraint plane rotation
             for node in femobj['Nodes']:
                 self.constraint_conflict_nodes.append(node)
@@ -101,22 +113,22 @@ class FemInputWriter():
     def get_constraints_planerotation_nodes(self):
         # get nodes
         for femobj in self.planerotation_objects:  # femobj --> dict, FreeCAD document object is femobj['Object']
-            femobj['Nodes'] = FemMeshTools.get_femnodes_by_femobj_with_references(self.femmesh, femobj)
+            femobj['Nodes'] = FemMeshTools.get_femnodes_by_femobj_with_references(self.femmesh, femobj, self.femmesh_topology)
 
     def get_constraints_transform_nodes(self):
         # get nodes
         for femobj in self.transform_objects:  # femobj --> dict, FreeCAD document object is femobj['Object']
-            femobj['Nodes'] = FemMeshTools.get_femnodes_by_femobj_with_references(self.femmesh, femobj)
+            femobj['Nodes'] = FemMeshTools.get_femnodes_by_femobj_with_references(self.femmesh, femobj, self.femmesh_topology)
 
     def get_constraints_temperature_nodes(self):
         # get nodes
         for femobj in self.temperature_objects:  # femobj --> dict, FreeCAD document object is femobj['Object']
-            femobj['Nodes'] = FemMeshTools.get_femnodes_by_femobj_with_references(self.femmesh, femobj)
+            femobj['Nodes'] = FemMeshTools.get_femnodes_by_femobj_with_references(self.femmesh, femobj, self.femmesh_topology)
 
     def get_constraints_fluidsection_nodes(self):
         # get nodes
         for femobj in self.fluidsection_objects:  # femobj --> dict, FreeCAD document object is femobj['Object']
-            femobj['Nodes'] = FemMeshTools.get_femnodes_by_femobj_with_references(self.femmesh, femobj)
+            femobj['Nodes'] = FemMeshTools.get_femnodes_by_femobj_with_references(self.femmesh, femobj, self.femmesh_topology)
 
     def get_constraints_force_nodeloads(self):
         # check shape type of reference shape
@@ -128,13 +140,12 @@ class FemInputWriter():
             elif femobj['RefShapeType'] == 'Face' and FemMeshTools.is_solid_femmesh(self.femmesh) and not FemMeshTools.has_no_face_data(self.femmesh):
                 # print("solid_mesh with face data --> we do not need the femelement_table but we need the femnodes_mesh for node load calculation")
                 if not self.femnodes_mesh:
-                    self.femnodes_mesh = self.femmesh.Nodes
+                    self.femnodes_mesh = self.femmesh_topology.get_femnodes_mesh()
             else:
                 # print("mesh without needed data --> we need the femelement_table and femnodes_mesh for node load calculation")
                 if not self.femnodes_mesh:
-                    self.femnodes_mesh = self.femmesh.Nodes
-                if not self.femelement_table:
-                    self.femelement_table = FemMeshTools.get_femelement_table(self.femmesh)
+                    self.femnodes_mesh = self.femmesh_topology.get_femnodes_mesh()
+                self.get_femelement_table_and_index()
         # get node loads
         for femobj in self.force_objects:  # femobj --> dict, FreeCAD document object is femobj['Object']
             frc_obj = femobj['Object']
@@ -143,9 +154,9 @@ class FemInputWriter():
             if femobj['RefShapeType'] == 'Vertex':  # point load on vertieces
                 femobj['NodeLoadTable'] = FemMeshTools.get_force_obj_vertex_nodeload_table(self.femmesh, frc_obj)
             elif femobj['RefShapeType'] == 'Edge':  # line load on edges
-                femobj['NodeLoadTable'] = FemMeshTools.get_force_obj_edge_nodeload_table(self.femmesh, self.femelement_table, self.femnodes_mesh, frc_obj)
+                femobj['NodeLoadTable'] = FemMeshTools.get_force_obj_edge_nodeload_table(self.femmesh, self.femelement_table, self.femnodes_mesh, frc_obj, self.femnodes_ele_index, self.femmesh_topology.get_femnodes_spatial_index())
             elif femobj['RefShapeType'] == 'Face':  # area load on faces
-                femobj['NodeLoadTable'] = FemMeshTools.get_force_obj_face_nodeload_table(self.femmesh, self.femelement_table, self.femnodes_mesh, frc_obj)
+                femobj['NodeLoadTable'] = FemMeshTools.get_force_obj_face_nodeload_table(self.femmesh, self.femelement_table, self.femnodes_mesh, frc_obj, self.femnodes_ele_index, self.femmesh_topology.get_femnodes_spatial_index())
 
     def get_constraints_pressure_faces(self):
         # TODO see comments in get_constraints_force_nodeloads(), it applies here too. Mhh it applies to all constraints ...
@@ -158,36 +169,28 @@ class FemInputWriter():
             # print(femobj['PressureFaces'])
         '''
 
-        if not self.femnodes_mesh:
-            self.femnodes_mesh = self.femmesh.Nodes
-        if not self.femelement_table:
-            self.femelement_table = FemMeshTools.get_femelement_table(self.femmesh)
-        if not self.femnodes_ele_table:
-            self.femnodes_ele_table = FemMeshTools.get_femnodes_ele_table(self.femnodes_mesh, self.femelement_table)
+        self.get_femelement_table_and_index()
 
         for femobj in self.pressure_objects:  # femobj --> dict, FreeCAD document object is femobj['Object']
-            pressure_faces = FemMeshTools.get_pressure_obj_faces(self.femmesh, self.femelement_table, self.femnodes_ele_table, femobj)
+            pressure_faces = FemMeshTools.get_pressure_obj_faces(self.femmesh, self.femelement_table, self.femnodes_ele_index, femobj, self.femmesh_topology)
             # print(len(pressure_faces))
             femobj['PressureFaces'] = [(femobj['Object'].Name + ': face load', pressure_faces)]
             print(femobj['PressureFaces'])
 
     def get_element_geometry2D_elements(self):
         # get element ids and write them into the objects
-        if not self.femelement_table:
-            self.femelement_table = FemMeshTools.get_femelement_table(self.femmesh)
-        FemMeshTools.get_femelement_sets(self.femmesh, self.femelement_table, self.shellthickness_objects)
+        self.get_femelement_table_and_index()
+        FemMeshTools.get_femelement_sets(self.femmesh, self.femelement_table, self.shellthickness_objects, self.femnodes_ele_index, self.femmesh_topology)
 
     def get_element_geometry1D_elements(self):
         # get element ids and write them into the objects
-        if not self.femelement_table:
-            self.femelement_table = FemMeshTools.get_femelement_table(self.femmesh)
-        FemMeshTools.get_femelement_sets(self.femmesh, self.femelement_table, self.beamsection_objects)
+        self.get_femelement_table_and_index()
+        FemMeshTools.get_femelement_sets(self.femmesh, self.femelement_table, self.beamsection_objects, self.femnodes_ele_index, self.femmesh_topology)
 
     def get_element_fluid1D_elements(self):
         # get element ids and write them into the objects
-        if not self.femelement_table:
-            self.femelement_table = FemMeshTools.get_femelement_table(self.femmesh)
-        FemMeshTools.get_femelement_sets(self.femmesh, self.femelement_table, self.fluidsection_objects)
+        self.get_femelement_table_and_index()
+        FemMeshTools.get_femelement_sets(self.femmesh, self.femelement_table, self.fluidsection_objects, self.femnodes_ele_index, self.femmesh_topology)
 
     def get_material_elements(self):
         # it only works if either Volumes or Shellthicknesses or Beamsections are in the material objects
@@ -200,21 +203,14 @@ class FemInputWriter():
                 all_found = FemMeshTools.get_femelement_sets_from_group_data(self.femmesh, self.material_objects)
                 print(all_found)
             if all_found is False:
-                if not self.femelement_table:
-                    self.femelement_table = FemMeshTools.get_femelement_table(self.femmesh)
-                # we gone use the binary search for get_femelements_by_femnodes(), thus we need the parameter values self.femnodes_ele_table
-                if not self.femnodes_mesh:
-                    self.femnodes_mesh = self.femmesh.Nodes
-                if not self.femnodes_ele_table:
-                    self.femnodes_ele_table = FemMeshTools.get_femnodes_ele_table(self.femnodes_mesh, self.femelement_table)
-                FemMeshTools.get_femelement_sets(self.femmesh, self.femelement_table, self.material_objects, self.femnodes_ele_table)
+                # we gone use the binary search for get_femelements_by_femnodes(), thus we need the self.femnodes_ele_index
+                self.get_femelement_table_and_index()
+                FemMeshTools.get_femelement_sets(self.femmesh, self.femelement_table, self.material_objects, self.femnodes_ele_index, self.femmesh_topology)
         if self.shellthickness_objects:
-            if not self.femelement_table:
-                self.femelement_table = FemMeshTools.get_femelement_table(self.femmesh)
-            FemMeshTools.get_femelement_sets(self.femmesh, self.femelement_table, self.material_objects)
+            self.get_femelement_table_and_index()
+            FemMeshTools.get_femelement_sets(self.femmesh, self.femelement_table, self.material_objects, self.femnodes_ele_index, self.femmesh_topology)
         if self.beamsection_objects or self.fluidsection_objects:
-            if not self.femelement_table:
-                self.femelement_table = FemMeshTools.get_femelement_table(self.femmesh)
-            FemMeshTools.get_femelement_sets(self.femmesh, self.femelement_table, self.material_objects)
+            self.get_femelement_table_and_index()
+            FemMeshTools.get_femelement_sets(self.femmesh, self.femelement_table, self.material_objects, self.femnodes_ele_index, self.femmesh_topology)
 
 ##  @}
@@ -29,6 +29,7 @@ __url__ = "http://www.freecadweb.org"
 #  @{
 
 import FreeCAD
+import itertools
 import os
 import sys
 import time
@@ -78,14 +79,14 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
         self.femmesh.writeABAQUS(self.file_name)
 
         # reopen file with "append" and add the analysis definition
-        inpfile = open(self.file_name, 'a')
+        inpfile = open_inp_file(self.file_name, 'a')
         inpfile.write('\n\n')
 
         # Check to see if fluid sections are in analysis and use D network element type
         if self.fluidsection_objects:
             inpfile.close()
             FemMeshTools.write_D_network_element_to_inputfile(self.file_name)
-            inpfile = open(self.file_name, 'a')
+            inpfile = open_inp_file(self.file_name, 'a')
         # node and element sets
         self.write_element_sets_material_and_femelement_type(inpfile)
         if self.fixed_objects:
@@ -111,7 +112,7 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
             if is_fluid_section_inlet_outlet(self.ccx_elsets) is True:
                 inpfile.close()
                 FemMeshTools.use_correct_fluidinout_ele_def(self.FluidInletoutlet_ele, self.file_name)
-                inpfile = open(self.file_name, 'a')
+                inpfile = open_inp_file(self.file_name, 'a')
 
         # constraints independent from steps
         if self.planerotation_objects:
@@ -171,7 +172,7 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
         # first open file with "write" to ensure that the .writeABAQUS also writes in inputfile
         inpfileMain = open(self.file_name, 'w')
         inpfileMain.close()
-        inpfileMain = open(self.file_name, 'a')
+        inpfileMain = open_inp_file(self.file_name, 'a')
         inpfileMain.write('\n\n')
 
         # write nodes and elements
@@ -193,20 +194,28 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
         inpfileMain.write('*INCLUDE,INPUT=' + include_name + "_Node_Elem_sets.inp \n")
 
         # create separate inputfiles for each node set or constraint
+        inpfiles = []  # all separate inputfiles are closed at the end
         if self.fixed_objects or self.displacement_objects or self.planerotation_objects:
-            inpfileNodes = open(name + "_Node_sets.inp", 'w')
+            inpfileNodes = open_inp_file(name + "_Node_sets.inp", 'w')
+            inpfiles.append(inpfileNodes)
         if self.analysis_type == "thermomech" and self.temperature_objects:
-            inpfileNodeTemp = open(name + "_Node_Temp.inp", 'w')
+            inpfileNodeTemp = open_inp_file(name + "_Node_Temp.inp", 'w')
+            inpfiles.append(inpfileNodeTemp)
         if self.force_objects:
-            inpfileForce = open(name + "_Node_Force.inp", 'w')
+            inpfileForce = open_inp_file(name + "_Node_Force.inp", 'w')
+            inpfiles.append(inpfileForce)
         if self.pressure_objects:
-            inpfilePressure = open(name + "_Pressure.inp", 'w')
+            inpfilePressure = open_inp_file(name + "_Pressure.inp", 'w')
+            inpfiles.append(inpfilePressure)
         if self.analysis_type == "thermomech" and self.heatflux_objects:
-            inpfileHeatflux = open(name + "_Node_Heatlfux.inp", 'w')
+            inpfileHeatflux = open_inp_file(name + "_Node_Heatlfux.inp", 'w')
+            inpfiles.append(inpfileHeatflux)
         if self.contact_objects:
-            inpfileContact = open(name + "_Surface_Contact.inp", 'w')
+            inpfileContact = open_inp_file(name + "_Surface_Contact.inp", 'w')
+            inpfiles.append(inpfileContact)
         if self.transform_objects:
-            inpfileTransform = open(name + "_Node_Transform.inp", 'w')
+            inpfileTransform = open_inp_file(name + "_Node_Transform.inp", 'w')
+            inpfiles.append(inpfileTransform)
 
         # node and element sets
         self.write_element_sets_material_and_femelement_type(inpfileMain)
@@ -331,6 +340,8 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
         # footer
         self.write_footer(inpfileMain)
         inpfileMain.close()
+        for inpfile in inpfiles:
+            inpfile.close()
         print("Writing time input file: " + str(time.clock() - timestart) + ' \n')
 
     def write_element_sets_material_and_femelement_type(self, f):
@@ -412,8 +423,7 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
                 if isinstance(ccx_elset['ccx_elset'], six.string_types):  # use six to be sure to be Python 2.7 and 3.x compatible
                     f.write(ccx_elset['ccx_elset'] + '\n')
                 else:
-                    for elid in ccx_elset['ccx_elset']:
-                        f.write(str(elid) + ',\n')
+                    write_id_lines(f, ccx_elset['ccx_elset'])
             else:
                 f.write('**No elements found for these objects\n')
 
@@ -428,8 +438,7 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
             fix_obj = femobj['Object']
             f.write('** ' + fix_obj.Label + '\n')
             f.write('*NSET,NSET=' + fix_obj.Name + '\n')
-            for n in femobj['Nodes']:
-                f.write(str(n) + ',\n')
+            write_id_lines(f, femobj['Nodes'])
 
     def write_node_sets_constraints_displacement(self, f):
         # get nodes
@@ -442,15 +451,14 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
             disp_obj = femobj['Object']
             f.write('** ' + disp_obj.Label + '\n')
             f.write('*NSET,NSET=' + disp_obj.Name + '\n')
-            for n in femobj['Nodes']:
-                f.write(str(n) + ',\n')
+            write_id_lines(f, femobj['Nodes'])
 
     def write_node_sets_constraints_planerotation(self, f):
         # get nodes
         self.get_constraints_planerotation_nodes()
         # write nodes to file
         if not self.femnodes_mesh:
-            self.femnodes_mesh = self.femmesh.Nodes
+            self.femnodes_mesh = self.femmesh_topology.get_femnodes_mesh()
         f.write('\n***********************************************************\n')
         f.write('** Node sets for plane rotation constraint\n')
         f.write('** written by {} function\n'.format(sys._getframe().f_code.co_name))
@@ -471,17 +479,9 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
             for i in range(len(l_nodes)):
                 if l_nodes[i] not in node_planerotation:
                     node_planerotation.append(l_nodes[i])
-            MPC_nodes = []
-            for i in range(len(node_planerotation)):
-                cnt = 0
-                for j in range(len(self.constraint_conflict_nodes)):
-                    if node_planerotation[i] == self.constraint_conflict_nodes[j]:
-                        cnt = cnt + 1
-                if cnt == 0:
-                    MPC = node_planerotation[i]
-                    MPC_nodes.append(MPC)
-            for i in range(len(MPC_nodes)):
-                f.write(str(MPC_nodes[i]) + ',\n')
+            constraint_conflict_nodes = set(self.constraint_conflict_nodes)
+            MPC_nodes = [n for n in node_planerotation if n not in constraint_conflict_nodes]
+            write_id_lines(f, MPC_nodes)
 
     def write_surfaces_contraints_contact(self, f):
         # get surface nodes and write them to file
@@ -496,7 +496,7 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
             obj = obj + 1
             for o, elem_tup in contact_obj.References:
                 for elem in elem_tup:
-                    ref_shape = o.Shape.getElement(elem)
+                    ref_shape = self.femmesh_topology.get_refshape(o, elem)
                     cnt = cnt + 1
                     if ref_shape.ShapeType == 'Face':
                         if cnt == 1:
@@ -504,9 +504,8 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
                         else:
                             name = "IND" + str(obj)
                         f.write('*SURFACE, NAME =' + name + '\n')
-                        v = self.mesh_object.FemMesh.getccxVolumesByFace(ref_shape)
-                        for i in v:
-                            f.write("{},S{}\n".format(i[0], i[1]))
+                        v = self.femmesh_topology.get_ccxvolumes_by_refelement(o, elem)
+                        write_formatted_lines(f, '%d,S%d\n', v)
 
     def write_node_sets_constraints_transform(self, f):
         # get nodes
@@ -522,8 +521,7 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
                 f.write('*NSET,NSET=Rect' + trans_obj.Name + '\n')
             elif trans_obj.TransformType == "Cylindrical":
                 f.write('*NSET,NSET=Cylin' + trans_obj.Name + '\n')
-            for n in femobj['Nodes']:
-                f.write(str(n) + ',\n')
+            write_id_lines(f, femobj['Nodes'])
 
     def write_node_sets_constraints_temperature(self, f):
         # get nodes
@@ -536,8 +534,7 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
             temp_obj = femobj['Object']
             f.write('** ' + temp_obj.Label + '\n')
             f.write('*NSET,NSET=' + temp_obj.Name + '\n')
-            for n in femobj['Nodes']:
-                f.write(str(n) + ',\n')
+            write_id_lines(f, femobj['Nodes'])
 
     def write_materials(self, f):
         f.write('\n***********************************************************\n')
@@ -880,19 +877,15 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
         for femobj in self.force_objects:  # femobj --> dict, FreeCAD document object is femobj['Object']
             f.write('** ' + femobj['Object'].Label + '\n')
             direction_vec = femobj['Object'].DirectionVector
+            # one line for each node and each direction component which is not 0.0
+            directions = [(i + 1, d) for i, d in enumerate((direction_vec.x, direction_vec.y, direction_vec.z)) if d != 0.0]
+            line_format = ''.join(['%d,{},%.13E\n'.format(i) for i, d in directions])
             for ref_shape in femobj['NodeLoadTable']:
                 f.write('** ' + ref_shape[0] + '\n')
-                for n in sorted(ref_shape[1]):
-                    node_load = ref_shape[1][n]
-                    if (direction_vec.x != 0.0):
-                        v1 = "{:.13E}".format(direction_vec.x * node_load)
-                        f.write(str(n) + ',1,' + v1 + '\n')
-                    if (direction_vec.y != 0.0):
-                        v2 = "{:.13E}".format(direction_vec.y * node_load)
-                        f.write(str(n) + ',2,' + v2 + '\n')
-                    if (direction_vec.z != 0.0):
-                        v3 = "{:.13E}".format(direction_vec.z * node_load)
-                        f.write(str(n) + ',3,' + v3 + '\n')
+                if directions:
+                    node_loads = ref_shape[1]
+                    rows = [[v for i, d in directions for v in (n, d * node_loads[n])] for n in sorted(node_loads)]
+                    write_formatted_lines(f, line_format, rows)
                 f.write('\n')
             f.write('\n')
 
@@ -907,16 +900,16 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
             prs_obj = femobj['Object']
             f.write('** ' + prs_obj.Label + '\n')
             rev = -1 if prs_obj.Reversed else 1
+            # the end of the line of each face number is formatted only once
+            face_load_lines = {}
+            for fno in (1, 2, 3, 4, 5, 6):  # solid mesh face
+                face_load_lines[fno] = ",P{},{}\n".format(fno, rev * prs_obj.Pressure)
+            face_load_lines[0] = ",P,{}\n".format(rev * prs_obj.Pressure)  # on shell mesh face: fno == 0 --> normal of element face == face normal
+            face_load_lines[-1] = ",P,{}\n".format(-1 * rev * prs_obj.Pressure)  # on shell mesh face: fno == -1 --> normal of element face oposite direction face normal
             f.write('*DLOAD\n')
             for ref_shape in femobj['PressureFaces']:
                 f.write('** ' + ref_shape[0] + '\n')
-                for face, fno in ref_shape[1]:
-                    if fno > 0:  # solid mesh face
-                        f.write("{},P{},{}\n".format(face, fno, rev * prs_obj.Pressure))
-                    elif fno == 0:  # on shell mesh face: fno == 0 --> normal of element face == face normal
-                        f.write("{},P,{}\n".format(face, rev * prs_obj.Pressure))
-                    elif fno == -1:  # on shell mesh face: fno == -1 --> normal of element face oposite direction face normal
-                        f.write("{},P,{}\n".format(face, -1 * rev * prs_obj.Pressure))
+                write_lines(f, [str(face) + face_load_lines[fno] for face, fno in ref_shape[1] if fno in face_load_lines])
 
     def write_constraints_temperature(self, f):
         f.write('\n***********************************************************\n')
@@ -946,22 +939,22 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
                 f.write('*FILM\n')
                 for o, elem_tup in heatflux_obj.References:
                     for elem in elem_tup:
-                        ho = o.Shape.getElement(elem)
+                        ho = self.femmesh_topology.get_refshape(o, elem)
                         if ho.ShapeType == 'Face':
-                            v = self.mesh_object.FemMesh.getccxVolumesByFace(ho)
+                            v = self.femmesh_topology.get_ccxvolumes_by_refelement(o, elem)
                             f.write("** Heat flux on face {}\n".format(elem))
-                            for i in v:
-                                f.write("{},F{},{},{}\n".format(i[0], i[1], heatflux_obj.AmbientTemp, heatflux_obj.FilmCoef * 0.001))  # SvdW add factor to force heatflux to units system of t/mm/s/K # OvG: Only write out the VolumeIDs linked to a particular face
+                            line_end = ",{},{}\n".format(heatflux_obj.AmbientTemp, heatflux_obj.FilmCoef * 0.001)  # SvdW add factor to force heatflux to units system of t/mm/s/K
+                            write_formatted_lines(f, '%d,F%d' + line_end.replace('%', '%%'), v)  # OvG: Only write out the VolumeIDs linked to a particular face
             elif heatflux_obj.ConstraintType == "DFlux":
                 f.write('*DFLUX\n')
                 for o, elem_tup in heatflux_obj.References:
                     for elem in elem_tup:
-                        ho = o.Shape.getElement(elem)
+                        ho = self.femmesh_topology.get_refshape(o, elem)
                         if ho.ShapeType == 'Face':
-                            v = self.mesh_object.FemMesh.getccxVolumesByFace(ho)
+                            v = self.femmesh_topology.get_ccxvolumes_by_refelement(o, elem)
                             f.write("** Heat flux on face {}\n".format(elem))
-                            for i in v:
-                                f.write("{},S{},{}\n".format(i[0], i[1], heatflux_obj.DFlux * 0.001))
+                            line_end = ",{}\n".format(heatflux_obj.DFlux * 0.001)
+                            write_formatted_lines(f, '%d,S%d' + line_end.replace('%', '%%'), v)
 
     def write_constraints_fluidsection(self, f):
         f.write('\n***********************************************************\n')
@@ -1200,10 +1193,8 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
                 mat_obj = mat_data['Object']
                 ccx_elset = {}
                 ccx_elset['beamsection_obj'] = beamsec_obj
-                elemids = []
-                for elemid in beamsec_data['FEMElements']:
-                    if elemid in mat_data['FEMElements']:
-                        elemids.append(elemid)
+                mat_elemids = set(mat_data['FEMElements'])
+                elemids = [elemid for elemid in beamsec_data['FEMElements'] if elemid in mat_elemids]
                 ccx_elset['ccx_elset'] = elemids
                 ccx_elset['ccx_elset_name'] = get_ccx_elset_beam_name(mat_obj.Name, beamsec_obj.Name, mat_data['ShortName'], beamsec_data['ShortName'])
                 ccx_elset['mat_obj_name'] = mat_obj.Name
@@ -1217,10 +1208,8 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
                 mat_obj = mat_data['Object']
                 ccx_elset = {}
                 ccx_elset['fluidsection_obj'] = fluidsec_obj
-                elemids = []
-                for elemid in fluidsec_data['FEMElements']:
-                    if elemid in mat_data['FEMElements']:
-                        elemids.append(elemid)
+                mat_elemids = set(mat_data['FEMElements'])
+                elemids = [elemid for elemid in fluidsec_data['FEMElements'] if elemid in mat_elemids]
                 ccx_elset['ccx_elset'] = elemids
                 ccx_elset['ccx_elset_name'] = get_ccx_elset_fluid_name(mat_obj.Name, fluidsec_obj.Name, mat_data['ShortName'], fluidsec_data['ShortName'])
                 ccx_elset['mat_obj_name'] = mat_obj.Name
@@ -1234,10 +1223,8 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
                 mat_obj = mat_data['Object']
                 ccx_elset = {}
                 ccx_elset['shellthickness_obj'] = shellth_obj
-                elemids = []
-                for elemid in shellth_data['FEMElements']:
-                    if elemid in mat_data['FEMElements']:
-                        elemids.append(elemid)
+                mat_elemids = set(mat_data['FEMElements'])
+                elemids = [elemid for elemid in shellth_data['FEMElements'] if elemid in mat_elemids]
                 ccx_elset['ccx_elset'] = elemids
                 ccx_elset['ccx_elset_name'] = get_ccx_elset_shell_name(mat_obj.Name, shellth_obj.Name, mat_data['ShortName'], shellth_data['ShortName'])
                 ccx_elset['mat_obj_name'] = mat_obj.Name
@@ -1246,6 +1233,35 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
 
 
 # Helpers
+# the big sections (node sets, element sets, loads) are formatted in chunks of lines and
+# written to the input files with a large file buffer
+inp_file_buffer_size = 1024 * 1024
+inp_chunk_size = 50000
+
+
+def open_inp_file(file_name, mode):
+    return open(file_name, mode, inp_file_buffer_size)
+
+
+def write_lines(f, lines):
+    # lines are strings which end with a newline
+    for start in range(0, len(lines), inp_chunk_size):
+        f.write(''.join(lines[start:start + inp_chunk_size]))
+
+
+def write_id_lines(f, ids):
+    # one node or element id per line followed by a comma
+    for start in range(0, len(ids), inp_chunk_size):
+        f.write(',\n'.join(map(str, ids[start:start + inp_chunk_size])) + ',\n')
+
+
+def write_formatted_lines(f, line_format, rows):
+    # every row is formatted with the %-style line_format, a whole chunk of rows is formatted at once
+    for start in range(0, len(rows), inp_chunk_size):
+        chunk = rows[start:start + inp_chunk_size]
+        f.write((line_format * len(chunk)) % tuple(itertools.chain.from_iterable(chunk)))
+
+
 def get_ccx_elset_beam_name(mat_name, beamsec_name, mat_short_name=None, beamsec_short_name=None):
     if not mat_short_name:
         mat_short_name = 'Mat0'
@@ -61,9 +61,9 @@ class FemInputWriterZ88(FemInputWriter.FemInputWriter):
 
     def write_z88_input(self):
         if not self.femnodes_mesh:
-            self.femnodes_mesh = self.femmesh.Nodes
+            self.femnodes_mesh = self.femmesh_topology.get_femnodes_mesh()
         if not self.femelement_table:
-            self.femelement_table = FemMeshTools.get_femelement_table(self.femmesh)
+            self.femelement_table = self.femmesh_topology.get_femelement_table()
             self.element_count = len(self.femelement_table)
         self.set_z88_elparam()
         self.write_z88_mesh()
@@ -29,6 +29,8 @@ __url__ = "http://www.freecadweb.org"
 ## @package FwmMesh2Mesh
 #  \ingroup FEM
 
+import FreeCAD
+import numpy as np
 import time
 # import Mesh
 
@@ -87,92 +89,111 @@ face_dicts = {
 
 
 def femmesh_2_mesh(myFemMesh, myResults=None):
-    shiftBits = 20  # allows a million nodes, needs to be higher for more nodes in a FemMesh
-
-    # This code generates a dict and a faceCode for each face of all elements
-    # All faceCodes are than sorted.
+    # This code generates the faces of all elements as sorted node arrays.
+    # The faces which are only used by one element are the faces on the surface of the mesh.
+    # There is no limit for the node ids, the faces are compared as rows of node ids.
 
     start_time = time.clock()
-    faceCodeList = []
-    faceCodeDict = {}
-
-    for ele in myFemMesh.Volumes:
-        element_nodes = myFemMesh.getElementNodes(ele)
-        # print 'element_node: ', element_nodes
-        faceDef = face_dicts[len(element_nodes)]
-
-        for key in faceDef:
-            nodeList = []
-            codeList = []
-            faceCode = 0
-            shifter = 0
-            for nodeIdx in faceDef[key]:
-                nodeList.append(element_nodes[nodeIdx])
-                codeList.append(element_nodes[nodeIdx])
-            codeList.sort()
-            for node in codeList:
-                faceCode += (node << shifter)
-                # x << n: x shifted left by n bits = Multiplication
-                shifter += shiftBits
-            # print 'codeList: ', codeList
-            faceCodeDict[faceCode] = nodeList
-            faceCodeList.append(faceCode)
-
-    faceCodeList.sort()
-    allFaces = len(faceCodeList)
-    actFaceIdx = 0
-    singleFaces = []
-    # Here we search for faces, which do not have a counterpart.
-    # These are the faces on the surface of the mesh.
-    while actFaceIdx < allFaces:
-        if actFaceIdx < (allFaces - 1):
-            if faceCodeList[actFaceIdx] == faceCodeList[actFaceIdx + 1]:
-                actFaceIdx += 2
-            else:
-                # print 'found a single Face: ', faceCodeList[actFaceIdx]
-                singleFaces.append(faceCodeList[actFaceIdx])
-                actFaceIdx += 1
-        else:
-            print('found a last Face: ', faceCodeList[actFaceIdx])
-            singleFaces.append(faceCodeList[actFaceIdx])
-            actFaceIdx += 1
+    faces = get_femmesh_faces(myFemMesh)
+    singleFaces = get_single_faces(faces)
+
+    node_ids, node_coords = get_femmesh_nodes(myFemMesh)
 
+    # triangles of the surface faces, a quad face is split into two triangles
     output_mesh = []
+    triangle_nodes = get_surface_triangles(singleFaces).ravel()
     if myResults:
         print(myResults.Name)
-        for myFace in singleFaces:
-            face_nodes = faceCodeDict[myFace]
-            dispVec0 = myResults.DisplacementVectors[myResults.NodeNumbers.index(face_nodes[0])]
-            dispVec1 = myResults.DisplacementVectors[myResults.NodeNumbers.index(face_nodes[1])]
-            dispVec2 = myResults.DisplacementVectors[myResults.NodeNumbers.index(face_nodes[2])]
-            triangle = [myFemMesh.getNodeById(face_nodes[0]) + dispVec0,
-                        myFemMesh.getNodeById(face_nodes[1]) + dispVec1,
-                        myFemMesh.getNodeById(face_nodes[2]) + dispVec2]
-            output_mesh.extend(triangle)
-            # print 'my triangle: ', triangle
-            if len(face_nodes) == 4:
-                dispVec3 = myResults.DisplacementVectors[myResults.NodeNumbers.index(face_nodes[3])]
-                triangle = [myFemMesh.getNodeById(face_nodes[2]) + dispVec2,
-                            myFemMesh.getNodeById(face_nodes[3]) + dispVec3,
-                            myFemMesh.getNodeById(face_nodes[0]) + dispVec0]
-                output_mesh.extend(triangle)
-                # print 'my 2. triangle: ', triangle
-
-    else:
-        for myFace in singleFaces:
-            face_nodes = faceCodeDict[myFace]
-            triangle = [myFemMesh.getNodeById(face_nodes[0]),
-                        myFemMesh.getNodeById(face_nodes[1]),
-                        myFemMesh.getNodeById(face_nodes[2])]
-            output_mesh.extend(triangle)
-            # print 'my triangle: ', triangle
-            if len(face_nodes) == 4:
-                triangle = [myFemMesh.getNodeById(face_nodes[2]),
-                            myFemMesh.getNodeById(face_nodes[3]),
-                            myFemMesh.getNodeById(face_nodes[0])]
-                output_mesh.extend(triangle)
-                # print 'my 2. triangle: ', triangle
+    if len(triangle_nodes):
+        points = node_coords[get_node_rows(node_ids, triangle_nodes)]
+        if myResults:
+            points += get_node_displacements(triangle_nodes, myResults)
+        output_mesh = [FreeCAD.Vector(p[0], p[1], p[2]) for p in points.tolist()]
 
     end_time = time.clock()
     print('Mesh by surface search method: ', end_time - start_time)
     return output_mesh
+
+
+def get_femmesh_nodes(femmesh):
+    # node ids sorted and an array of the node coordinates with one row per node id
+    nodes = femmesh.Nodes
+    node_ids = np.array(sorted(nodes), dtype=np.int64)
+    node_coords = np.array([tuple(nodes[n]) for n in node_ids.tolist()], dtype=np.float64).reshape(-1, 3)
+    return node_ids, node_coords
+
+
+def get_node_rows(node_ids, nodes):
+    # the rows of the nodes in the sorted node_ids array
+    rows = np.searchsorted(node_ids, nodes)
+    if rows.size and (rows.max() >= len(node_ids) or not np.array_equal(node_ids[rows], nodes)):
+        raise ValueError('FemMesh2Mesh: Node id not found.')
+    return rows
+
+
+def get_node_displacements(nodes, myResults):
+    # vectorized lookup of the displacement vectors of the nodes by a node id to row map of the result
+    result_node_ids = np.array(myResults.NodeNumbers, dtype=np.int64)
+    displacements = np.array([tuple(v) for v in myResults.DisplacementVectors], dtype=np.float64).reshape(-1, 3)
+    order = np.argsort(result_node_ids, kind='mergesort')
+    rows = get_node_rows(result_node_ids[order], nodes)
+    return displacements[order[rows]]
+
+
+def get_femmesh_faces(femmesh):
+    # {number of face nodes: (faces as node arrays in face node order, faces as sorted node arrays)}
+    element_nodes = {}  # {number of element nodes: [element nodes, ...]}
+    for ele in femmesh.Volumes:
+        nodes = femmesh.getElementNodes(ele)
+        element_nodes.setdefault(len(nodes), []).append(nodes)
+    faces = {3: [], 4: []}
+    for nodes_count, elements in element_nodes.items():
+        elements = np.array(elements, dtype=np.int64)
+        faceDef = face_dicts[nodes_count]
+        for key in sorted(faceDef):
+            faces[len(faceDef[key])].append(elements[:, faceDef[key]])
+    for face_nodes_count in list(faces):
+        if faces[face_nodes_count]:
+            face_nodes = np.concatenate(faces[face_nodes_count])
+            faces[face_nodes_count] = (face_nodes, np.sort(face_nodes, axis=1))
+        else:
+            del faces[face_nodes_count]
+    return faces
+
+
+def get_single_faces(faces):
+    # Here we search for faces, which do not have a counterpart.
+    # These are the faces on the surface of the mesh.
+    singleFaces = []
+    for face_nodes_count in sorted(faces):
+        face_nodes, sorted_nodes = faces[face_nodes_count]
+        order = np.lexsort(sorted_nodes.T[::-1])
+        sorted_nodes = sorted_nodes[order]
+        is_new = np.ones(len(sorted_nodes), dtype=bool)
+        is_new[1:] = np.any(sorted_nodes[1:] != sorted_nodes[:-1], axis=1)
+        starts = np.nonzero(is_new)[0]
+        counts = np.diff(np.append(starts, len(sorted_nodes)))
+        singleFaces.append(face_nodes[order[starts[counts == 1]]])
+    return singleFaces
+
+
+def get_surface_triangles(singleFaces):
+    # The surface faces are sorted by their sorted node ids, the highest node id first.
+    # A triangle face is sorted as if it had a fourth node id 0, this is the order of the former faceCode search.
+    keys = []  # sorted face nodes as columns node0, node1, node2, node3
+    face_triangles = []  # triangle nodes of every face, -1 if the face has only one triangle
+    for face_nodes in singleFaces:
+        sorted_nodes = np.sort(face_nodes, axis=1)
+        rows = np.full((len(face_nodes), 6), -1, dtype=np.int64)
+        rows[:, 0:3] = face_nodes[:, [0, 1, 2]]
+        if face_nodes.shape[1] == 3:
+            sorted_nodes = np.column_stack((sorted_nodes, np.zeros(len(sorted_nodes), dtype=np.int64)))
+        else:
+            rows[:, 3:6] = face_nodes[:, [2, 3, 0]]
+        keys.append(sorted_nodes)
+        face_triangles.append(rows)
+    if not keys:
+        return np.zeros((0, 3), dtype=np.int64)
+    keys = np.concatenate(keys)
+    face_triangles = np.concatenate(face_triangles)[np.lexsort(keys.T)].reshape(-1, 3)
+    return face_triangles[face_triangles[:, 0] >= 0]
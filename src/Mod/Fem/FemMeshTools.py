@@ -28,40 +28,47 @@ __url__ = "http://www.freecadweb.org"
 #  @{
 
 import FreeCAD
+import itertools
+import numpy as np
 
 
-def get_femnodes_by_femobj_with_references(femmesh, femobj):
+def get_femnodes_by_femobj_with_references(femmesh, femobj, femmesh_topology=None):
     node_set = []
     if femmesh.GroupCount:
         node_set = get_femnode_set_from_group_data(femmesh, femobj)
         # print('node_set_group: ', node_set)
     if not node_set:
-        node_set = get_femnodes_by_references(femmesh, femobj['Object'].References)
+        node_set = get_femnodes_by_references(femmesh, femobj['Object'].References, femmesh_topology)
         # print('node_set_nogroup: ', node_set)
     return node_set
 
 
-def get_femelements_by_references(femmesh, femelement_table, references, femnodes_ele_table=None):
+def get_femelements_by_references(femmesh, femelement_table, references, femnodes_ele_index=None, femmesh_topology=None):
     '''get the femelements for a list of references
+    if a femnodes_ele_index is given it is used for all references,
+    volume elements are in order of the femelement_table, all others are sorted
     '''
     references_femelements = []
+    binary_search = femnodes_ele_index is not None and is_solid_femmesh(femmesh)
+    if femnodes_ele_index is None:
+        femnodes_ele_index = get_femnodes_ele_index(femelement_table)
     for ref in references:
-        ref_femnodes = get_femnodes_by_refshape(femmesh, ref)  # femnodes for the current ref
-        if femnodes_ele_table:
+        ref_femnodes = get_femnodes_by_refshape(femmesh, ref, femmesh_topology)  # femnodes for the current ref
+        if binary_search:
             # blind fast binary search, works for volumes only
-            references_femelements += get_femelements_by_femnodes_bin(femelement_table, femnodes_ele_table, ref_femnodes)  # femelements for all references
+            references_femelements += get_femelements_by_femnodes_bin(femelement_table, femnodes_ele_index, ref_femnodes)  # femelements for all references
         else:
             # standard search
-            references_femelements += get_femelements_by_femnodes_std(femelement_table, ref_femnodes)  # femelements for all references
+            references_femelements += get_femelements_by_femnodes_std(femelement_table, ref_femnodes, femnodes_ele_index)  # femelements for all references
     return references_femelements
 
 
-def get_femnodes_by_references(femmesh, references):
+def get_femnodes_by_references(femmesh, references, femmesh_topology=None):
     '''get the femnodes for a list of references
     '''
     references_femnodes = []
     for ref in references:
-        references_femnodes += get_femnodes_by_refshape(femmesh, ref)
+        references_femnodes += get_femnodes_by_refshape(femmesh, ref, femmesh_topology)
 
     # return references_femnodes  # keeps duplicate nodes, keeps node order
 
@@ -69,24 +76,258 @@ def get_femnodes_by_references(femmesh, references):
     return list(set(references_femnodes))  # removes duplicate nodes, sortes node order
 
 
-def get_femnodes_by_refshape(femmesh, ref):
+def get_femnodes_by_refshape(femmesh, ref, femmesh_topology=None):
     nodes = []
     for refelement in ref[1]:
-        r = get_element(ref[0], refelement)  # the method getElement(element) does not return Solid elements
-        print('  ReferenceShape : ', r.ShapeType, ', ', ref[0].Name, ', ', ref[0].Label, ' --> ', refelement)
-        if r.ShapeType == 'Vertex':
-            nodes += femmesh.getNodesByVertex(r)
-        elif r.ShapeType == 'Edge':
-            nodes += femmesh.getNodesByEdge(r)
-        elif r.ShapeType == 'Face':
-            nodes += femmesh.getNodesByFace(r)
-        elif r.ShapeType == 'Solid':
-            nodes += femmesh.getNodesBySolid(r)
+        if femmesh_topology:
+            nodes += femmesh_topology.get_femnodes_by_refelement(ref[0], refelement)
         else:
-            print('  No Vertice, Edge, Face or Solid as reference shapes!')
+            nodes += get_femnodes_by_refelement(femmesh, ref[0], refelement)
     return nodes
 
 
+def get_femnodes_by_refelement(femmesh, ref_obj, refelement, r=None, femnodes_spatial_index=None):
+    if r is None:
+        r = get_element(ref_obj, refelement)  # the method getElement(element) does not return Solid elements
+    print('  ReferenceShape : ', r.ShapeType, ', ', ref_obj.Name, ', ', ref_obj.Label, ' --> ', refelement)
+    nodes = []
+    if r.ShapeType in ('Vertex', 'Edge', 'Face', 'Solid'):
+        nodes = get_femnodes_by_shape(femmesh, r, femnodes_spatial_index)
+    else:
+        print('  No Vertice, Edge, Face or Solid as reference shapes!')
+    return list(nodes)
+
+
+def get_femnodes_by_shape(femmesh, shape, femnodes_spatial_index=None):
+    '''the femnodes on a Vertex, Edge, Face or Solid, sorted by node id
+    the femnodes_spatial_index is used if given, otherwise the FemMesh is searched
+    '''
+    if femnodes_spatial_index is not None:
+        return femnodes_spatial_index.get_femnodes_by_shape(shape)
+    if shape.ShapeType == 'Vertex':
+        return femmesh.getNodesByVertex(shape)
+    elif shape.ShapeType == 'Edge':
+        return femmesh.getNodesByEdge(shape)
+    elif shape.ShapeType == 'Face':
+        return femmesh.getNodesByFace(shape)
+    elif shape.ShapeType == 'Solid':
+        return femmesh.getNodesBySolid(shape)
+    return []
+
+
+class FemMeshTopologyCache(object):
+    '''mesh topology of a mesh object used while writing the solver input
+    The femelement_table, the femnodes_ele_index and the femnodes and ccx volume faces of every
+    reference sub shape are searched only once, no matter how many constraints use them.
+    The cache is keyed by the mesh object and the reference sub shapes (ref object name, sub element name).
+    invalidate() has to be called if the FemMesh of the mesh object was changed.
+    '''
+    def __init__(self, mesh_obj):
+        self.mesh_object = mesh_obj
+        self.invalidate()
+
+    def invalidate(self):
+        self.femmesh = self.mesh_object.FemMesh
+        self.femnodes_mesh = {}
+        self.femelement_table = {}
+        self.femnodes_ele_index = None
+        self.femnodes_spatial_index = None
+        self.refshapes = {}  # {(ref object name, sub element name): sub shape}
+        self.refshape_femnodes = {}  # {(ref object name, sub element name): [femnodes]}
+        self.refshape_ccxvolumes = {}  # {(ref object name, sub element name): [(femvolume, ccx face number)]}
+
+    def get_femnodes_mesh(self):
+        if not self.femnodes_mesh:
+            self.femnodes_mesh = self.femmesh.Nodes
+        return self.femnodes_mesh
+
+    def get_femelement_table(self):
+        if not self.femelement_table:
+            self.femelement_table = get_femelement_table(self.femmesh)
+        return self.femelement_table
+
+    def get_femnodes_ele_index(self):
+        if self.femnodes_ele_index is None:
+            self.femnodes_ele_index = get_femnodes_ele_index(self.get_femelement_table())
+        return self.femnodes_ele_index
+
+    def get_femnodes_spatial_index(self):
+        if self.femnodes_spatial_index is None:
+            self.femnodes_spatial_index = FemNodesSpatialIndex(self.femmesh, self.get_femnodes_mesh())
+        return self.femnodes_spatial_index
+
+    def get_refshape(self, ref_obj, refelement):
+        key = (ref_obj.Name, refelement)
+        if key not in self.refshapes:
+            self.refshapes[key] = get_element(ref_obj, refelement)
+        return self.refshapes[key]
+
+    def get_femnodes_by_refelement(self, ref_obj, refelement):
+        key = (ref_obj.Name, refelement)
+        if key not in self.refshape_femnodes:
+            self.refshape_femnodes[key] = get_femnodes_by_refelement(self.femmesh, ref_obj, refelement, self.get_refshape(ref_obj, refelement), self.get_femnodes_spatial_index())
+        return self.refshape_femnodes[key]
+
+    def get_ccxvolumes_by_refelement(self, ref_obj, refelement):
+        key = (ref_obj.Name, refelement)
+        if key not in self.refshape_ccxvolumes:
+            self.refshape_ccxvolumes[key] = self.femmesh.getccxVolumesByFace(self.get_refshape(ref_obj, refelement))
+        return self.refshape_ccxvolumes[key]
+
+
+class FemNodesSpatialIndex(object):
+    '''uniform grid over the node coordinates of a FemMesh to find the nodes on reference shapes
+    Built once for a mesh and used for all reference shapes. Only the nodes in the grid cells of the
+    bounding box of a shape are tested instead of all nodes of the mesh. The nodes of vertices and
+    straight edges are found by their distance only. For circles, planes, cylinders and spheres the
+    nodes which are not on the underlying curve or surface are sorted out at once, the remaining ones
+    are measured against the shape. The limits are the ones of the FemMesh.getNodesBy methods, thus
+    the same nodes are found. Solids are searched by FemMesh.getNodesBySolid(), nearly all nodes
+    in the bounding box of a solid have to be measured anyway.
+    the nodes of the grid cell cell_coords[i] are node_ids[cell_ptr[i]:cell_ptr[i + 1]]
+    '''
+    nodes_per_cell = 8
+
+    def __init__(self, femmesh, femnodes_mesh=None):
+        self.femmesh = femmesh
+        if femnodes_mesh is None:
+            femnodes_mesh = femmesh.Nodes
+        node_ids = np.array(list(femnodes_mesh.keys()), dtype=np.int64)
+        coords = np.array([(v.x, v.y, v.z) for v in femnodes_mesh.values()], dtype=np.float64).reshape(-1, 3)
+        if len(node_ids):
+            self.box_min = coords.min(axis=0)
+            extent = coords.max(axis=0) - self.box_min
+        else:
+            self.box_min = np.zeros(3)
+            extent = np.zeros(3)
+        # cubic cells with about nodes_per_cell nodes, flat directions of face and edge meshes are not counted
+        dims = extent > extent.max() * 1e-6
+        if dims.any():
+            cell_volume = np.prod(extent[dims]) * self.nodes_per_cell / len(node_ids)
+            self.cell_size = cell_volume ** (1.0 / dims.sum())
+        else:
+            self.cell_size = 1.0
+        self.cell_coords, cell_index = unique_rows(self.get_cell_coords(coords))
+        order = np.argsort(cell_index, kind='mergesort')
+        self.node_ids = node_ids[order]
+        self.coords = coords[order]
+        self.cell_ptr = np.zeros(len(self.cell_coords) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cell_index, minlength=len(self.cell_coords)), out=self.cell_ptr[1:])
+
+    def get_cell_coords(self, coords):
+        return np.floor((coords - self.box_min) / self.cell_size).astype(np.int64)
+
+    def get_node_indices_in_box(self, box_min, box_max):
+        '''indices of the nodes inside the box
+        '''
+        cell_min = self.get_cell_coords(box_min)
+        cell_max = self.get_cell_coords(box_max)
+        cells = np.nonzero(np.all((self.cell_coords >= cell_min) & (self.cell_coords <= cell_max), axis=1))[0]
+        starts = self.cell_ptr[cells]
+        indices = get_range_indices(starts, self.cell_ptr[cells + 1] - starts)
+        inside = np.all((self.coords[indices] >= box_min) & (self.coords[indices] <= box_max), axis=1)
+        return indices[inside]
+
+    def get_node_indices_in_shape_box(self, shape, limit):
+        bb = shape.BoundBox
+        # the bounding box of the FemMesh methods contains the shape tolerance and the limit
+        gap = shape.Tolerance + limit
+        return self.get_node_indices_in_box(np.array((bb.XMin, bb.YMin, bb.ZMin)) - gap,
+                                            np.array((bb.XMax, bb.YMax, bb.ZMax)) + gap)
+
+    def get_femnodes_by_shape(self, shape):
+        '''the femnodes on a Vertex, Edge, Face or Solid, sorted by node id
+        '''
+        if shape.ShapeType == 'Vertex':
+            return self.get_femnodes_by_vertex(shape)
+        elif shape.ShapeType == 'Edge':
+            return self.get_femnodes_by_edge(shape)
+        elif shape.ShapeType == 'Face':
+            return self.get_femnodes_by_face(shape)
+        elif shape.ShapeType == 'Solid':
+            return sorted(self.femmesh.getNodesBySolid(shape))
+        return []
+
+    def get_femnodes_by_vertex(self, vertex):
+        limit = vertex.Tolerance
+        point = get_vector_array(vertex.Point)
+        indices = self.get_node_indices_in_box(point - limit, point + limit)
+        distances = ((self.coords[indices] - point) ** 2).sum(axis=1)
+        return sorted(self.node_ids[indices[distances <= limit * limit]].tolist())
+
+    def get_femnodes_by_edge(self, edge):
+        limit = edge.Tolerance
+        indices = self.get_node_indices_in_shape_box(edge, limit)
+        curve = edge.Curve
+        curve_type = type(curve).__name__
+        if curve_type in ('Line', 'LineSegment'):
+            # the distance to the segment between the vertices is the distance to the edge
+            start = get_vector_array(edge.Vertexes[0].Point)
+            direction = get_vector_array(edge.Vertexes[-1].Point) - start
+            vectors = self.coords[indices] - start
+            t = np.clip(np.dot(vectors, direction) / max(np.dot(direction, direction), 1e-300), 0.0, 1.0)
+            distances = np.sqrt(((vectors - t[:, None] * direction) ** 2).sum(axis=1))
+            return sorted(self.node_ids[indices[distances < limit]].tolist())
+        elif curve_type == 'Circle':
+            vectors = self.coords[indices] - get_vector_array(curve.Center)
+            heights = np.dot(vectors, get_vector_array(curve.Axis))
+            radii = np.sqrt(np.maximum((vectors ** 2).sum(axis=1) - heights ** 2, 0.0))
+            distances = np.sqrt(heights ** 2 + (radii - curve.Radius) ** 2)
+            indices = indices[distances < limit * (1 + 1e-9)]
+        return self.get_femnodes_by_distance(edge, indices, limit)
+
+    def get_femnodes_by_face(self, face):
+        limit = face.Tolerance
+        indices = self.get_node_indices_in_shape_box(face, limit)
+        surface = face.Surface
+        surface_type = type(surface).__name__
+        distances = None
+        if surface_type == 'Plane':
+            distances = np.abs(np.dot(self.coords[indices] - get_vector_array(surface.Position), get_vector_array(surface.Axis)))
+        elif surface_type == 'Cylinder':
+            vectors = self.coords[indices] - get_vector_array(surface.Center)
+            heights = np.dot(vectors, get_vector_array(surface.Axis))
+            radii = np.sqrt(np.maximum((vectors ** 2).sum(axis=1) - heights ** 2, 0.0))
+            distances = np.abs(radii - surface.Radius)
+        elif surface_type == 'Sphere':
+            distances = np.abs(np.sqrt(((self.coords[indices] - get_vector_array(surface.Center)) ** 2).sum(axis=1)) - surface.Radius)
+        if distances is not None:
+            indices = indices[distances < limit * (1 + 1e-9)]
+        return self.get_femnodes_by_distance(face, indices, limit)
+
+    def get_femnodes_by_distance(self, shape, indices, limit):
+        import Part
+        nodes = []
+        for i in indices.tolist():
+            if shape.distToShape(Part.Vertex(FreeCAD.Vector(*self.coords[i].tolist())))[0] < limit:
+                nodes.append(int(self.node_ids[i]))
+        return sorted(nodes)
+
+
+def get_vector_array(vector):
+    return np.array((vector.x, vector.y, vector.z), dtype=np.float64)
+
+
+def get_range_indices(starts, lengths):
+    '''concatenated index ranges starts[i]:starts[i] + lengths[i]
+    '''
+    return np.arange(lengths.sum(), dtype=np.int64) + np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+
+
+def unique_rows(rows):
+    '''unique rows of a (N, 3) integer array and the index of every row in the unique rows
+    '''
+    if not len(rows):
+        return rows.reshape(0, 3), np.zeros(0, dtype=np.int64)
+    order = np.lexsort(rows.T[::-1])
+    sorted_rows = rows[order]
+    new_row = np.ones(len(rows), dtype=bool)
+    new_row[1:] = np.any(sorted_rows[1:] != sorted_rows[:-1], axis=1)
+    index = np.empty(len(rows), dtype=np.int64)
+    index[order] = np.cumsum(new_row) - 1
+    return sorted_rows[new_row], index
+
+
 def get_femelement_table(femmesh):
     """ get_femelement_table(femmesh): { elementid : [ nodeid, nodeid, ... , nodeid ] }"""
     femelement_table = {}
@@ -104,172 +345,176 @@ def get_femelement_table(femmesh):
     return femelement_table
 
 
-def get_femnodes_ele_table(femnodes_mesh, femelement_table):
-    '''the femnodes_ele_table contains for each node its membership in elements
-    {nodeID : [[eleID, NodePosition], [], ...], nodeID : [[], [], ...], ...}
-    stored informatation are:
-    element number, the number of nodes per element, the position of the node in the element.
-    The position of the node in the element is coded as a set bit at that position in a bit array (integer)
-    Fixme: the number of nodes per element should be replaced by the type of the element
-    but I did not know, how to get this from the mesh.
-    Since the femelement_table contains either volume or face or edgemesh the femnodes_ele_table only
-    has either volume or face or edge elements, see get_femelement_table()
+# CalculiX element face masks, a bit is set for every node of the volume element which is part of the face
+# {number of element nodes : {face mask : ccx face number}}
+ccx_face_masks = {
+    4: ((7, 1), (11, 2), (13, 3), (14, 4)),  # tet4
+    10: ((119, 1), (411, 2), (717, 3), (814, 4)),  # tet10
+    8: ((240, 1), (15, 2), (102, 3), (204, 4), (153, 5), (51, 6)),  # hex8
+    20: ((61680, 1), (3855, 2), (402022, 3), (804044, 4), (624793, 5), (201011, 6)),  # hex20
+    6: ((56, 1), (7, 2), (54, 3), (45, 4), (27, 5)),  # pent6
+    15: ((3640, 1), (455, 2), (25782, 3), (22829, 4), (12891, 5))}  # pent15
+
+# number of element nodes on a face of a volume element {number of element nodes : (face node counts)}
+volume_face_node_counts = {
+    4: (3,),  # tetra4
+    10: (4,),  # tetra10, see get_femvolumeelements_by_femfacenodes()
+    8: (4,),  # hexa8
+    20: (8,),  # hexa20
+    6: (3, 4),  # penta6
+    15: (6, 8)}  # penta15
+
+
+class FemNodesEleIndex(object):
+    '''node to element adjacency of a femelement_table in compressed sparse row (CSR) form
+    Built once for a mesh and used for all node set queries, thus the femelement_table is
+    not searched for every constraint or reference shape again.
+    elements are stored by index in the order of the femelement_table:
+        ele_ids: element id of every element index
+        ele_nodes_count: number of nodes of every element
+    the elements of the node node_ids[i] are
+        node_ele[node_ptr[i]:node_ptr[i + 1]], their node position in the element in node_pos
+    The bit patterns are the ones of ulrichs binary search, see forumpost
+    http://forum.freecadweb.org/viewtopic.php?f=18&p=141133&sid=013c93f496a63872951d2ce521702ffa#p141108
+    The bit at the node position of the element is set if the node is in the node set.
     '''
-    femnodes_ele_table = {}  # node_dict in ulrichs class
-    for n in femnodes_mesh:  # initialize it with sorted node keys and empty lists
-        femnodes_ele_table[n] = []
-    for ele in femelement_table:
-        ele_list = femelement_table[ele]
-        # print(ele_list)
-        pos = int(1)
-        for ele_node in ele_list:
-            femnodes_ele_table[ele_node].append([ele, pos])
-            pos = pos << 1
-    print('len femnodes_ele_table:' + str(len(femnodes_ele_table)))
-    # print('femnodes_ele_table: ', femnodes_ele_table)
-    return femnodes_ele_table
-
-
-def get_copy_of_empty_femelement_table(femelement_table):
-    '''{eleID : 0, eleID : 0, ...}
+    def __init__(self, femelement_table):
+        ele_ids = list(femelement_table.keys())
+        ele_nodes = [femelement_table[e] for e in ele_ids]
+        self.ele_ids = np.array(ele_ids, dtype=np.int64)
+        self.ele_nodes_count = np.array([len(n) for n in ele_nodes], dtype=np.int64)
+        entries_count = int(self.ele_nodes_count.sum())
+        entry_nodes = np.fromiter(itertools.chain.from_iterable(ele_nodes), dtype=np.int64, count=entries_count)
+        entry_ele = np.repeat(np.arange(len(ele_ids), dtype=np.int64), self.ele_nodes_count)
+        ele_ptr = np.zeros(len(ele_ids) + 1, dtype=np.int64)
+        np.cumsum(self.ele_nodes_count, out=ele_ptr[1:])
+        entry_pos = np.arange(entries_count, dtype=np.int64) - np.repeat(ele_ptr[:-1], self.ele_nodes_count)
+        # group the entries by node
+        self.node_ids, entry_node_index = np.unique(entry_nodes, return_inverse=True)
+        order = np.argsort(entry_node_index, kind='mergesort')
+        self.node_ele = entry_ele[order]
+        self.node_pos = entry_pos[order]
+        self.node_ptr = np.zeros(len(self.node_ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(entry_node_index, minlength=len(self.node_ids)), out=self.node_ptr[1:])
+
+    def get_node_entries(self, node_set):
+        '''element indices and node positions of all elements of the nodes in node_set
+        duplicate nodes and nodes which are not in any element are ignored
+        '''
+        nodes = np.unique(np.asarray(list(node_set), dtype=np.int64))
+        node_index = np.searchsorted(self.node_ids, nodes)
+        in_range = node_index < len(self.node_ids)
+        node_index = node_index[in_range]
+        node_index = node_index[self.node_ids[node_index] == nodes[in_range]]
+        starts = self.node_ptr[node_index]
+        lengths = self.node_ptr[node_index + 1] - starts
+        entries = get_range_indices(starts, lengths)
+        return self.node_ele[entries], self.node_pos[entries]
+
+    def get_bit_patterns(self, node_set):
+        '''bit pattern of every element index for the node_set
+        '''
+        ele, pos = self.get_node_entries(node_set)
+        # max 20 nodes per element, the sum is exact in float64
+        bits = np.left_shift(1, pos).astype(np.float64)
+        return np.bincount(ele, weights=bits, minlength=len(self.ele_ids)).astype(np.int64)
+
+    def get_node_counts(self, node_set):
+        '''number of nodes of the node_set in every element index
+        '''
+        ele, pos = self.get_node_entries(node_set)
+        return np.bincount(ele, minlength=len(self.ele_ids))
+
+    def get_femelements_by_femnodes(self, node_set):
+        '''elements with all nodes in node_set, in order of the femelement_table
+        '''
+        found = self.get_node_counts(node_set) == self.ele_nodes_count
+        return self.ele_ids[found].tolist()
+
+    def get_femelements_by_femnodes_count(self, node_set, min_count):
+        '''element indices with at least min_count nodes in node_set
+        '''
+        return np.nonzero(self.get_node_counts(node_set) >= min_count)[0]
+
+    def get_ccxelement_faces(self, node_set):
+        '''[[element, ccx face number], ...] of the volume element faces with all nodes in node_set
+        '''
+        patterns = self.get_bit_patterns(node_set)
+        candidates = np.nonzero(patterns)[0]
+        faces = []  # [element index, face order, face number]
+        for nodes_count, masks in ccx_face_masks.items():
+            of_type = candidates[self.ele_nodes_count[candidates] == nodes_count]
+            for face_order, (mask, face_number) in enumerate(masks):
+                found = of_type[(patterns[of_type] & mask) == mask]
+                faces.append(np.column_stack((found, np.full(len(found), face_order), np.full(len(found), face_number))))
+        if not faces:
+            return []
+        faces = np.concatenate(faces)
+        faces = faces[np.lexsort((faces[:, 1], faces[:, 0]))]
+        return [[e, f] for e, f in zip(self.ele_ids[faces[:, 0]].tolist(), faces[:, 2].tolist())]
+
+    def get_femvolumeelements_by_femfacenodes(self, node_set):
+        '''volume elements with one face on node_set, sorted by element id
+        see get_femvolumeelements_by_femfacenodes()
+        '''
+        counts = self.get_node_counts(node_set)
+        found = np.zeros(len(self.ele_ids), dtype=bool)
+        for nodes_count in np.unique(self.ele_nodes_count).tolist():
+            if nodes_count not in volume_face_node_counts:
+                FreeCAD.Console.PrintError('Error in get_femvolumeelements_by_femfacenodes(): not known volume element: ' + str(nodes_count) + '\n')
+                continue
+            of_type = self.ele_nodes_count == nodes_count
+            for face_nodes_count in volume_face_node_counts[nodes_count]:
+                found |= of_type & (counts == face_nodes_count)
+        return sorted(self.ele_ids[found].tolist())
+
+
+def get_femnodes_ele_index(femelement_table):
+    '''the femnodes_ele_index contains for each node its membership in elements, see FemNodesEleIndex
+    Since the femelement_table contains either volume or face or edgemesh the femnodes_ele_index only
+    has either volume or face or edge elements, see get_femelement_table()
     '''
-    empty_femelement_table = {}
-    for ele in femelement_table:  # initialize it with sorted element keys and empty int
-        empty_femelement_table[ele] = 0
-    return empty_femelement_table.copy()
+    femnodes_ele_index = FemNodesEleIndex(femelement_table)
+    print('len femnodes_ele_index: ' + str(len(femnodes_ele_index.node_ids)))
+    return femnodes_ele_index
 
 
-def get_bit_pattern_dict(femelement_table, femnodes_ele_table, node_set):
-    '''Now we are looking for nodes inside of the Faces = filling the bit_pattern_dict
-    {eleID : [lenEleNodes, binary_position]}
-    see forumpost for a ver good explanation whats really happening
-    http://forum.freecadweb.org/viewtopic.php?f=18&p=141133&sid=013c93f496a63872951d2ce521702ffa#p141108
-    The bit_pattern_dict holds later an integer (bit array) for each element, which gives us
-    the information we are searching for:
-    Is this element part of the node list (searching for elements) or  has this element a face we are searching for?
-    The number in the ele_dict is organized as a bit array.
-    The corresponding bit is set, if the node of the node_set is contained in the element.
-    '''
-    print('len femnodes_ele_table:' + str(len(femnodes_ele_table)))
-    print('len node_set: ' + str(len(node_set)))
-    # print('node_set: ', node_set)
-    bit_pattern_dict = get_copy_of_empty_femelement_table(femelement_table)
-    # # initializing the bit_pattern_dict
-    for ele in femelement_table:
-        len_ele = len(femelement_table[ele])
-        bit_pattern_dict[ele] = [len_ele, 0]
-    for node in node_set:
-        for nList in femnodes_ele_table[node]:
-            bit_pattern_dict[nList[0]][1] += nList[1]
-    print('len bit_pattern_dict:' + str(len(bit_pattern_dict)))
-    # print('bit_pattern_dict: ', bit_pattern_dict)
-    return bit_pattern_dict
-
-
-def get_ccxelement_faces_from_binary_search(bit_pattern_dict):
+def get_ccxelement_faces_from_binary_search(femnodes_ele_index, node_set):
     '''get the CalculiX element face numbers
     '''
-    tet10_mask = {
-        119: 1,
-        411: 2,
-        717: 3,
-        814: 4}
-    tet4_mask = {
-        7: 1,
-        11: 2,
-        13: 3,
-        14: 4}
-    hex8_mask = {
-        240: 1,
-        15: 2,
-        102: 3,
-        204: 4,
-        153: 5,
-        51: 6}
-    hex20_mask = {
-        61680: 1,
-        3855: 2,
-        402022: 3,
-        804044: 4,
-        624793: 5,
-        201011: 6}
-    pent6_mask = {
-        56: 1,
-        7: 2,
-        54: 3,
-        45: 4,
-        27: 5}
-    pent15_mask = {
-        3640: 1,
-        455: 2,
-        25782: 3,
-        22829: 4,
-        12891: 5}
-    vol_dict = {
-        4: tet4_mask,
-        6: pent6_mask,
-        8: hex8_mask,
-        10: tet10_mask,
-        15: pent15_mask,
-        20: hex20_mask}
-    faces = []
-    for ele in bit_pattern_dict:
-        mask_dict = vol_dict[bit_pattern_dict[ele][0]]
-        for key in mask_dict:
-            if (key & bit_pattern_dict[ele][1]) == key:
-                faces.append([ele, mask_dict[key]])
+    faces = femnodes_ele_index.get_ccxelement_faces(node_set)
     print('found Faces: ', len(faces))
     print('faces: ', faces)
     return faces
 
 
-def get_femelements_by_femnodes_bin(femelement_table, femnodes_ele_table, node_list):
+def get_femelements_by_femnodes_bin(femelement_table, femnodes_ele_index, node_list):
     '''for every femelement of femelement_table
     if all nodes of the femelement are in node_list,
     the femelement is added to the list which is returned
-    blind fast binary search, but workd for volumes only
+    blind fast binary search, the femelements are in order of the femelement_table
     '''
     print('binary search: get_femelements_by_femnodes_bin')
-    vol_masks = {
-        4: 15,
-        6: 63,
-        8: 255,
-        10: 1023,
-        15: 32767,
-        20: 1048575}
-    # Now we are looking for nodes inside of the Volumes = filling the bit_pattern_dict
-    print('len femnodes_ele_table:' + str(len(femnodes_ele_table)))
-    bit_pattern_dict = get_bit_pattern_dict(femelement_table, femnodes_ele_table, node_list)
-    # search
-    ele_list = []  # The ele_list contains the result of the search.
-    for ele in bit_pattern_dict:
-        # print('bit_pattern_dict[ele][0]: ', bit_pattern_dict[ele][0])
-        if bit_pattern_dict[ele][1] == vol_masks[bit_pattern_dict[ele][0]]:
-            ele_list.append(ele)
+    ele_list = femnodes_ele_index.get_femelements_by_femnodes(node_list)
     print('found Volumes: ', len(ele_list))
-    print('   volumes: ', len(ele_list))
     return ele_list
 
 
-def get_femelements_by_femnodes_std(femelement_table, node_list):
+def get_femelements_by_femnodes_std(femelement_table, node_list, femnodes_ele_index=None):
     '''for every femelement of femelement_table
     if all nodes of the femelement are in node_list,
     the femelement is added to the list which is returned
+    the femelements are sorted
     e: elementlist
     nodes: nodelist '''
     print('std search: get_femelements_by_femnodes_std')
-    e = []  # elementlist
-    for elementID in sorted(femelement_table):
-        nodecount = 0
-        for nodeID in femelement_table[elementID]:
-            if nodeID in node_list:
-                nodecount = nodecount + 1
-        if nodecount == len(femelement_table[elementID]):   # all nodes of the element are in the node_list!
-            e.append(elementID)
+    if femnodes_ele_index is None:
+        femnodes_ele_index = FemNodesEleIndex(femelement_table)
+    e = sorted(femnodes_ele_index.get_femelements_by_femnodes(node_list))  # elementlist
     return e
 
 
-def get_femvolumeelements_by_femfacenodes(femelement_table, node_list):
+def get_femvolumeelements_by_femfacenodes(femelement_table, node_list, femnodes_ele_index=None):
     '''assume femelement_table only has volume elements
     for every femvolumeelement of femelement_table
     for tetra4 and tetra10 the C++ methods could be used --> test again to be sure
@@ -279,53 +524,14 @@ def get_femvolumeelements_by_femfacenodes(femelement_table, node_list):
     if penta15 volume element --> if exact 6 or 8 element nodes are in node_list --> add femelement
     e: elementlist
     nodes: nodelist '''
-    e = []  # elementlist
-    for elementID in sorted(femelement_table):
-        nodecount = 0
-        el_nd_ct = len(femelement_table[elementID])
-        if el_nd_ct == 4:  # tetra4
-            for nodeID in femelement_table[elementID]:
-                if nodeID in node_list:
-                    nodecount = nodecount + 1
-            if nodecount == 3:
-                e.append(elementID)
-        elif el_nd_ct == 10:  # tetra10
-            for nodeID in femelement_table[elementID]:
-                if nodeID in node_list:
-                    nodecount = nodecount + 1
-            if nodecount == 4:
-                e.append(elementID)
-        elif el_nd_ct == 8:  # hexa8
-            for nodeID in femelement_table[elementID]:
-                if nodeID in node_list:
-                    nodecount = nodecount + 1
-            if nodecount == 4:
-                e.append(elementID)
-        elif el_nd_ct == 20:  # hexa20
-            for nodeID in femelement_table[elementID]:
-                if nodeID in node_list:
-                    nodecount = nodecount + 1
-            if nodecount == 8:
-                e.append(elementID)
-        elif el_nd_ct == 6:  # penta6
-            for nodeID in femelement_table[elementID]:
-                if nodeID in node_list:
-                    nodecount = nodecount + 1
-            if nodecount == 3 or nodecount == 4:
-                e.append(elementID)
-        elif el_nd_ct == 15:  # penta15
-            for nodeID in femelement_table[elementID]:
-                if nodeID in node_list:
-                    nodecount = nodecount + 1
-            if nodecount == 6 or nodecount == 8:
-                e.append(elementID)
-        else:
-            FreeCAD.Console.PrintError('Error in get_femvolumeelements_by_femfacenodes(): not known volume element: ' + el_nd_ct + '\n')
+    if femnodes_ele_index is None:
+        femnodes_ele_index = FemNodesEleIndex(femelement_table)
+    e = femnodes_ele_index.get_femvolumeelements_by_femfacenodes(node_list)  # elementlist
     # print(sorted(e))
     return e
 
 
-def get_femelement_sets(femmesh, femelement_table, fem_objects, femnodes_ele_table=None):  # fem_objects = FreeCAD FEM document objects
+def get_femelement_sets(femmesh, femelement_table, fem_objects, femnodes_ele_index=None, femmesh_topology=None):  # fem_objects = FreeCAD FEM document objects
     # get femelements for reference shapes of each obj.References
     count_femelements = 0
     referenced_femelements = []
@@ -335,7 +541,7 @@ def get_femelement_sets(femmesh, femelement_table, fem_objects, femnodes_ele_tab
         fem_object['ShortName'] = get_elset_short_name(obj, fem_object_i)  # unique short identifier
         if obj.References:
             ref_shape_femelements = []
-            ref_shape_femelements = get_femelements_by_references(femmesh, femelement_table, obj.References, femnodes_ele_table)
+            ref_shape_femelements = get_femelements_by_references(femmesh, femelement_table, obj.References, femnodes_ele_index, femmesh_topology)
             referenced_femelements += ref_shape_femelements
             count_femelements += len(ref_shape_femelements)
             fem_object['FEMElements'] = ref_shape_femelements
@@ -344,6 +550,7 @@ def get_femelement_sets(femmesh, femelement_table, fem_objects, femnodes_ele_tab
     # get remaining femelements for the fem_objects
     if has_remaining_femelements:
         remaining_femelements = []
+        referenced_femelements = set(referenced_femelements)
         for elemid in femelement_table:
             if elemid not in referenced_femelements:
                 remaining_femelements.append(elemid)
@@ -442,7 +649,7 @@ def get_force_obj_vertex_nodeload_table(femmesh, frc_obj):
     return force_obj_node_load_table
 
 
-def get_force_obj_edge_nodeload_table(femmesh, femelement_table, femnodes_mesh, frc_obj):
+def get_force_obj_edge_nodeload_table(femmesh, femelement_table, femnodes_mesh, frc_obj, femnodes_ele_index=None, femnodes_spatial_index=None):
     # force_obj_node_load_table = [('refshape_name.elemname',node_load_table), ..., ('refshape_name.elemname',node_load_table)]
     force_obj_node_load_table = []
     sum_ref_edge_length = 0
@@ -458,7 +665,7 @@ def get_force_obj_edge_nodeload_table(femmesh, femelement_table, femnodes_mesh,
             ref_edge = o.Shape.getElement(elem)
 
             # edge_table = { meshedgeID : ( nodeID, ... , nodeID ) }
-            edge_table = get_ref_edgenodes_table(femmesh, femelement_table, ref_edge)
+            edge_table = get_ref_edgenodes_table(femmesh, femelement_table, ref_edge, femnodes_ele_index, femnodes_spatial_index)
 
             # node_length_table = [ (nodeID, length), ... , (nodeID, length) ]  some nodes will have more than one entry
             node_length_table = get_ref_edgenodes_lengths(femnodes_mesh, edge_table)
@@ -510,7 +717,7 @@ def get_force_obj_edge_nodeload_table(femmesh, femelement_table, femnodes_mesh,
 
         print('bad_edge_table')
         # bad_edge_table = { meshedgeID : ( nodeID, ... , nodeID ) }
-        bad_edge_table = get_ref_edgenodes_table(femmesh, femelement_table, bad_refedge)
+        bad_edge_table = get_ref_edgenodes_table(femmesh, femelement_table, bad_refedge, femnodes_ele_index)
         print(len(bad_edge_table))
         bad_edge_table_nodes = []
         for elem in bad_edge_table:
@@ -549,14 +756,15 @@ def get_pressure_obj_faces_depreciated(femmesh, femobj):
     return pressure_faces
 
 
-def get_pressure_obj_faces(femmesh, femelement_table, femnodes_ele_table, femobj):
+def get_pressure_obj_faces(femmesh, femelement_table, femnodes_ele_index, femobj, femmesh_topology=None):
     if is_solid_femmesh(femmesh):
         # get the nodes
-        prs_face_node_set = get_femnodes_by_femobj_with_references(femmesh, femobj)  # sorted and duplicates removed
+        prs_face_node_set = get_femnodes_by_femobj_with_references(femmesh, femobj, femmesh_topology)  # sorted and duplicates removed
         # print('prs_face_node_set: ', prs_face_node_set)
-        # fill the bit_pattern_dict and search for the faces
-        bit_pattern_dict = get_bit_pattern_dict(femelement_table, femnodes_ele_table, prs_face_node_set)
-        pressure_faces = get_ccxelement_faces_from_binary_search(bit_pattern_dict)
+        # search for the faces by the bit patterns of the femnodes_ele_index
+        if femnodes_ele_index is None:
+            femnodes_ele_index = get_femnodes_ele_index(femelement_table)
+        pressure_faces = get_ccxelement_faces_from_binary_search(femnodes_ele_index, prs_face_node_set)
     elif is_face_femmesh(femmesh):
         pressure_faces = []
         # normaly we should call get_femelements_by_references and the group check should be integrated there
@@ -577,7 +785,7 @@ def get_pressure_obj_faces(femmesh, femelement_table, femnodes_ele_table, femobj
     return pressure_faces
 
 
-def get_force_obj_face_nodeload_table(femmesh, femelement_table, femnodes_mesh, frc_obj):
+def get_force_obj_face_nodeload_table(femmesh, femelement_table, femnodes_mesh, frc_obj, femnodes_ele_index=None, femnodes_spatial_index=None):
     # force_obj_node_load_table = [('refshape_name.elemname',node_load_table), ..., ('refshape_name.elemname',node_load_table)]
     force_obj_node_load_table = []
     sum_ref_face_area = 0
@@ -593,7 +801,7 @@ def get_force_obj_face_nodeload_table(femmesh, femelement_table, femnodes_mesh,
             ref_face = o.Shape.getElement(elem)
 
             # face_table = { meshfaceID : ( nodeID, ... , nodeID ) }
-            face_table = get_ref_facenodes_table(femmesh, femelement_table, ref_face)
+            face_table = get_ref_facenodes_table(femmesh, femelement_table, ref_face, femnodes_ele_index, femnodes_spatial_index)
 
             # node_area_table = [ (nodeID, Area), ... , (nodeID, Area) ]  some nodes will have more than one entry
             node_area_table = get_ref_facenodes_areas(femnodes_mesh, face_table)
@@ -634,19 +842,14 @@ def get_force_obj_face_nodeload_table(femmesh, femelement_table, femnodes_mesh,
     return force_obj_node_load_table
 
 
-def get_ref_edgenodes_table(femmesh, femelement_table, refedge):
+def get_ref_edgenodes_table(femmesh, femelement_table, refedge, femnodes_ele_index=None, femnodes_spatial_index=None):
     edge_table = {}  # { meshedgeID : ( nodeID, ... , nodeID ) }
-    refedge_nodes = femmesh.getNodesByEdge(refedge)
+    refedge_nodes = set(get_femnodes_by_shape(femmesh, refedge, femnodes_spatial_index))
+    if femnodes_ele_index is None:
+        femnodes_ele_index = get_femnodes_ele_index(femelement_table)
     if is_solid_femmesh(femmesh):
-        refedge_fem_volumeelements = []
         # if at least two nodes of a femvolumeelement are in refedge_nodes the volume is added to refedge_fem_volumeelements
-        for elem in femelement_table:
-            nodecount = 0
-            for node in femelement_table[elem]:
-                if node in refedge_nodes:
-                    nodecount += 1
-            if nodecount > 1:
-                refedge_fem_volumeelements.append(elem)
+        refedge_fem_volumeelements = femnodes_ele_index.ele_ids[femnodes_ele_index.get_femelements_by_femnodes_count(refedge_nodes, 2)].tolist()
         # for every refedge_fem_volumeelement look which of his nodes is in refedge_nodes --> add all these nodes to edge_table
         for elem in refedge_fem_volumeelements:
             fe_refedge_nodes = []
@@ -657,15 +860,8 @@ def get_ref_edgenodes_table(femmesh, femelement_table, refedge):
         #  FIXME duplicate_mesh_elements: as soon as contact ans springs are supported the user should decide on which edge the load is applied
         edge_table = delete_duplicate_mesh_elements(edge_table)
     elif is_face_femmesh(femmesh):
-        refedge_fem_faceelements = []
         # if at least two nodes of a femfaceelement are in refedge_nodes the volume is added to refedge_fem_volumeelements
-        for elem in femelement_table:
-            nodecount = 0
-            for node in femelement_table[elem]:
-                if node in refedge_nodes:
-                    nodecount += 1
-            if nodecount > 1:
-                refedge_fem_faceelements.append(elem)
+        refedge_fem_faceelements = femnodes_ele_index.ele_ids[femnodes_ele_index.get_femelements_by_femnodes_count(refedge_nodes, 2)].tolist()
         # for every refedge_fem_faceelement look which of his nodes is in refedge_nodes --> add all these nodes to edge_table
         for elem in refedge_fem_faceelements:
             fe_refedge_nodes = []
@@ -676,7 +872,7 @@ def get_ref_edgenodes_table(femmesh, femelement_table, refedge):
         #  FIXME duplicate_mesh_elements: as soon as contact ans springs are supported the user should decide on which edge the load is applied
         edge_table = delete_duplicate_mesh_elements(edge_table)
     elif is_edge_femmesh(femmesh):
-        refedge_fem_edgeelements = get_femelements_by_femnodes_std(femelement_table, refedge_nodes)
+        refedge_fem_edgeelements = get_femelements_by_femnodes_std(femelement_table, refedge_nodes, femnodes_ele_index)
         for elem in refedge_fem_edgeelements:
             edge_table[elem] = femelement_table[elem]  # { edgeID : ( nodeID, ... , nodeID  )} # all nodes off this femedgeelement
     return edge_table
@@ -728,7 +924,7 @@ def get_ref_edgenodes_lengths(femnodes_mesh, edge_table):
     return node_length_table
 
 
-def get_ref_facenodes_table(femmesh, femelement_table, ref_face):
+def get_ref_facenodes_table(femmesh, femelement_table, ref_face, femnodes_ele_index=None, femnodes_spatial_index=None):
     face_table = {}  # { meshfaceID : ( nodeID, ... , nodeID ) }
     if is_solid_femmesh(femmesh):
         if has_no_face_data(femmesh):
@@ -736,7 +932,7 @@ def get_ref_facenodes_table(femmesh, femelement_table, ref_face):
             # there is no face data
             # the problem if we retrive the nodes ourself is they are not sorted we just have the nodes. We need to sourt them according
             # the shell mesh notaion of tria3, tria6, quad4, quad8
-            ref_face_nodes = femmesh.getNodesByFace(ref_face)
+            ref_face_nodes = set(get_femnodes_by_shape(femmesh, ref_face, femnodes_spatial_index))
             # try to use getccxVolumesByFace() to get the volume ids of element with elementfaces on the ref_face --> should work for tetra4 and tetra10
             ref_face_volume_elements = femmesh.getccxVolumesByFace(ref_face)  # list of tupels (mv, ccx_face_nr)
             if ref_face_volume_elements:  # mesh with tetras
@@ -750,7 +946,7 @@ def get_ref_facenodes_table(femmesh, femelement_table, ref_face):
                     face_table[veID] = ve_ref_face_nodes  # { volumeID : ( facenodeID, ... , facenodeID ) } only the ref_face nodes
             else:  # mesh with hexa or penta
                 print('Use of getccxVolumesByFace() has NOT returned volume elements of the ref_face! We try to use get_femvolumeelements_by_femfacenodes()!')
-                ref_face_volume_elements = get_femvolumeelements_by_femfacenodes(femelement_table, ref_face_nodes)  # list of integer [mv]
+                ref_face_volume_elements = get_femvolumeelements_by_femfacenodes(femelement_table, ref_face_nodes, femnodes_ele_index)  # list of integer [mv]
                 for veID in ref_face_volume_elements:
                     ve_ref_face_nodes = []
                     for nodeID in femelement_table[veID]:
@@ -763,8 +959,8 @@ def get_ref_facenodes_table(femmesh, femelement_table, ref_face):
             for mf in faces:
                 face_table[mf] = femmesh.getElementNodes(mf)
     elif is_face_femmesh(femmesh):
-        ref_face_nodes = femmesh.getNodesByFace(ref_face)
-        ref_face_elements = get_femelements_by_femnodes_std(femelement_table, ref_face_nodes)
+        ref_face_nodes = set(get_femnodes_by_shape(femmesh, ref_face, femnodes_spatial_index))
+        ref_face_elements = get_femelements_by_femnodes_std(femelement_table, ref_face_nodes, femnodes_ele_index)
         for mf in ref_face_elements:
             face_table[mf] = femelement_table[mf]
     # print(face_table)
@@ -1482,14 +1678,9 @@ def get_cylindrical_coords(obj):
 def write_D_network_element_to_inputfile(fileName):
     # replace B32 elements with D elements for fluid section
     f = open(fileName, 'r+')
-    lines = f.readlines()
+    data = f.read()
     f.seek(0)
-    for line in lines:
-        if line.find("B32") == -1:
-            f.write(line)
-        else:
-            dummy = line.replace("B32", "D")
-            f.write(dummy)
+    f.write(data.replace("B32", "D"))
     f.truncate()
     f.close()
 
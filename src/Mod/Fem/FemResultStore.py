@@ -0,0 +1,252 @@
+# ***************************************************************************
+# *                                                                         *
+# *   Copyright (c) 2026 agent <agent@local>                                *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+
+__title__ = "FEM result store"
+__author__ = "agent"
+__url__ = "http://www.freecadweb.org"
+
+## @package FemResultStore
+#  \ingroup FEM
+#  \brief store for FEM result sets with random access to every result set
+#
+#  The result sets are written into an uncompressed .npz file next to the result file
+#  of the solver. Every array of the store is memory mapped on reading, thus only
+#  the result set which is used is read from disk.
+#  The result objects of a store only know the store file and the index of their
+#  result set, the result data is filled by load_result() the first time it is needed.
+
+import FreeCAD
+import io
+import numpy as np
+import os
+import struct
+import tempfile
+import zipfile
+
+
+def get_result_store_file(result_file):
+    store_file = os.path.splitext(result_file)[0] + '_results.npz'
+    if os.access(os.path.dirname(os.path.abspath(store_file)), os.W_OK):
+        return store_file
+    # the result directory is read only, the store is written into the temp directory,
+    # the name holds a hash of the result file path, thus result files of the same name do not share a store
+    import hashlib
+    store_dir = os.path.join(tempfile.gettempdir(), 'FEM_result_stores')
+    if not os.path.isdir(store_dir):
+        os.makedirs(store_dir)
+    path = os.path.abspath(result_file)
+    if not isinstance(path, bytes):
+        path = path.encode('utf-8')
+    return os.path.join(store_dir, hashlib.md5(path).hexdigest()[:12] + '_' + os.path.basename(store_file))
+
+
+class FemResultStoreWriter(object):
+    '''writes result sets of the array based result readers one by one into a store file
+    a result set is {'number', 'time', 'step', result key: (node ids, values)}
+    '''
+    def __init__(self, store_file, result_file=None):
+        self.store_file = store_file
+        self.result_file = result_file
+        self.numbers = []
+        self.times = []
+        self.steps = []
+        self.zip_file = zipfile.ZipFile(store_file, 'w', zipfile.ZIP_STORED, allowZip64=True)
+
+    def add_result_set(self, result_set):
+        index = len(self.numbers)
+        self.numbers.append(result_set.get('number', 0))
+        self.times.append(result_set.get('time', 0))
+        self.steps.append(result_set.get('step', index))
+        for key in result_set:
+            if key not in ('number', 'time', 'step'):
+                ids, values = result_set[key]
+                self.write_array(get_member_name(index, key, 'ids'), ids)
+                self.write_array(get_member_name(index, key, 'values'), values)
+        return index
+
+    def write_array(self, name, array):
+        # np.save into a temporary file, zip_file.open() for writing is not available in Python 2
+        fd, tmp_file = tempfile.mkstemp(suffix='.npy')
+        os.close(fd)
+        try:
+            np.save(tmp_file, array)
+            self.zip_file.write(tmp_file, name + '.npy')
+        finally:
+            os.remove(tmp_file)
+
+    def close(self, span=0.0):
+        # the index is written at last, a store without index is not valid
+        if self.result_file and os.path.isfile(self.result_file):
+            self.write_array('result_file_name', np.array(os.path.abspath(self.result_file)))
+            self.write_array('result_file_size', np.array(os.path.getsize(self.result_file), dtype=np.int64))
+            self.write_array('result_file_mtime', np.array(os.path.getmtime(self.result_file), dtype=np.float64))
+        self.write_array('span', np.array(span, dtype=np.float64))
+        self.write_array('number', np.array(self.numbers, dtype=np.int64))
+        self.write_array('time', np.array(self.times, dtype=np.float64))
+        self.write_array('step', np.array(self.steps, dtype=np.int64))
+        self.zip_file.close()
+
+
+class FemResultStore(object):
+    '''random access to the result sets of a store file written by FemResultStoreWriter
+    '''
+    def __init__(self, store_file):
+        self.store_file = store_file
+        zip_file = zipfile.ZipFile(store_file, 'r')
+        self.members = {}
+        for info in zip_file.infolist():
+            self.members[os.path.splitext(info.filename)[0]] = info
+        zip_file.close()
+        if 'step' not in self.members:
+            raise Exception("{} is not a valid result store file.".format(store_file))
+        self.span = float(self.get_array('span'))
+        self.numbers = self.get_array('number').tolist()
+        self.times = self.get_array('time').tolist()
+        self.steps = self.get_array('step').tolist()
+        self.result_file = None
+        if 'result_file_name' in self.members:
+            self.result_file = self.get_array('result_file_name').item()
+            if isinstance(self.result_file, bytes) and not isinstance(self.result_file, str):
+                self.result_file = self.result_file.decode('utf-8')
+            if not os.path.isfile(self.result_file):
+                # the result file moved together with the store file
+                self.result_file = os.path.join(os.path.dirname(store_file), os.path.basename(self.result_file))
+
+    def __len__(self):
+        return len(self.numbers)
+
+    def is_up_to_date(self, result_file=None):
+        if result_file is None:
+            result_file = self.result_file
+        if result_file is None:
+            return False
+        if 'result_file_size' not in self.members or not os.path.isfile(result_file):
+            return False
+        return (int(self.get_array('result_file_size')) == os.path.getsize(result_file) and
+                float(self.get_array('result_file_mtime')) == os.path.getmtime(result_file))
+
+    def get_result_keys(self, index):
+        prefix = 'r{}_'.format(index)
+        return sorted(set([n[len(prefix):].rsplit('_', 1)[0] for n in self.members if n.startswith(prefix)]))
+
+    def get_result_set(self, index, result_types=None):
+        '''returns the result set index with memory mapped arrays
+        '''
+        result_set = {'number': self.numbers[index], 'time': self.times[index], 'step': self.steps[index]}
+        for key in self.get_result_keys(index):
+            if result_types is None or key in result_types:
+                result_set[key] = (self.get_array(get_member_name(index, key, 'ids')),
+                                   self.get_array(get_member_name(index, key, 'values')))
+        return result_set
+
+    def get_array(self, name):
+        info = self.members[name]
+        with open(self.store_file, 'rb') as f:
+            if info.compress_type != zipfile.ZIP_STORED:
+                zip_file = zipfile.ZipFile(f)
+                return np.load(io.BytesIO(zip_file.read(info)))
+            # the data of a stored member starts after its local file header
+            f.seek(info.header_offset)
+            header = f.read(30)
+            name_length, extra_length = struct.unpack('<HH', header[26:30])
+            f.seek(info.header_offset + 30 + name_length + extra_length)
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+            offset = f.tell()
+            if not shape or 0 in shape:
+                return np.fromfile(f, dtype=dtype, count=int(np.prod(shape))).reshape(shape)
+        order = 'F' if fortran_order else 'C'
+        return np.memmap(self.store_file, dtype=dtype, mode='r', offset=offset, shape=shape, order=order)
+
+
+class FemResultSetCollector(object):
+    '''callback for the array based result readers
+    the first result set is kept in memory, if a second one is read all result sets are
+    written into a store file, thus single results (static analysis) do not need a store file
+    '''
+    def __init__(self, store_file, result_file=None):
+        self.store_file = store_file
+        self.result_file = result_file
+        self.writer = None
+        self.result_sets = []
+
+    def add_result_set(self, result_set):
+        if self.writer is None and len(self.result_sets) == 0:
+            self.result_sets.append(result_set)
+            return
+        if self.writer is None:
+            self.writer = FemResultStoreWriter(self.store_file, self.result_file)
+            first = self.result_sets[0]
+            self.writer.add_result_set(first)
+            self.result_sets = [get_result_set_info(first)]
+        self.writer.add_result_set(result_set)
+        self.result_sets.append(get_result_set_info(result_set))
+
+    def is_stored(self):
+        return self.writer is not None
+
+    def close(self, span=0.0):
+        if self.writer is not None:
+            self.writer.close(span)
+        elif os.path.isfile(self.store_file):
+            # old store of a former solver run
+            os.remove(self.store_file)
+
+
+def get_result_set_info(result_set):
+    return {'number': result_set.get('number', 0), 'time': result_set.get('time', 0), 'step': result_set.get('step', 0)}
+
+
+def get_member_name(index, key, kind):
+    return 'r{}_{}_{}'.format(index, key, kind)
+
+
+def set_result_store(result_obj, store_file, index):
+    ''' links a result object to a result set of a store, the result data is loaded by load_result()
+    '''
+    result_obj.ResultStoreFile = store_file
+    result_obj.ResultStoreIndex = index
+
+
+def load_result(result_obj):
+    ''' fills the result object with the result data of its store if this was not done before
+        returns True if the result data was loaded
+    '''
+    if not hasattr(result_obj, 'ResultStoreFile') or not result_obj.ResultStoreFile:
+        return False
+    if result_obj.NodeNumbers:
+        return False
+    if not os.path.isfile(result_obj.ResultStoreFile):
+        FreeCAD.Console.PrintError('FEM: Result store file {} not found.\n'.format(result_obj.ResultStoreFile))
+        return False
+    import importToolsFem
+    store = FemResultStore(result_obj.ResultStoreFile)
+    if store.result_file and os.path.isfile(store.result_file) and not store.is_up_to_date():
+        # the solver was run again but its results were not imported
+        FreeCAD.Console.PrintError('FEM: Result store file {} is older than the result file {}, the results have to be imported again.\n'
+                                   .format(result_obj.ResultStoreFile, store.result_file))
+        return False
+    importToolsFem.fill_femresult_mechanical_arrays(result_obj, store.get_result_set(result_obj.ResultStoreIndex), store.span)
+    return True
@@ -0,0 +1,125 @@
+# ***************************************************************************
+# *                                                                         *
+# *   Copyright (c) 2026 agent <agent@local>                                *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+
+__title__ = "FEM result view"
+__author__ = "agent"
+__url__ = "http://www.freecadweb.org"
+
+## @package FemResultView
+#  \ingroup FEM
+#  \brief array view of the results of a FEM result object
+#
+#  The result properties of a result object are converted into numpy arrays the first
+#  time they are used and the arrays are kept, thus switching the result type or the
+#  cutoff of the mesh coloring only computes the values passed to the mesh view provider.
+
+import numpy as np
+
+# result type --> result object property
+result_type_properties = {
+    "Sabs": "StressValues",
+    "Uabs": "DisplacementLengths",
+    "MaxPrin": "PrincipalMax",
+    "MidPrin": "PrincipalMed",
+    "MinPrin": "PrincipalMin",
+    "MaxShear": "MaxShear",
+    "Peeq": "Peeq",
+    "Temp": "Temperature",
+    "MFlow": "MassFlowRate",
+    "NPress": "NetworkPressure",
+    "User": "UserDefined",
+}
+
+# result type --> (vector result object property, component)
+result_type_components = {
+    "U1": ("DisplacementVectors", 0),
+    "U2": ("DisplacementVectors", 1),
+    "U3": ("DisplacementVectors", 2),
+}
+
+vector_properties = ("DisplacementVectors", "StressVectors", "StrainVectors")
+
+
+class FemResultView(object):
+    '''cached arrays of the results of a result object
+    invalidate() has to be called if the result properties of the result object are changed
+    '''
+    def __init__(self, result_obj):
+        self.result_obj = result_obj
+        self.invalidate()
+
+    def invalidate(self):
+        self.arrays = {}
+        self.node_numbers = None
+        self.colors = None  # (result type, limit, values passed to the view provider) of the last coloring
+
+    def invalidate_property(self, prop):
+        # the result property prop of the result object was changed
+        self.arrays.pop(prop, None)
+        if self.colors is not None:
+            result_type = self.colors[0]
+            if result_type_properties.get(result_type) == prop or result_type_components.get(result_type, (None,))[0] == prop:
+                self.colors = None
+
+    def get_node_numbers(self):
+        # kept as list, the view provider takes lists only
+        if self.node_numbers is None:
+            self.node_numbers = list(self.result_obj.NodeNumbers)
+        return self.node_numbers
+
+    def get_property_array(self, prop):
+        if prop not in self.arrays:
+            values = np.array(getattr(self.result_obj, prop), dtype=np.float64)
+            if prop in vector_properties:
+                values = values.reshape(-1, 3)
+            self.arrays[prop] = values
+        return self.arrays[prop]
+
+    def get_values(self, result_type):
+        if result_type in result_type_components:
+            prop, component = result_type_components[result_type]
+            return self.get_property_array(prop)[:, component]
+        return self.get_property_array(result_type_properties[result_type])
+
+    def get_stats(self, result_type):
+        values = self.get_values(result_type)
+        if len(values) == 0:
+            return (0.0, 0.0, 0.0)
+        return (float(values.min()), float(values.mean()), float(values.max()))
+
+    def get_color_values(self, result_type, limit=None):
+        '''values of result_type as list, all values over limit are set to limit'''
+        if self.colors is None or self.colors[:2] != (result_type, limit):
+            self.colors = (result_type, limit, get_values_with_cutoff(self.get_values(result_type), limit))
+        return self.colors[2]
+
+    def show(self, mesh_view_obj, result_type, limit=None):
+        '''colors the mesh by the values of result_type'''
+        mesh_view_obj.setNodeColorByScalars(self.get_node_numbers(), self.get_color_values(result_type, limit))
+
+
+def get_values_with_cutoff(values, limit=None):
+    # all values over the limit are treated as equal to the limit, a limit of 0.0 is no limit
+    values = np.asarray(values, dtype=np.float64)
+    if limit:
+        values = np.minimum(values, limit)
+    return values.tolist()
@@ -58,12 +58,14 @@ class FemTools(QtCore.QRunnable, QtCore.QObject):
             self.update_objects()
             self.results_present = False
             self.result_object = None
+            self.result_view = None
         else:
             raise Exception('FEM: No active analysis found!')
 
     ## Removes all result objects
     #  @param self The python object self
     def purge_results(self):
+        self.result_view = None
         for m in self.analysis.Member:
             if (m.isDerivedFrom('Fem::FemResultObject')):
                 self.analysis.Document.removeObject(m.Name)
@@ -116,31 +118,26 @@ class FemTools(QtCore.QRunnable, QtCore.QObject):
             if FreeCAD.GuiUp:
                 if self.result_object.Mesh.ViewObject.Visibility is False:
                     self.result_object.Mesh.ViewObject.Visibility = True
-            if result_type == "Sabs":
-                values = self.result_object.StressValues
-            elif result_type == "Uabs":
-                values = self.result_object.DisplacementLengths
-            else:
-                match = {"U1": 0, "U2": 1, "U3": 2}
-                d = zip(*self.result_object.DisplacementVectors)
-                values = list(d[match[result_type]])
-            self.show_color_by_scalar_with_cutoff(values, limit)
+            # repeated coloring by the same result type and limit reuses the values of the last coloring
+            self.get_result_view().show(self.mesh.ViewObject, result_type, limit)
+
+    ## Returns the array view of the result object, the arrays of the results are created once per result object
+    #  @param self The python object self
+    def get_result_view(self):
+        import FemResultView
+        result_view = getattr(self, 'result_view', None)
+        if result_view is None or result_view.result_obj is not self.result_object:
+            self.result_view = FemResultView.FemResultView(self.result_object)
+        return self.result_view
 
     ## Sets mesh color using list of values. Internally used by show_result function.
     #  @param self The python object self
-    #  @param values list of values
+    #  @param values list or array of values
     #  @param limit cutoff value. All values over the limit are treated as equel to the limit. Useful for filtering out hot spots.
     def show_color_by_scalar_with_cutoff(self, values, limit=None):
-        if limit:
-            filtered_values = []
-            for v in values:
-                if v > limit:
-                    filtered_values.append(limit)
-                else:
-                    filtered_values.append(v)
-        else:
-            filtered_values = values
-        self.mesh.ViewObject.setNodeColorByScalars(self.result_object.NodeNumbers, filtered_values)
+        import FemResultView
+        filtered_values = FemResultView.get_values_with_cutoff(values, limit)
+        self.mesh.ViewObject.setNodeColorByScalars(self.get_result_view().get_node_numbers(), filtered_values)
 
     def show_displacement(self, displacement_factor=0.0):
         self.mesh.ViewObject.setNodeDisplacementByVectors(self.result_object.NodeNumbers,
@@ -590,6 +587,7 @@ class FemTools(QtCore.QRunnable, QtCore.QObject):
     #  @param result object name
     def use_results(self, results_name=None):
         self.result_object = None
+        self.result_view = None
         if results_name is not None:
             for m in self.analysis.Member:
                 if m.isDerivedFrom("Fem::FemResultObject") and m.Name == results_name:
@@ -608,6 +606,9 @@ class FemTools(QtCore.QRunnable, QtCore.QObject):
                     has_results = True
             if not self.result_object:
                 raise Exception("No result object found in the analysis")
+        # results of a result store are loaded on first use
+        import FemResultStore
+        FemResultStore.load_result(self.result_object)
 
     ## Returns minimum, average and maximum value for provided result type
     #  @param self The python object self
@@ -622,8 +623,16 @@ class FemTools(QtCore.QRunnable, QtCore.QObject):
     #  - None - always return (0.0, 0.0, 0.0)
     def get_stats(self, result_type):
         stats = (0.0, 0.0, 0.0)
+        result_object = None
         for m in self.analysis.Member:
             if m.isDerivedFrom("Fem::FemResultObject"):
+                result_object = m
+        if result_object:
+            # results of a result store are loaded on first use
+            import FemResultStore
+            FemResultStore.load_result(result_object)
+            m = result_object
+            if m.Stats:
                 match = {"U1": (m.Stats[0], m.Stats[1], m.Stats[2]),
                          "U2": (m.Stats[3], m.Stats[4], m.Stats[5]),
                          "U3": (m.Stats[6], m.Stats[7], m.Stats[8]),
@@ -81,6 +81,7 @@ class FemToolsCcx(FemTools.FemTools):
                 self.ccx_binary_present = False
                 self.setup_ccx()
             self.result_object = None
+            self.result_view = None
         else:
             raise Exception('FEM: No active analysis found!')
 
@@ -173,21 +174,12 @@ class FemToolsCcx(FemTools.FemTools):
             raise Exception(error_message)
 
     def start_ccx(self):
-        import multiprocessing
-        import os
         import subprocess
         self.ccx_stdout = ""
         self.ccx_stderr = ""
         if self.inp_file_name != "" and self.ccx_binary_present:
-            ont_backup = os.environ.get('OMP_NUM_THREADS')
-            self.ccx_prefs = FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/Fem/Ccx")
-            num_cpu_pref = self.ccx_prefs.GetInt("AnalysisNumCPUs", 1)  # If number of CPU's specified
-            if not ont_backup:
-                ont_backup = str(num_cpu_pref)
-            if num_cpu_pref > 1:
-                _env = os.putenv('OMP_NUM_THREADS', str(num_cpu_pref))  # if user picked a number use that instead
-            else:
-                _env = os.putenv('OMP_NUM_THREADS', str(multiprocessing.cpu_count()))
+            # the number of threads is set in the environment of the ccx process only, not globally
+            _env = get_ccx_environment()
             # change cwd because ccx may crash if directory has no write permission
             # there is also a limit of the length of file names so jump to the document directory
             cwd = QtCore.QDir.currentPath()
@@ -197,11 +189,118 @@ class FemToolsCcx(FemTools.FemTools):
                                  stdout=subprocess.PIPE, stderr=subprocess.PIPE,
                                  shell=False, env=_env)
             self.ccx_stdout, self.ccx_stderr = p.communicate()
-            os.putenv('OMP_NUM_THREADS', ont_backup)
             QtCore.QDir.setCurrent(cwd)
             return p.returncode
         return -1
 
+    ## Runs ccx and parses its output while it is running
+    #  @param self The python object self
+    #  @param progress CcxProgress which gets the lines of the ccx output, its callbacks are called in the calling thread
+    #  @param frd_callback if given the .frd file is read while ccx is running and every result set
+    #  is passed to frd_callback as soon as it is written by ccx, see importCcxFrdResults.read_frd_result_arrays
+    #  Returns the return code of ccx, the output is in ccx_stdout and ccx_stderr as with start_ccx
+    def start_ccx_streaming(self, progress=None, frd_callback=None):
+        import os
+        self.ccx_stdout = ""
+        self.ccx_stderr = ""
+        if self.inp_file_name != "" and self.ccx_binary_present:
+            if progress is None:
+                progress = CcxProgress()
+            self.ccx_progress = progress
+            working_dir = os.path.dirname(os.path.abspath(self.inp_file_name))
+            base_name = os.path.splitext(os.path.basename(self.inp_file_name))[0]
+            frd_file = os.path.join(working_dir, base_name + '.frd') if frd_callback else None
+            ret_code, self.ccx_stdout, self.ccx_stderr = run_ccx_streaming(
+                [self.ccx_binary, "-i", base_name], working_dir, get_ccx_environment(),
+                progress, frd_file, frd_callback)
+            return ret_code
+        return -1
+
+    ## Writes the CalculiX input files of parameter variants of the analysis, every variant into its own directory
+    #  @param self The python object self
+    #  @param parameter_sets list of parameter overrides {object name: {property name: value}}, the values
+    #  of dict properties like the Material of a material object are updated, not replaced.
+    #  If a property of a gmsh mesh object is overridden the mesh is recreated for the variant.
+    #  @param base_dir directory the variant directories are created in, default is the working directory
+    #  The analysis objects and the working directory are restored after all variants are written.
+    #  Returns a list of CcxJob, one for every parameter set
+    def write_inp_file_variants(self, parameter_sets, base_dir=None):
+        import os
+        if base_dir is None:
+            base_dir = self.working_dir
+        working_dir = self.working_dir
+        jobs = []
+        try:
+            for i, parameters in enumerate(parameter_sets):
+                originals = self.apply_parameters(parameters)
+                try:
+                    variant_dir = os.path.join(base_dir, 'variant_{}'.format(i))
+                    self.setup_working_dir(variant_dir)
+                    self.write_inp_file()
+                    jobs.append(CcxJob(self.inp_file_name, 'variant_{}'.format(i), parameters))
+                finally:
+                    self.restore_parameters(originals)
+        finally:
+            self.setup_working_dir(working_dir)
+        return jobs
+
+    ## Sets the overridden properties of the analysis members
+    #  @param self The python object self
+    #  @param parameters parameter overrides {object name: {property name: value}}
+    #  Returns the original values to be used by restore_parameters
+    def apply_parameters(self, parameters):
+        doc = self.analysis.Document
+        originals = []
+        remesh = []
+        for obj_name in sorted(parameters):
+            obj = doc.getObject(obj_name)
+            if obj is None:
+                raise Exception('FEM: Object {} of the parameter set not found!'.format(obj_name))
+            for prop, value in sorted(parameters[obj_name].items()):
+                old_value = getattr(obj, prop)
+                originals.append((obj, prop, old_value))
+                if isinstance(old_value, dict):
+                    new_value = old_value.copy()
+                    new_value.update(value)
+                    value = new_value
+                setattr(obj, prop, value)
+            if hasattr(obj, "Proxy") and obj.Proxy and getattr(obj.Proxy, "Type", "") == "FemMeshGmsh":
+                originals.append((obj, "FemMesh", obj.FemMesh))
+                remesh.append(obj)
+        for mesh_obj in remesh:
+            import FemGmshTools
+            error = FemGmshTools.FemGmshTools(mesh_obj, self.analysis).create_mesh()
+            if error:
+                self.restore_parameters(originals)
+                raise Exception('FEM: Meshing {} for the parameter set failed: {}'.format(mesh_obj.Name, error))
+        doc.recompute()
+        self.update_objects()
+        return originals
+
+    ## Restores the properties changed by apply_parameters
+    #  @param self The python object self
+    #  @param originals original values returned by apply_parameters
+    def restore_parameters(self, originals):
+        for obj, prop, value in reversed(originals):
+            setattr(obj, prop, value)
+        self.analysis.Document.recompute()
+        self.update_objects()
+
+    ## Writes and runs parameter variants of the analysis in a pool of concurrent ccx processes
+    #  @param self The python object self
+    #  @param parameter_sets list of parameter overrides, see write_inp_file_variants
+    #  @param max_jobs number of ccx processes running at the same time
+    #  @param threads_per_job number of threads of every ccx process
+    #  @param callback called with every CcxJob as soon as it has finished
+    #  Returns the list of CcxJob in the order of the parameter sets
+    def run_batch(self, parameter_sets, max_jobs=None, threads_per_job=None, callback=None, base_dir=None):
+        jobs = self.write_inp_file_variants(parameter_sets, base_dir)
+        runner = CcxBatchRunner(self.ccx_binary, max_jobs, threads_per_job)
+        for job in jobs:
+            runner.add_job(job)
+        runner.run(callback)
+        return jobs
+
     def run(self):
         ret_code = 0
         message = self.check_prerequisites()
@@ -210,7 +309,7 @@ class FemToolsCcx(FemTools.FemTools):
             from FreeCAD import Base
             progress_bar = Base.ProgressIndicator()
             progress_bar.start("Running CalculiX ccx...", 0)
-            ret_code = self.start_ccx()
+            ret_code = self.start_ccx_streaming()
             self.finished.emit(ret_code)
             progress_bar.stop()
         else:
@@ -298,4 +397,318 @@ class FemToolsCcx(FemTools.FemTools):
                         if m.Eigenmode == mf['eigenmode']:
                             m.EigenmodeFrequency = mf['frequency']
 
+
+## Returns a copy of the environment for a ccx process with the number of threads set
+#  @param num_threads number of threads, default is the preference AnalysisNumCPUs or the number of CPUs if it is not set
+def get_ccx_environment(num_threads=None):
+    import multiprocessing
+    import os
+    if num_threads is None:
+        num_threads = FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/Fem/Ccx").GetInt("AnalysisNumCPUs", 1)
+        if num_threads < 2:
+            num_threads = multiprocessing.cpu_count()
+    env = os.environ.copy()
+    env['OMP_NUM_THREADS'] = str(num_threads)
+    return env
+
+
+## A ccx job of a batch, the input file is run in its own directory
+class CcxJob(object):
+
+    def __init__(self, inp_file_name, name=None, parameters=None):
+        import os
+        self.inp_file_name = inp_file_name
+        self.working_dir = os.path.dirname(os.path.abspath(inp_file_name))
+        self.base_name = os.path.splitext(os.path.basename(inp_file_name))[0]
+        self.name = name if name else self.base_name
+        self.parameters = parameters
+        self.num_threads = 1
+        self.returncode = None
+        self.stdout = ""
+        self.stderr = ""
+        self.run_time = 0.0
+
+    def get_result_file(self, extension='.frd'):
+        import os
+        return os.path.join(self.working_dir, self.base_name + extension)
+
+    def succeeded(self):
+        return self.returncode == 0
+
+
+## Runs ccx jobs in a pool of concurrent ccx processes
+#  Every process gets its number of threads by its own environment and runs in the directory of its
+#  input file, thus neither the environment nor the current directory of FreeCAD are changed.
+class CcxBatchRunner(object):
+
+    ## The constructor
+    #  @param ccx_binary path to ccx binary
+    #  @param max_jobs number of ccx processes running at the same time, default is the number of CPUs divided by threads_per_job
+    #  @param threads_per_job number of threads of every ccx process, default is the preference AnalysisNumCPUs
+    #  if it is set, otherwise the number of CPUs divided by max_jobs
+    def __init__(self, ccx_binary, max_jobs=None, threads_per_job=None):
+        import multiprocessing
+        cpu_count = multiprocessing.cpu_count()
+        if threads_per_job is None:
+            threads_per_job = FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/Fem/Ccx").GetInt("AnalysisNumCPUs", 1)
+            if threads_per_job < 2 and max_jobs:
+                threads_per_job = cpu_count // max_jobs
+        if max_jobs is None:
+            max_jobs = cpu_count // max(1, threads_per_job)
+        self.ccx_binary = ccx_binary
+        self.max_jobs = max(1, max_jobs)
+        self.threads_per_job = max(1, threads_per_job)
+        self.jobs = []
+
+    def add_job(self, job):
+        if not isinstance(job, CcxJob):
+            job = CcxJob(job)
+        job.num_threads = self.threads_per_job
+        self.jobs.append(job)
+        return job
+
+    ## Runs all jobs, the callback is called in the calling thread with every job as soon as it has finished
+    #  Returns the jobs in the order they have finished
+    def run(self, callback=None):
+        finished = []
+        if not self.jobs:
+            return finished
+        from multiprocessing.pool import ThreadPool
+        pool = ThreadPool(min(self.max_jobs, len(self.jobs)))
+        try:
+            for job in pool.imap_unordered(self.run_job, self.jobs):
+                finished.append(job)
+                if callback:
+                    callback(job)
+        finally:
+            pool.close()
+            pool.join()
+        return finished
+
+    def run_job(self, job):
+        import subprocess
+        import time
+        from platform import system
+        startup_info = None
+        if system() == "Windows":
+            # Windows workaround to avoid blinking terminal window
+            startup_info = subprocess.STARTUPINFO()
+            startup_info.dwFlags = subprocess.STARTF_USESHOWWINDOW
+        start_time = time.time()
+        try:
+            p = subprocess.Popen([self.ccx_binary, "-i", job.base_name],
+                                 stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                 shell=False, cwd=job.working_dir,
+                                 env=get_ccx_environment(job.num_threads),
+                                 startupinfo=startup_info)
+            stdout, stderr = p.communicate()
+            job.stdout = decode_ccx_output(stdout)
+            job.stderr = decode_ccx_output(stderr)
+            job.returncode = p.returncode
+        except OSError as e:
+            job.stderr = "FEM: CalculiX binary ccx \'{}\' could not be started: {}\n".format(self.ccx_binary, e)
+            job.returncode = -1
+        job.run_time = time.time() - start_time
+        return job
+
+
+## Progress of a running ccx, filled line by line with the output of ccx
+#  The callbacks are called with the progress and the event: 'step', 'increment', 'iteration',
+#  'residual', 'convergence', 'divergence', 'error' or 'finished'.
+#  A callback may call cancel() to stop ccx, e. g. on the first nonpositive jacobian.
+class CcxProgress(object):
+
+    def __init__(self, callback=None):
+        self.callbacks = []
+        if callback:
+            self.callbacks.append(callback)
+        self.step = 0
+        self.increment = 0
+        self.attempt = 0
+        self.iteration = 0
+        self.increment_size = 0.0
+        self.step_time = 0.0
+        self.total_time = 0.0
+        self.average_force = 0.0
+        self.residual_force = 0.0
+        self.residual_node = 0
+        self.converged = None
+        self.iterations = []  # (step, increment, iteration, residual force) of all iterations
+        self.errors = []
+        self.nonpositive_jacobian_elements = []
+        self.finished = False
+        self.canceled = False
+
+    def add_callback(self, callback):
+        self.callbacks.append(callback)
+
+    def notify(self, event):
+        for callback in self.callbacks:
+            callback(self, event)
+
+    def cancel(self):
+        self.canceled = True
+
+    def parse_line(self, line):
+        words = line.split()
+        if not words:
+            return
+        first = words[0]
+        if first == 'STEP' and len(words) > 1 and words[1].isdigit():
+            self.step = int(words[1])
+            self.increment = 0
+            self.iteration = 0
+            self.converged = None
+            self.notify('step')
+        elif first == 'increment' and len(words) > 1:
+            if words[1] == 'size=' and len(words) > 2:
+                self.increment_size = get_ccx_float(words[2])
+            elif words[1].isdigit():
+                self.increment = int(words[1])
+                self.attempt = int(words[3]) if len(words) > 3 and words[2] == 'attempt' else 1
+                self.iteration = 0
+                self.converged = None
+                self.notify('increment')
+        elif first == 'actual' and len(words) > 2:
+            if words[1] == 'step':
+                self.step_time = get_ccx_float(line.split('=')[1])
+            elif words[1] == 'total':
+                self.total_time = get_ccx_float(line.split('=')[1])
+        elif first == 'iteration' and len(words) == 2 and words[1].isdigit():
+            self.iteration = int(words[1])
+            self.notify('iteration')
+        elif first == 'average' and len(words) > 2 and words[1] == 'force=':
+            self.average_force = get_ccx_float(words[2])
+        elif first == 'largest' and len(words) > 1 and words[1] == 'residual' and '=' in line:
+            # largest residual force= 0.000000 in node 12 and dof 1
+            self.residual_force = get_ccx_float(line.split('=')[1].split()[0])
+            if 'node' in words[:-1] and words[words.index('node') + 1].isdigit():
+                self.residual_node = int(words[words.index('node') + 1])
+            self.iterations.append((self.step, self.increment, self.iteration, self.residual_force))
+            self.notify('residual')
+        elif first == 'convergence':
+            self.converged = True
+            self.notify('convergence')
+        elif first == 'no' and len(words) > 1 and words[1] == 'convergence':
+            self.converged = False
+        elif first == 'divergence;' or first == 'divergence' or (first == 'too' and 'iterations' in words):
+            self.converged = False
+            self.notify('divergence')
+        elif first.startswith('*ERROR'):
+            self.errors.append(line.strip())
+            self.notify('error')
+        elif first == 'determinant' and 'element' in words[:-1] and words[words.index('element') + 1].isdigit():
+            element = int(words[words.index('element') + 1])
+            if element not in self.nonpositive_jacobian_elements:
+                self.nonpositive_jacobian_elements.append(element)
+                self.notify('error')
+        elif first == 'Job' and len(words) > 1 and words[1] == 'finished':
+            self.finished = True
+            self.notify('finished')
+
+
+def get_ccx_float(value):
+    try:
+        return float(value.strip())
+    except ValueError:
+        return 0.0
+
+
+## Runs a ccx command and passes every line of its output to progress while it is running
+#  @param command ccx command list
+#  @param cwd directory ccx is run in
+#  @param env environment of the ccx process
+#  @param progress CcxProgress
+#  @param frd_file if given the frd file is read while ccx is running, every result set is passed to frd_callback
+#  All callbacks are called in the calling thread.
+#  Returns (return code, stdout, stderr)
+def run_ccx_streaming(command, cwd, env, progress, frd_file=None, frd_callback=None):
+    import os
+    import subprocess
+    import threading
+    try:
+        import Queue as queue
+    except ImportError:
+        import queue
+    from platform import system
+    startup_info = None
+    if system() == "Windows":
+        # Windows workaround to avoid blinking terminal window
+        startup_info = subprocess.STARTUPINFO()
+        startup_info.dwFlags = subprocess.STARTF_USESHOWWINDOW
+    if frd_file and os.path.isfile(frd_file):
+        # the frd file of a former run must not be read
+        os.remove(frd_file)
+    p = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                         shell=False, cwd=cwd, env=env, startupinfo=startup_info)
+    # stdout and stderr are read by threads, thus ccx is never blocked by a full pipe,
+    # the lines of stdout and the result sets of the frd file are passed by one queue
+    # to the calling thread, which calls the callbacks as soon as something is available
+    events = queue.Queue()
+    stderr = []
+    # the process is not polled by the frd thread, Popen is not thread safe in Python 2
+    ccx_finished = threading.Event()
+
+    def read_stdout():
+        for line in iter(p.stdout.readline, b''):
+            events.put(('line', line))
+        events.put(('end', None))
+
+    def read_frd():
+        import importCcxFrdResults
+        try:
+            frd_lines = importCcxFrdResults.FrdTail(frd_file, lambda: not ccx_finished.is_set())
+            importCcxFrdResults.read_frd_result_arrays(
+                frd_lines, read_mesh=False, result_set_callback=lambda result_set: events.put(('result', result_set)))
+        except Exception as e:
+            FreeCAD.Console.PrintError('FEM: Reading {} while ccx is running failed: {}\n'.format(frd_file, e))
+
+    threads = [threading.Thread(target=read_stdout), threading.Thread(target=lambda: stderr.append(p.stderr.read()))]
+    frd_thread = None
+    if frd_file and frd_callback:
+        frd_thread = threading.Thread(target=read_frd)
+        threads.append(frd_thread)
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+
+    stdout = []
+    try:
+        while True:
+            kind, value = events.get()
+            if kind == 'line':
+                line = decode_ccx_output(value)
+                stdout.append(line)
+                progress.parse_line(line)
+                if progress.canceled and p.poll() is None:
+                    p.terminate()
+            elif kind == 'result':
+                frd_callback(value)
+            else:
+                break
+    except:
+        # ccx is stopped if a callback has raised, thus the reading threads end too
+        if p.poll() is None:
+            p.terminate()
+        raise
+    finally:
+        p.wait()
+        ccx_finished.set()
+        for thread in threads:
+            thread.join()
+        p.stdout.close()
+        p.stderr.close()
+    # result sets of the end of the frd file
+    while not events.empty():
+        kind, value = events.get()
+        if kind == 'result':
+            frd_callback(value)
+    return p.returncode, ''.join(stdout), decode_ccx_output(stderr[0]) if stderr else ''
+
+
+def decode_ccx_output(output):
+    if not isinstance(output, str):
+        output = output.decode('utf-8', 'replace')
+    return output
+
 ##  @}
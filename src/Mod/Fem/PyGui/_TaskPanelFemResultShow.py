@@ -28,6 +28,8 @@ __url__ = "http://www.freecadweb.org"
 #  \ingroup FEM
 
 import FreeCAD
+import FemResultStore
+import FemResultView
 import numpy as np
 
 import FreeCADGui
@@ -42,6 +44,12 @@ class _TaskPanelFemResultShow:
     def __init__(self, obj):
         self.result_obj = obj
         self.mesh_obj = self.result_obj.Mesh
+        # results of a result store are loaded the first time they are shown
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        FemResultStore.load_result(self.result_obj)
+        QtGui.qApp.restoreOverrideCursor()
+        # the arrays of the results are created on first use and kept as long as the task panel is open
+        self.result_view = FemResultView.FemResultView(self.result_obj)
         # task panel should be started by use of setEdit of view provider
         # in view provider checks: Mesh, active analysis and if Mesh and result are in active analysis
 
@@ -188,7 +196,7 @@ class _TaskPanelFemResultShow:
         FreeCAD.FEM_dialog["results_type"] = "Sabs"
         QApplication.setOverrideCursor(Qt.WaitCursor)
         if self.suitable_results:
-            self.mesh_obj.ViewObject.setNodeColorByScalars(self.result_obj.NodeNumbers, self.result_obj.StressValues)
+            self.result_view.show(self.mesh_obj.ViewObject, "Sabs")
         (minm, avg, maxm) = self.get_result_stats("Sabs")
         self.set_result_stats("MPa", minm, avg, maxm)
         QtGui.qApp.restoreOverrideCursor()
@@ -197,7 +205,7 @@ class _TaskPanelFemResultShow:
         FreeCAD.FEM_dialog["results_type"] = "MaxShear"
         QApplication.setOverrideCursor(Qt.WaitCursor)
         if self.suitable_results:
-            self.mesh_obj.ViewObject.setNodeColorByScalars(self.result_obj.NodeNumbers, self.result_obj.MaxShear)
+            self.result_view.show(self.mesh_obj.ViewObject, "MaxShear")
         (minm, avg, maxm) = self.get_result_stats("MaxShear")
         self.set_result_stats("MPa", minm, avg, maxm)
         QtGui.qApp.restoreOverrideCursor()
@@ -206,7 +214,7 @@ class _TaskPanelFemResultShow:
         FreeCAD.FEM_dialog["results_type"] = "MaxPrin"
         QApplication.setOverrideCursor(Qt.WaitCursor)
         if self.suitable_results:
-            self.mesh_obj.ViewObject.setNodeColorByScalars(self.result_obj.NodeNumbers, self.result_obj.PrincipalMax)
+            self.result_view.show(self.mesh_obj.ViewObject, "MaxPrin")
         (minm, avg, maxm) = self.get_result_stats("MaxPrin")
         self.set_result_stats("MPa", minm, avg, maxm)
         QtGui.qApp.restoreOverrideCursor()
@@ -215,10 +223,8 @@ class _TaskPanelFemResultShow:
         FreeCAD.FEM_dialog["results_type"] = "Temp"
         QApplication.setOverrideCursor(Qt.WaitCursor)
         if self.suitable_results:
-            self.mesh_obj.ViewObject.setNodeColorByScalars(self.result_obj.NodeNumbers, self.result_obj.Temperature)
-        minm = min(self.result_obj.Temperature)
-        avg = sum(self.result_obj.Temperature) / len(self.result_obj.Temperature)
-        maxm = max(self.result_obj.Temperature)
+            self.result_view.show(self.mesh_obj.ViewObject, "Temp")
+        (minm, avg, maxm) = self.result_view.get_stats("Temp")
         self.set_result_stats("K", minm, avg, maxm)
         QtGui.qApp.restoreOverrideCursor()
 
@@ -226,10 +232,8 @@ class _TaskPanelFemResultShow:
         FreeCAD.FEM_dialog["results_type"] = "MFlow"
         QApplication.setOverrideCursor(Qt.WaitCursor)
         if self.suitable_results:
-            self.mesh_obj.ViewObject.setNodeColorByScalars(self.result_obj.NodeNumbers, self.result_obj.MassFlowRate)
-        minm = min(self.result_obj.MassFlowRate)
-        avg = sum(self.result_obj.MassFlowRate) / len(self.result_obj.MassFlowRate)
-        maxm = max(self.result_obj.MassFlowRate)
+            self.result_view.show(self.mesh_obj.ViewObject, "MFlow")
+        (minm, avg, maxm) = self.result_view.get_stats("MFlow")
         self.set_result_stats("kg/s", minm, avg, maxm)
         QtGui.qApp.restoreOverrideCursor()
 
@@ -237,10 +241,8 @@ class _TaskPanelFemResultShow:
         FreeCAD.FEM_dialog["results_type"] = "NPress"
         QApplication.setOverrideCursor(Qt.WaitCursor)
         if self.suitable_results:
-            self.mesh_obj.ViewObject.setNodeColorByScalars(self.result_obj.NodeNumbers, self.result_obj.NetworkPressure)
-        minm = min(self.result_obj.NetworkPressure)
-        avg = sum(self.result_obj.NetworkPressure) / len(self.result_obj.NetworkPressure)
-        maxm = max(self.result_obj.NetworkPressure)
+            self.result_view.show(self.mesh_obj.ViewObject, "NPress")
+        (minm, avg, maxm) = self.result_view.get_stats("NPress")
         self.set_result_stats("MPa", minm, avg, maxm)
         QtGui.qApp.restoreOverrideCursor()
 
@@ -248,7 +250,7 @@ class _TaskPanelFemResultShow:
         FreeCAD.FEM_dialog["results_type"] = "MinPrin"
         QApplication.setOverrideCursor(Qt.WaitCursor)
         if self.suitable_results:
-            self.mesh_obj.ViewObject.setNodeColorByScalars(self.result_obj.NodeNumbers, self.result_obj.PrincipalMin)
+            self.result_view.show(self.mesh_obj.ViewObject, "MinPrin")
         (minm, avg, maxm) = self.get_result_stats("MinPrin")
         self.set_result_stats("MPa", minm, avg, maxm)
         QtGui.qApp.restoreOverrideCursor()
@@ -257,7 +259,7 @@ class _TaskPanelFemResultShow:
         FreeCAD.FEM_dialog["results_type"] = "Peeq"
         QApplication.setOverrideCursor(Qt.WaitCursor)
         if self.suitable_results:
-            self.mesh_obj.ViewObject.setNodeColorByScalars(self.result_obj.NodeNumbers, self.result_obj.Peeq)
+            self.result_view.show(self.mesh_obj.ViewObject, "Peeq")
         (minm, avg, maxm) = self.get_result_stats("Peeq")
         self.set_result_stats("", minm, avg, maxm)
         QtGui.qApp.restoreOverrideCursor()
@@ -270,52 +272,47 @@ class _TaskPanelFemResultShow:
         FreeCAD.FEM_dialog["results_type"] = "None"
         self.update()
         self.restore_result_dialog()
-        # Convert existing values to numpy array
-        P1 = np.array(self.result_obj.PrincipalMax)
-        P2 = np.array(self.result_obj.PrincipalMed)
-        P3 = np.array(self.result_obj.PrincipalMin)
-        Von = np.array(self.result_obj.StressValues)
-        Peeq = np.array(self.result_obj.Peeq)
-        T = np.array(self.result_obj.Temperature)
-        MF = np.array(self.result_obj.MassFlowRate)
-        NP = np.array(self.result_obj.NetworkPressure)
-        dispvectors = np.array(self.result_obj.DisplacementVectors)
-        x = np.array(dispvectors[:, 0])
-        y = np.array(dispvectors[:, 1])
-        z = np.array(dispvectors[:, 2])
-        stressvectors = np.array(self.result_obj.StressVectors)
-        sx = np.array(stressvectors[:, 0])
-        sy = np.array(stressvectors[:, 1])
-        sz = np.array(stressvectors[:, 2])
-        strainvectors = np.array(self.result_obj.StrainVectors)
-        ex = np.array(strainvectors[:, 0])
-        ey = np.array(strainvectors[:, 1])
-        ez = np.array(strainvectors[:, 2])
+        # the numpy arrays of the results are cached by the result view, copies are used in the equation
+        rv = self.result_view
+        P1 = rv.get_property_array("PrincipalMax").copy()
+        P2 = rv.get_property_array("PrincipalMed").copy()
+        P3 = rv.get_property_array("PrincipalMin").copy()
+        Von = rv.get_property_array("StressValues").copy()
+        Peeq = rv.get_property_array("Peeq").copy()
+        T = rv.get_property_array("Temperature").copy()
+        MF = rv.get_property_array("MassFlowRate").copy()
+        NP = rv.get_property_array("NetworkPressure").copy()
+        dispvectors = rv.get_property_array("DisplacementVectors")
+        x = dispvectors[:, 0].copy()
+        y = dispvectors[:, 1].copy()
+        z = dispvectors[:, 2].copy()
+        stressvectors = rv.get_property_array("StressVectors")
+        sx = stressvectors[:, 0].copy()
+        sy = stressvectors[:, 1].copy()
+        sz = stressvectors[:, 2].copy()
+        strainvectors = rv.get_property_array("StrainVectors")
+        ex = strainvectors[:, 0].copy()
+        ey = strainvectors[:, 1].copy()
+        ez = strainvectors[:, 2].copy()
         userdefined_eq = self.form.user_def_eq.toPlainText()  # Get equation to be used
-        UserDefinedFormula = eval(userdefined_eq).tolist()
+        UserDefinedFormula = np.asarray(eval(userdefined_eq), dtype=np.float64).tolist()
         self.result_obj.UserDefined = UserDefinedFormula
+        self.result_view.invalidate_property("UserDefined")
         minm = min(UserDefinedFormula)
         avg = sum(UserDefinedFormula) / len(UserDefinedFormula)
         maxm = max(UserDefinedFormula)
 
         QApplication.setOverrideCursor(Qt.WaitCursor)
         if self.suitable_results:
-            self.mesh_obj.ViewObject.setNodeColorByScalars(self.result_obj.NodeNumbers, UserDefinedFormula)
+            self.mesh_obj.ViewObject.setNodeColorByScalars(self.result_view.get_node_numbers(), UserDefinedFormula)
         self.set_result_stats("", minm, avg, maxm)
         QtGui.qApp.restoreOverrideCursor()
         del x, y, z, T, Von, Peeq, P1, P2, P3, sx, sy, sz, ex, ey, ez, MF, NP  # Dummy use to get around flake8, varibles not being used
 
     def select_displacement_type(self, disp_type):
         QApplication.setOverrideCursor(Qt.WaitCursor)
-        if disp_type == "Uabs":
-            if self.suitable_results:
-                self.mesh_obj.ViewObject.setNodeColorByScalars(self.result_obj.NodeNumbers, self.result_obj.DisplacementLengths)
-        else:
-            match = {"U1": 0, "U2": 1, "U3": 2}
-            d = zip(*self.result_obj.DisplacementVectors)
-            displacements = list(d[match[disp_type]])
-            if self.suitable_results:
-                self.mesh_obj.ViewObject.setNodeColorByScalars(self.result_obj.NodeNumbers, displacements)
+        if self.suitable_results:
+            self.result_view.show(self.mesh_obj.ViewObject, disp_type)
         (minm, avg, maxm) = self.get_result_stats(disp_type)
         self.set_result_stats("mm", minm, avg, maxm)
         QtGui.qApp.restoreOverrideCursor()
@@ -344,7 +341,7 @@ class _TaskPanelFemResultShow:
                 self.update_displacement()
         FreeCAD.FEM_dialog["result_obj"] = self.result_obj
         if self.suitable_results:
-            self.mesh_obj.ViewObject.setNodeDisplacementByVectors(self.result_obj.NodeNumbers, self.result_obj.DisplacementVectors)
+            self.mesh_obj.ViewObject.setNodeDisplacementByVectors(self.result_view.get_node_numbers(), self.result_obj.DisplacementVectors)
         self.update_displacement()
         QtGui.qApp.restoreOverrideCursor()
 
@@ -399,7 +396,7 @@ class _TaskPanelFemResultShow:
     def update(self):
         self.suitable_results = False
         self.disable_empty_result_buttons()
-        if (self.mesh_obj.FemMesh.NodeCount == len(self.result_obj.NodeNumbers)):
+        if (self.mesh_obj.FemMesh.NodeCount == len(self.result_view.get_node_numbers())):
             self.suitable_results = True
             hide_parts_constraints()
         else:
@@ -81,6 +81,11 @@ class _FemResultMechanical():
 
         obj.addProperty("App::PropertyFloat", "EigenmodeFrequency", "Fem", "User Defined Results", True)
 
+        # results of multi step analysis are loaded on demand from a result store, see FemResultStore
+        obj.addProperty("App::PropertyString", "ResultStoreFile", "Fem", "File the results are loaded from on demand", True)
+
+        obj.addProperty("App::PropertyInteger", "ResultStoreIndex", "Fem", "Index of the result set in the result store file", True)
+
     # standard FeutureT methods
     def execute(self, obj):
         """"this method is executed on object creation and whenever the document is recomputed"
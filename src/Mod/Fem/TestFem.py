@@ -125,6 +125,426 @@ class FemTest(unittest.TestCase):
         self.assertTrue(True if read_node_line in expected else False,
                         "Problem in test_writeAbaqus_precision, \n{0}\n{1}".format(read_node_line, expected))
 
+    def test_frd_result_arrays(self):
+        import importCcxFrdResults
+        for base_name in [static_base_name, frequency_base_name, thermomech_base_name, Flow1D_thermomech_base_name]:
+            frd_file = test_file_dir + '/' + base_name + '.frd'
+            fcc_print('Comparing array reader with readResult for {}.frd'.format(base_name))
+            m = importCcxFrdResults.readResult(frd_file)
+            a = importCcxFrdResults.read_frd_result_arrays(frd_file, chunk_size=10)
+            mesh_data = importCcxFrdResults.get_mesh_data_from_frd_arrays(a)
+            for k in m:
+                if k != 'Results':
+                    self.assertEqual(m[k], mesh_data[k], "Different {} read from {}.frd".format(k, base_name))
+            self.assertEqual(len(m['Results']), len(a['Results']), "Different number of results in {}.frd".format(base_name))
+            for result_set, result_arrays in zip(m['Results'], a['Results']):
+                result_arrays = importCcxFrdResults.get_result_set_from_frd_arrays(result_arrays)
+                for k in result_set:
+                    if result_set[k] or k in result_arrays:
+                        self.assertEqual(result_set[k], result_arrays[k], "Different {} result read from {}.frd".format(k, base_name))
+
+            # only the displacements of the first result set
+            a = importCcxFrdResults.read_frd_result_arrays(frd_file, result_types=['disp'], steps=[0], read_mesh=False)
+            self.assertEqual(len(a['NodeIds']), 0, "Nodes read from {}.frd with read_mesh=False".format(base_name))
+            for result_arrays in a['Results']:
+                self.assertEqual(result_arrays['step'], 0, "Unexpected result set read from {}.frd".format(base_name))
+                self.assertFalse(set(result_arrays) - set(['number', 'time', 'step', 'disp']),
+                                 "Unexpected results read from {}.frd".format(base_name))
+
+    def test_result_store(self):
+        import FemResultStore
+        import importCcxFrdResults
+        import numpy as np
+        import os
+        import shutil
+        frd_file = test_file_dir + '/' + static_base_name + '.frd'
+        store_file = temp_dir + '/' + static_base_name + '_results.npz'
+        result_sets = importCcxFrdResults.read_frd_result_arrays(frd_file, read_mesh=False)['Results']
+        writer = FemResultStore.FemResultStoreWriter(store_file, frd_file)
+        for result_set in result_sets + result_sets:
+            writer.add_result_set(result_set)
+        writer.close(1.0)
+        store = FemResultStore.FemResultStore(store_file)
+        self.assertEqual(len(store), 2 * len(result_sets), "Wrong number of result sets in the result store")
+        self.assertTrue(store.is_up_to_date(frd_file), "Result store is not up to date")
+        for i, result_set in enumerate(result_sets + result_sets):
+            stored_set = store.get_result_set(i)
+            self.assertEqual(sorted(result_set), sorted(stored_set), "Different result keys in result store")
+            for k in result_set:
+                if isinstance(result_set[k], tuple):
+                    self.assertTrue(np.array_equal(result_set[k][0], stored_set[k][0]), "Different node ids for {}".format(k))
+                    self.assertTrue(np.array_equal(result_set[k][1], stored_set[k][1]), "Different values for {}".format(k))
+                else:
+                    self.assertEqual(result_set[k], stored_set[k], "Different {} in result store".format(k))
+        # a store older than its result file is not loaded
+        stale_frd_file = temp_dir + '/result_store_stale.frd'
+        shutil.copyfile(frd_file, stale_frd_file)
+        stale_store_file = FemResultStore.get_result_store_file(stale_frd_file)
+        writer = FemResultStore.FemResultStoreWriter(stale_store_file, stale_frd_file)
+        for result_set in result_sets + result_sets:
+            writer.add_result_set(result_set)
+        writer.close(1.0)
+        self.assertEqual(FemResultStore.FemResultStore(stale_store_file).result_file, os.path.abspath(stale_frd_file), "Wrong result file of the result store")
+        os.utime(stale_frd_file, (os.path.getatime(stale_frd_file), os.path.getmtime(stale_frd_file) + 10))
+        self.assertFalse(FemResultStore.FemResultStore(stale_store_file).is_up_to_date(), "Result store is up to date")
+        result_obj = ObjectsFem.makeResultMechanical('StaleResult')
+        FemResultStore.set_result_store(result_obj, stale_store_file, 0)
+        self.assertFalse(FemResultStore.load_result(result_obj), "Result of a stale result store loaded")
+        self.assertFalse(result_obj.NodeNumbers, "Result of a stale result store loaded")
+        # the store of a result file in a read only directory is written into the temp directory
+        read_only_dir = temp_dir + '/result_store_read_only'
+        if not os.path.isdir(read_only_dir):
+            os.makedirs(read_only_dir)
+        os.chmod(read_only_dir, 0o555)
+        try:
+            if not os.access(read_only_dir, os.W_OK):
+                read_only_store_file = FemResultStore.get_result_store_file(read_only_dir + '/' + static_base_name + '.frd')
+                self.assertNotEqual(os.path.dirname(read_only_store_file), read_only_dir, "Result store in a read only directory")
+                self.assertTrue(os.access(os.path.dirname(read_only_store_file), os.W_OK), "Result store directory not writable")
+        finally:
+            os.chmod(read_only_dir, 0o755)
+
+    def test_result_view(self):
+        import FemResultView
+        result_obj = ObjectsFem.makeResultMechanical('ResultView')
+        result_obj.NodeNumbers = [1, 2, 3]
+        result_obj.DisplacementVectors = [FreeCAD.Vector(1, 2, 3), FreeCAD.Vector(4, 5, 6), FreeCAD.Vector(7, 8, 9)]
+        result_obj.StressValues = [10.0, 30.0, 20.0]
+        result_view = FemResultView.FemResultView(result_obj)
+        self.assertEqual(result_view.get_node_numbers(), [1, 2, 3], "Wrong node numbers of the result view")
+        self.assertEqual(result_view.get_values("U2").tolist(), [2.0, 5.0, 8.0], "Wrong displacement component")
+        self.assertEqual(result_view.get_stats("Sabs"), (10.0, 20.0, 30.0), "Wrong stats of the result view")
+        self.assertEqual(result_view.get_color_values("Sabs", 25.0), [10.0, 25.0, 20.0], "Wrong values with cutoff")
+        self.assertEqual(result_view.get_color_values("Sabs"), [10.0, 30.0, 20.0], "Wrong values without cutoff")
+        result_obj.StressValues = [1.0, 2.0, 3.0]
+        self.assertEqual(result_view.get_stats("Sabs"), (10.0, 20.0, 30.0), "Arrays of the result view are not cached")
+        result_view.invalidate_property("StressValues")
+        self.assertEqual(result_view.get_color_values("Sabs"), [1.0, 2.0, 3.0], "Result view property not invalidated")
+
+    def test_stress_arrays(self):
+        import importToolsFem
+        import numpy as np
+        stress = np.array([[100.0, -20.0, 35.5, 12.0, -7.25, 3.0],
+                           [0.0, 0.0, 0.0, 0.0, 0.0, 0.0],
+                           [-1.5e3, 2.2e2, 7.0, -4.4e2, 1.0e1, 9.9e1]])
+        mises = importToolsFem.calculate_von_mises_array(stress)
+        principal = importToolsFem.calculate_principal_stress_array(stress)
+        for i, s in enumerate(stress.tolist()):
+            self.assertAlmostEqual(mises[i], importToolsFem.calculate_von_mises(s), 9, "Wrong von Mises stress for {}".format(s))
+            for expected, calculated in zip(importToolsFem.calculate_principal_stress(s), principal):
+                self.assertAlmostEqual(calculated[i], expected, 9, "Wrong principal stress for {}".format(s))
+        stats = importToolsFem.get_stats_array(mises, len(mises))
+        self.assertEqual(stats, (min(mises.tolist()), sum(mises.tolist()) / len(mises), max(mises.tolist())), "Wrong stats")
+
+    def test_femnodes_ele_index(self):
+        import FemMeshTools
+        # two tetra4 with the common face 2, 3, 4 and one hexa8
+        femelement_table = {1: (1, 2, 3, 4), 2: (2, 3, 4, 5), 3: (11, 12, 13, 14, 15, 16, 17, 18)}
+        femnodes_ele_index = FemMeshTools.get_femnodes_ele_index(femelement_table)
+        self.assertEqual(FemMeshTools.get_femelements_by_femnodes_bin(femelement_table, femnodes_ele_index, [1, 2, 3, 4, 99]), [1], "Wrong elements by nodes")
+        self.assertEqual(FemMeshTools.get_femelements_by_femnodes_std(femelement_table, [5, 4, 3, 2, 1], femnodes_ele_index), [1, 2], "Wrong elements by nodes")
+        self.assertEqual(FemMeshTools.get_ccxelement_faces_from_binary_search(femnodes_ele_index, [2, 3, 4, 15, 16, 17, 18]), [[1, 4], [2, 1], [3, 1]], "Wrong element faces")
+        self.assertEqual(FemMeshTools.get_femvolumeelements_by_femfacenodes(femelement_table, [2, 3, 4, 11, 12, 13, 14], femnodes_ele_index), [1, 2, 3], "Wrong volume elements by face nodes")
+
+    def test_femmesh_2_mesh(self):
+        import FemMesh2Mesh
+        # two hexa8 with a common face, node ids above the former limit of the face search
+        hexa8 = Fem.FemMesh()
+        offset = 5000000
+        for i, (x, y, z) in enumerate([(x, y, z) for z in (0, 1) for y in (0, 1) for x in (0, 1, 2)]):
+            hexa8.addNode(x, y, z, offset + i)
+        hexa8.addVolume([offset + n for n in (0, 1, 4, 3, 6, 7, 10, 9)], 1)
+        hexa8.addVolume([offset + n for n in (1, 2, 5, 4, 7, 8, 11, 10)], 2)
+        out_mesh = FemMesh2Mesh.femmesh_2_mesh(hexa8)
+        self.assertEqual(len(out_mesh), 10 * 2 * 3, "Wrong number of surface triangle points")
+        self.assertEqual(max([p.x for p in out_mesh]), 2.0, "Wrong surface triangle points")
+
+    def test_femmesh_bulk(self):
+        import numpy as np
+        import importToolsFem
+        coords = [(0, 0, 0), (1, 0, 0), (0, 1, 0), (0, 0, 1), (1, 1, 1)]
+        single = Fem.FemMesh()
+        for i, (x, y, z) in enumerate(coords):
+            single.addNode(x, y, z, i + 1)
+        single.addVolume([1, 2, 3, 4], 1)
+        single.addVolume([2, 3, 4, 5], 2)
+        single.addFace([1, 2, 3], 3)
+        single.addEdge([1, 5], 4)
+        # numpy arrays
+        bulk = Fem.FemMesh()
+        bulk.addNodes(np.array(coords, dtype=np.float64), np.arange(1, 6))
+        bulk.addVolumes(np.array([[1, 2, 3, 4], [2, 3, 4, 5]]), np.array([1, 2]))
+        bulk.addFaces(np.array([[1, 2, 3]]), np.array([3]))
+        bulk.addEdges(np.array([[1, 5]]), np.array([4]))
+        # sequences, without element ids
+        bulk_list = Fem.FemMesh()
+        bulk_list.addNodes(coords, range(1, 6))
+        bulk_list.addVolumes([(1, 2, 3, 4), (2, 3, 4, 5)])
+        for mesh in (bulk, bulk_list):
+            self.assertEqual((mesh.NodeCount, mesh.VolumeCount), (5, 2), "Wrong FemMesh of the bulk methods")
+            self.assertEqual(mesh.getNodeById(5), single.getNodeById(5), "Wrong node of the bulk methods")
+            self.assertEqual(mesh.getElementNodes(2), (2, 3, 4, 5), "Wrong volume of the bulk methods")
+        self.assertEqual(bulk.getElementNodes(3), single.getElementNodes(3), "Wrong face of the bulk methods")
+        self.assertEqual(bulk.getElementNodes(4), single.getElementNodes(4), "Wrong edge of the bulk methods")
+        self.assertRaises(Exception, bulk_list.addVolumes, [(1, 2, 3)], [10])
+        self.assertRaises(Exception, bulk_list.addVolumes, [(1, 2, 3, 4)], [10, 11])
+        mesh = importToolsFem.make_femmesh({'Nodes': dict(zip(range(1, 6), coords)), 'Tetra4Elem': {1: (1, 2, 3, 4), 2: (2, 3, 4, 5)}})
+        self.assertEqual((mesh.NodeCount, mesh.VolumeCount), (5, 2), "Wrong FemMesh of make_femmesh")
+
+    def test_fenics_xdmf_binary(self):
+        import readFenicsXDMF
+        import writeFenicsXDMF
+        tetra4 = Fem.FemMesh()
+        tetra4.addNodes([(0, 0, 0), (1, 0, 0), (0, 1, 0), (0, 0, 1), (1, 1, 1)], [1, 2, 3, 4, 5])
+        tetra4.addVolumes([(1, 2, 3, 4), (2, 3, 4, 5)], [1, 2])
+        tetra4.addEdges([(1, 2), (2, 3)])  # the element order is determined by the edges
+        mesh_object = self.active_doc.addObject('Fem::FemMeshObject', 'XDMFMesh')
+        mesh_object.FemMesh = tetra4
+        arrays = {}
+        for encoding in (writeFenicsXDMF.ENCODING_ASCII, writeFenicsXDMF.ENCODING_BINARY):
+            xdmf_file = temp_dir + '/tetra4_mesh_' + encoding + '.xdmf'
+            writeFenicsXDMF.write_fenics_mesh_xdmf(mesh_object, xdmf_file, encoding=encoding)
+            arrays[encoding] = readFenicsXDMF.read_fenics_mesh_xdmf_arrays(xdmf_file)
+        ascii_mesh = arrays[writeFenicsXDMF.ENCODING_ASCII]
+        binary_mesh = arrays[writeFenicsXDMF.ENCODING_BINARY]
+        self.assertEqual(binary_mesh['NodeCoords'].tolist(), ascii_mesh['NodeCoords'].tolist(), "Different geometry of the binary heavy data")
+        self.assertEqual(binary_mesh['Elements']['Tetra4Elem'][1].tolist(), ascii_mesh['Elements']['Tetra4Elem'][1].tolist(),
+                         "Different topology of the binary heavy data")
+        self.assertEqual(len(binary_mesh['Elements']['Tetra4Elem'][0]), 2, "Wrong number of cells")
+
+    def test_inp_mesh_arrays(self):
+        import os
+        import importInpMesh
+        import importToolsFem
+        # nested *INCLUDE and element rows continued on the next line
+        include_dir = temp_dir + '/inp_include'
+        if not os.path.isdir(include_dir):
+            os.makedirs(include_dir)
+        with open(include_dir + '/nodes.inp', 'w') as f:
+            f.write('*NODE, NSET=Nall\n')
+            f.write('\n'.join(['{}, {}, {}, {}'.format(i + 1, x, y, z) for i, (x, y, z) in enumerate(
+                [(x, y, z) for z in (0, 1) for y in (0, 1) for x in (0, 1)])]) + '\n')
+            f.write('*INCLUDE, INPUT=elements.inp\n')
+        with open(include_dir + '/elements.inp', 'w') as f:
+            f.write('** hexa8 in two lines\n*ELEMENT, TYPE=C3D8, ELSET=Eall\n1, 1, 2, 4, 3,\n5, 6, 8, 7\n')
+        inp_file = temp_dir + '/inp_include_mesh.inp'
+        with open(inp_file, 'w') as f:
+            f.write('*INCLUDE, INPUT=inp_include/nodes.inp\n*STEP\n*NODE PRINT, NSET=Nall\nU\n*END STEP\n')
+        calls = []
+        m = importInpMesh.read_inp_arrays(inp_file, calls.append, chunk_size=2)
+        self.assertEqual(m['NodeIds'].tolist(), list(range(1, 9)), "Wrong node ids")
+        self.assertEqual(m['NodeCoords'][7].tolist(), [1.0, 1.0, 1.0], "Wrong node coordinates")
+        ids, nodes = m['Elements']['Hexa8Elem']
+        self.assertEqual(ids.tolist(), [1], "Wrong element ids")
+        self.assertEqual(nodes.tolist(), [[6, 8, 7, 5, 2, 4, 3, 1]], "Wrong FreeCAD node order")
+        self.assertEqual(calls[-1], 1.0, "Wrong progress")
+        self.assertEqual(importInpMesh.read_inp_arrays(inp_file, lambda fraction: False, chunk_size=2), None, "Reading was not canceled")
+        self.assertEqual(importInpMesh.read_inp(inp_file)['Hexa8Elem'], {1: [6, 8, 7, 5, 2, 4, 3, 1]}, "Wrong mesh data")
+        mesh = importToolsFem.make_femmesh_arrays(m)
+        self.assertEqual((mesh.NodeCount, mesh.VolumeCount), (8, 1), "Wrong FemMesh of the mesh arrays")
+
+    def test_z88_mesh_arrays(self):
+        import numpy as np
+        import importZ88Mesh
+        import importZ88O2Results
+        z88_mesh_file = temp_dir + '/z88_tetra4_i1.txt'
+        with open(z88_mesh_file, 'w') as f:
+            importZ88Mesh.write_z88_mesh_arrays_to_file(
+                np.array([1, 2, 3, 4]), np.array([(0, 0, 0), (1, 0, 0), (0, 1, 0), (0, 0, 1)], dtype=np.float64),
+                np.array([1]), np.array([[1, 2, 3, 4]]), 17, f)
+        m = importZ88Mesh.read_z88_mesh_arrays(z88_mesh_file)
+        self.assertEqual(m['NodeIds'].tolist(), [1, 2, 3, 4], "Wrong node ids")
+        self.assertEqual(m['NodeCoords'][3].tolist(), [0.0, 0.0, 1.0], "Wrong node coordinates")
+        ids, nodes = m['Elements']['Tetra4Elem']
+        self.assertEqual(ids.tolist(), [1], "Wrong element ids")
+        self.assertEqual(nodes.tolist(), [[1, 2, 3, 4]], "Wrong FreeCAD node order")
+        with open(z88_mesh_file) as f:
+            self.assertEqual(f.read().splitlines()[-1], '4 2 3 1', "Wrong z88 node order")
+        self.assertEqual(importZ88Mesh.read_z88_mesh(z88_mesh_file)['Tetra4Elem'], {1: (1, 2, 3, 4)}, "Wrong mesh data")
+        z88_disp_file = temp_dir + '/z88_o2.txt'
+        with open(z88_disp_file, 'w') as f:
+            f.write('\n' * 5 + '1 0.1 0.2 0.3\n2 0.0 0.0 -1.5\n\n')
+        r = importZ88O2Results.read_z88_disp_arrays(z88_disp_file)
+        ids, disp = r['Results'][0]['disp']
+        self.assertEqual(ids.tolist(), [1, 2], "Wrong displacement node ids")
+        self.assertEqual(disp[1].tolist(), [0.0, 0.0, -1.5], "Wrong displacements")
+
+    def test_ccx_streaming(self):
+        import os
+        import stat
+        import shutil
+        import time
+        from platform import system
+        progress = FemToolsCcx.CcxProgress()
+        events = []
+        progress.add_callback(lambda p, event: events.append(event))
+        for line in (' STEP           1', ' increment 1 attempt 1 ', ' actual total time=5.000000e-01', ' iteration 1',
+                     ' largest residual force= 1.5e-03 in node 12 and dof 1', ' no convergence', ' iteration 2',
+                     ' largest residual force= 0.000000 in node 3 and dof 2', ' convergence',
+                     ' *ERROR in e_c3d: nonpositive jacobian', ' determinant in element 7', ' Job finished'):
+            progress.parse_line(line)
+        self.assertEqual(events, ['step', 'increment', 'iteration', 'residual', 'iteration', 'residual', 'convergence', 'error', 'error', 'finished'], "Wrong ccx progress events")
+        self.assertEqual(progress.iterations, [(1, 1, 1, 0.0015), (1, 1, 2, 0.0)], "Wrong ccx iterations")
+        self.assertEqual((progress.total_time, progress.converged, progress.nonpositive_jacobian_elements), (0.5, True, [7]), "Wrong ccx progress")
+        for line in (' average', ' no', ' Job', ' largest residual', ' determinant in element', ' increment size='):
+            progress.parse_line(line)
+        self.assertEqual(len(events), 10, "Event of a truncated ccx output line")
+        if system() == "Windows":
+            fcc_print('The stand-in ccx of the streaming test is a shell script, test skipped on Windows')
+            return
+        stream_dir = temp_dir + '/ccx_streaming'
+        if not os.path.isdir(stream_dir):
+            os.makedirs(stream_dir)
+        shutil.copyfile(test_file_dir + '/cube_static.frd', stream_dir + '/result.frd')
+        # stand-in ccx, writes the frd file and waits, thus the results are read while it is running
+        stand_in_ccx = stream_dir + '/ccx'
+        with open(stand_in_ccx, 'w') as f:
+            f.write('#!/bin/sh\necho " STEP 1"\ncp result.frd "$2.frd"\nsleep 2\necho " Job finished"\n')
+        os.chmod(stand_in_ccx, os.stat(stand_in_ccx).st_mode | stat.S_IEXEC)
+        progress = FemToolsCcx.CcxProgress()
+        result_sets = []
+        ret_code, stdout, stderr = FemToolsCcx.run_ccx_streaming(
+            [stand_in_ccx, '-i', 'job'], stream_dir, FemToolsCcx.get_ccx_environment(1), progress,
+            stream_dir + '/job.frd', lambda result_set: result_sets.append((result_set, progress.finished)))
+        self.assertEqual(ret_code, 0, "Wrong return code of the stand-in ccx")
+        self.assertTrue(progress.finished, "ccx output not parsed")
+        self.assertEqual(len(result_sets), 1, "Wrong number of result sets read while ccx was running")
+        self.assertFalse(result_sets[0][1], "Result set not passed before ccx has finished")
+        self.assertEqual(len(result_sets[0][0]['disp'][0]), 280, "Wrong displacements read while ccx was running")
+        # ccx is stopped if a callback raises
+        if os.path.exists(stream_dir + '/finished'):
+            os.remove(stream_dir + '/finished')
+        with open(stand_in_ccx, 'w') as f:
+            f.write('#!/bin/sh\necho " STEP 1"\nsleep 2\ntouch finished\n')
+
+        def raise_on_step(p, event):
+            raise RuntimeError(event)
+        progress = FemToolsCcx.CcxProgress(raise_on_step)
+        self.assertRaises(RuntimeError, FemToolsCcx.run_ccx_streaming, [stand_in_ccx, '-i', 'job'], stream_dir, FemToolsCcx.get_ccx_environment(1), progress)
+        time.sleep(1)
+        self.assertFalse(os.path.exists(stream_dir + '/finished'), "ccx not stopped after a callback has raised")
+
+    def test_gmsh_mesh_cache(self):
+        import os
+        import shutil
+        import time
+        import FemGmshTools
+        cache_dir = temp_dir + '/gmsh_mesh_cache'
+        if os.path.isdir(cache_dir):
+            shutil.rmtree(cache_dir)
+        mesh_cache = FemGmshTools.GmshMeshCache(cache_dir, 250)
+        brep_file = temp_dir + '/gmsh_mesh_cache.brep'
+        with open(brep_file, 'w') as f:
+            f.write('DBRep_DrawableShape\n')
+        parameters = {'clmax': 1e+22, 'order': '2', 'groups': [('Face1', ['Face1'])]}
+        key = mesh_cache.get_key(brep_file, parameters)
+        self.assertEqual(key, mesh_cache.get_key(brep_file, dict(parameters)), "Different keys of the same shape and parameters")
+        self.assertNotEqual(key, mesh_cache.get_key(brep_file, dict(parameters, order='1')), "Same keys of different parameters")
+        self.assertEqual(mesh_cache.get(key), None, "Mesh found in empty cache")
+        keys = []
+        for i in range(3):
+            mesh_file = temp_dir + '/gmsh_mesh_cache_{}.unv'.format(i)
+            with open(mesh_file, 'w') as f:
+                f.write(str(i) * 100)
+            keys.append(mesh_cache.get_key(brep_file, dict(parameters, clmax=float(i))))
+            mesh_cache.add(keys[-1], mesh_file)
+            os.utime(mesh_cache.get_file(keys[-1]), (time.time() - 10 + i, time.time() - 10 + i))
+            if i == 1:
+                # mesh 0 is used again, thus mesh 1 is the least recently used one
+                self.assertTrue(mesh_cache.get(keys[0]), "Cached mesh not found")
+        self.assertEqual([bool(mesh_cache.get(k)) for k in keys], [True, False, True], "Wrong eviction of the mesh cache")
+        with open(mesh_cache.get(keys[2])) as f:
+            self.assertEqual(f.read(), '2' * 100, "Wrong cached mesh")
+
+    def test_femmesh_topology_cache(self):
+        import FemMeshTools
+        tetra4 = Fem.FemMesh()
+        tetra4.addNode(0, 0, 0, 1)
+        tetra4.addNode(1, 0, 0, 2)
+        tetra4.addNode(0, 1, 0, 3)
+        tetra4.addNode(0, 0, 1, 4)
+        tetra4.addVolume([1, 2, 3, 4], 1)
+        mesh_object = self.active_doc.addObject('Fem::FemMeshObject', 'TopologyCacheMesh')
+        mesh_object.FemMesh = tetra4
+        femmesh_topology = FemMeshTools.FemMeshTopologyCache(mesh_object)
+        self.assertEqual(femmesh_topology.get_femelement_table(), {1: (1, 2, 3, 4)}, "Wrong femelement_table")
+        self.assertEqual(femmesh_topology.get_femnodes_ele_index().get_femelements_by_femnodes([1, 2, 3, 4]), [1], "Wrong femnodes_ele_index")
+        tetra4.addNode(1, 1, 1, 5)
+        tetra4.addVolume([2, 3, 4, 5], 2)
+        mesh_object.FemMesh = tetra4
+        self.assertEqual(len(femmesh_topology.get_femelement_table()), 1, "FemMesh topology cache is not cached")
+        femmesh_topology.invalidate()
+        self.assertEqual(len(femmesh_topology.get_femelement_table()), 2, "FemMesh topology cache is not invalidated")
+        self.assertEqual(femmesh_topology.get_femnodes_ele_index().get_femelements_by_femnodes([2, 3, 4, 5]), [2], "Wrong femnodes_ele_index")
+
+    def test_femnodes_spatial_index(self):
+        import FemMeshTools
+        import Part
+        femmesh = Fem.FemMesh()
+        node_id = 1
+        for x in range(5):
+            for y in range(5):
+                for z in range(5):
+                    femmesh.addNode(x * 0.5, y * 0.5, z * 0.5, node_id)
+                    node_id += 1
+        box = Part.makeBox(1, 1, 1, FreeCAD.Vector(0.5, 0.5, 0.5))
+        cylinder = Part.makeCylinder(0.5, 2, FreeCAD.Vector(1, 1, 0))
+        spatial_index = FemMeshTools.FemNodesSpatialIndex(femmesh)
+        for shape in box.Vertexes + box.Edges + box.Faces + cylinder.Edges + cylinder.Faces:
+            self.assertEqual(spatial_index.get_femnodes_by_shape(shape), sorted(FemMeshTools.get_femnodes_by_shape(femmesh, shape)),
+                             "Different femnodes of the spatial index for a " + shape.ShapeType)
+        self.assertEqual(len(spatial_index.get_femnodes_by_shape(box.Faces[0])), 9, "Wrong number of femnodes on a face")
+
+    def test_tetgen_poly_export(self):
+        import Mesh
+        import convert2TetGen
+        box_mesh = Mesh.createBox(1, 1, 1)
+        poly_file = temp_dir + '/box_mesh.poly'
+        convert2TetGen.exportMeshToTetGenPoly(box_mesh, poly_file, False)
+        with open(poly_file) as f:
+            lines = f.read().splitlines()
+        self.assertEqual(lines[2], '8  3  0  0', "Wrong node list header")
+        markers = [int(line.split()[2]) for line in lines if line.startswith('  1 0 ')]
+        self.assertEqual(markers, [-1] * box_mesh.CountFacets, "A closed mesh has one boundary marker")
+        # a fin on the first box edge makes this edge shared by three facets
+        points, facets = box_mesh.Topology
+        facets = list(facets) + [(facets[0][0], facets[0][1], len(points))]
+        markers = convert2TetGen.getBoundaryMarkers(convert2TetGen.np.array(facets), len(points) + 1)
+        self.assertEqual(markers.tolist(), [-1] * box_mesh.CountFacets + [-2], "Wrong boundary markers of the fin")
+
+    def test_ccx_batch_runner(self):
+        import os
+        import stat
+        from platform import system
+        if system() == "Windows":
+            fcc_print('The stand-in ccx of the batch runner test is a shell script, test skipped on Windows')
+            return
+        batch_dir = temp_dir + '/ccx_batch'
+        # stand-in ccx, writes the number of threads of its environment into the result file
+        stand_in_ccx = batch_dir + '/ccx'
+        if not os.path.isdir(batch_dir):
+            os.makedirs(batch_dir)
+        with open(stand_in_ccx, 'w') as f:
+            f.write('#!/bin/sh\necho "CalculiX stand-in $2"\necho "$OMP_NUM_THREADS" > "$2.frd"\n')
+        os.chmod(stand_in_ccx, os.stat(stand_in_ccx).st_mode | stat.S_IEXEC)
+        omp_num_threads = os.environ.get('OMP_NUM_THREADS')
+        runner = FemToolsCcx.CcxBatchRunner(stand_in_ccx, max_jobs=2, threads_per_job=3)
+        for i in range(4):
+            job_dir = batch_dir + '/job_{}'.format(i)
+            if not os.path.isdir(job_dir):
+                os.makedirs(job_dir)
+            open(job_dir + '/job.inp', 'w').close()
+            runner.add_job(job_dir + '/job.inp')
+        finished = []
+        self.assertEqual(len(runner.run(finished.append)), 4, "Wrong number of finished jobs")
+        self.assertEqual(sorted([job.working_dir for job in finished]), sorted([job.working_dir for job in runner.jobs]), "Wrong finished jobs")
+        for job in runner.jobs:
+            self.assertTrue(job.succeeded(), "ccx job {} failed".format(job.name))
+            self.assertTrue('CalculiX stand-in job' in job.stdout, "Wrong stdout of ccx job {}".format(job.name))
+            with open(job.get_result_file()) as f:
+                self.assertEqual(f.read().strip(), '3', "Wrong number of threads of ccx job {}".format(job.name))
+        self.assertEqual(os.environ.get('OMP_NUM_THREADS'), omp_num_threads, "OMP_NUM_THREADS of FreeCAD was changed")
+
     def tearDown(self):
         FreeCAD.closeDocument("FemTest")
         pass
@@ -235,6 +655,16 @@ class FemCcxAnalysisTest(unittest.TestCase):
         ret = compare_inp_files(static_analysis_inp_file, static_analysis_dir + "/" + mesh_name + '.inp')
         self.assertFalse(ret, "FemToolsCcx write_inp_file test failed.\n{}".format(ret))
 
+        fcc_print('Writing parameter variants of the static analysis to {}'.format(static_analysis_dir))
+        jobs = fea.write_inp_file_variants([{}, {'MechanicalMaterial': {'Material': {'YoungsModulus': "210000 MPa"}}}])
+        self.assertEqual(len(jobs), 2, "Wrong number of parameter variants")
+        ret = compare_inp_files(static_analysis_inp_file, jobs[0].inp_file_name)
+        self.assertFalse(ret, "FemToolsCcx write_inp_file_variants test failed.\n{}".format(ret))
+        with open(jobs[1].inp_file_name) as f:
+            self.assertTrue('210000, 0.300' in f.read(), "Parameter override of the material not written")
+        self.assertEqual(new_material_object.Material['YoungsModulus'], "200000 MPa", "Material not restored after writing the variants")
+        self.assertEqual(fea.working_dir, static_analysis_dir, "Working directory not restored after writing the variants")
+
         fcc_print('Setting up working directory to {} in order to read simulated calculations'.format(test_file_dir))
         fea.setup_working_dir(test_file_dir)
         self.assertTrue(True if fea.working_dir == test_file_dir else False,
@@ -309,6 +739,33 @@ class FemCcxAnalysisTest(unittest.TestCase):
         fcc_print('Save FreeCAD file for frequency analysis to {}...'.format(frequency_save_fc_file))
         self.active_doc.saveAs(frequency_save_fc_file)
 
+        fcc_print('Checking the eigenmode frequencies of a frequency analysis with two modes...')
+        # the second mode is a copy of the first one with another mode number and frequency
+        two_modes_base_name = frequency_base_name + '_two_modes'
+        with open(test_file_dir + '/' + frequency_base_name + '.frd') as f:
+            frd_lines = f.readlines()
+        first = [i for i, line in enumerate(frd_lines) if line[5:10] == 'PSTEP'][0]
+        mode_lines = frd_lines[first:-1]
+        second_mode_lines = [line[:30] + '     2' + line[36:] if line[5:10] == 'PMODE' else line for line in mode_lines]
+        with open(frequency_analysis_dir + '/' + two_modes_base_name + '.frd', 'w') as f:
+            f.writelines(frd_lines[:first] + mode_lines + second_mode_lines + frd_lines[-1:])
+        with open(test_file_dir + '/' + frequency_base_name + '.dat') as f:
+            dat_lines = f.readlines()
+        mode = [i for i, line in enumerate(dat_lines) if line.startswith('      1   0.1163246E+12')][0]
+        dat_lines.insert(mode + 1, '      2   0.2326492E+12   0.4823365E+06   0.7676702E+05   0.0000000E+00\n')
+        with open(frequency_analysis_dir + '/' + two_modes_base_name + '.dat', 'w') as f:
+            f.writelines(dat_lines)
+        fea.inp_file_name = frequency_analysis_dir + '/' + two_modes_base_name + '.inp'
+        members = fea.analysis.Member
+        fea.load_results()
+        frequencies = {}
+        for m in fea.analysis.Member:
+            if m not in members and m.isDerivedFrom("Fem::FemResultObject"):
+                frequencies[m.Eigenmode] = m.EigenmodeFrequency
+        self.assertEqual(sorted(frequencies), [1, 2], "Wrong eigenmodes of the frequency analysis with two modes")
+        self.assertAlmostEqual(frequencies[1], 54282.01, 1, "Wrong frequency of the first eigenmode")
+        self.assertAlmostEqual(frequencies[2], 76767.02, 1, "Wrong frequency of the second eigenmode")
+
         fcc_print('--------------- End of FEM tests static and frequency analysis ---------------')
 
     def test_thermomech_analysis(self):
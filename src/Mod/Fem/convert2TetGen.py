@@ -2,6 +2,8 @@
 
 #Make mesh of pn junction in TetGen format
 import FreeCAD, FreeCADGui, Part, Mesh
+import collections
+import numpy as np
 App = FreeCAD # shortcut
 Gui = FreeCADGui # shortcut
 
@@ -14,120 +16,33 @@ def exportMeshToTetGenPoly(meshToExport,filePath,beVerbose=1):
     if beVerbose == 1:
             FreeCAD.Console.PrintMessage("\nExport of mesh to TetGen file ...")
     (allVertices,allFacets) = meshToExport.Topology
+    points = np.array([(v.x, v.y, v.z) for v in allVertices], dtype=np.float64).reshape(-1, 3)
+    facets = np.array(allFacets, dtype=np.int64).reshape(len(allFacets), -1)
     f = open(filePath, 'w')
     f.write("# This file was generated from FreeCAD geometry\n")
     f.write("# Part 1 - node list\n")
     f.write("%(TotalNumOfPoints)i  %(NumOfDimensions)i  %(NumOfProperties)i  %(BoundaryMarkerExists)i\n" % \
-            {'TotalNumOfPoints':len(allVertices), \
+            {'TotalNumOfPoints':len(points), \
              'NumOfDimensions':3, \
              'NumOfProperties':0, \
              'BoundaryMarkerExists':0})
-    for PointIndex in range(len(allVertices)):
-        f.write("%(PointIndex)5i %(x) e %(y) e %(z) e\n" % \
-                {'PointIndex':PointIndex, \
-                'x':allVertices[PointIndex].x, \
-                'y':allVertices[PointIndex].y, \
-                'z':allVertices[PointIndex].z})
+    writeColumns(f, "%5i % e % e % e\n", [range(len(points))] + points.T.tolist())
 
     ## Find out BoundaryMarker for each facet. If edge connects only two facets,
     # then this facets should have the same BoundaryMarker
     BoundaryMarkerExists = 1
-    PointList=[allFacets[0][1],allFacets[0][0]]
-    PointList.sort()
-    EdgeFacets = {(PointList[0],PointList[1]):set([0])}
-    Edge = []
-
-    # Finde all facets for each edge
-    for FacetIndex in range(len(allFacets)):
-        Facet = allFacets[FacetIndex]
-        for i in range(0,-len(Facet),-1):
-            tmpEdge = [Facet[i],Facet[i+1]]
-            tmpEdge.sort()
-            Edge.append(tmpEdge)
-        for i in range(len(Edge)):
-            EdgeIndex = (Edge[i][0],Edge[i][1])
-            if EdgeIndex in EdgeFacets:
-                EdgeFacets[EdgeIndex].add(FacetIndex)               
-            else:
-                EdgeFacets[EdgeIndex] = set([FacetIndex])                
-        Edge = []
-    
-    # Find BoundaryMarker for each facet
-    BoundaryMarker = []
-    for index in range(len(allFacets)):
-        BoundaryMarker.append(0)
-    MinMarker = -1
-    InitialFacet = 0
-    BoundaryMarker[InitialFacet] = MinMarker
-    EdgeKeys = EdgeFacets.keys()
-    disconnectedEdges = len(EdgeKeys)
-    if beVerbose == 1:
-        FreeCAD.Console.PrintMessage('\nBoundaryMarker:'+repr(BoundaryMarker)+' '+repr(len(EdgeFacets)))
-    searchForPair = 1
-
-    # Main loop: first search for all complementary facets, then fill one branch and repeat while edges are available
-    while len(EdgeFacets)>0:        
-        removeEdge = 0
-        for EdgeIndex in EdgeKeys:
-            if len(EdgeFacets[EdgeIndex]) == 1:
-                removeEdge = 1
-                break
-            if len(EdgeFacets[EdgeIndex]) == 2:
-                FacetPair = []
-                for facet in EdgeFacets[EdgeIndex]:
-                    FacetPair.append(facet)
-                if (BoundaryMarker[FacetPair[0]]==0) and (BoundaryMarker[FacetPair[1]]==0):
-                    continue
-                if (BoundaryMarker[FacetPair[0]]!=0) and (BoundaryMarker[FacetPair[1]]!=0):
-                    removeEdge = 1
-                    break
-                if (BoundaryMarker[FacetPair[0]]!=0):
-                    BoundaryMarker[FacetPair[1]] = BoundaryMarker[FacetPair[0]]
-                else:
-                    BoundaryMarker[FacetPair[0]] = BoundaryMarker[FacetPair[1]]
-                removeEdge = 1
-                break
-            if searchForPair == 1:
-                continue
-            FacetTree = []
-            AllMarkers = 1
-            MarkerSum = 0
-            for facet in EdgeFacets[EdgeIndex]:
-                FacetTree.append(facet)
-                MarkerSum += BoundaryMarker[facet]
-            if MarkerSum == 0:
-                continue
-            for facet in EdgeFacets[EdgeIndex]:
-                if BoundaryMarker[facet] == 0:
-                    MinMarker -= 1
-                    BoundaryMarker[facet] = MinMarker
-                    searchForPair = 1
-            removeEdge = 1
-            break
-        if removeEdge == 1:
-            del EdgeFacets[EdgeIndex]
-            EdgeKeys = EdgeFacets.keys()
-            continue
-        searchForPair = 0
-    # End of main loop
+    BoundaryMarker = getBoundaryMarkers(facets, len(points))
     if beVerbose == 1:
-        FreeCAD.Console.PrintMessage('\nNew BoundaryMarker:'+repr(BoundaryMarker)+' '+repr(len(EdgeFacets)))
+        FreeCAD.Console.PrintMessage('\nBoundaryMarker: ' + repr(len(np.unique(BoundaryMarker))) + ' regions')
 
     ## Part 2 - write all facets to *.poly file
     f.write("# Part 2 - facet list\n")
     f.write("%(TotalNumOfFacets)i  %(BoundaryMarkerExists)i\n" %\
-            {'TotalNumOfFacets':len(allFacets),\
+            {'TotalNumOfFacets':len(facets),\
              'BoundaryMarkerExists':BoundaryMarkerExists})
-    for FacetIndex in range(len(allFacets)):
-        f.write("# FacetIndex = %(Index)i\n"%{'Index':FacetIndex})
-        f.write("%(NumOfPolygons)3i "%{'NumOfPolygons':1})
-        if BoundaryMarkerExists == 1:
-            f.write("0 %(BoundaryMarker)i"%{'BoundaryMarker':BoundaryMarker[FacetIndex]})
-        f.write("\n%(NumOfConers)3i  "%{'NumOfConers':len(allFacets[FacetIndex])})
-        for PointIndex in range(len(allFacets[FacetIndex])):
-            #        f.write(repr(allFacets[FacetIndex][PointIndex]))
-            f.write("%(PointIndex)i "%{'PointIndex':allFacets[FacetIndex][PointIndex]})
-        f.write("\n")
+    numOfCorners = facets.shape[1]
+    facetFormat = "# FacetIndex = %i\n  1 0 %i\n" + "%3i  " % numOfCorners + "%i " * numOfCorners + "\n"
+    writeColumns(f, facetFormat, [range(len(facets)), BoundaryMarker.tolist()] + facets.T.tolist())
     ## Part 3 and Part 4 are zero
     f.write("# Part 3 - the hole list.\n# There is no hole in bar.\n0\n")
     f.write("# Part 4 - the region list.\n# There is no region defined.\n0\n")
@@ -135,6 +50,90 @@ def exportMeshToTetGenPoly(meshToExport,filePath,beVerbose=1):
     f.close()
 
 
+def getBoundaryMarkers(facets, numOfPoints):
+    """BoundaryMarker for each facet of the (facets, corners) point index array
+    Facets connected by edges of exactly two facets are in the same region and get the same
+    marker. The region of the first facet gets -1, the other regions get -2, -3, ... in the
+    order they are reached over the edges of more than two facets from the first region.
+    Regions which are not connected to the first one at all are numbered at last."""
+    numOfFacets, numOfCorners = facets.shape
+    if numOfFacets == 0:
+        return np.zeros(0, dtype=np.int64)
+    # all edges of all facets as sorted point pairs, grouped by edge
+    startPoints = facets.ravel()
+    endPoints = np.roll(facets, -1, axis=1).ravel()
+    edgeKeys = np.minimum(startPoints, endPoints) * numOfPoints + np.maximum(startPoints, endPoints)
+    edgeFacets = np.repeat(np.arange(numOfFacets, dtype=np.int64), numOfCorners)
+    order = np.argsort(edgeKeys, kind='mergesort')
+    edgeKeys = edgeKeys[order]
+    edgeFacets = edgeFacets[order]
+    newEdge = np.ones(len(edgeKeys), dtype=bool)
+    newEdge[1:] = edgeKeys[1:] != edgeKeys[:-1]
+    edgeStarts = np.nonzero(newEdge)[0]
+    edgeCounts = np.diff(np.append(edgeStarts, len(edgeKeys)))
+    # regions over the edges of two facets
+    pairs = edgeStarts[edgeCounts == 2]
+    regions = getConnectedComponents(numOfFacets, edgeFacets[pairs], edgeFacets[pairs + 1])
+    regionIds, facetRegions = np.unique(regions, return_inverse=True)
+    facetRegions = facetRegions.ravel()
+    # region neighbours over the edges of more than two facets
+    neighbours = [[] for r in range(len(regionIds))]
+    for start, count in zip(edgeStarts[edgeCounts > 2].tolist(), edgeCounts[edgeCounts > 2].tolist()):
+        edgeRegions = facetRegions[edgeFacets[start:start + count]].tolist()
+        for region in edgeRegions:
+            neighbours[region].extend(edgeRegions)
+    # one breadth first search over the regions
+    regionMarkers = np.zeros(len(regionIds), dtype=np.int64)
+    MinMarker = 0
+    for firstRegion in [facetRegions[0]] + list(range(len(regionIds))):
+        if regionMarkers[firstRegion] != 0:
+            continue
+        MinMarker -= 1
+        regionMarkers[firstRegion] = MinMarker
+        queue = collections.deque([firstRegion])
+        while queue:
+            region = queue.popleft()
+            for neighbour in neighbours[region]:
+                if regionMarkers[neighbour] == 0:
+                    MinMarker -= 1
+                    regionMarkers[neighbour] = MinMarker
+                    queue.append(neighbour)
+    return regionMarkers[facetRegions]
+
+
+def getConnectedComponents(numOfNodes, nodesA, nodesB):
+    """component of each node of the graph with the edges (nodesA[i], nodesB[i]),
+    the component is given by its smallest node"""
+    labels = np.arange(numOfNodes, dtype=np.int64)
+    while True:
+        labelsA = labels[nodesA]
+        labelsB = labels[nodesB]
+        differ = labelsA != labelsB
+        if not differ.any():
+            return labels
+        nodesA = nodesA[differ]
+        nodesB = nodesB[differ]
+        # hook the root of the greater label to the smaller one, then flatten the trees
+        np.minimum.at(labels, np.maximum(labelsA[differ], labelsB[differ]), np.minimum(labelsA[differ], labelsB[differ]))
+        while True:
+            roots = labels[labels]
+            if np.array_equal(roots, labels):
+                break
+            labels = roots
+
+
+def writeColumns(f, rowFormat, columns, chunkSize=10000):
+    """write the rows of the value columns with one formatted string per chunk of rows"""
+    numOfColumns = len(columns)
+    numOfRows = len(columns[0])
+    for i in range(0, numOfRows, chunkSize):
+        chunkRows = min(chunkSize, numOfRows - i)
+        values = [None] * (chunkRows * numOfColumns)
+        for j, column in enumerate(columns):
+            values[j::numOfColumns] = column[i:i + chunkRows]
+        f.write((rowFormat * chunkRows) % tuple(values))
+
+
 def export(objectslist,filename):
     """Called when freecad exports a mesh to poly format"""
     for obj in objectslist:
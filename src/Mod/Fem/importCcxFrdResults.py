@@ -63,11 +63,16 @@ def insert(filename, docname):
 def importFrd(filename, analysis=None, result_name_prefix=None):
     import importToolsFem
     import ObjectsFem
+    import FemResultStore
     if result_name_prefix is None:
         result_name_prefix = ''
-    m = readResult(filename)
+    # a frd file with more than one result set (frequency, transient) is written into a result store
+    # the result objects of the store are filled the first time they are used, see FemResultStore
+    store_file = FemResultStore.get_result_store_file(filename)
+    result_sets = FemResultStore.FemResultSetCollector(store_file, filename)
+    m = read_frd_result_arrays(filename, result_set_callback=result_sets.add_result_set)
     mesh_object = None
-    if(len(m['Nodes']) > 0):
+    if(len(m['NodeIds']) > 0):
         if analysis is None:
             analysis_name = os.path.splitext(os.path.basename(filename))[0]
             analysis_object = ObjectsFem.makeAnalysis('Analysis')
@@ -75,28 +80,20 @@ def importFrd(filename, analysis=None, result_name_prefix=None):
         else:
             analysis_object = analysis  # see if statement few lines later, if not analysis -> no FemMesh object is created !
 
-        if 'Nodes' in m:
-            positions = []
-            for k, v in m['Nodes'].items():
-                positions.append(v)
-            p_x_max, p_y_max, p_z_max = map(max, zip(*positions))
-            p_x_min, p_y_min, p_z_min = map(min, zip(*positions))
-
-            x_span = abs(p_x_max - p_x_min)
-            y_span = abs(p_y_max - p_y_min)
-            z_span = abs(p_z_max - p_z_min)
-            span = max(x_span, y_span, z_span)
+        coords = m['NodeCoords']
+        span = float((coords.max(axis=0) - coords.min(axis=0)).max())
+        result_sets.close(span)
 
         if (not analysis):
-            mesh = importToolsFem.make_femmesh(m)
+            mesh = importToolsFem.make_femmesh_arrays(m)
 
-            if len(m['Nodes']) > 0:
+            if len(m['NodeIds']) > 0:
                 mesh_object = FreeCAD.ActiveDocument.addObject('Fem::FemMeshObject', 'ResultMesh')
                 mesh_object.FemMesh = mesh
                 analysis_object.Member = analysis_object.Member + [mesh_object]
 
-        number_of_increments = len(m['Results'])
-        for result_set in m['Results']:
+        number_of_increments = len(result_sets.result_sets)
+        for index, result_set in enumerate(result_sets.result_sets):
             eigenmode_number = result_set['number']
             step_time = result_set['time']
             step_time = round(step_time, 2)
@@ -108,32 +105,46 @@ def importFrd(filename, analysis=None, result_name_prefix=None):
                 results_name = result_name_prefix + 'results'
 
             results = ObjectsFem.makeResultMechanical(results_name)
+            # set here for stored results too, the frequencies of the modes are set by their number before the results are loaded
+            if eigenmode_number > 0:
+                results.Eigenmode = eigenmode_number
+            results.Time = step_time
             for m in analysis_object.Member:  # TODO analysis could have multiple mesh objects in the future
                 if m.isDerivedFrom("Fem::FemMeshObject"):
                     results.Mesh = m
                     break
-            results = importToolsFem.fill_femresult_mechanical(results, result_set, span)
+            if result_sets.is_stored():
+                FemResultStore.set_result_store(results, store_file, index)
+            else:
+                results = importToolsFem.fill_femresult_mechanical_arrays(results, result_set, span)
             analysis_object.Member = analysis_object.Member + [results]
 
         if(FreeCAD.GuiUp):
             import FemGui
             FemGui.setActiveAnalysis(analysis_object)
+    else:
+        result_sets.close()
 
 
-# read a calculix result file and extract the nodes, displacement vectores and stress values.
-def readResult(frd_input):
-    inout_nodes_exist = False
+# read the fluid inlet and outlet nodes written by FemMeshTools.use_correct_fluidinout_ele_def()
+# the file is removed after reading, every row holds three node numbers and the element name
+def read_inout_nodes():
+    inout_nodes = []
     if os.path.exists("inout_nodes.txt"):
-        inout_nodes = []
         f = pyopen("inout_nodes.txt", "r")
         lines = f.readlines()
         for line in lines:
             a = line.split(',')
             inout_nodes.append(a)
-        if len(inout_nodes) > 0:
-            inout_nodes_exist = True
         f.close()
         os.remove("inout_nodes.txt")
+    return inout_nodes
+
+
+# read a calculix result file and extract the nodes, displacement vectores and stress values.
+def readResult(frd_input):
+    inout_nodes = read_inout_nodes()
+    inout_nodes_exist = len(inout_nodes) > 0
     frd_file = pyopen(frd_input, "r")
     nodes = {}
     elements_hexa8 = {}
@@ -536,3 +547,375 @@ def readResult(frd_input):
             'Penta15Elem': elements_penta15, 'Hexa20Elem': elements_hexa20, 'Tria3Elem': elements_tria3, 'Tria6Elem': elements_tria6,
             'Quad4Elem': elements_quad4, 'Quad8Elem': elements_quad8, 'Seg2Elem': elements_seg2, 'Seg3Elem': elements_seg3,
             'Results': results}
+
+
+########## array based reader ##########
+# result blocks of the frd file which are read into arrays
+# (name of the -4 block header, key in the result set, number of values per node)
+frd_result_blocks = (
+    (b'DISP', 'disp', 3),
+    (b'STRESS', 'stress', 6),
+    (b'TOSTRAIN', 'strain', 6),
+    (b'PE', 'peeq', 1),
+    (b'NDTEMP', 'temp', 1),
+    (b'MAFLOW', 'mflow', 1),
+    (b'STPRES', 'npressure', 1),
+)
+
+# frd element type --> (FreeCAD mesh data key, number of nodes, node order for FreeCAD)
+# node orders are the same as in readResult(), see there for the reasons
+frd_element_types = {
+    1: ('Hexa8Elem', 8, (5, 6, 7, 4, 1, 2, 3, 0)),
+    2: ('Penta6Elem', 6, (4, 5, 3, 1, 2, 0)),
+    3: ('Tetra4Elem', 4, (1, 0, 2, 3)),
+    4: ('Hexa20Elem', 20, (7, 4, 5, 6, 3, 0, 1, 2, 19, 16, 17, 18, 11, 8, 9, 10, 15, 12, 13, 14)),
+    5: ('Penta15Elem', 15, (4, 5, 3, 1, 2, 0, 13, 14, 12, 7, 8, 6, 10, 11, 9)),
+    6: ('Tetra10Elem', 10, (1, 0, 2, 3, 4, 6, 5, 8, 7, 9)),
+    7: ('Tria3Elem', 3, (0, 1, 2)),
+    8: ('Tria6Elem', 6, (0, 1, 2, 3, 4, 5)),
+    9: ('Quad4Elem', 4, (0, 1, 2, 3)),
+    10: ('Quad8Elem', 8, (0, 1, 2, 3, 4, 5, 6, 7)),
+    11: ('Seg2Elem', 2, (0, 1)),
+    12: ('Seg3Elem', 3, (0, 2, 1)),
+}
+
+# the nodes of one element are written in lines of max 10 nodes
+frd_nodes_per_line = 10
+
+
+class FrdBlockLines(object):
+    '''collects the fixed width data lines of one frd block
+    and converts them into a numpy record array every chunk_size lines,
+    thus the memory needed for the raw lines stays bounded
+    if store is False the lines are only counted
+    '''
+    def __init__(self, record_dtype, store=True, chunk_size=100000):
+        self.dtype = record_dtype
+        self.store = store
+        self.chunk_size = chunk_size
+        self.count = 0
+        self.lines = []
+        self.chunks = []
+
+    def append(self, line):
+        self.count += 1
+        if self.store:
+            self.lines.append(line)
+            if len(self.lines) >= self.chunk_size:
+                self.flush()
+
+    def flush(self):
+        import numpy as np
+        if self.lines:
+            width = self.dtype.itemsize
+            buf = b''.join([l[:width] for l in self.lines])
+            if len(buf) != width * len(self.lines) or b'\n' in buf:
+                # short lines, pad them to the full record width
+                buf = b''.join([l.rstrip(b'\r\n')[:width].ljust(width) for l in self.lines])
+            self.chunks.append(np.frombuffer(buf, dtype=self.dtype))
+            self.lines = []
+
+    def records(self):
+        import numpy as np
+        self.flush()
+        if len(self.chunks) == 1:
+            return self.chunks[0]
+        elif self.chunks:
+            return np.concatenate(self.chunks)
+        return np.zeros(0, dtype=self.dtype)
+
+
+def get_frd_value_dtype(number_of_values):
+    # ' -1', 10 digits node number, 12 digits per value
+    import numpy as np
+    return np.dtype([('key', 'S3'), ('id', 'S10'), ('values', 'S12', (number_of_values,))])
+
+
+def get_frd_ids_and_values(block_lines):
+    import numpy as np
+    rec = block_lines.records()
+    ids = rec['id'].astype(np.int64)
+    values = rec['values'].astype(np.float64)
+    return ids, values
+
+
+def read_frd_result_arrays(frd_input, result_types=None, steps=None, read_mesh=True, chunk_size=100000,
+                           result_set_callback=None):
+    '''reads a CalculiX frd result file into numpy arrays
+    frd_input is the file name or an iterable of the binary lines of the file
+
+    The file is streamed line by line, the fixed width data lines are collected
+    and converted in chunks by numpy, no python object per node is created.
+    result_types: keys of frd_result_blocks ('disp', 'stress', ...) to read, None reads all
+    steps: indices of the result sets to read (counted as in readResult()), None reads all
+    read_mesh: if False the nodes and elements are skipped
+    result_set_callback: if given every result set is passed to it as soon as it is read
+    and it is not kept in 'Results', thus only one result set is held in memory
+
+    Returns a dictionary:
+    'NodeIds': int array (N,), 'NodeCoords': float array (N, 3),
+    'Elements': {FreeCAD mesh data key: (element ids (M,), nodes (M, k))},
+    'Results': list of result sets {'number', 'time', 'step', result key: (node ids, values)}
+    '''
+    import numpy as np
+    inout_nodes = read_inout_nodes()
+    if result_types is not None:
+        result_types = set(result_types)
+    if steps is not None:
+        steps = set(steps)
+
+    node_lines = FrdBlockLines(get_frd_value_dtype(3), read_mesh, chunk_size)
+    element_header_dtype = np.dtype([('key', 'S3'), ('id', 'S10'), ('type', 'S5')])
+    element_types = {}
+    for t in frd_element_types:
+        element_types[('%4d' % t).encode()] = t
+    element_headers = {}
+    element_nodes = {}
+    two_line_types = (4, 5)
+
+    block = None  # the FrdBlockLines the -1 lines are added to
+    block_key = None
+    present = {}  # result key --> FrdBlockLines of the result blocks found since last result set
+    results = []
+    set_index = 0
+    eigenmode = 0
+    timestep = 0
+    mode_time_found = False
+    elements_found = False
+    elem_type = None
+    first_line = None
+    if result_set_callback is None:
+        result_set_callback = results.append
+
+    if isinstance(frd_input, (str, type(u''))):
+        frd_file = pyopen(frd_input, "rb")
+    else:
+        # the lines of the frd file, e. g. FrdTail of a frd file which is still written by ccx
+        frd_file = frd_input
+    for line in frd_file:
+        key = line[1:3]
+        if key == b'-1':
+            if block is not None:
+                block.append(line)
+            elif elements_found:
+                elem_type = element_types.get(line[14:18])
+                first_line = None
+                if elem_type is not None and read_mesh:
+                    if elem_type not in element_headers:
+                        element_headers[elem_type] = FrdBlockLines(element_header_dtype, True, chunk_size)
+                        n = frd_element_types[elem_type][1]
+                        element_nodes[elem_type] = FrdBlockLines(np.dtype([('key', 'S3'), ('nodes', 'S10', (n,))]), True, chunk_size)
+                    element_headers[elem_type].append(line)
+        elif key == b'-2':
+            if elements_found and elem_type is not None and read_mesh:
+                if elem_type in two_line_types:
+                    if first_line is None:
+                        first_line = line
+                        continue
+                    line = first_line[:3 + 10 * frd_nodes_per_line] + line[3:]
+                    first_line = None
+                element_nodes[elem_type].append(line)
+        elif key == b'-4':
+            block = None
+            block_key = None
+            for name, result_key, number_of_values in frd_result_blocks:
+                if line[5:5 + len(name)] == name:
+                    store = (result_types is None or result_key in result_types) and (steps is None or set_index in steps)
+                    block = FrdBlockLines(get_frd_value_dtype(number_of_values), store, chunk_size)
+                    block_key = result_key
+                    break
+        elif key == b'-3':
+            if block_key is not None and block.count > 0:
+                present[block_key] = block
+            block = None
+            block_key = None
+            elements_found = False
+            mode_time_found = False
+            # same grouping of the result blocks into result sets as in readResult()
+            if all(k in present for k in ('disp', 'stress', 'strain', 'temp')):
+                if steps is None or set_index in steps:
+                    result_set_callback(make_frd_array_result_set(
+                        present, ('disp', 'stress', 'strain', 'peeq', 'temp'), eigenmode, timestep, set_index, result_types, inout_nodes))
+                set_index += 1
+                for k in ('disp', 'stress', 'strain', 'peeq', 'temp'):
+                    present.pop(k, None)
+                eigenmode = 0
+            if all(k in present for k in ('disp', 'stress', 'strain')):
+                if steps is None or set_index in steps:
+                    result_set_callback(make_frd_array_result_set(
+                        present, ('disp', 'stress', 'strain', 'peeq'), eigenmode, 0, set_index, result_types, inout_nodes))
+                set_index += 1
+                for k in ('disp', 'stress', 'strain', 'peeq'):
+                    present.pop(k, None)
+                eigenmode = 0
+            if all(k in present for k in ('mflow', 'npressure')):
+                if steps is None or set_index in steps:
+                    result_set_callback(make_frd_array_result_set(
+                        present, ('mflow', 'npressure'), eigenmode, timestep, set_index, result_types, inout_nodes))
+                set_index += 1
+                for k in ('mflow', 'npressure'):
+                    present.pop(k, None)
+                eigenmode = 0
+        elif key == b'-5':
+            pass
+        elif line[4:6] == b'2C':
+            block = node_lines
+            block_key = None
+        elif line[4:6] == b'3C':
+            elements_found = True
+        elif line[5:10] == b'PMODE':
+            eigenmode = int(line[30:36])
+        elif line[4:10] == b'1PSTEP':
+            mode_time_found = True
+        elif mode_time_found and line[2:7] == b'100CL':
+            timetemp = float(line[13:25])
+            if timetemp > timestep:
+                timestep = timetemp
+    if frd_file is not frd_input:
+        frd_file.close()
+
+    node_ids, node_coords = get_frd_ids_and_values(node_lines)
+    if read_mesh and len(node_ids) == 0:
+        FreeCAD.Console.PrintError('FEM: No nodes found in Frd file.\n')
+
+    elements = {}
+    for elem_type in element_headers:
+        mesh_key, n, order = frd_element_types[elem_type]
+        ids = element_headers[elem_type].records()['id'].astype(np.int64)
+        nodes = element_nodes[elem_type].records()['nodes'].astype(np.int64)
+        if elem_type == 12 and inout_nodes:
+            ids, nodes = get_frd_fluid_seg3_elements(ids, nodes, inout_nodes)
+        else:
+            nodes = nodes[:, order]
+        elements[mesh_key] = (ids, nodes)
+
+    return {'NodeIds': node_ids, 'NodeCoords': node_coords, 'Elements': elements, 'Results': results}
+
+
+class FrdTail(object):
+    '''iterates the complete binary lines of a frd file which is still written by ccx
+    the iteration waits for new lines until is_running() returns False and the end of the file is reached
+    '''
+    def __init__(self, frd_input, is_running, poll_interval=0.2, read_size=1 << 16):
+        self.frd_input = frd_input
+        self.is_running = is_running
+        self.poll_interval = poll_interval
+        self.read_size = read_size
+
+    def __iter__(self):
+        import time
+        while not os.path.isfile(self.frd_input):
+            if not self.is_running():
+                return
+            time.sleep(self.poll_interval)
+        frd_file = pyopen(self.frd_input, "rb")
+        try:
+            rest = b''
+            while True:
+                # check before reading, thus the last data written before the end of ccx is read
+                running = self.is_running()
+                data = frd_file.read(self.read_size)
+                if data:
+                    lines = (rest + data).split(b'\n')
+                    rest = lines.pop()
+                    for line in lines:
+                        yield line + b'\n'
+                elif running:
+                    time.sleep(self.poll_interval)
+                else:
+                    break
+            if rest:
+                yield rest
+        finally:
+            frd_file.close()
+
+
+def make_frd_array_result_set(present, keys, eigenmode, time, step, result_types, inout_nodes):
+    result_set = {'number': eigenmode, 'time': time, 'step': step}
+    for k in keys:
+        if k in present and present[k].store:
+            ids, values = get_frd_ids_and_values(present[k])
+            if values.shape[1] == 1:
+                values = values[:, 0]
+            if k == 'mflow':
+                values = values * 1000  # convert units to kg/s from t/s
+            if k in ('mflow', 'npressure') and inout_nodes:
+                ids, values = add_frd_fluid_inout_node_values(ids, values, inout_nodes)
+            result_set[k] = (ids, values)
+    return result_set
+
+
+def get_frd_fluid_seg3_elements(ids, nodes, inout_nodes):
+    # seg3 of the fluid inlet and outlet elements, the same as in readResult()
+    # the nodes in the frd file are in order N1, N3, N2
+    # elements without an inlet or outlet node are not returned
+    import numpy as np
+    n1 = nodes[:, 0]
+    n3 = nodes[:, 1]
+    new_nodes = np.zeros(nodes.shape, dtype=nodes.dtype)
+    found = np.zeros(len(ids), dtype=bool)
+    for inout in inout_nodes:
+        node = int(inout[1])
+        inlet = (n1 == node)
+        outlet = (n3 == node) & ~inlet
+        new_nodes[inlet] = np.column_stack((np.full(len(ids), int(inout[2]), dtype=nodes.dtype), n3, n1))[inlet]
+        new_nodes[outlet] = np.column_stack((n1, np.full(len(ids), int(inout[2]), dtype=nodes.dtype), n3))[outlet]
+        found |= inlet | outlet
+    return ids[found], new_nodes[found]
+
+
+def add_frd_fluid_inout_node_values(ids, values, inout_nodes):
+    # the value of the ccx node is set to the FreeCAD node too, the same as in readResult()
+    # readResult() uses dictionaries, a node found twice keeps its first position and its last value
+    import numpy as np
+    positions = []
+    new_ids = []
+    for inout in inout_nodes:
+        found = np.nonzero(ids == int(inout[1]))[0]
+        positions.extend(found + 1)
+        new_ids.extend([int(inout[2])] * len(found))
+    if not positions:
+        return ids, values
+    positions = np.array(positions)
+    order = np.argsort(positions, kind='mergesort')
+    positions = positions[order]
+    new_ids = np.array(new_ids, dtype=ids.dtype)[order]
+    new_values = values[positions - 1]
+    ids = np.insert(ids, positions, new_ids)
+    values = np.insert(values, positions, new_values)
+    unique_ids, first = np.unique(ids, return_index=True)
+    last = len(ids) - 1 - np.unique(ids[::-1], return_index=True)[1]
+    keep = np.argsort(first)
+    return unique_ids[keep], values[last[keep]]
+
+
+def get_mesh_data_from_frd_arrays(m):
+    ''' converts the mesh of read_frd_result_arrays() into the mesh data of readResult()
+    '''
+    mesh_data = {'Nodes': {}}
+    for mesh_key, n, order in frd_element_types.values():
+        mesh_data[mesh_key] = {}
+    for i, v in zip(m['NodeIds'].tolist(), m['NodeCoords'].tolist()):
+        mesh_data['Nodes'][i] = FreeCAD.Vector(v[0], v[1], v[2])
+    for mesh_key, (ids, nodes) in m['Elements'].items():
+        mesh_data[mesh_key] = dict(zip(ids.tolist(), [tuple(e) for e in nodes.tolist()]))
+    return mesh_data
+
+
+def get_result_set_from_frd_arrays(result_set):
+    ''' converts a result set of read_frd_result_arrays() into a result set of readResult()
+    '''
+    vector_keys = {'disp': 'disp', 'stress': 'stressv', 'strain': 'strainv'}
+    r = {'number': result_set['number'], 'time': result_set['time']}
+    for k in ('disp', 'stress', 'strain', 'peeq', 'temp', 'mflow', 'npressure'):
+        if k not in result_set:
+            continue
+        ids, values = result_set[k]
+        ids = ids.tolist()
+        if k in vector_keys:
+            r[vector_keys[k]] = dict(zip(ids, [FreeCAD.Vector(v[0], v[1], v[2]) for v in values.tolist()]))
+            if k == 'stress':
+                r['stress'] = dict(zip(ids, [tuple(v) for v in values.tolist()]))
+        else:
+            r[k] = dict(zip(ids, values.tolist()))
+    return r
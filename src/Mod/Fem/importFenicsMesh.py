@@ -33,6 +33,7 @@ import FreeCAD
 import importToolsFem
 import os
 
+import readFenicsXDMF
 import readFenicsXML
 import writeFenicsXML
 import writeFenicsXDMF
@@ -79,7 +80,10 @@ def export(objectslist, fileString):
         if fileExtension.lower() == '.xml':
             writeFenicsXML.write_fenics_mesh_xml(obj, fileString)
         elif fileExtension.lower() == '.xdmf':
-            writeFenicsXDMF.write_fenics_mesh_xdmf(obj, fileString)
+            # ASCII, HDF5 or Binary, see writeFenicsXDMF
+            fem_prefs = FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/Fem/General")
+            encoding = fem_prefs.GetString("FenicsXDMFEncoding", writeFenicsXDMF.ENCODING_ASCII)
+            writeFenicsXDMF.write_fenics_mesh_xdmf(obj, fileString, encoding=encoding)
 
     # write_fenics_mesh(obj, filename)
 
@@ -87,11 +91,12 @@ def export(objectslist, fileString):
 def import_fenics_mesh(filename, analysis=None):
     '''insert a FreeCAD FEM Mesh object in the ActiveDocument
     '''
-    mesh_data = readFenicsXML.read_fenics_mesh_xml(filename)
-    # xdmf not operational
-
     mesh_name = os.path.basename(os.path.splitext(filename)[0])
-    femmesh = importToolsFem.make_femmesh(mesh_data)
+    if os.path.splitext(filename)[1].lower() == '.xdmf':
+        femmesh = importToolsFem.make_femmesh_arrays(readFenicsXDMF.read_fenics_mesh_xdmf_arrays(filename))
+    else:
+        mesh_data = readFenicsXML.read_fenics_mesh_xml(filename)
+        femmesh = importToolsFem.make_femmesh(mesh_data)
     if femmesh:
         mesh_object = FreeCAD.ActiveDocument.addObject('Fem::FemMeshObject', mesh_name)
         mesh_object.FemMesh = femmesh
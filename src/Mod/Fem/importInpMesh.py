@@ -31,7 +31,6 @@ __date__ = "04/08/2016"
 
 import FreeCAD
 import os
-import string
 
 
 ########## generic FreeCAD import and export methods ##########
@@ -63,180 +62,268 @@ def insert(filename, docname):
 def import_inp(filename):
     "create imported objects in FreeCAD, currently only FemMesh"
 
-    m = read_inp(filename)
+    from FreeCAD import Base
+    progress_bar = Base.ProgressIndicator()
+    progress_bar.start("Reading " + os.path.basename(filename) + " ...", 100)
+    progress = InpReadProgress(progress_bar)
+    m = read_inp_arrays(filename, progress.update)
+    progress_bar.stop()
+    if m is None:
+        FreeCAD.Console.PrintWarning('Import of {} was canceled.\n'.format(filename))
+        return
     import importToolsFem
-    mesh = importToolsFem.make_femmesh(m)
+    mesh = importToolsFem.make_femmesh_arrays(m)
     mesh_name = os.path.splitext(os.path.basename(filename))[0]
     mesh_object = FreeCAD.ActiveDocument.addObject('Fem::FemMeshObject', mesh_name)
     mesh_object.FemMesh = mesh
 
 
+class InpReadProgress(object):
+    '''progress callback for read_inp_arrays() which moves a Base.ProgressIndicator
+    started with 100 steps, if the user aborts the progress indicator the reading is canceled
+    '''
+    def __init__(self, progress_bar):
+        self.progress_bar = progress_bar
+        self.percent = 0
+
+    def update(self, fraction):
+        try:
+            while self.percent < int(fraction * 100):
+                self.percent += 1
+                self.progress_bar.next(True)
+        except Exception:
+            return False
+        return True
+
+
 def read_inp(file_name):
     "read .inp file, currently only the mesh"
 
-    class elements():
-
-        tria3 = {}
-        tria6 = {}
-        quad4 = {}
-        quad8 = {}
-        tetra4 = {}
-        tetra10 = {}
-        hexa8 = {}
-        hexa20 = {}
-        penta6 = {}
-        penta15 = {}
-        seg2 = {}
-        seg3 = {}
-    error_seg3 = False  # to print "not supported"
-    nodes = {}
-    model_definition = True
+    m = read_inp_arrays(file_name)
+    mesh_data = {'Nodes': {}}
+    for mesh_key in inp_element_node_orders:
+        if mesh_key != 'Seg3Elem':
+            mesh_data[mesh_key] = {}
+    for i, v in zip(m['NodeIds'].tolist(), m['NodeCoords'].tolist()):
+        mesh_data['Nodes'][i] = v
+    for mesh_key, (ids, nodes) in m['Elements'].items():
+        mesh_data[mesh_key] = dict(zip(ids.tolist(), nodes.tolist()))
+    return mesh_data
 
-    f = pyopen(file_name, "r")
-    line = "\n"
-    include = ""
-    f_include = None
-    while line != "":
-        if include:
-            line = f_include.readline()
-            if line == "":
-                f_include.close()
-                include = ""
-                line = f.readline()
-        else:
-            line = f.readline()
-        if line.strip() == '':
-            continue
-        elif line[0] == '*':  # start/end of a reading set
-            if line[0:2] == '**':  # comments
-                continue
-            if line[:8].upper() == "*INCLUDE":
-                start = 1 + line.index("=")
-                include = line[start:].strip().strip('"')
-                include_path = os.path.normpath(include)
-                if os.path.isfile(include_path) is True:
-                    f_include = pyopen(include_path, "r")
-                else:
-                    path_start = os.path.split(file_name)[0]
-                    include_full_path = os.path.join(path_start, include_path)
-                    f_include = pyopen(include_full_path, "r")
+
+# inp element type --> FreeCAD mesh data key
+inp_element_types = {
+    'S3': 'Tria3Elem', 'CPS3': 'Tria3Elem', 'CPE3': 'Tria3Elem', 'CAX3': 'Tria3Elem',
+    'S6': 'Tria6Elem', 'CPS6': 'Tria6Elem', 'CPE6': 'Tria6Elem', 'CAX6': 'Tria6Elem',
+    'S4': 'Quad4Elem', 'S4R': 'Quad4Elem', 'CPS4': 'Quad4Elem', 'CPS4R': 'Quad4Elem',
+    'CPE4': 'Quad4Elem', 'CPE4R': 'Quad4Elem', 'CAX4': 'Quad4Elem', 'CAX4R': 'Quad4Elem',
+    'S8': 'Quad8Elem', 'S8R': 'Quad8Elem', 'CPS8': 'Quad8Elem', 'CPS8R': 'Quad8Elem',
+    'CPE8': 'Quad8Elem', 'CPE8R': 'Quad8Elem', 'CAX8': 'Quad8Elem', 'CAX8R': 'Quad8Elem',
+    'C3D4': 'Tetra4Elem',
+    'C3D10': 'Tetra10Elem',
+    'C3D8': 'Hexa8Elem', 'C3D8R': 'Hexa8Elem', 'C3D8I': 'Hexa8Elem',
+    'C3D20': 'Hexa20Elem', 'C3D20R': 'Hexa20Elem', 'C3D20RI': 'Hexa20Elem',
+    'C3D6': 'Penta6Elem',
+    'C3D15': 'Penta15Elem',
+    'B31': 'Seg2Elem', 'B31R': 'Seg2Elem', 'T3D2': 'Seg2Elem',
+    'B32': 'Seg3Elem', 'B32R': 'Seg3Elem', 'T3D3': 'Seg3Elem',
+}
+
+# FreeCAD mesh data key --> node order for FreeCAD
+# switches from the CalculiX node numbering to the FreeCAD node numbering
+inp_element_node_orders = {
+    'Tria3Elem': (0, 1, 2),
+    'Tria6Elem': (0, 1, 2, 3, 4, 5),
+    'Quad4Elem': (0, 1, 2, 3),
+    'Quad8Elem': (0, 1, 2, 3, 4, 5, 6, 7),
+    'Tetra4Elem': (1, 0, 2, 3),
+    'Tetra10Elem': (1, 0, 2, 3, 4, 6, 5, 8, 7, 9),
+    'Hexa8Elem': (5, 6, 7, 4, 1, 2, 3, 0),
+    'Hexa20Elem': (5, 6, 7, 4, 1, 2, 3, 0, 13, 14, 15, 12, 9, 10, 11, 8, 17, 18, 19, 16),
+    'Penta6Elem': (4, 5, 3, 1, 2, 0),
+    'Penta15Elem': (4, 5, 3, 1, 2, 0, 10, 11, 9, 7, 8, 6, 13, 14, 12),
+    'Seg2Elem': (0, 1),
+    'Seg3Elem': (0, 2, 1),
+}
+
+
+class InpDataLines(object):
+    '''collects the comma separated data lines of *NODE or of one kind of *ELEMENT
+    and converts them into a numpy array of rows with the given number of columns
+    every chunk_size lines, thus the memory needed for the raw lines stays bounded
+    a row may be continued on the next line (elements with many nodes)
+    '''
+    def __init__(self, columns, dtype, chunk_size=100000, progress=None):
+        import numpy as np
+        self.columns = columns
+        self.dtype = dtype
+        self.convert = float if dtype == np.float64 else int
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self.lines = []
+        self.values = 0  # number of values of the collected lines
+        self.chunks = []
+
+    def read(self, inp_file):
+        '''adds the data lines of the open inp_file up to the next keyword line
+        returns the keyword line, b'' at the end of the file or None if the progress canceled the reading
+        '''
+        lines = self.lines
+        for line in inp_file:
+            if line[:1] == b'*':
+                if line[:2] == b'**':  # comments
+                    continue
+                return line
+            line = line.strip().rstrip(b',')
+            if line:
+                lines.append(line)
+                self.values += line.count(b',') + 1
+                if len(lines) >= self.chunk_size and self.values % self.columns == 0:
+                    self.flush()
+                    lines = self.lines
+                    if self.progress and self.progress() is False:
+                        return None
+        return b''
+
+    def flush(self):
+        import numpy as np
+        if not self.lines:
+            return
+        rows = None
+        if self.values % self.columns == 0:
+            try:
+                values = np.fromstring(b','.join(self.lines), dtype=self.dtype, sep=',')
+                if len(values) == self.values:
+                    rows = values.reshape(-1, self.columns)
+            except ValueError:
+                pass
+        if rows is None:
+            rows = np.array(get_inp_rows(self.lines, self.columns, self.convert), dtype=self.dtype).reshape(-1, self.columns)
+        self.chunks.append(rows)
+        self.lines = []
+        self.values = 0
+
+    def rows(self):
+        import numpy as np
+        self.flush()
+        if len(self.chunks) == 1:
+            return self.chunks[0]
+        elif self.chunks:
+            return np.concatenate(self.chunks)
+        return np.zeros((0, self.columns), dtype=self.dtype)
+
+
+def get_inp_rows(lines, columns, convert):
+    '''slow line by line parsing for data lines which are not plain rows of numbers,
+    the values of a line are read until the row is complete or a value could not be
+    converted (the row is continued on the next line), the rest of the line is ignored
+    '''
+    rows = []
+    row = []
+    for line in lines:
+        for value in line.split(b','):
+            try:
+                row.append(convert(value))
+            except ValueError:
+                break
+            if len(row) == columns:
+                rows.append(row)
+                row = []
+                break
+    return rows
+
+
+def open_inp_include(line, file_name):
+    include = line[1 + line.index(b'='):].strip().strip(b'"').decode()
+    include_path = os.path.normpath(include)
+    if not os.path.isfile(include_path):
+        # relative to the including file
+        include_path = os.path.join(os.path.split(file_name)[0], include_path)
+    return pyopen(include_path, "rb"), include_path
+
+
+def read_inp_arrays(file_name, progress_callback=None, chunk_size=100000):
+    '''reads the mesh of a .inp file into numpy arrays
+
+    The file and all files included by *INCLUDE (nested includes are supported) are
+    streamed line by line, the data lines are collected and converted in chunks by numpy,
+    no python object per node or element is created.
+    progress_callback: called with the fraction of the main file read every chunk_size
+    data lines, if it returns False the reading is canceled and None is returned
+
+    Returns a dictionary as read_frd_result_arrays() in importCcxFrdResults:
+    'NodeIds': int array (N,), 'NodeCoords': float array (N, 3),
+    'Elements': {FreeCAD mesh data key: (element ids (M,), nodes (M, k))}, all supported keys are set
+    '''
+    import numpy as np
+    file_size = max(os.path.getsize(file_name), 1)
+    files = [(pyopen(file_name, "rb"), file_name)]  # stack of the main file and the open include files
+
+    def progress():
+        return progress_callback(min(float(files[0][0].tell()) / file_size, 1.0))
+
+    if progress_callback is None:
+        progress = None
+    nodes = InpDataLines(4, np.float64, chunk_size, progress)
+    elements = {}  # FreeCAD mesh data key --> InpDataLines
+    model_definition = True
+    line = b''
+    try:
+        while files:
+            f, current_file = files[-1]
+            if not line:
+                line = next(f, b'')
+                if not line:
+                    f.close()
+                    files.pop()
+                    continue
+            if line[:1] != b'*' or line[:2] == b'**':
+                # comments and data lines without a data keyword
+                line = b''
                 continue
-            read_node = False
-            elm_category = []
-            elm_2nd_line = False
-
-        # reading nodes
-        if (line[:5].upper() == "*NODE") and (model_definition is True):
-            read_node = True
-        elif read_node is True:
-            line_list = string.split(line, ',')
-            number = int(line_list[0])
-            x = float(line_list[1])
-            y = float(line_list[2])
-            z = float(line_list[3])
-            nodes[number] = [x, y, z]
-
-        # reading elements
-        elif line[:8].upper() == "*ELEMENT":
-            line_list = line[8:].upper().split(',')
-            for line_part in line_list:
-                if line_part.lstrip()[:4] == "TYPE":
-                    elm_type = line_part.split('=')[1].strip()
-
-            if elm_type in ["S3", "CPS3", "CPE3", "CAX3"]:
-                elm_category = elements.tria3
-                number_of_nodes = 3
-            elif elm_type in ["S6", "CPS6", "CPE6", "CAX6"]:
-                elm_category = elements.tria6
-                number_of_nodes = 6
-            elif elm_type in ["S4", "S4R", "CPS4", "CPS4R", "CPE4", "CPE4R",
-                              "CAX4", "CAX4R"]:
-                elm_category = elements.quad4
-                number_of_nodes = 4
-            elif elm_type in ["S8", "S8R", "CPS8", "CPS8R", "CPE8", "CPE8R",
-                              "CAX8", "CAX8R"]:
-                elm_category = elements.quad8
-                number_of_nodes = 8
-            elif elm_type == "C3D4":
-                elm_category = elements.tetra4
-                number_of_nodes = 4
-            elif elm_type == "C3D10":
-                elm_category = elements.tetra10
-                number_of_nodes = 10
-            elif elm_type in ["C3D8", "C3D8R", "C3D8I"]:
-                elm_category = elements.hexa8
-                number_of_nodes = 8
-            elif elm_type in ["C3D20", "C3D20R", "C3D20RI"]:
-                elm_category = elements.hexa20
-                number_of_nodes = 20
-            elif elm_type == "C3D6":
-                elm_category = elements.penta6
-                number_of_nodes = 6
-            elif elm_type == "C3D15":
-                elm_category = elements.penta15
-                number_of_nodes = 15
-            elif elm_type in ["B31", "B31R", "T3D2"]:
-                elm_category = elements.seg2
-                number_of_nodes = 2
-            elif elm_type in ["B32", "B32R", "T3D3"]:
-                elm_category = elements.seg3
-                number_of_nodes = 3
-                error_seg3 = True  # to print "not supported"
-
-        elif elm_category != []:
-            line_list = string.split(line, ',')
-            if elm_2nd_line is False:
-                number = int(line_list[0])
-                elm_category[number] = []
-                pos = 1
-            else:
-                pos = 0
-                elm_2nd_line = False
-            for en in range(pos, pos + number_of_nodes - len(elm_category[number])):
-                try:
-                    enode = int(line_list[en])
-                    elm_category[number].append(enode)
-                except:
-                    elm_2nd_line = True
-                    break
-
-        elif line[:5].upper() == "*STEP":
-            model_definition = False
-    if error_seg3 is True:  # to print "not supported"
+            data = None
+            keyword = line[:8].upper()
+            if keyword == b'*INCLUDE':
+                files.append(open_inp_include(line, current_file))
+            elif keyword[:5] == b'*NODE' and model_definition:
+                data = nodes
+            elif keyword == b'*ELEMENT':
+                elm_type = None
+                for line_part in line[8:].upper().split(b','):
+                    if line_part.lstrip()[:4] == b'TYPE':
+                        elm_type = line_part.split(b'=')[1].strip().decode()
+                if elm_type in inp_element_types:
+                    mesh_key = inp_element_types[elm_type]
+                    if mesh_key not in elements:
+                        n = len(inp_element_node_orders[mesh_key])
+                        elements[mesh_key] = InpDataLines(1 + n, np.int64, chunk_size, progress)
+                    data = elements[mesh_key]
+            elif keyword[:5] == b'*STEP':
+                model_definition = False
+            line = b''
+            if data is not None:
+                line = data.read(f)
+                if line is None:
+                    return None
+    finally:
+        for f, current_file in files:
+            f.close()
+    if progress_callback:
+        progress_callback(1.0)
+
+    rows = nodes.rows()
+    node_ids = rows[:, 0].astype(np.int64)
+    node_coords = np.ascontiguousarray(rows[:, 1:4])
+    if 'Seg3Elem' in elements:
         FreeCAD.Console.PrintError("Error: seg3 (3-node beam element type) not supported, yet.\n")
-    f.close()
-
-    # switch from the CalculiX node numbering to the FreeCAD node numbering
-    # numbering do not change: tria3, tria6, quad4, quad8, seg2
-    for en in elements.tetra4:
-        n = elements.tetra4[en]
-        elements.tetra4[en] = [n[1], n[0], n[2], n[3]]
-    for en in elements.tetra10:
-        n = elements.tetra10[en]
-        elements.tetra10[en] = [n[1], n[0], n[2], n[3], n[4], n[6], n[5],
-                                n[8], n[7], n[9]]
-    for en in elements.hexa8:
-        n = elements.hexa8[en]
-        elements.hexa8[en] = [n[5], n[6], n[7], n[4], n[1], n[2], n[3], n[0]]
-    for en in elements.hexa20:
-        n = elements.hexa20[en]
-        elements.hexa20[en] = [n[5], n[6], n[7], n[4], n[1], n[2], n[3], n[0],
-                               n[13], n[14], n[15], n[12], n[9], n[10], n[11],
-                               n[8], n[17], n[18], n[19], n[16]]
-    for en in elements.penta6:
-        n = elements.penta6[en]
-        elements.penta6[en] = [n[4], n[5], n[3], n[1], n[2], n[0]]
-    for en in elements.penta15:
-        n = elements.penta15[en]
-        elements.penta15[en] = [n[4], n[5], n[3], n[1], n[2], n[0],
-                                n[10], n[11], n[9], n[7], n[8], n[6], n[13],
-                                n[14], n[12]]
-    for en in elements.seg3:
-        n = elements.seg3[en]
-        elements.seg3[en] = [n[0], n[2], n[1]]
-
-    return {'Nodes': nodes,
-            'Hexa8Elem': elements.hexa8, 'Penta6Elem': elements.penta6, 'Tetra4Elem': elements.tetra4,
-            'Tetra10Elem': elements.tetra10, 'Penta15Elem': elements.penta15, 'Hexa20Elem': elements.hexa20,
-            'Tria3Elem': elements.tria3, 'Tria6Elem': elements.tria6, 'Quad4Elem': elements.quad4,
-            'Quad8Elem': elements.quad8, 'Seg2Elem': elements.seg2}  # , 'Seg3Elem': elements.seg3}
+    mesh_elements = {}
+    for mesh_key in inp_element_node_orders:
+        if mesh_key == 'Seg3Elem':
+            continue
+        order = [1 + i for i in inp_element_node_orders[mesh_key]]
+        if mesh_key in elements:
+            rows = elements[mesh_key].rows()
+        else:
+            rows = np.zeros((0, len(order) + 1), dtype=np.int64)
+        mesh_elements[mesh_key] = (rows[:, 0], rows[:, order])
+    return {'NodeIds': node_ids, 'NodeCoords': node_coords, 'Elements': mesh_elements}
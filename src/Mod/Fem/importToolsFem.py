@@ -87,7 +87,7 @@ def get_FemMeshObjectElementTypes(fem_mesh_obj, remove_zero_element_entries=True
         "Node": 0, "Edge": 1, "Hexa": 3, "Polygon": 2, "Polyhedron": 3,
         "Prism": 3, "Pyramid": 3, "Quadrangle": 2, "Tetra": 3, "Triangle": 2}
 
-    elements_list_with_zero = [(eval("fem_mesh_obj.FemMesh." + s + "Count"), s, d) for (s, d) in FreeCAD_element_names_dims.iteritems()]
+    elements_list_with_zero = [(getattr(fem_mesh_obj.FemMesh, s + "Count"), s, d) for (s, d) in FreeCAD_element_names_dims.items()]
     # ugly but necessary
     if remove_zero_element_entries:
         elements_list = [(num, s, d) for (num, s, d) in elements_list_with_zero if num > 0]
@@ -107,79 +107,70 @@ def get_MaxDimElementFromList(elem_list):
 
 def make_femmesh(mesh_data):
     ''' makes an FreeCAD FEM Mesh object from FEM Mesh data
+        the data is converted into arrays and make_femmesh_arrays() is used
+    '''
+    return make_femmesh_arrays(get_femmesh_arrays(mesh_data))
+
+
+# element keys of the FEM Mesh data and their dimension in the order they are added by make_femmesh_arrays()
+femmesh_element_keys = ('Hexa8Elem', 'Penta6Elem', 'Tetra4Elem', 'Tetra10Elem', 'Penta15Elem', 'Hexa20Elem',
+                        'Tria3Elem', 'Tria6Elem', 'Quad4Elem', 'Quad8Elem', 'Seg2Elem')
+femmesh_element_dimensions = {'Hexa8Elem': 3, 'Penta6Elem': 3, 'Tetra4Elem': 3, 'Tetra10Elem': 3, 'Penta15Elem': 3, 'Hexa20Elem': 3,
+                              'Tria3Elem': 2, 'Tria6Elem': 2, 'Quad4Elem': 2, 'Quad8Elem': 2, 'Seg2Elem': 1}
+
+
+def get_femmesh_arrays(mesh_data):
+    ''' converts the {id: nodes} dictionaries of FEM Mesh data
+        into the FEM Mesh arrays used by make_femmesh_arrays()
+    '''
+    nodes = mesh_data.get('Nodes', {})
+    node_ids = np.array(list(nodes.keys()), dtype=np.int64)
+    node_coords = np.array([(v[0], v[1], v[2]) for v in nodes.values()], dtype=np.float64).reshape(-1, 3)
+    elements = {}
+    for key in femmesh_element_keys:
+        if key in mesh_data:
+            elms = mesh_data[key]
+            ids = np.array(list(elms.keys()), dtype=np.int64)
+            if len(ids) > 0:
+                elements[key] = (ids, np.array([tuple(e) for e in elms.values()], dtype=np.int64).reshape(len(ids), -1))
+            else:
+                elements[key] = (ids, np.zeros((0, 0), dtype=np.int64))
+    return {'NodeIds': node_ids, 'NodeCoords': node_coords, 'Elements': elements}
+
+
+def make_femmesh_arrays(mesh_arrays):
+    ''' makes an FreeCAD FEM Mesh object from FEM Mesh arrays
+        mesh_arrays is {'NodeIds': (N,), 'NodeCoords': (N, 3), 'Elements': {element key: (ids (M,), nodes (M, k))}}
+        as returned by the array based mesh readers, the node order of the elements is the FreeCAD one
+        the nodes and the elements of every type are added in bulk
     '''
     import Fem
     mesh = Fem.FemMesh()
-    m = mesh_data
-    if ('Nodes' in m) and (len(m['Nodes']) > 0):
+    m = mesh_arrays
+    elements = m['Elements']
+    if len(m['NodeIds']) > 0:
         print("Found: nodes")
-        if (('Seg2Elem' in m) or
-           ('Tria3Elem' in m) or
-           ('Tria6Elem' in m) or
-           ('Quad4Elem' in m) or
-           ('Quad8Elem' in m) or
-           ('Tetra4Elem' in m) or
-           ('Tetra10Elem' in m) or
-           ('Penta6Elem' in m) or
-           ('Penta15Elem' in m) or
-           ('Hexa8Elem' in m) or
-           ('Hexa20Elem' in m)):
-
-            nds = m['Nodes']
+        mesh.addNodes(np.ascontiguousarray(m['NodeCoords'], dtype=np.float64), np.ascontiguousarray(m['NodeIds'], dtype=np.int64))
+        if [k for k in femmesh_element_keys if k in elements]:
             print("Found: elements")
-            for i in nds:
-                n = nds[i]
-                mesh.addNode(n[0], n[1], n[2], i)
-            elms_hexa8 = m['Hexa8Elem']
-            for i in elms_hexa8:
-                e = elms_hexa8[i]
-                mesh.addVolume([e[0], e[1], e[2], e[3], e[4], e[5], e[6], e[7]], i)
-            elms_penta6 = m['Penta6Elem']
-            for i in elms_penta6:
-                e = elms_penta6[i]
-                mesh.addVolume([e[0], e[1], e[2], e[3], e[4], e[5]], i)
-            elms_tetra4 = m['Tetra4Elem']
-            for i in elms_tetra4:
-                e = elms_tetra4[i]
-                mesh.addVolume([e[0], e[1], e[2], e[3]], i)
-            elms_tetra10 = m['Tetra10Elem']
-            for i in elms_tetra10:
-                e = elms_tetra10[i]
-                mesh.addVolume([e[0], e[1], e[2], e[3], e[4], e[5], e[6], e[7], e[8], e[9]], i)
-            elms_penta15 = m['Penta15Elem']
-            for i in elms_penta15:
-                e = elms_penta15[i]
-                mesh.addVolume([e[0], e[1], e[2], e[3], e[4], e[5], e[6], e[7], e[8], e[9],
-                                e[10], e[11], e[12], e[13], e[14]], i)
-            elms_hexa20 = m['Hexa20Elem']
-            for i in elms_hexa20:
-                e = elms_hexa20[i]
-                mesh.addVolume([e[0], e[1], e[2], e[3], e[4], e[5], e[6], e[7], e[8], e[9],
-                                e[10], e[11], e[12], e[13], e[14], e[15], e[16], e[17], e[18], e[19]], i)
-            elms_tria3 = m['Tria3Elem']
-            for i in elms_tria3:
-                e = elms_tria3[i]
-                mesh.addFace([e[0], e[1], e[2]], i)
-            elms_tria6 = m['Tria6Elem']
-            for i in elms_tria6:
-                e = elms_tria6[i]
-                mesh.addFace([e[0], e[1], e[2], e[3], e[4], e[5]], i)
-            elms_quad4 = m['Quad4Elem']
-            for i in elms_quad4:
-                e = elms_quad4[i]
-                mesh.addFace([e[0], e[1], e[2], e[3]], i)
-            elms_quad8 = m['Quad8Elem']
-            for i in elms_quad8:
-                e = elms_quad8[i]
-                mesh.addFace([e[0], e[1], e[2], e[3], e[4], e[5], e[6], e[7]], i)
-            elms_seg2 = m['Seg2Elem']
-            for i in elms_seg2:
-                e = elms_seg2[i]
-                mesh.addEdge(e[0], e[1])
+            add_elements = {1: mesh.addEdges, 2: mesh.addFaces, 3: mesh.addVolumes}
+            count = {}
+            for key in femmesh_element_keys:
+                count[key] = 0
+                if key not in elements or len(elements[key][0]) == 0:
+                    continue
+                ids, nodes = elements[key]
+                count[key] = len(ids)
+                nodes = np.ascontiguousarray(nodes, dtype=np.int64)
+                if key == 'Seg2Elem':
+                    # the edges get new ids
+                    mesh.addEdges(nodes)
+                else:
+                    add_elements[femmesh_element_dimensions[key]](nodes, np.ascontiguousarray(ids, dtype=np.int64))
             print("imported mesh: {} nodes, {} HEXA8, {} PENTA6, {} TETRA4, {} TETRA10, {} PENTA15".format(
-                  len(nds), len(elms_hexa8), len(elms_penta6), len(elms_tetra4), len(elms_tetra10), len(elms_penta15)))
+                  len(m['NodeIds']), count['Hexa8Elem'], count['Penta6Elem'], count['Tetra4Elem'], count['Tetra10Elem'], count['Penta15Elem']))
             print("imported mesh: {} HEXA20, {} TRIA3, {} TRIA6, {} QUAD4, {} QUAD8, {} SEG2".format(
-                  len(elms_hexa20), len(elms_tria3), len(elms_tria6), len(elms_quad4), len(elms_quad8), len(elms_seg2)))
+                  count['Hexa20Elem'], count['Tria3Elem'], count['Tria6Elem'], count['Quad4Elem'], count['Quad8Elem'], count['Seg2Elem']))
         else:
             FreeCAD.Console.PrintError("No Elements found!\n")
     else:
@@ -189,6 +180,37 @@ def make_femmesh(mesh_data):
 
 def fill_femresult_mechanical(results, result_set, span):
     ''' fills  an FreeCAD FEM mechanical result object with result data
+        result_set holds dictionaries {node: value} as returned by the result readers,
+        they are converted into arrays and fill_femresult_mechanical_arrays() is used
+    '''
+    return fill_femresult_mechanical_arrays(results, get_result_arrays(result_set), span)
+
+
+def get_result_arrays(result_set):
+    ''' converts the {node: value} dictionaries of a result set
+        into (node ids, values) array pairs used by fill_femresult_mechanical_arrays()
+    '''
+    result_arrays = {}
+    for k in ('number', 'time'):
+        if k in result_set:
+            result_arrays[k] = result_set[k]
+    for k, n in (('disp', 3), ('stress', 6), ('strainv', 3), ('peeq', 1), ('temp', 1), ('mflow', 1), ('npressure', 1)):
+        if k in result_set and len(result_set[k]) > 0:
+            values = result_set[k]
+            ids = np.array(list(values.keys()), dtype=np.int64)
+            if n == 1:
+                values = np.array(list(values.values()), dtype=np.float64)
+            else:
+                values = np.array([tuple(v) for v in values.values()], dtype=np.float64).reshape(-1, n)
+            result_arrays['strain' if k == 'strainv' else k] = (ids, values)
+    return result_arrays
+
+
+def fill_femresult_mechanical_arrays(results, result_set, span):
+    ''' fills  an FreeCAD FEM mechanical result object with result data
+        result_set holds (node ids, values) array pairs, values are (N, 3) for 'disp',
+        (N, 6) for 'stress', (N, 3) or (N, 6) for 'strain' and (N,) for the others
+        all derived values and the stats are computed with a few array operations
     '''
 
     if 'number' in result_set:
@@ -199,16 +221,17 @@ def fill_femresult_mechanical(results, result_set, span):
         step_time = result_set['time']
         step_time = round(step_time, 2)
 
+    # result stats, set stats values to 0, they may not exist
+    x_stats = y_stats = z_stats = a_stats = s_stats = (0, 0, 0)
+    p1_stats = p2_stats = p3_stats = ms_stats = peeq_stats = (0, 0, 0)
+
+    no_of_values = 0
     if 'disp' in result_set:
-        disp = result_set['disp']
-        no_of_values = len(disp)
-        displacement = []
-        for k, v in disp.items():
-            displacement.append(v)
+        disp_ids, disp = result_set['disp']
+        no_of_values = len(disp_ids)
 
-        x_max, y_max, z_max = map(max, zip(*displacement))
         if eigenmode_number > 0:
-            max_disp = max(x_max, y_max, z_max)
+            max_disp = disp.max()
             # Allow for max displacement to be 0.1% of the span
             # FIXME - add to Preferences
             max_allowed_disp = 0.001 * span
@@ -216,144 +239,80 @@ def fill_femresult_mechanical(results, result_set, span):
         else:
             scale = 1.0
 
-        results.DisplacementVectors = list(map((lambda x: x * scale), disp.values()))
-        results.NodeNumbers = list(disp.keys())
-        results.DisplacementLengths = calculate_disp_abs(displacement)
+        disp_abs = calculate_disp_abs_array(disp)
+        results.DisplacementVectors = get_vector_list(disp * scale)
+        results.NodeNumbers = disp_ids.tolist()
+        results.DisplacementLengths = disp_abs.tolist()
+        if no_of_values > 0:
+            x_stats = get_stats_array(disp[:, 0], no_of_values)
+            y_stats = get_stats_array(disp[:, 1], no_of_values)
+            z_stats = get_stats_array(disp[:, 2], no_of_values)
+            a_stats = get_stats_array(disp_abs, no_of_values)
 
-        if 'stressv' in result_set:
-            stressv = result_set['stressv']
-            results.StressVectors = list(map((lambda x: x * scale), stressv.values()))
+        if 'stress' in result_set:
+            stress_ids, stress = result_set['stress']
+            results.StressVectors = get_vector_list(stress[:, :3] * scale)
 
-        if 'strainv' in result_set:
-            strainv = result_set['strainv']
-            results.StrainVectors = list(map((lambda x: x * scale), strainv.values()))
+        if 'strain' in result_set:
+            strain = result_set['strain'][1]
+            results.StrainVectors = get_vector_list(strain[:, :3] * scale)
 
         if 'stress' in result_set:
-            stress = result_set['stress']
             if len(stress) > 0:
-                mstress = []
-                prinstress1 = []
-                prinstress2 = []
-                prinstress3 = []
-                shearstress = []
-                for i in stress.values():
-                    mstress.append(calculate_von_mises(i))
-                    prin1, prin2, prin3, shear = calculate_principal_stress(i)
-                    prinstress1.append(prin1)
-                    prinstress2.append(prin2)
-                    prinstress3.append(prin3)
-                    shearstress.append(shear)
+                mstress = calculate_von_mises_array(stress)
+                prinstress1, prinstress2, prinstress3, shearstress = calculate_principal_stress_array(stress)
                 if eigenmode_number > 0:
-                    results.StressValues = list(map((lambda x: x * scale), mstress))
-                    results.PrincipalMax = list(map((lambda x: x * scale), prinstress1))
-                    results.PrincipalMed = list(map((lambda x: x * scale), prinstress2))
-                    results.PrincipalMin = list(map((lambda x: x * scale), prinstress3))
-                    results.MaxShear = list(map((lambda x: x * scale), shearstress))
+                    mstress = mstress * scale
+                    prinstress1 = prinstress1 * scale
+                    prinstress2 = prinstress2 * scale
+                    prinstress3 = prinstress3 * scale
+                    shearstress = shearstress * scale
                     results.Eigenmode = eigenmode_number
-                else:
-                    results.StressValues = mstress
-                    results.PrincipalMax = prinstress1
-                    results.PrincipalMed = prinstress2
-                    results.PrincipalMin = prinstress3
-                    results.MaxShear = shearstress
-            stress_keys = list(stress.keys())
-            if (results.NodeNumbers != 0 and results.NodeNumbers != stress_keys):
+                results.StressValues = mstress.tolist()
+                results.PrincipalMax = prinstress1.tolist()
+                results.PrincipalMed = prinstress2.tolist()
+                results.PrincipalMin = prinstress3.tolist()
+                results.MaxShear = shearstress.tolist()
+                s_stats = get_stats_array(mstress, no_of_values)
+                p1_stats = get_stats_array(prinstress1, no_of_values)
+                p2_stats = get_stats_array(prinstress2, no_of_values)
+                p3_stats = get_stats_array(prinstress3, no_of_values)
+                ms_stats = get_stats_array(shearstress, no_of_values)
+            if not np.array_equal(disp_ids, stress_ids):
                 print("Inconsistent FEM results: element number for Stress doesn't equal element number for Displacement {} != {}"
-                      .format(results.NodeNumbers, len(results.StressValues)))
-            results.NodeNumbers = stress_keys
+                      .format(no_of_values, len(stress_ids)))
+            results.NodeNumbers = stress_ids.tolist()
 
         # Read Equivalent Plastic strain if they exist
         if 'peeq' in result_set:
-            Peeq = result_set['peeq']
+            Peeq = result_set['peeq'][1][:no_of_values]
             if len(Peeq) > 0:
-                if len(Peeq.values()) != len(disp.values()):
-                    Pe = []
-                    Pe_extra_nodes = Peeq.values()
-                    nodes = len(disp.values())
-                    for i in range(nodes):
-                        Pe_value = Pe_extra_nodes[i]
-                        Pe.append(Pe_value)
-                    results.Peeq = Pe
-                else:
-                    results.Peeq = Peeq.values()
+                results.Peeq = Peeq.tolist()
+                peeq_stats = get_stats_array(Peeq, no_of_values)
 
     # Read temperatures if they exist
     if 'temp' in result_set:
-        Temperature = result_set['temp']
+        Temperature = result_set['temp'][1]
+        if 'disp' in result_set:
+            Temperature = Temperature[:no_of_values]
         if len(Temperature) > 0:
-            if len(Temperature.values()) != len(disp.values()):
-                Temp = []
-                Temp_extra_nodes = Temperature.values()
-                nodes = len(disp.values())
-                for i in range(nodes):
-                    Temp_value = Temp_extra_nodes[i]
-                    Temp.append(Temp_value)
-                results.Temperature = list(map((lambda x: x), Temp))
-            else:
-                results.Temperature = list(map((lambda x: x), Temperature.values()))
+            results.Temperature = Temperature.tolist()
             results.Time = step_time
 
     if 'mflow' in result_set:
-        MassFlow = result_set['mflow']
+        MassFlow = result_set['mflow'][1]
         if len(MassFlow) > 0:
-            results.MassFlowRate = list(map((lambda x: x), MassFlow.values()))
+            results.MassFlowRate = MassFlow.tolist()
             results.Time = step_time
 
     if 'npressure' in result_set:
-        NetworkPressure = result_set['npressure']
+        NetworkPressure = result_set['npressure'][1]
         if len(NetworkPressure) > 0:
-            results.NetworkPressure = list(map((lambda x: x), NetworkPressure.values()))
+            results.NetworkPressure = NetworkPressure.tolist()
             results.Time = step_time
 
-    # result stats, set stats values to 0, they may not exist
-    x_min = y_min = z_min = x_max = y_max = z_max = x_avg = y_avg = z_avg = 0
-    a_max = a_min = a_avg = s_max = s_min = s_avg = 0
-    p1_min = p1_avg = p1_max = p2_min = p2_avg = p2_max = p3_min = p3_avg = p3_max = 0
-    ms_min = ms_avg = ms_max = peeq_min = peeq_avg = peeq_max = 0
-
-    if results.DisplacementVectors:
-        x_max, y_max, z_max = map(max, zip(*displacement))
-        x_min, y_min, z_min = map(min, zip(*displacement))
-        sum_list = map(sum, zip(*displacement))
-        x_avg, y_avg, z_avg = [i / no_of_values for i in sum_list]
-        a_max = max(results.DisplacementLengths)
-        a_min = min(results.DisplacementLengths)
-        a_avg = sum(results.DisplacementLengths) / no_of_values
-    if results.StressValues:
-        s_max = max(results.StressValues)
-        s_min = min(results.StressValues)
-        s_avg = sum(results.StressValues) / no_of_values
-    if results.PrincipalMax:
-        p1_min = min(results.PrincipalMax)
-        p1_avg = sum(results.PrincipalMax) / no_of_values
-        p1_max = max(results.PrincipalMax)
-    if results.PrincipalMed:
-        p2_min = min(results.PrincipalMed)
-        p2_avg = sum(results.PrincipalMed) / no_of_values
-        p2_max = max(results.PrincipalMed)
-    if results.PrincipalMin:
-        p3_min = min(results.PrincipalMin)
-        p3_avg = sum(results.PrincipalMin) / no_of_values
-        p3_max = max(results.PrincipalMin)
-    if results.MaxShear:
-        ms_min = min(results.MaxShear)
-        ms_avg = sum(results.MaxShear) / no_of_values
-        ms_max = max(results.MaxShear)
-    if results.Peeq:
-        peeq_max = max(results.Peeq)
-        peeq_min = min(results.Peeq)
-        peeq_avg = sum(results.Peeq) / no_of_values
-
-    results.Stats = [x_min, x_avg, x_max,
-                     y_min, y_avg, y_max,
-                     z_min, z_avg, z_max,
-                     a_min, a_avg, a_max,
-                     s_min, s_avg, s_max,
-                     p1_min, p1_avg, p1_max,
-                     p2_min, p2_avg, p2_max,
-                     p3_min, p3_avg, p3_max,
-                     ms_min, ms_avg, ms_max,
-                     peeq_min, peeq_avg, peeq_max]
+    results.Stats = (list(x_stats) + list(y_stats) + list(z_stats) + list(a_stats) + list(s_stats) +
+                     list(p1_stats) + list(p2_stats) + list(p3_stats) + list(ms_stats) + list(peeq_stats))
 
     return results
 
@@ -392,3 +351,45 @@ def calculate_disp_abs(displacements):
     for d in displacements:
         disp_abs.append(sqrt(pow(d[0], 2) + pow(d[1], 2) + pow(d[2], 2)))
     return disp_abs
+
+
+def calculate_disp_abs_array(displacements):
+    # displacements (N, 3) --> (N,)
+    d = np.asarray(displacements, dtype=np.float64)
+    return np.sqrt(np.square(d[:, 0]) + np.square(d[:, 1]) + np.square(d[:, 2]))
+
+
+def calculate_von_mises_array(stress):
+    # stress (N, 6) with s11, s22, s33, s12, s23, s31 --> (N,)
+    # same operations as calculate_von_mises() for every row
+    s11 = stress[:, 0]
+    s22 = stress[:, 1]
+    s33 = stress[:, 2]
+    s11s22 = np.square(s11 - s22)
+    s22s33 = np.square(s22 - s33)
+    s33s11 = np.square(s33 - s11)
+    s12s23s31 = 6 * (np.square(stress[:, 3]) + np.square(stress[:, 4]) + np.square(stress[:, 5]))
+    return np.sqrt(0.5 * (s11s22 + s22s33 + s33s11 + s12s23s31))
+
+
+def calculate_principal_stress_array(stress):
+    # stress (N, 6) --> principal stresses (N,) each in descending order and max shear (N,)
+    # eigvalsh is called once for the stack of all (N, 3, 3) stress tensors
+    sigma = np.empty((len(stress), 3, 3))
+    for row, col, comp in ((0, 0, 0), (1, 1, 1), (2, 2, 2), (0, 1, 3), (1, 0, 3), (0, 2, 4), (2, 0, 4), (1, 2, 5), (2, 1, 5)):
+        sigma[:, row, col] = stress[:, comp]
+    eigvals = np.linalg.eigvalsh(sigma)  # ascending
+    maxshear = (eigvals[:, 2] - eigvals[:, 0]) / 2.0
+    return eigvals[:, 2], eigvals[:, 1], eigvals[:, 0], maxshear
+
+
+def get_stats_array(values, no_of_values):
+    # (min, avg, max) of an array, the avg is divided by no_of_values
+    # add.accumulate sums sequentially like the python sum(), np.sum would give different roundings
+    values = np.asarray(values, dtype=np.float64)
+    return (float(values.min()), float(np.add.accumulate(values)[-1]) / no_of_values, float(values.max()))
+
+
+def get_vector_list(values):
+    # (N, 3) array --> list of 3-tuples accepted by a PropertyVectorList
+    return [tuple(v) for v in values.tolist()]
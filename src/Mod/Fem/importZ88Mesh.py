@@ -74,7 +74,7 @@ def export(objectslist, filename):
     import FemMeshTools
     femelement_table = FemMeshTools.get_femelement_table(obj.FemMesh)
     z88_element_type = get_z88_element_type(obj.FemMesh, femelement_table)
-    f = pyopen(filename, "wb")
+    f = pyopen(filename, "w")
     write_z88_mesh_to_file(femnodes_mesh, femelement_table, z88_element_type, f)
     f.close()
 
@@ -83,10 +83,12 @@ def export(objectslist, filename):
 def import_z88_mesh(filename, analysis=None):
     '''insert a FreeCAD FEM Mesh object in the ActiveDocument
     '''
-    mesh_data = read_z88_mesh(filename)
+    mesh_arrays = read_z88_mesh_arrays(filename)
+    if not mesh_arrays:
+        return
     mesh_name = os.path.basename(os.path.splitext(filename)[0])
     import importToolsFem
-    femmesh = importToolsFem.make_femmesh(mesh_data)
+    femmesh = importToolsFem.make_femmesh_arrays(mesh_arrays)
     if femmesh:
         mesh_object = FreeCAD.ActiveDocument.addObject('Fem::FemMeshObject', mesh_name)
         mesh_object.FemMesh = femmesh
@@ -95,221 +97,151 @@ def import_z88_mesh(filename, analysis=None):
 def read_z88_mesh(z88_mesh_input):
     ''' reads a z88 mesh file z88i1.txt (Z88OSV14) or z88structure.txt (Z88AuroraV3)
         and extracts the nodes and elements
+        returns the {id: nodes} dictionaries of the FEM Mesh data, see read_z88_mesh_arrays()
     '''
+    m = read_z88_mesh_arrays(z88_mesh_input)
+    if not m:
+        return {}
     nodes = {}
-    elements_hexa8 = {}
-    elements_penta6 = {}
-    elements_tetra4 = {}
-    elements_tetra10 = {}
-    elements_penta15 = {}
-    elements_hexa20 = {}
-    elements_tria3 = {}
-    elements_tria6 = {}
-    elements_quad4 = {}
-    elements_quad8 = {}
-    elements_seg2 = {}
-
-    input_continues = False
-    # elem = -1
-    z88_element_type = 0
-
+    for node_id, (x, y, z) in zip(m['NodeIds'].tolist(), m['NodeCoords'].tolist()):
+        nodes[node_id] = FreeCAD.Vector(x, y, z)
+    mesh_data = {'Nodes': nodes}
+    for key in ('Hexa8Elem', 'Penta6Elem', 'Tetra4Elem', 'Tetra10Elem', 'Penta15Elem', 'Hexa20Elem',
+                'Tria3Elem', 'Tria6Elem', 'Quad4Elem', 'Quad8Elem', 'Seg2Elem'):
+        mesh_data[key] = {}
+    for key in m['Elements']:
+        ids, element_nodes = m['Elements'][key]
+        mesh_data[key] = dict(zip(ids.tolist(), [tuple(e) for e in element_nodes.tolist()]))
+    return mesh_data
+
+
+# z88 element type --> (FreeCAD mesh data key, number of nodes, z88 node order)
+# the element nodes of FreeCAD are the nodes of the z88 element line in z88 node order and vice versa
+z88_element_types = {
+    # stab4 or stab5 or welle5 or beam13 or beam25 Z88 --> seg2 FreeCAD
+    2: ('Seg2Elem', 2, (0, 1)),
+    4: ('Seg2Elem', 2, (0, 1)),
+    5: ('Seg2Elem', 2, (0, 1)),
+    9: ('Seg2Elem', 2, (0, 1)),
+    13: ('Seg2Elem', 2, (0, 1)),
+    25: ('Seg2Elem', 2, (0, 1)),
+    # scheibe3 or scheibe14 or schale24 Z88 --> tria6 FreeCAD
+    3: ('Tria6Elem', 6, (0, 1, 2, 3, 4, 5)),
+    14: ('Tria6Elem', 6, (0, 1, 2, 3, 4, 5)),
+    24: ('Tria6Elem', 6, (0, 1, 2, 3, 4, 5)),
+    # scheibe7 or platte20 or schale23 Z88 --> quad8 FreeCAD
+    7: ('Quad8Elem', 8, (0, 1, 2, 3, 4, 5, 6, 7)),
+    20: ('Quad8Elem', 8, (0, 1, 2, 3, 4, 5, 6, 7)),
+    23: ('Quad8Elem', 8, (0, 1, 2, 3, 4, 5, 6, 7)),
+    # volume17 Z88 --> tetra4 FreeCAD: N4, N2, N3, N1
+    17: ('Tetra4Elem', 4, (3, 1, 2, 0)),
+    # volume16 Z88 --> tetra10 FreeCAD: N4, N2, N3, N1, N9, N6, N10, N5, N7, N8
+    16: ('Tetra10Elem', 10, (3, 1, 2, 0, 8, 5, 9, 4, 6, 7)),
+    # volume1 Z88 --> hexa8 FreeCAD
+    1: ('Hexa8Elem', 8, (0, 1, 2, 3, 4, 5, 6, 7)),
+    # volume10 Z88 --> hexa20 FreeCAD, turned by 90 degree they match
+    10: ('Hexa20Elem', 20, tuple(range(20))),
+}
+
+# z88 element types which are not supported
+z88_unsupported_element_types = {
+    8: ("Z88 Element No. 8, torus8\n", "Rotational elements are not supported at the moment\n"),
+    12: ("Z88 Element No. 12, torus12\n", "Rotational elements are not supported at the moment\n"),
+    15: ("Z88 Element No. 15, torus6\n", "Rotational elements are not supported at the moment\n"),
+    19: ("Z88 Element No. 19, platte16\n", "Not supported at the moment\n"),
+    21: ("Z88 Element No. 21, schale16\n", "Not supported at the moment\n"),
+    22: ("Z88 Element No. 22, schale12\n", "Not supported at the moment\n"),
+}
+
+
+def read_z88_mesh_arrays(z88_mesh_input):
+    ''' reads a z88 mesh file z88i1.txt (Z88OSV14) or z88structure.txt (Z88AuroraV3)
+        into numpy arrays, the node and element lines are converted in bulk
+        returns {'NodeIds': (N,), 'NodeCoords': (N, 3), 'Elements': {FreeCAD mesh data key: (ids (M,), nodes (M, k))}}
+        or an empty dictionary if the mesh is not supported
+    '''
+    import itertools
+    import numpy as np
     z88_mesh_file = pyopen(z88_mesh_input, "r")
-    mesh_info = z88_mesh_file.readline().strip().split()
-
-    nodes_dimension = int(mesh_info[0])
-    nodes_count = int(mesh_info[1])
-    elements_count = int(mesh_info[2])
-    kflag = int(mesh_info[4])
-    if kflag:  # for non rotational elements ist --> kflag = 0 --> karthesian, kflag = 1 polar koordinates
-        FreeCAD.Console.PrintError("KFLAG = 1, Rotational koordinates not supported at the moment\n")
-        return {}
-    nodes_first_line = 2  # first line is mesh_info
-    nodes_last_line = nodes_count + 1
-    elemts_first_line = nodes_last_line + 1
-    elements_last_line = elemts_first_line - 1 + elements_count * 2
+    try:
+        mesh_info = z88_mesh_file.readline().strip().split()
+        nodes_dimension = int(mesh_info[0])
+        nodes_count = int(mesh_info[1])
+        elements_count = int(mesh_info[2])
+        kflag = int(mesh_info[4])
+        if kflag:  # for non rotational elements ist --> kflag = 0 --> karthesian, kflag = 1 polar koordinates
+            FreeCAD.Console.PrintError("KFLAG = 1, Rotational koordinates not supported at the moment\n")
+            return {}
+        node_lines = list(itertools.islice(z88_mesh_file, nodes_count))
+        element_lines = list(itertools.islice(z88_mesh_file, 2 * elements_count))
+    finally:
+        z88_mesh_file.close()
     if Debug:
         print(nodes_count)
         print(elements_count)
-        print(nodes_last_line)
-        print(elemts_first_line)
-        print(elements_last_line)
-
-    z88_mesh_file.seek(0)  # go back to the beginning of the file
-    for no, line in enumerate(z88_mesh_file):
-        lno = no + 1
-        linecolumns = line.split()
-
-        if lno >= nodes_first_line and lno <= nodes_last_line:
-            # node line
-            node_no = int(linecolumns[0])
-            node_x = float(linecolumns[2])
-            node_y = float(linecolumns[3])
-            if nodes_dimension == 2:
-                node_z = 0.0
-            elif nodes_dimension == 3:
-                node_z = float(linecolumns[4])
-            nodes[node_no] = FreeCAD.Vector(node_x, node_y, node_z)
-
-        if lno >= elemts_first_line and lno <= elements_last_line:
-            # first element line
-            if not input_continues:
-                elem_no = int(linecolumns[0])
-                z88_element_type = int(linecolumns[1])
-                input_continues = True
-
-            # second element line
-            elif input_continues:
-                # not supported elements
-                if z88_element_type == 8:
-                    # torus8
-                    FreeCAD.Console.PrintError("Z88 Element No. 8, torus8\n")
-                    FreeCAD.Console.PrintError("Rotational elements are not supported at the moment\n")
-                    return {}
-                elif z88_element_type == 12:
-                    # torus12
-                    FreeCAD.Console.PrintError("Z88 Element No. 12, torus12\n")
-                    FreeCAD.Console.PrintError("Rotational elements are not supported at the moment\n")
-                    return {}
-                elif z88_element_type == 15:
-                    # torus6
-                    FreeCAD.Console.PrintError("Z88 Element No. 15, torus6\n")
-                    FreeCAD.Console.PrintError("Rotational elements are not supported at the moment\n")
-                    return {}
-                elif z88_element_type == 19:
-                    # platte16
-                    FreeCAD.Console.PrintError("Z88 Element No. 19, platte16\n")
-                    FreeCAD.Console.PrintError("Not supported at the moment\n")
-                    return {}
-                elif z88_element_type == 21:
-                    # schale16, mixture made from hexa8  und hexa20 (thickness is linear)
-                    FreeCAD.Console.PrintError("Z88 Element No. 21, schale16\n")
-                    FreeCAD.Console.PrintError("Not supported at the moment\n")
-                    return {}
-                elif z88_element_type == 22:
-                    # schale12, mixtrue made from prism6 and prism15 (thickness is linear)
-                    FreeCAD.Console.PrintError("Z88 Element No. 22, schale12\n")
-                    FreeCAD.Console.PrintError("Not supported at the moment\n")
-                    return {}
-
-                # supported elements
-                elif z88_element_type == 2 or z88_element_type == 4 or z88_element_type == 5 or z88_element_type == 9 or z88_element_type == 13 or z88_element_type == 25:
-                    # stab4 or stab5 or welle5 or beam13 or beam25 Z88 --> seg2 FreeCAD
-                    # N1, N2
-                    nd1 = int(linecolumns[0])
-                    nd2 = int(linecolumns[1])
-                    elements_seg2[elem_no] = (nd1, nd2)
-                    input_continues = False
-                elif z88_element_type == 3 or z88_element_type == 14 or z88_element_type == 24:
-                    # scheibe3 or scheibe14 or schale24 Z88 --> tria6 FreeCAD
-                    # N1, N2, N3, N4, N5, N6
-                    nd1 = int(linecolumns[0])
-                    nd2 = int(linecolumns[1])
-                    nd3 = int(linecolumns[2])
-                    nd4 = int(linecolumns[3])
-                    nd5 = int(linecolumns[4])
-                    nd6 = int(linecolumns[5])
-                    elements_tria6[elem_no] = (nd1, nd2, nd3, nd4, nd5, nd6)
-                    input_continues = False
-                elif z88_element_type == 7 or z88_element_type == 20 or z88_element_type == 23:
-                    # scheibe7 or platte20 or schale23 Z88 --> quad8 FreeCAD
-                    # N1, N2, N3, N4, N5, N6, N7, N8
-                    nd1 = int(linecolumns[0])
-                    nd2 = int(linecolumns[1])
-                    nd3 = int(linecolumns[2])
-                    nd4 = int(linecolumns[3])
-                    nd5 = int(linecolumns[4])
-                    nd6 = int(linecolumns[5])
-                    nd7 = int(linecolumns[6])
-                    nd8 = int(linecolumns[7])
-                    elements_quad8[elem_no] = (nd1, nd2, nd3, nd4, nd5, nd6, nd7, nd8)
-                    input_continues = False
-                elif z88_element_type == 17:
-                    # volume17 Z88 --> tetra4 FreeCAD
-                    # N4, N2, N3, N1
-                    nd1 = int(linecolumns[0])
-                    nd2 = int(linecolumns[1])
-                    nd3 = int(linecolumns[2])
-                    nd4 = int(linecolumns[3])
-                    elements_tetra4[elem_no] = (nd4, nd2, nd3, nd1)
-                    input_continues = False
-                elif z88_element_type == 16:
-                    # volume16 Z88 --> tetra10 FreeCAD
-                    # N4, N2, N3, N1, N9, N6, N10, N5, N7, N8
-                    nd1 = int(linecolumns[0])
-                    nd2 = int(linecolumns[1])
-                    nd3 = int(linecolumns[2])
-                    nd4 = int(linecolumns[3])
-                    nd5 = int(linecolumns[4])
-                    nd6 = int(linecolumns[5])
-                    nd7 = int(linecolumns[6])
-                    nd8 = int(linecolumns[7])
-                    nd9 = int(linecolumns[8])
-                    nd10 = int(linecolumns[9])
-                    elements_tetra10[elem_no] = (nd4, nd2, nd3, nd1, nd9, nd6, nd10, nd5, nd7, nd8)
-                    input_continues = False
-                elif z88_element_type == 1:
-                    # volume1 Z88 --> hexa8 FreeCAD
-                    # N1, N2, N3, N4, N5, N6, N7, N8
-                    nd1 = int(linecolumns[0])
-                    nd2 = int(linecolumns[1])
-                    nd3 = int(linecolumns[2])
-                    nd4 = int(linecolumns[3])
-                    nd5 = int(linecolumns[4])
-                    nd6 = int(linecolumns[5])
-                    nd7 = int(linecolumns[6])
-                    nd8 = int(linecolumns[7])
-                    elements_hexa8[elem_no] = (nd1, nd2, nd3, nd4, nd5, nd6, nd7, nd8)
-                    input_continues = False
-                elif z88_element_type == 10:
-                    # volume10 Z88 --> hexa20 FreeCAD
-                    # N2, N3, N4, N1, N6, N7, N8, N5, N10, N11, N12, N9,  N14, N15, N16, N13, N18, N19, N20, N17
-                    # or turn by 90 degree and they match !
-                    # N1, N2, N3, N4, N5, N6, N7, N8, N9, N10, N11, N12, N13, N14, N15, N16, N17, N18, N19, N20
-                    nd1 = int(linecolumns[0])
-                    nd2 = int(linecolumns[1])
-                    nd3 = int(linecolumns[2])
-                    nd4 = int(linecolumns[3])
-                    nd5 = int(linecolumns[4])
-                    nd6 = int(linecolumns[5])
-                    nd7 = int(linecolumns[6])
-                    nd8 = int(linecolumns[7])
-                    nd9 = int(linecolumns[8])
-                    nd10 = int(linecolumns[9])
-                    nd11 = int(linecolumns[10])
-                    nd12 = int(linecolumns[11])
-                    nd13 = int(linecolumns[12])
-                    nd14 = int(linecolumns[13])
-                    nd15 = int(linecolumns[14])
-                    nd16 = int(linecolumns[15])
-                    nd17 = int(linecolumns[16])
-                    nd18 = int(linecolumns[17])
-                    nd19 = int(linecolumns[18])
-                    nd20 = int(linecolumns[19])
-                    elements_hexa20[elem_no] = (nd1, nd2, nd3, nd4, nd5, nd6, nd7, nd8, nd9, nd10,
-                                                nd11, nd12, nd13, nd14, nd15, nd16, nd17, nd18, nd19, nd20)
-                    input_continues = False
-
-                # not known elements, some example have -1 for some teaching reasons to show some other stuff
-                else:
-                    FreeCAD.Console.PrintError("Not known element\n")
-                    return {}
-
-    if Debug:
-        for n in nodes:
-            print(n, '  ', nodes[n])
-        for e in elements_tria6:
-            print(e, '  ', elements_tria6[e])
 
-    z88_mesh_file.close()
-    return {'Nodes': nodes,
-            'Hexa8Elem': elements_hexa8, 'Penta6Elem': elements_penta6, 'Tetra4Elem': elements_tetra4, 'Tetra10Elem': elements_tetra10,
-            'Penta15Elem': elements_penta15, 'Hexa20Elem': elements_hexa20, 'Tria3Elem': elements_tria3, 'Tria6Elem': elements_tria6,
-            'Quad4Elem': elements_quad4, 'Quad8Elem': elements_quad8, 'Seg2Elem': elements_seg2,
-            }
+    # node line: node number, dof, x, y (, z)
+    nodes = get_z88_rows(node_lines, 2 + nodes_dimension, float)
+    node_ids = nodes[:, 0].astype(np.int64)
+    node_coords = np.zeros((len(node_lines), 3), dtype=np.float64)
+    node_coords[:, :nodes_dimension] = nodes[:, 2:2 + nodes_dimension]
+
+    # element lines: element number, z88 element type and in the next line the nodes
+    headers = get_z88_rows(element_lines[0::2], 2, int)
+    node_lines = element_lines[1::2]
+    elements = {}
+    for z88_element_type in np.unique(headers[:, 1]).tolist():
+        if z88_element_type in z88_unsupported_element_types:
+            for message in z88_unsupported_element_types[z88_element_type]:
+                FreeCAD.Console.PrintError(message)
+            return {}
+        if z88_element_type not in z88_element_types:
+            # not known elements, some example have -1 for some teaching reasons to show some other stuff
+            FreeCAD.Console.PrintError("Not known element\n")
+            return {}
+        key, n, order = z88_element_types[z88_element_type]
+        selected = np.flatnonzero(headers[:, 1] == z88_element_type)
+        ids = headers[selected, 0]
+        element_nodes = get_z88_rows([node_lines[i] for i in selected.tolist()], n, int)[:, order]
+        if key in elements:
+            ids = np.concatenate((elements[key][0], ids))
+            element_nodes = np.concatenate((elements[key][1], element_nodes))
+        elements[key] = (ids, element_nodes)
+    return {'NodeIds': node_ids, 'NodeCoords': node_coords, 'Elements': elements}
+
+
+def get_z88_rows(lines, columns, dtype):
+    # the first columns of every line, all lines are converted at once if they have the same number of columns
+    import numpy as np
+    if not lines:
+        return np.zeros((0, columns), dtype=np.int64 if dtype is int else np.float64)
+    try:
+        values = np.fromstring(' '.join(lines), dtype=np.float64, sep=' ')
+    except ValueError:
+        values = np.zeros(0, dtype=np.float64)
+    if len(values) == len(lines) * columns:
+        values = values.reshape(len(lines), columns)
+    else:
+        values = np.array([l.split()[:columns] for l in lines], dtype=np.float64)
+    if dtype is int:
+        return values.astype(np.int64)
+    return values
 
 
 # write z88 Mesh
 def write_z88_mesh_to_file(femnodes_mesh, femelement_table, z88_element_type, f):
+    import numpy as np
+    node_ids = np.array(list(femnodes_mesh.keys()), dtype=np.int64)
+    node_coords = np.array([(v.x, v.y, v.z) for v in femnodes_mesh.values()], dtype=np.float64).reshape(-1, 3)
+    element_ids = np.array(list(femelement_table.keys()), dtype=np.int64)
+    element_nodes = np.array([tuple(n) for n in femelement_table.values()], dtype=np.int64).reshape(len(element_ids), -1)
+    write_z88_mesh_arrays_to_file(node_ids, node_coords, element_ids, element_nodes, z88_element_type, f)
+
+
+def write_z88_mesh_arrays_to_file(node_ids, node_coords, element_ids, element_nodes, z88_element_type, f):
+    ''' writes the nodes (N,) (N, 3) and the elements (M,) (M, k) of one element type,
+        the lines are formatted and written chunk by chunk
+    '''
     node_dimension = 3  # 2 for 2D not supported
     if (z88_element_type == 4 or
        z88_element_type == 17 or z88_element_type == 16 or
@@ -320,8 +252,8 @@ def write_z88_mesh_to_file(femnodes_mesh, femelement_table, z88_element_type, f)
     else:
         print("Error: wrong z88_element_type")
         return
-    node_count = len(femnodes_mesh)
-    element_count = len(femelement_table)
+    node_count = len(node_ids)
+    element_count = len(element_ids)
     dofs = node_dof * node_count
     unknown_flag = 0
     written_by = "written by FreeCAD"
@@ -329,61 +261,29 @@ def write_z88_mesh_to_file(femnodes_mesh, femelement_table, z88_element_type, f)
     # first line, some z88 specific stuff
     f.write("{0} {1} {2} {3} {4} {5}\n".format(node_dimension, node_count, element_count, dofs, unknown_flag, written_by))
     # nodes
-    for node in femnodes_mesh:
-        vec = femnodes_mesh[node]
-        f.write("{0} {1} {2:.6f} {3:.6f} {4:.6f}\n".format(node, node_dof, vec.x, vec.y, vec.z, node))
-    # elements
-    for element in femelement_table:
-        # z88_element_type is checked for every element, but mixed elements are not supported up to date
-        n = femelement_table[element]
-        if z88_element_type == 2 or z88_element_type == 4 or z88_element_type == 5 or z88_element_type == 9 or z88_element_type == 13 or z88_element_type == 25:
-            # seg2 FreeCAD --> stab4 Z88
-            # N1, N2
-            f.write("{0} {1}\n".format(element, z88_element_type, element))
-            f.write("{0} {1}\n".format(
-                    n[0], n[1]))
-        elif z88_element_type == 3 or z88_element_type == 14 or z88_element_type == 24:
-            # tria6 FreeCAD --> schale24 Z88
-            # N1, N2, N3, N4, N5, N6
-            f.write("{0} {1}\n".format(element, z88_element_type, element))
-            f.write("{0} {1} {2} {3} {4} {5}\n".format(
-                    n[0], n[1], n[2], n[3], n[4], n[5]))
-        elif z88_element_type == 7 or z88_element_type == 20 or z88_element_type == 23:
-            # quad8 FreeCAD --> schale23 Z88
-            # N1, N2, N3, N4, N5, N6, N7, N8
-            f.write("{0} {1}\n".format(element, z88_element_type, element))
-            f.write("{0} {1} {2} {3} {4} {5} {6} {7}\n".format(
-                    n[0], n[1], n[2], n[3], n[4], n[5], n[6], n[7]))
-        elif z88_element_type == 17:
-            # tetra4 FreeCAD --> volume17 Z88#
-            # N4, N2, N3, N1
-            f.write("{0} {1}\n".format(element, z88_element_type, element))
-            f.write("{0} {1} {2} {3}\n".format(
-                    n[3], n[1], n[2], n[0]))
-        elif z88_element_type == 16:
-            # tetra10 FreeCAD --> volume16 Z88
-            # N4, N2, N3, N1, N9, N6, N10, N5, N7, N8
-            f.write("{0} {1}\n".format(element, z88_element_type, element))
-            f.write("{0} {1} {2} {3} {4} {5} {6} {7} {8} {9}\n".format(
-                    n[3], n[1], n[2], n[0], n[8], n[5], n[9], n[4], n[6], n[7]))
-        elif z88_element_type == 1:
-            # hexa8 FreeCAD --> volume1 Z88
-            # N1, N2, N3, N4, N5, N6, N7, N8
-            f.write("{0} {1}\n".format(element, z88_element_type, element))
-            f.write("{0} {1} {2} {3} {4} {5} {6} {7}\n".format(
-                    n[0], n[1], n[2], n[3], n[4], n[5], n[6], n[7]))
-        elif z88_element_type == 10:
-            # hexa20 FreeCAD --> volume10 Z88
-            # N2, N3, N4, N1, N6, N7, N8, N5, N10, N11, N12, N9,  N14, N15, N16, N13, N18, N19, N20, N17
-            # or turn by 90 degree and they match !
-            # N1, N2, N3, N4, N5, N6, N7, N8, N9, N10, N11, N12, N13, N14, N15, N16, N17, N18, N19, N20
-            f.write("{0} {1}\n".format(element, z88_element_type, element))
-            f.write("{0} {1} {2} {3} {4} {5} {6} {7} {8} {9} {10} {11} {12} {13} {14} {15} {16} {17} {18} {19}\n".format(
-                    n[0], n[1], n[2], n[3], n[4], n[5], n[6], n[7], n[8], n[9], n[10], n[11], n[12], n[13], n[14], n[15], n[16], n[17], n[18], n[19]))
-        else:
-            FreeCAD.Console.PrintError("Writing of Z88 elementtype {0} not supported.\n".format(z88_element_type))
-            # TODO support schale12 (made from prism15) and schale16 (made from hexa20)
-            return
+    write_z88_rows(f, "%d " + str(node_dof) + " %.6f %.6f %.6f\n",
+                   zip(node_ids.tolist(), *[node_coords[:, i].tolist() for i in range(3)]))
+    # elements, mixed elements are not supported up to date
+    if element_count == 0:
+        return
+    if z88_element_type not in z88_element_types or z88_element_types[z88_element_type][1] != element_nodes.shape[1]:
+        FreeCAD.Console.PrintError("Writing of Z88 elementtype {0} not supported.\n".format(z88_element_type))
+        # TODO support schale12 (made from prism15) and schale16 (made from hexa20)
+        return
+    order = z88_element_types[z88_element_type][2]
+    element_format = "%d " + str(z88_element_type) + "\n" + " ".join(["%d"] * len(order)) + "\n"
+    write_z88_rows(f, element_format, zip(element_ids.tolist(), *[element_nodes[:, i].tolist() for i in order]))
+
+
+def write_z88_rows(f, line_format, rows, chunk_size=10000):
+    # every row is formatted with the %-style line_format, a whole chunk of rows is formatted at once
+    import itertools
+    rows = iter(rows)
+    while True:
+        chunk = list(itertools.islice(rows, chunk_size))
+        if not chunk:
+            break
+        f.write((line_format * len(chunk)) % tuple(itertools.chain.from_iterable(chunk)))
 
 
 # Helper
@@ -68,8 +68,8 @@ def import_z88_disp(filename, analysis=None, result_name_prefix=None):
     import ObjectsFem
     if result_name_prefix is None:
         result_name_prefix = ''
-    m = read_z88_disp(filename)
-    if(len(m['Nodes']) > 0):
+    m = read_z88_disp_arrays(filename)
+    if(len(m['NodeIds']) > 0):
         if analysis is None:
             analysis_name = os.path.splitext(os.path.basename(filename))[0]
             analysis_object = ObjectsFem.makeAnalysis('Analysis')
@@ -84,7 +84,7 @@ def import_z88_disp(filename, analysis=None, result_name_prefix=None):
                 if m.isDerivedFrom("Fem::FemMeshObject"):
                     results.Mesh = m
                     break
-            results = importToolsFem.fill_femresult_mechanical(results, result_set, 0)
+            results = importToolsFem.fill_femresult_mechanical_arrays(results, result_set, 0)
             analysis_object.Member = analysis_object.Member + [results]
 
         if(FreeCAD.GuiUp):
@@ -107,27 +107,14 @@ def read_z88_disp(z88_disp_input):
 
     The FreeCAD file needs to have an Analysis and an appropriate FEM Mesh
     '''
+    m = read_z88_disp_arrays(z88_disp_input)
     nodes = {}
     mode_disp = {}
     mode_results = {}
     results = []
-
-    z88_disp_file = pyopen(z88_disp_input, "r")
-
-    for no, line in enumerate(z88_disp_file):
-        lno = no + 1
-        linelist = line.split()
-
-        if lno >= 6:
-            # disp line
-            # print(linelist)
-            node_no = int(linelist[0])
-            mode_disp_x = float(linelist[1])
-            mode_disp_y = float(linelist[2])
-            if len(linelist) > 3:
-                mode_disp_z = float(linelist[3])
-            else:
-                mode_disp_z = 0.0
+    if len(m['Results']) > 0:
+        ids, disp = m['Results'][0]['disp']
+        for node_no, (mode_disp_x, mode_disp_y, mode_disp_z) in zip(ids.tolist(), disp.tolist()):
             mode_disp[node_no] = FreeCAD.Vector(mode_disp_x, mode_disp_y, mode_disp_z)
             nodes[node_no] = node_no
 
@@ -138,5 +125,35 @@ def read_z88_disp(z88_disp_input):
         for r in results[0]['disp']:
             print(r, ' --> ', results[0]['disp'][r])
 
-    z88_disp_file.close()
     return {'Nodes': nodes, 'Results': results}
+
+
+def read_z88_disp_arrays(z88_disp_input):
+    '''
+    reads a z88 disp file z88o2.txt into numpy arrays, all displacement lines are converted at once
+    returns {'NodeIds': (N,), 'Results': [{'disp': (node ids (N,), displacements (N, 3))}]}
+    the result set is the one used by importToolsFem.fill_femresult_mechanical_arrays()
+    '''
+    import itertools
+    import numpy as np
+    z88_disp_file = pyopen(z88_disp_input, "r")
+    # the displacements start at line 6
+    lines = list(itertools.islice(z88_disp_file, 5, None))
+    z88_disp_file.close()
+    lines = [l for l in lines if l.strip()]
+    if not lines:
+        return {'NodeIds': np.zeros(0, dtype=np.int64), 'Results': []}
+    # node number, ux, uy (, uz, rotations of shell elements)
+    columns = len(lines[0].split())
+    try:
+        values = np.fromstring(' '.join(lines), dtype=np.float64, sep=' ')
+    except ValueError:
+        values = np.zeros(0, dtype=np.float64)
+    if len(values) == len(lines) * columns:
+        values = values.reshape(len(lines), columns)
+    else:
+        values = np.array([(l.split() + ['0'])[:4] for l in lines], dtype=np.float64)
+    ids = values[:, 0].astype(np.int64)
+    disp = np.zeros((len(ids), 3), dtype=np.float64)
+    disp[:, :min(3, values.shape[1] - 1)] = values[:, 1:4]
+    return {'NodeIds': ids, 'Results': [{'disp': (ids, disp)}]}
@@ -29,13 +29,104 @@ __url__ = "http://www.freecadweb.org"
 #  \ingroup FEM
 #  \brief FreeCAD Fenics Mesh XDMF reader for FEM workbench
 
+import FreeCAD
+from xml.etree import ElementTree as ET
+import numpy as np
+import os
 
-def read_fenics_mesh_xdmf(xdmffilename):
 
-    print("Not operational, yet")
+# XDMF topology type --> (FreeCAD mesh data key, nodes per element)
+# the node order is the one written by writeFenicsXDMF
+XDMF_to_FreeCAD_dict = {
+    "polyline": ("Seg2Elem", 2),
+    "triangle": ("Tria3Elem", 3),
+    "tri_6": ("Tria6Elem", 6),
+    "quadrilateral": ("Quad4Elem", 4),
+    "tetrahedron": ("Tetra4Elem", 4),
+    "tet_10": ("Tetra10Elem", 10),
+    "hexahedron": ("Hexa8Elem", 8),
+}
+
+
+def get_xdmf_dtype(dataitem):
+    number_type = dataitem.get("NumberType", dataitem.get("DataType", "Float"))
+    precision = int(dataitem.get("Precision", "8" if number_type == "Float" else "4"))
+    kind = {"Float": "f", "Int": "i", "UInt": "u", "Char": "i", "UChar": "u"}[number_type]
+    endian = {"Little": "<", "Big": ">"}.get(dataitem.get("Endian"), "=")
+    return np.dtype(endian + kind + str(precision))
+
+
+def read_xdmf_dataitem(dataitem, xdmf_dir):
+    '''returns the array of a XDMF DataItem,
+    the heavy data of binary and HDF5 DataItems is memory mapped if possible
+    '''
+    shape = tuple([int(d) for d in dataitem.get("Dimensions").split()])
+    dtype = get_xdmf_dtype(dataitem)
+    data_format = dataitem.get("Format", "XML")
+    if data_format == "XML":
+        return np.fromstring(dataitem.text, dtype=dtype, sep=" ").reshape(shape)
+    elif data_format == "Binary":
+        file_name = os.path.join(xdmf_dir, dataitem.text.strip())
+        return np.memmap(file_name, dtype=dtype, mode='r', offset=int(dataitem.get("Seek", "0")), shape=shape)
+    elif data_format == "HDF":
+        file_name, path = dataitem.text.strip().split(":", 1)
+        file_name = os.path.join(xdmf_dir, file_name)
+        import h5py
+        with h5py.File(file_name, 'r') as h5_file:
+            dataset = h5_file[path]
+            offset = None
+            if dataset.chunks is None and dataset.compression is None:
+                offset = dataset.id.get_offset()
+            if offset is None:
+                # chunked or compressed datasets can not be memory mapped
+                return dataset[...].reshape(shape)
+            dtype = dataset.dtype
+        return np.memmap(file_name, dtype=dtype, mode='r', offset=offset, shape=shape)
+    raise Exception("XDMF DataItem format {} is not supported.".format(data_format))
+
 
-    return {'Nodes': {},
-            'Hexa8Elem': {}, 'Penta6Elem': {}, 'Tetra4Elem': {}, 'Tetra10Elem': {},
-            'Penta15Elem': {}, 'Hexa20Elem': {}, 'Tria3Elem': {}, 'Tria6Elem': {},
-            'Quad4Elem': {}, 'Quad8Elem': {}, 'Seg2Elem': {}
-            }
+def read_fenics_mesh_xdmf_arrays(xdmffilename):
+    '''
+        Returns the mesh arrays to be evaluated by make_femmesh_arrays later,
+        the node and element ids are the fenics indices increased by one
+    '''
+    xdmf_dir = os.path.dirname(os.path.abspath(xdmffilename))
+    root = ET.parse(xdmffilename).getroot()
+    grid = root.find("Domain/Grid")
+    geometry = grid.find("Geometry")
+    topology = grid.find("Topology")
+
+    coords = read_xdmf_dataitem(geometry.find("DataItem"), xdmf_dir)
+    if coords.shape[1] == 2:
+        # XY geometry
+        coords = np.hstack((coords, np.zeros((len(coords), 1), dtype=coords.dtype)))
+    mesh_arrays = {'NodeIds': np.arange(1, len(coords) + 1, dtype=np.int64), 'NodeCoords': coords, 'Elements': {}}
+
+    topology_type = topology.get("TopologyType").lower()
+    if topology_type not in XDMF_to_FreeCAD_dict:
+        FreeCAD.Console.PrintError("XDMF topology type {} is not supported.\n".format(topology_type))
+        return mesh_arrays
+    (mesh_key, nodes_per_element) = XDMF_to_FreeCAD_dict[topology_type]
+    cells = read_xdmf_dataitem(topology.find("DataItem"), xdmf_dir).reshape(-1, nodes_per_element)
+    # increase node index by one, since fenics starts at 0, FreeCAD at 1
+    cells = cells.astype(np.int64) + 1
+    mesh_arrays['Elements'][mesh_key] = (np.arange(1, len(cells) + 1, dtype=np.int64), cells)
+    print("Read %d nodes and %d %s cells" % (len(coords), len(cells), topology_type))
+    return mesh_arrays
+
+
+def read_fenics_mesh_xdmf(xdmffilename):
+    '''
+        Returns element dictionary to be evaluated by make_femmesh later
+    '''
+    mesh_data = {'Nodes': {},
+                 'Hexa8Elem': {}, 'Penta6Elem': {}, 'Tetra4Elem': {}, 'Tetra10Elem': {},
+                 'Penta15Elem': {}, 'Hexa20Elem': {}, 'Tria3Elem': {}, 'Tria6Elem': {},
+                 'Quad4Elem': {}, 'Quad8Elem': {}, 'Seg2Elem': {}
+                 }
+    m = read_fenics_mesh_xdmf_arrays(xdmffilename)
+    for (i, v) in zip(m['NodeIds'].tolist(), m['NodeCoords'].tolist()):
+        mesh_data['Nodes'][i] = FreeCAD.Vector(v[0], v[1], v[2])
+    for (mesh_key, (ids, nodes)) in m['Elements'].items():
+        mesh_data[mesh_key] = dict(zip(ids.tolist(), [tuple(e) for e in nodes.tolist()]))
+    return mesh_data
@@ -29,12 +29,15 @@ __url__ = "http://www.freecadweb.org"
 #  \ingroup FEM
 #  \brief FreeCAD Fenics Mesh XDMF writer for FEM workbench
 
+import FreeCAD
 from importToolsFem import get_FemMeshObjectDimension, get_FemMeshObjectElementTypes, get_MaxDimElementFromList, get_FemMeshObjectOrder
 from xml.etree import ElementTree as ET  # parsing xml files and exporting
 import numpy as np
+import os
 
 ENCODING_ASCII = 'ASCII'
 ENCODING_HDF5 = 'HDF5'
+ENCODING_BINARY = 'Binary'  # raw binary heavy data file, no additional module needed
 
 # TODO: export mesh functions (to be defined, cell functions, vertex functions, facet functions)
 # TODO: integrate cell function
@@ -62,9 +65,52 @@ def tuples_to_numpy(tpls):
     return np.array([list(t) for t in tpls])
 
 
-def write_fenics_mesh_points_xdmf(fem_mesh_obj, geometrynode, encoding=ENCODING_ASCII):
+class XDMFHeavyDataWriter(object):
+    '''writes the heavy data arrays of a XDMF file as contiguous datasets into a HDF5 file
+    (ENCODING_HDF5, needs h5py) or one after the other into a raw binary file (ENCODING_BINARY),
+    the file is written next to the XDMF file and referenced by the DataItem of every array,
+    thus the arrays can be memory mapped on reading, see readFenicsXDMF
+    '''
+    def __init__(self, xdmf_file_name, encoding=ENCODING_BINARY):
+        self.encoding = encoding
+        base_name = os.path.splitext(xdmf_file_name)[0]
+        if encoding == ENCODING_HDF5:
+            import h5py
+            self.file_name = base_name + '.h5'
+            self.heavy_file = h5py.File(self.file_name, 'w')
+        else:
+            self.file_name = base_name + '.bin'
+            self.heavy_file = open(self.file_name, 'wb')
+
+    def add_dataitem(self, parentnode, name, array):
+        '''writes the array and adds its DataItem to parentnode
+        '''
+        # little endian, thus the binary files are the same on all platforms
+        array = np.ascontiguousarray(array, dtype=array.dtype.newbyteorder('<'))
+        number_type = {'f': 'Float', 'i': 'Int', 'u': 'UInt'}[array.dtype.kind]
+        dimensions = " ".join([str(d) for d in array.shape])
+        file_reference = os.path.basename(self.file_name)
+        if self.encoding == ENCODING_HDF5:
+            path = '/Mesh/' + name
+            self.heavy_file.create_dataset(path, data=array)
+            dataitem = ET.SubElement(parentnode, "DataItem", NumberType=number_type, Precision=str(array.dtype.itemsize),
+                                     Dimensions=dimensions, Format="HDF")
+            dataitem.text = file_reference + ':' + path
+        else:
+            seek = self.heavy_file.tell()
+            array.tofile(self.heavy_file)
+            dataitem = ET.SubElement(parentnode, "DataItem", NumberType=number_type, Precision=str(array.dtype.itemsize),
+                                     Dimensions=dimensions, Format="Binary", Endian="Little", Seek=str(seek))
+            dataitem.text = file_reference
+        return dataitem
+
+    def close(self):
+        self.heavy_file.close()
+
+
+def write_fenics_mesh_points_xdmf(fem_mesh_obj, geometrynode, encoding=ENCODING_ASCII, heavy_data=None):
     """
-        Writes either into hdf5 file or into open mesh file
+        Writes either into the heavy data file (XDMFHeavyDataWriter) or into open mesh file
     """
 
     numnodes = fem_mesh_obj.FemMesh.NodeCount
@@ -82,21 +128,21 @@ def write_fenics_mesh_points_xdmf(fem_mesh_obj, geometrynode, encoding=ENCODING_
 
     recalc_nodes_ind_dict = {}
 
+    nodes = []
+    for (ind, (key, node)) in enumerate(fem_mesh_obj.FemMesh.Nodes.items()):
+        nodes.append(node)
+        recalc_nodes_ind_dict[key] = ind
+
     if encoding == ENCODING_ASCII:
         dataitem = ET.SubElement(geometrynode, "DataItem", Dimensions="%d %d" % (numnodes, 3), Format="XML")
-        nodes = []
-        for (ind, (key, node)) in enumerate(fem_mesh_obj.FemMesh.Nodes.iteritems()):
-            nodes.append(node)
-            recalc_nodes_ind_dict[key] = ind
-
         dataitem.text = numpy_array_to_str(points_to_numpy(nodes))
-    elif encoding == ENCODING_HDF5:
-        pass
+    elif encoding in (ENCODING_HDF5, ENCODING_BINARY):
+        heavy_data.add_dataitem(geometrynode, "geometry", points_to_numpy(nodes).astype(np.float64))
 
     return recalc_nodes_ind_dict
 
 
-def write_fenics_mesh_volumes_xdmf(fem_mesh_obj, topologynode, rd, encoding=ENCODING_ASCII):
+def write_fenics_mesh_volumes_xdmf(fem_mesh_obj, topologynode, rd, encoding=ENCODING_ASCII, heavy_data=None):
     (num_cells, name_cell, dim_cell) = get_MaxDimElementFromList(get_FemMeshObjectElementTypes(fem_mesh_obj))
     element_order = get_FemMeshObjectOrder(fem_mesh_obj)
 
@@ -135,11 +181,12 @@ def write_fenics_mesh_volumes_xdmf(fem_mesh_obj, topologynode, rd, encoding=ENCO
     if encoding == ENCODING_ASCII:
         dataitem = ET.SubElement(topologynode, "DataItem", NumberType="UInt", Dimensions="%d %d" % (num_cells, nodes_per_element), Format="XML")
         dataitem.text = numpy_array_to_str(tuples_to_numpy(nodeindices))
-    elif encoding == ENCODING_HDF5:
-        pass
+    elif encoding in (ENCODING_HDF5, ENCODING_BINARY):
+        topology = np.array([list(t) for t in nodeindices], dtype=np.int64).reshape(-1, nodes_per_element)
+        heavy_data.add_dataitem(topologynode, "topology", topology)
 
 
-def write_fenics_mesh_cellfunctions(fem_mesh_obj, mycellvalues, attributenode, encoding=ENCODING_ASCII):
+def write_fenics_mesh_cellfunctions(fem_mesh_obj, mycellvalues, attributenode, encoding=ENCODING_ASCII, heavy_data=None):
     attributenode.set("AttributeType", "Scalar")
     attributenode.set("Center", "Cell")
     attributenode.set("Name", "f")
@@ -149,13 +196,19 @@ def write_fenics_mesh_cellfunctions(fem_mesh_obj, mycellvalues, attributenode, e
     if encoding == ENCODING_ASCII:
         dataitem = ET.SubElement(attributenode, "DataItem", Dimensions="%d %d" % (num_cells, 1), Format="XML")
         dataitem.text = numpy_array_to_str(np.random.random((num_cells, 1)))
-    elif encoding == ENCODING_HDF5:
-        pass
+    elif encoding in (ENCODING_HDF5, ENCODING_BINARY):
+        # mycellvalues: {fenics cell index: value}
+        values = np.zeros((num_cells, 1), dtype=np.float64)
+        for (ind, value) in mycellvalues.items():
+            values[ind, 0] = value
+        heavy_data.add_dataitem(attributenode, "cell_function", values)
 
 
 def write_fenics_mesh_xdmf(fem_mesh_obj, outputfile, encoding=ENCODING_ASCII):
     """
         For the export of xdmf.
+        With ENCODING_HDF5 or ENCODING_BINARY the heavy data is written into
+        a .h5 or .bin file next to the xdmf file.
     """
 
     FreeCAD_to_Fenics_dict = {
@@ -188,14 +241,26 @@ def write_fenics_mesh_xdmf(fem_mesh_obj, outputfile, encoding=ENCODING_ASCII):
 
     # attribute = etree.SubElement(grid, "Attribute") #  for cell functions
 
-    recalc_dict = write_fenics_mesh_points_xdmf(fem_mesh_obj, geometry, encoding=encoding)
-    write_fenics_mesh_volumes_xdmf(fem_mesh_obj, topology, recalc_dict, encoding=encoding)
+    heavy_data = None
+    if encoding in (ENCODING_HDF5, ENCODING_BINARY):
+        try:
+            heavy_data = XDMFHeavyDataWriter(outputfile, encoding)
+        except ImportError:
+            FreeCAD.Console.PrintError("h5py not found, the heavy data is written into a raw binary file.\n")
+            encoding = ENCODING_BINARY
+            heavy_data = XDMFHeavyDataWriter(outputfile, encoding)
+
+    recalc_dict = write_fenics_mesh_points_xdmf(fem_mesh_obj, geometry, encoding=encoding, heavy_data=heavy_data)
+    write_fenics_mesh_volumes_xdmf(fem_mesh_obj, topology, recalc_dict, encoding=encoding, heavy_data=heavy_data)
 
     # TODO: improve cell functions support
-    # write_fenics_mesh_cellfunctions(fem_mesh_obj, {}, attribute, encoding=encoding)
+    # write_fenics_mesh_cellfunctions(fem_mesh_obj, {}, attribute, encoding=encoding, heavy_data=heavy_data)
+
+    if heavy_data is not None:
+        heavy_data.close()
 
-    fp = open(outputfile, "w")
-    fp.write('''<?xml version="1.0"?>\n<!DOCTYPE Xdmf SYSTEM "Xdmf.dtd" []>\n''')
+    fp = open(outputfile, "wb")
+    fp.write(b'''<?xml version="1.0"?>\n<!DOCTYPE Xdmf SYSTEM "Xdmf.dtd" []>\n''')
     fp.write(ET.tostring(root))
     # xml core functionality does not support pretty printing
     # so the output file looks quite ugly
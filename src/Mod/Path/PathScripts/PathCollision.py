@@ -23,6 +23,7 @@
 # ***************************************************************************
 
 import FreeCAD
+import PathScripts.PathHeightmap as PathHeightmap
 import PathScripts.PathLog as PathLog
 from PySide import QtCore
 from PathScripts.PathUtils import waiting_effects
@@ -84,15 +85,8 @@ class _ViewProviderCollisionSim:
         return True
 
 
-def __compareBBSpace(bb1, bb2):
-    if (bb1.XMin == bb2.XMin and
-            bb1.XMax == bb2.XMax and
-            bb1.YMin == bb2.YMin and
-            bb1.YMax == bb2.YMax and
-            bb1.ZMin == bb2.ZMin and
-            bb1.ZMax == bb2.ZMax):
-        return True
-    return False
+def __bbSpace(bb):
+    return (bb.XMin, bb.XMax, bb.YMin, bb.YMax, bb.ZMin, bb.ZMax)
 
 
 @waiting_effects
@@ -105,12 +99,9 @@ def getCollisionObject(baseobject, simobject):
         colorassignment = []
         gougedShape = baseobject.Shape.cut(simobject)
 
+        intersecSpaces = set(__bbSpace(j.BoundBox) for j in cVol.Faces)
         for idx, i in enumerate(gougedShape.Faces):
-            match = False
-            for jdx, j in enumerate(cVol.Faces):
-                if __compareBBSpace(i.BoundBox, j.BoundBox):
-                    match = True
-            if match is True:
+            if __bbSpace(i.BoundBox) in intersecSpaces:
                 # print ("Need to highlight Face{}".format(idx+1))
                 colorassignment.append(intersecColor)
             else:
@@ -129,4 +120,29 @@ def getCollisionObject(baseobject, simobject):
     return result
 
 
-
+@waiting_effects
+def getSimulatedCollisionObject(job, resolution=None, simulator=None, stock=None):
+    """Simulates the stock removal of the active operations of job on a heightmap and adds a mesh
+    of the gouged areas of the part to the document. Much faster than the boolean operations of
+    getCollisionObject, but approximate. The stock is the bounding box stock, by default the one of
+    the stock of job. If a simulator of a previous call is passed only the changed operations are
+    simulated again. Returns the simulator and the mesh object, None if nothing was gouged."""
+    if simulator is None:
+        simulator = PathHeightmap.StockSimulator.fromJob(job, resolution, stock=stock)
+    results = simulator.simulate(PathHeightmap.jobOperations(job))
+    obj = None
+    gouged = [r for r in results if r.hasGouges()]
+    for r in gouged:
+        PathLog.warning("%s gouges the part in %d cells", r.name, r.gouged.sum())
+    for r in results:
+        if r.rapidCuts:
+            PathLog.warning("%s has %d rapid moves into the stock", r.name, len(r.rapidCuts))
+    if gouged:
+        heightmap = simulator.heightmap
+        vertices, facets = heightmap.mesh(heightmap.gouges(simulator.tolerance) > 0)
+        obj = FreeCAD.ActiveDocument.addObject("Mesh::Feature", "Collision")
+        obj.Mesh = PathHeightmap.toMesh(vertices, facets)
+        if FreeCAD.GuiUp:
+            obj.ViewObject.ShapeColor = (1.0, 0.0, 0.0)
+        FreeCAD.ActiveDocument.recompute()
+    return simulator, obj
@@ -311,9 +311,9 @@ class Bone:
         # for some reason pi/2 is not equal to pi/2
         if math.fabs(angle - boneAngle) < 0.00001:
             # moving directly towards the corner
-            PathLog.debug("adaptive - on target: %.2f - %.2f" % (distance, toolRadius))
+            PathLog.debug("adaptive - on target: %.2f - %.2f", distance, toolRadius)
             return distance - toolRadius
-        PathLog.debug("adaptive - angles: corner=%.2f  bone=%.2f diff=%.12f" % (angle/math.pi, boneAngle/math.pi, angle - boneAngle))
+        PathLog.debug("adaptive - angles: corner=%.2f  bone=%.2f diff=%.12f", angle/math.pi, boneAngle/math.pi, angle - boneAngle)
 
         # The bones root and end point form a triangle with the intersection of the tool path
         # with the toolRadius circle around the bone end point.
@@ -336,7 +336,7 @@ class Bone:
             length2 = toolRadius * math.sin(alpha2) / math.sin(beta2)
             length = min(length, length2)
 
-        PathLog.debug("adaptive corner=%.2f * %.2f˚ -> bone=%.2f * %.2f˚" % (distance, angle, length, boneAngle))
+        PathLog.debug("adaptive corner=%.2f * %.2f˚ -> bone=%.2f * %.2f˚", distance, angle, length, boneAngle)
         return length
 
     def edges(self):
@@ -385,26 +385,26 @@ class ObjectDressup:
         return outChord.foldsBackOrTurns(inChord, self.theOtherSideOf(obj.Side))
 
     def findPivotIntersection(self, pivot, pivotEdge, edge, refPt, d, color):
-        PathLog.track("(%.2f, %.2f)^%.2f  - [(%.2f, %.2f), (%.2f, %.2f)]" % (pivotEdge.Curve.Center.x, pivotEdge.Curve.Center.y, pivotEdge.Curve.Radius, edge.Vertexes[0].Point.x, edge.Vertexes[0].Point.y, edge.Vertexes[1].Point.x, edge.Vertexes[1].Point.y))
+        PathLog.track(pivotEdge.Curve.Center, pivotEdge.Curve.Radius, edge.Vertexes[0].Point, edge.Vertexes[1].Point)
         ppt = None
         pptDistance = 0
         for pt in DraftGeomUtils.findIntersection(edge, pivotEdge, dts=False):
             #debugMarker(pt, "pti.%d-%s.in" % (self.boneId, d), color, 0.2)
             distance = (pt - refPt).Length
-            PathLog.debug("        -->  (%.2f, %.2f): %.2f" % (pt.x, pt.y, distance))
+            PathLog.debug("        -->  (%.2f, %.2f): %.2f", pt.x, pt.y, distance)
             if not ppt or pptDistance < distance:
                 ppt = pt
                 pptDistance = distance
         if not ppt:
             tangent = DraftGeomUtils.findDistance(pivot, edge)
             if tangent:
-                PathLog.debug("Taking tangent as intersect %s" % tangent)
+                PathLog.debug("Taking tangent as intersect %s", tangent)
                 ppt = pivot + tangent
             else:
-                PathLog.debug("Taking chord start as intersect %s" % inChordStart)
+                PathLog.debug("Taking chord start as intersect %s", inChordStart)
                 ppt = inChord.Start
             #debugMarker(ppt, "ptt.%d-%s.in" % (self.boneId, d), color, 0.2)
-            PathLog.debug("        -->  (%.2f, %.2f)" % (ppt.x, ppt.y))
+            PathLog.debug("        -->  (%.2f, %.2f)", ppt.x, ppt.y)
         return ppt
 
     def pointIsOnEdge(self, point, edge):
@@ -423,19 +423,19 @@ class ObjectDressup:
             refPoint = outChord.End
 
         if DraftGeomUtils.areColinear(inChord.asEdge(), outChord.asEdge()):
-            PathLog.info(" straight edge %s" % d)
+            PathLog.info(" straight edge %s", d)
             return [ outChord.g1Command() ]
 
         pivot = None
         pivotDistance = 0
 
-        PathLog.info("smooth:  (%.2f, %.2f)-(%.2f, %.2f)" % (edge.Vertexes[0].Point.x, edge.Vertexes[0].Point.y, edge.Vertexes[1].Point.x, edge.Vertexes[1].Point.y))
+        PathLog.info("smooth:  (%.2f, %.2f)-(%.2f, %.2f)", edge.Vertexes[0].Point.x, edge.Vertexes[0].Point.y, edge.Vertexes[1].Point.x, edge.Vertexes[1].Point.y)
         for e in wire.Edges:
             self.dbg.append(e)
             if type(e.Curve) == Part.LineSegment or type(e.Curve) == Part.Line:
-                PathLog.debug("         (%.2f, %.2f)-(%.2f, %.2f)" % (e.Vertexes[0].Point.x, e.Vertexes[0].Point.y, e.Vertexes[1].Point.x, e.Vertexes[1].Point.y))
+                PathLog.debug("         (%.2f, %.2f)-(%.2f, %.2f)", e.Vertexes[0].Point.x, e.Vertexes[0].Point.y, e.Vertexes[1].Point.x, e.Vertexes[1].Point.y)
             else:
-                PathLog.debug("         (%.2f, %.2f)^%.2f" % (e.Curve.Center.x, e.Curve.Center.y, e.Curve.Radius))
+                PathLog.debug("         (%.2f, %.2f)^%.2f", e.Curve.Center.x, e.Curve.Center.y, e.Curve.Radius)
             for pt in DraftGeomUtils.findIntersection(edge, e, True, findAll=True):
                 if not PathGeom.pointsCoincide(pt, corner) and self.pointIsOnEdge(pt, e):
                     #debugMarker(pt, "candidate-%d-%s" % (self.boneId, d), color, 0.05)
@@ -462,7 +462,7 @@ class ObjectDressup:
                 PathLog.debug("  add g3 command")
                 commands.append(Chord(t1, t2).g3Command(pivot))
             else:
-                PathLog.debug("  add g2 command center=(%.2f, %.2f) -> from (%2f, %.2f) to (%.2f, %.2f" % (pivot.x, pivot.y, t1.x, t1.y, t2.x, t2.y))
+                PathLog.debug("  add g2 command center=(%.2f, %.2f) -> from (%2f, %.2f) to (%.2f, %.2f", pivot.x, pivot.y, t1.x, t1.y, t2.x, t2.y)
                 commands.append(Chord(t1, t2).g2Command(pivot))
             if not PathGeom.pointsCoincide(t2, outChord.End):
                 PathLog.debug("  add lead out")
@@ -482,7 +482,7 @@ class ObjectDressup:
 
         bone.tip = bone.inChord.End # in case there is no bone
 
-        PathLog.debug("corner = (%.2f, %.2f)" % (corner.x, corner.y))
+        PathLog.debug("corner = (%.2f, %.2f)", corner.x, corner.y)
         #debugMarker(corner, 'corner', (1., 0., 1.), self.toolRadius)
 
         length = fixedLength
@@ -571,7 +571,7 @@ class ObjectDressup:
         onInString = 'out'
         if onIn:
             onInString = 'in'
-        PathLog.debug("tboneEdge boneAngle[%s]=%.2f   (in=%.2f, out=%.2f)" % (onInString, boneAngle/math.pi, bone.inChord.getAngleXY()/math.pi, bone.outChord.getAngleXY()/math.pi))
+        PathLog.debug("tboneEdge boneAngle[%s]=%.2f   (in=%.2f, out=%.2f)", onInString, boneAngle/math.pi, bone.inChord.getAngleXY()/math.pi, bone.outChord.getAngleXY()/math.pi)
         return self.inOutBoneCommands(bone, boneAngle, self.toolRadius)
 
     def tboneLongEdge(self, bone):
@@ -614,7 +614,7 @@ class ObjectDressup:
             return [ bone.lastCommand, bone.outChord.g1Command() ]
 
     def insertBone(self, bone):
-        PathLog.debug(">----------------------------------- %d --------------------------------------" % bone.boneId)
+        PathLog.debug(">----------------------------------- %d --------------------------------------", bone.boneId)
         self.boneShapes = []
         blacklisted, inaccessible = self.boneIsBlacklisted(bone)
         enabled = not blacklisted
@@ -628,7 +628,7 @@ class ObjectDressup:
         bone.commands = commands
 
         self.shapes[bone.boneId] = self.boneShapes
-        PathLog.debug("<----------------------------------- %d --------------------------------------" % bone.boneId)
+        PathLog.debug("<----------------------------------- %d --------------------------------------", bone.boneId)
         return commands
 
     def removePathCrossing(self, commands, bone1, bone2):
@@ -697,7 +697,7 @@ class ObjectDressup:
         boneIserted = False
 
         for thisCommand in obj.Base.Path.Commands:
-            PathLog.info("Command: %s" % thisCommand)
+            PathLog.info("Command: %s", thisCommand)
             if thisCommand.Name in movecommands:
                 thisChord = lastChord.moveToParameters(thisCommand.Parameters)
                 thisIsACandidate = self.canAttachDogbone(thisCommand, thisChord)
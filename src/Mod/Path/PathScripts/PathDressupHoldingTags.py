@@ -29,6 +29,7 @@ import Path
 import PathScripts.PathLog as PathLog
 import PathScripts.PathPreferencesPathDressup as PathPreferencesPathDressup
 import Part
+import bisect
 import copy
 import math
 
@@ -159,8 +160,12 @@ class HoldingTagsPreferences:
         return HoldingTagsPreferences()
 
 class Tag:
+    # solids of recent tags by their geometry, the tags are recreated whenever the dressup is recomputed
+    solidCache = {}
+    solidCacheSize = 1000
+
     def __init__(self, id, x, y, width, height, angle, radius, enabled=True):
-        PathLog.track("%.2f, %.2f, %.2f, %.2f, %.2f, %.2f, %d" % (x, y, width, height, angle, radius, enabled))
+        PathLog.track(x, y, width, height, angle, radius, enabled)
         self.id = id
         self.x = x
         self.y = y
@@ -184,7 +189,21 @@ class Tag:
     def top(self):
         return self.z + self.actualHeight
 
+    @PathLog.profile
     def createSolidsAt(self, z, R):
+        key = (self.x, self.y, self.width, self.height, self.angle, self.radius, z, R)
+        cached = Tag.solidCache.get(key)
+        if cached is None:
+            self.makeSolidsAt(z, R)
+            if len(Tag.solidCache) >= Tag.solidCacheSize:
+                Tag.solidCache.clear()
+            Tag.solidCache[key] = (self.solid, self.r1, self.r2, self.actualHeight, self.isSquare, self.realRadius)
+        else:
+            self.z = z
+            self.toolRadius = R
+            self.solid, self.r1, self.r2, self.actualHeight, self.isSquare, self.realRadius = cached
+
+    def makeSolidsAt(self, z, R):
         self.z = z
         self.toolRadius = R
         r1 = self.fullWidth() / 2
@@ -197,7 +216,7 @@ class Tag:
             self.isSquare = True
             self.solid = Part.makeCylinder(r1, height)
             radius = min(min(self.radius, r1), self.height)
-            PathLog.debug("Part.makeCone(%f, %f)" % (r1, height))
+            PathLog.debug("Part.makeCone(%f, %f)", r1, height)
         elif self.angle > 0.0 and height > 0.0:
             # cone
             rad = math.radians(self.angle)
@@ -214,23 +233,23 @@ class Tag:
                 height = r1 * tangens * 1.01
                 self.actualHeight = height
             self.r2 = r2
-            PathLog.debug("Part.makeCone(%f, %f, %f)" % (r1, r2, height))
+            PathLog.debug("Part.makeCone(%f, %f, %f)", r1, r2, height)
             self.solid = Part.makeCone(r1, r2, height)
         else:
             # degenerated case - no tag
-            PathLog.debug("Part.makeSphere(%f / 10000)" % (r1))
+            PathLog.debug("Part.makeSphere(%f / 10000)", r1)
             self.solid = Part.makeSphere(r1 / 10000)
         if not R == 0: # testing is easier if the solid is not rotated
             angle = -PathGeom.getAngle(self.originAt(0)) * 180 / math.pi
-            PathLog.debug("solid.rotate(%f)" % angle)
+            PathLog.debug("solid.rotate(%f)", angle)
             self.solid.rotate(FreeCAD.Vector(0,0,0), FreeCAD.Vector(0,0,1), angle)
         orig = self.originAt(z - 0.01 * self.actualHeight)
-        PathLog.debug("solid.translate(%s)" % orig)
+        PathLog.debug("solid.translate(%s)", orig)
         self.solid.translate(orig)
         radius = min(self.radius, radius)
         self.realRadius = radius
         if radius != 0:
-            PathLog.debug("makeFillet(%.4f)" % radius)
+            PathLog.debug("makeFillet(%.4f)", radius)
             self.solid = self.solid.makeFillet(radius, [self.solid.Edges[0]])
 
     def filterIntersections(self, pts, face):
@@ -289,6 +308,41 @@ class Tag:
             Part.show(e)
 
 
+class TagIndex:
+    """Grid over the bounding boxes of the solids of the enabled tags in the XY plane.
+    candidates(edge) returns the indexes of the tags whose bounding box the edge's one overlaps,
+    only these tags can intersect the edge."""
+
+    def __init__(self, tags, tolerance=PathGeom.Tolerance):
+        self.boxes = []
+        for i, tag in enumerate(tags):
+            if tag.enabled:
+                bb = tag.solid.BoundBox
+                self.boxes.append((i, bb.XMin - tolerance, bb.XMax + tolerance, bb.YMin - tolerance, bb.YMax + tolerance, bb.ZMin - tolerance, bb.ZMax + tolerance))
+        self.size = max([max(b[2] - b[1], b[4] - b[3]) for b in self.boxes] + [PathGeom.Tolerance])
+        self.cells = {}
+        for box in self.boxes:
+            for cell in self.cellsOf(box[1], box[2], box[3], box[4]):
+                self.cells.setdefault(cell, []).append(box)
+
+    def cellRange(self, vmin, vmax):
+        return range(int(math.floor(vmin / self.size)), int(math.floor(vmax / self.size)) + 1)
+
+    def cellsOf(self, xmin, xmax, ymin, ymax):
+        return [(x, y) for x in self.cellRange(xmin, xmax) for y in self.cellRange(ymin, ymax)]
+
+    def candidates(self, edge):
+        bb = edge.BoundBox
+        columns = self.cellRange(bb.XMin, bb.XMax)
+        rows = self.cellRange(bb.YMin, bb.YMax)
+        if len(columns) * len(rows) > len(self.boxes):
+            # a long edge, checking all tags is cheaper than looking at all the cells it covers
+            boxes = self.boxes
+        else:
+            boxes = [box for x in columns for y in rows for box in self.cells.get((x, y), [])]
+        return sorted(set(i for (i, xmin, xmax, ymin, ymax, zmin, zmax) in boxes if xmin <= bb.XMax and bb.XMin <= xmax and ymin <= bb.YMax and bb.YMin <= ymax and zmin <= bb.ZMax and bb.ZMin <= zmax))
+
+
 class MapWireToTag:
     def __init__(self, edge, tag, i, segm, maxZ):
         debugEdge(edge, 'MapWireToTag(%.2f, %.2f, %.2f)' % (i.x, i.y, i.z))
@@ -313,9 +367,9 @@ class MapWireToTag:
         self.edges = []
         self.entry = i
         if tail:
-            PathLog.debug("MapWireToTag(%s - %s)" % (i, tail.valueAt(tail.FirstParameter)))
+            PathLog.debug("MapWireToTag(%s - %s)", i, tail.valueAt(tail.FirstParameter))
         else:
-            PathLog.debug("MapWireToTag(%s - )" % i)
+            PathLog.debug("MapWireToTag(%s - )", i)
         self.complete = False
         self.haveProblem = False
 
@@ -416,7 +470,7 @@ class MapWireToTag:
         return edges
 
     def orderAndFlipEdges(self, edges):
-        PathLog.track("entry(%.2f, %.2f, %.2f), exit(%.2f, %.2f, %.2f)" % (self.entry.x, self.entry.y, self.entry.z, self.exit.x, self.exit.y, self.exit.z))
+        PathLog.track(self.entry, self.exit)
         self.edgesOrder = []
         outputEdges = []
         p0 = self.entry
@@ -453,9 +507,9 @@ class MapWireToTag:
                     debugEdge(e, '    ', False)
                 raise ValueError("No connection to %s" % (p0))
             elif lastP:
-                PathLog.debug("xxxxxx (%.2f, %.2f, %.2f) (%.2f, %.2f, %.2f)" % (p0.x, p0.y, p0.z, lastP.x, lastP.y, lastP.z))
+                PathLog.debug("xxxxxx (%.2f, %.2f, %.2f) (%.2f, %.2f, %.2f)", p0.x, p0.y, p0.z, lastP.x, lastP.y, lastP.z)
             else:
-                PathLog.debug("xxxxxx (%.2f, %.2f, %.2f) -" % (p0.x, p0.y, p0.z))
+                PathLog.debug("xxxxxx (%.2f, %.2f, %.2f) -", p0.x, p0.y, p0.z)
             lastP = p0
         PathLog.track("-")
         return outputEdges
@@ -508,7 +562,7 @@ class MapWireToTag:
                     rapid = None
                 return commands
             except Exception as e:
-                PathLog.error("Exception during processing tag @(%.2f, %.2f) (%s) - disabling the tag" % (self.tag.x, self.tag.y, e.args[0]))
+                PathLog.error("Exception during processing tag @(%.2f, %.2f) (%s) - disabling the tag", self.tag.x, self.tag.y, e.args[0])
                 self.tag.enabled = False
                 commands = []
                 for e in self.edges:
@@ -621,7 +675,7 @@ class PathData:
         startIndex = 0
         for i in range(0, len(self.baseWire.Edges)):
             edge = self.baseWire.Edges[i]
-            PathLog.debug('  %d: %.2f' % (i, edge.Length))
+            PathLog.debug('  %d: %.2f', i, edge.Length)
             if edge.Length == longestEdge.Length:
                 startIndex = i
                 break
@@ -636,10 +690,10 @@ class PathData:
 
         minLength = min(2. * W, longestEdge.Length)
 
-        PathLog.debug("length=%.2f shortestEdge=%.2f(%.2f) longestEdge=%.2f(%.2f) minLength=%.2f" % (self.baseWire.Length, shortestEdge.Length, shortestEdge.Length/self.baseWire.Length, longestEdge.Length, longestEdge.Length / self.baseWire.Length, minLength))
-        PathLog.debug("   start: index=%-2d count=%d (length=%.2f, distance=%.2f)" % (startIndex, startCount, startEdge.Length, tagDistance))
-        PathLog.debug("               -> lastTagLength=%.2f)" % lastTagLength)
-        PathLog.debug("               -> currentLength=%.2f)" % currentLength)
+        PathLog.debug("length=%.2f shortestEdge=%.2f(%.2f) longestEdge=%.2f(%.2f) minLength=%.2f", self.baseWire.Length, shortestEdge.Length, shortestEdge.Length/self.baseWire.Length, longestEdge.Length, longestEdge.Length / self.baseWire.Length, minLength)
+        PathLog.debug("   start: index=%-2d count=%d (length=%.2f, distance=%.2f)", startIndex, startCount, startEdge.Length, tagDistance)
+        PathLog.debug("               -> lastTagLength=%.2f)", lastTagLength)
+        PathLog.debug("               -> currentLength=%.2f)", currentLength)
 
         edgeDict = { startIndex: startCount }
 
@@ -654,7 +708,7 @@ class PathData:
 
         for (i, count) in edgeDict.iteritems():
             edge = self.baseWire.Edges[i]
-            PathLog.debug(" %d: %d" % (i, count))
+            PathLog.debug(" %d: %d", i, count)
             #debugMarker(edge.Vertexes[0].Point, 'base', (1.0, 0.0, 0.0), 0.2)
             #debugMarker(edge.Vertexes[1].Point, 'base', (0.0, 1.0, 0.0), 0.2)
             if 0 != count:
@@ -673,10 +727,10 @@ class PathData:
                 tagCount += 1
                 lastTagLength += tagDistance
             if tagCount > 0:
-                PathLog.debug("      index=%d -> count=%d" % (index, tagCount))
+                PathLog.debug("      index=%d -> count=%d", index, tagCount)
                 edgeDict[index] = tagCount
         else:
-            PathLog.debug("      skipping=%-2d (%.2f)" % (index, edge.Length))
+            PathLog.debug("      skipping=%-2d (%.2f)", index, edge.Length)
 
         return (currentLength, lastTagLength)
 
@@ -709,7 +763,7 @@ class PathData:
                 ordered.append(t)
         # disable all tags that are not on the base wire.
         for tag in tags:
-            PathLog.notice("Tag #%d not on base wire - disabling\n" % len(ordered))
+            PathLog.notice("Tag #%d not on base wire - disabling\n", len(ordered))
             tag.enabled = False
             ordered.append(tag)
         return ordered
@@ -774,6 +828,7 @@ class ObjectDressup:
                 return False
         return True
 
+    @PathLog.profile
     def createPath(self, obj, pathData, tags):
         PathLog.track()
         commands = []
@@ -794,8 +849,13 @@ class ObjectDressup:
         self.mappers = []
         mapper = None
 
+        # only the tags whose bounding box an edge overlaps are checked for intersections with it
+        tagIndex = TagIndex(tags)
+        candidates = []
+        candidatesEdge = None
+
         while edge or lastEdge < len(pathData.edges):
-            PathLog.debug("------- lastEdge = %d/%d.%d/%d" % (lastEdge, lastTag, t, len(tags)))
+            PathLog.debug("------- lastEdge = %d/%d.%d/%d", lastEdge, lastTag, t, len(tags))
             if not edge:
                 edge = pathData.edges[lastEdge]
                 debugEdge(edge, "=======  new edge: %d/%d" % (lastEdge, len(pathData.edges)))
@@ -812,13 +872,25 @@ class ObjectDressup:
                     edge = None
 
             if edge:
-                tIndex = (t + lastTag) % len(tags)
-                t += 1
-                i = tags[tIndex].intersects(edge, edge.FirstParameter)
-                if i and self.isValidTagStartIntersection(edge, i):
-                    mapper = MapWireToTag(edge, tags[tIndex], i, segm, pathData.maxZ)
-                    self.mappers.append(mapper)
-                    edge = mapper.tail
+                if candidatesEdge is not edge:
+                    candidatesEdge = edge
+                    candidates = sorted((c - lastTag) % len(tags) for c in tagIndex.candidates(edge))
+                if t < len(tags):
+                    # skip all tags up to the next candidate
+                    c = bisect.bisect_left(candidates, t)
+                    check = c < len(candidates)
+                    t = candidates[c] if check else len(tags)
+                else:
+                    # the tail of a mapped edge is checked once more, against the tag at t modulo the tag count
+                    check = t % len(tags) in candidates
+                if check:
+                    tIndex = (t + lastTag) % len(tags)
+                    t += 1
+                    i = tags[tIndex].intersects(edge, edge.FirstParameter)
+                    if i and self.isValidTagStartIntersection(edge, i):
+                        mapper = MapWireToTag(edge, tags[tIndex], i, segm, pathData.maxZ)
+                        self.mappers.append(mapper)
+                        edge = mapper.tail
 
 
             if not mapper and t >= len(tags):
@@ -885,20 +957,20 @@ class ObjectDressup:
             if tag.enabled:
                 if prev:
                     if prev.solid.common(tag.solid).Faces:
-                        PathLog.notice("Tag #%d intersects with previous tag - disabling\n" % i)
-                        PathLog.debug("this tag = %d [%s]" % (i, tag.solid.BoundBox))
+                        PathLog.notice("Tag #%d intersects with previous tag - disabling\n", i)
+                        PathLog.debug("this tag = %d [%s]", i, tag.solid.BoundBox)
                         tag.enabled = False
                 elif self.pathData.edges:
                     e = self.pathData.edges[0]
                     p0 = e.valueAt(e.FirstParameter)
                     p1 = e.valueAt(e.LastParameter)
                     if tag.solid.isInside(p0, PathGeom.Tolerance, True) or tag.solid.isInside(p1, PathGeom.Tolerance, True):
-                        PathLog.notice("Tag #%d intersects with starting point - disabling\n" % i)
+                        PathLog.notice("Tag #%d intersects with starting point - disabling\n", i)
                         tag.enabled = False
 
             if tag.enabled:
                 prev = tag
-                PathLog.debug("previousTag = %d [%s]" % (i, prev))
+                PathLog.debug("previousTag = %d [%s]", i, prev)
             else:
                 disabled.append(i)
             tag.id = i # assigne final id
@@ -933,7 +1005,7 @@ class ObjectDressup:
         if hasattr(obj, "Positions"):
             self.tags, positions, disabled = self.createTagsPositionDisabled(obj, obj.Positions, obj.Disabled)
             if obj.Disabled != disabled:
-                PathLog.debug("Updating properties.... %s vs. %s" % (obj.Disabled, disabled))
+                PathLog.debug("Updating properties.... %s vs. %s", obj.Disabled, disabled)
                 obj.Positions = positions
                 obj.Disabled = disabled
 
@@ -945,7 +1017,7 @@ class ObjectDressup:
         try:
             self.processTags(obj)
         except Exception as e:
-            PathLog.error("processing tags failed clearing all tags ... '%s'" % (e.args[0]))
+            PathLog.error("processing tags failed clearing all tags ... '%s'", e.args[0])
             obj.Path = obj.Base.Path
 
         # update disabled in case there are some additional ones
@@ -963,7 +1035,7 @@ class ObjectDressup:
             for tag in self.tags:
                 tagID += 1
                 if tag.enabled:
-                    PathLog.debug("x=%s, y=%s, z=%s" % (tag.x, tag.y, self.pathData.minZ))
+                    PathLog.debug("x=%s, y=%s, z=%s", tag.x, tag.y, self.pathData.minZ)
                     #debugMarker(FreeCAD.Vector(tag.x, tag.y, self.pathData.minZ), "tag-%02d" % tagID , (1.0, 0.0, 1.0), 0.5)
                     #if tag.angle != 90:
                     #    debugCone(tag.originAt(self.pathData.minZ), tag.r1, tag.r2, tag.actualHeight, "tag-%02d" % tagID)
@@ -111,7 +111,7 @@ class ObjectDressup:
                     projectionlen = plungelen * math.tan(math.radians(rampangle))  # length of the forthcoming ramp projected to XY plane
                     if self.method == 'RampMethod3':
                         projectionlen = projectionlen / 2
-                    PathLog.debug("Found plunge move at X:{} Y:{} From Z:{} to Z{}, length of ramp: {}".format(p0.x, p0.y, p0.z, p1.z, projectionlen))
+                    PathLog.debug("Found plunge move at X:%s Y:%s From Z:%s to Z%s, length of ramp: %s", p0.x, p0.y, p0.z, p1.z, projectionlen)
                     # next need to determine how many edges in the path after
                     # plunge are needed to cover the length:
                     covered = False
@@ -147,7 +147,7 @@ class ObjectDressup:
                                     rampangle = math.degrees(math.atan(l / (plungelen / 2)))
                                 else:
                                     rampangle = math.degrees(math.atan(l / plungelen))
-                                PathLog.warning("Cannot cover with desired angle, tightening angle to: {}".format(rampangle))
+                                PathLog.warning("Cannot cover with desired angle, tightening angle to: %s", rampangle)
 
                         # PathLog.debug("Doing ramp to edges: {}".format(rampedges))
                         if self.method == 'RampMethod1':
@@ -186,7 +186,7 @@ class ObjectDressup:
                 p1 = edge.Vertexes[1].Point
                 if bb.XLength < 1e-6 and bb.YLength < 1e-6 and bb.ZLength > 0 and p0.z > p1.z:
                     # plungelen = abs(p0.z-p1.z)
-                    PathLog.debug("Found plunge move at X:{} Y:{} From Z:{} to Z{}, Searching for closed loop".format(p0.x, p0.y, p0.z, p1.z))
+                    PathLog.debug("Found plunge move at X:%s Y:%s From Z:%s to Z%s, Searching for closed loop", p0.x, p0.y, p0.z, p1.z)
                     # next need to determine how many edges in the path after plunge are needed to cover the length:
                     loopFound = False
                     rampedges = []
@@ -311,8 +311,8 @@ class ObjectDressup:
                     # will reach end of ramp within this edge, needs to be splitted
                     p1 = self.getSplitPoint(redge, rampremaining)
                     splitEdge = PathGeom.splitEdgeAt(redge, p1)
-                    PathLog.debug("Ramp remaining: {}".format(rampremaining))
-                    PathLog.debug("Got split edge (index: {}) (total len: {}) with lengths: {}, {}".format(i, redge.Length, splitEdge[0].Length, splitEdge[1].Length))
+                    PathLog.debug("Ramp remaining: %s", rampremaining)
+                    PathLog.debug("Got split edge (index: %s) (total len: %s) with lengths: %s, %s", i, redge.Length, splitEdge[0].Length, splitEdge[1].Length)
                     # ramp ends to the last point of first edge
                     p1 = splitEdge[0].valueAt(splitEdge[0].LastParameter)
                     outedges.append(self.createRampEdge(splitEdge[0], curPoint, p1))
@@ -377,7 +377,7 @@ class ObjectDressup:
                     # will reach end of ramp within this edge, needs to be splitted
                     p1 = self.getSplitPoint(redge, rampremaining)
                     splitEdge = PathGeom.splitEdgeAt(redge, p1)
-                    PathLog.debug("Got split edge (index: {}) with lengths: {}, {}".format(i, splitEdge[0].Length, splitEdge[1].Length))
+                    PathLog.debug("Got split edge (index: %s) with lengths: %s, %s", i, splitEdge[0].Length, splitEdge[1].Length)
                     # ramp ends to the last point of first edge
                     p1 = splitEdge[0].valueAt(splitEdge[0].LastParameter)
                     deltaZ = splitEdge[0].Length / math.tan(math.radians(rampangle))
@@ -444,7 +444,7 @@ class ObjectDressup:
                     # this edge needs to be splitted
                     p1 = self.getSplitPoint(redge, rampremaining)
                     splitEdge = PathGeom.splitEdgeAt(redge, p1)
-                    PathLog.debug("Got split edges with lengths: {}, {}".format(splitEdge[0].Length, splitEdge[1].Length))
+                    PathLog.debug("Got split edges with lengths: %s, %s", splitEdge[0].Length, splitEdge[1].Length)
                     # ramp starts at the last point of first edge
                     p1 = splitEdge[0].valueAt(splitEdge[0].LastParameter)
                     p1.z = p0.z
@@ -148,6 +148,7 @@ class PathGeom:
         return Vector(point.x, point.y, 0)
 
     @classmethod
+    @PathLog.profile
     def cmdsForEdge(cls, edge, flip = False, useHelixForBSpline = True, segm = 50):
         """(edge, flip=False, useHelixForBSpline=True, segm=50) -> List(Path.Command)
         Returns a list of Path.Command representing the given edge.
@@ -173,7 +174,7 @@ class PathGeom:
                 else:
                     cmd = 'G3' if not flip else 'G2'
                 pd = Part.Circle(PathGeom.xy(p1), PathGeom.xy(p2), PathGeom.xy(p3)).Center
-                PathLog.info("**** %s.%d: (%.2f, %.2f, %.2f) - (%.2f, %.2f, %.2f) - (%.2f, %.2f, %.2f) -> center=(%.2f, %.2f)" % (cmd, flip, p1.x, p1.y, p1.z, p2.x, p2.y, p2.z, p3.x, p3.y, p3.z, pd.x, pd.y))
+                PathLog.info("**** %s.%d: (%.2f, %.2f, %.2f) - (%.2f, %.2f, %.2f) - (%.2f, %.2f, %.2f) -> center=(%.2f, %.2f)", cmd, flip, p1.x, p1.y, p1.z, p2.x, p2.y, p2.z, p3.x, p3.y, p3.z, pd.x, pd.y)
 
                 # Have to calculate the center in the XY plane, using pd leads to an error if this is a helix
                 pa = PathGeom.xy(p1)
@@ -181,9 +182,9 @@ class PathGeom:
                 pc = PathGeom.xy(p3)
                 offset = Part.Circle(pa, pb, pc).Center - pa
 
-                PathLog.debug("**** (%.2f, %.2f, %.2f) - (%.2f, %.2f, %.2f)" % (pa.x, pa.y, pa.z, pc.x, pc.y, pc.z))
-                PathLog.debug("**** (%.2f, %.2f, %.2f) - (%.2f, %.2f, %.2f)" % (pb.x, pb.y, pb.z, pd.x, pd.y, pd.z))
-                PathLog.debug("**** (%.2f, %.2f, %.2f)" % (offset.x, offset.y, offset.z))
+                PathLog.debug("**** (%.2f, %.2f, %.2f) - (%.2f, %.2f, %.2f)", pa.x, pa.y, pa.z, pc.x, pc.y, pc.z)
+                PathLog.debug("**** (%.2f, %.2f, %.2f) - (%.2f, %.2f, %.2f)", pb.x, pb.y, pb.z, pd.x, pd.y, pd.z)
+                PathLog.debug("**** (%.2f, %.2f, %.2f)", offset.x, offset.y, offset.z)
 
                 params.update({'I': offset.x, 'J': offset.y, 'K': (p3.z - p1.z)/2})
                 commands = [ Path.Command(cmd, params) ]
@@ -213,6 +214,7 @@ class PathGeom:
         return commands
 
     @classmethod
+    @PathLog.profile
     def edgeForCmd(cls, cmd, startPoint):
         """(cmd, startPoint).
         Returns an Edge representing the given command, assuming a given startPoint."""
@@ -230,7 +232,7 @@ class PathGeom:
             d = -B.x * A.y + B.y * A.x
 
             if cls.isRoughly(d, 0, 0.005):
-                PathLog.info("Half circle arc at: (%.2f, %.2f, %.2f)" % (center.x, center.y, center.z))
+                PathLog.info("Half circle arc at: (%.2f, %.2f, %.2f)", center.x, center.y, center.z)
                 # we're dealing with half a circle here
                 angle = cls.getAngle(A) + math.pi/2
                 if cmd.Name in cls.CmdMoveCW:
@@ -238,15 +240,15 @@ class PathGeom:
             else:
                 C = A + B
                 angle = cls.getAngle(C)
-                PathLog.info("Arc (%8f) at: (%.2f, %.2f, %.2f) -> angle=%f" % (d, center.x, center.y, center.z, angle / math.pi))
+                PathLog.info("Arc (%8f) at: (%.2f, %.2f, %.2f) -> angle=%f", d, center.x, center.y, center.z, angle / math.pi)
 
             R = A.Length
-            PathLog.debug("arc: p1=(%.2f, %.2f) p2=(%.2f, %.2f) -> center=(%.2f, %.2f)" % (startPoint.x, startPoint.y, endPoint.x, endPoint.y, center.x, center.y))
-            PathLog.debug("arc: A=(%.2f, %.2f) B=(%.2f, %.2f) -> d=%.2f" % (A.x, A.y, B.x, B.y, d))
-            PathLog.debug("arc: R=%.2f angle=%.2f" % (R, angle/math.pi))
+            PathLog.debug("arc: p1=(%.2f, %.2f) p2=(%.2f, %.2f) -> center=(%.2f, %.2f)", startPoint.x, startPoint.y, endPoint.x, endPoint.y, center.x, center.y)
+            PathLog.debug("arc: A=(%.2f, %.2f) B=(%.2f, %.2f) -> d=%.2f", A.x, A.y, B.x, B.y, d)
+            PathLog.debug("arc: R=%.2f angle=%.2f", R, angle/math.pi)
             if cls.isRoughly(startPoint.z, endPoint.z):
                 midPoint = center + Vector(math.cos(angle), math.sin(angle), 0) * R
-                PathLog.debug("arc: (%.2f, %.2f) -> (%.2f, %.2f) -> (%.2f, %.2f)" % (startPoint.x, startPoint.y, midPoint.x, midPoint.y, endPoint.x, endPoint.y))
+                PathLog.debug("arc: (%.2f, %.2f) -> (%.2f, %.2f) -> (%.2f, %.2f)", startPoint.x, startPoint.y, midPoint.x, midPoint.y, endPoint.x, endPoint.y)
                 return Part.Edge(Part.Arc(startPoint, midPoint, endPoint))
 
             # It's a Helix
@@ -0,0 +1,415 @@
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *                                                                         *
+# *   Copyright (c) 2026 agent <agent@local>                                *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+
+
+import FreeCAD
+import math
+import numpy
+
+import PathScripts.PathLog as PathLog
+import PathScripts.PathUtil as PathUtil
+
+__title__ = "Path Heightmap"
+__author__ = "agent"
+__url__ = "http://www.freecadweb.org"
+__doc__ = "Approximate stock removal simulation on a Z heightmap of the stock."
+
+#PathLog.setLevel(PathLog.Level.DEBUG, PathLog.thisModule())
+
+
+class ToolShape(object):
+    """Lower outline of a Path.Tool, the height of its cutting surface above the tip as a function
+    of the distance to the tool axis. Flat and bull nose end mills, ball end mills and cone shaped
+    tools are supported, for the latter CuttingEdgeAngle is the included angle of the cone and
+    FlatRadius the radius of a flat tip."""
+
+    Cones = ['Drill', 'CenterDrill', 'CounterSink', 'Chamfer', 'Engraver']
+
+    def __init__(self, tool):
+        self.radius = max(tool.Diameter / 2.0, 0.0)
+        self.toolType = str(tool.ToolType)
+        self.angle = tool.CuttingEdgeAngle
+        self.flatRadius = min(max(tool.FlatRadius, 0.0), self.radius)
+        if self.toolType == 'BallEndMill':
+            self.cornerRadius = self.radius
+        else:
+            self.cornerRadius = min(max(tool.CornerRadius, 0.0), self.radius)
+        self.cone = self.toolType in self.Cones and 0 < self.angle < 180
+
+    def key(self):
+        return (self.toolType, self.radius, self.angle, self.flatRadius, self.cornerRadius)
+
+    def heights(self, r, reach=None):
+        """heights(r, reach=None) ... heights of the cutting surface at the distances r of the axis,
+        infinite beyond reach, which defaults to the tool radius"""
+        r = numpy.asarray(r, dtype=float)
+        if reach is None:
+            reach = self.radius
+        rr = numpy.minimum(r, self.radius)
+        if self.cone:
+            h = numpy.maximum(rr - self.flatRadius, 0.0) / math.tan(math.radians(self.angle) / 2)
+        elif self.cornerRadius > 0:
+            c = self.cornerRadius
+            dr = numpy.clip(rr - (self.radius - c), 0.0, c)
+            h = c - numpy.sqrt(c * c - dr * dr)
+        else:
+            h = numpy.zeros(r.shape)
+        return numpy.where(r <= reach, h, numpy.inf)
+
+
+class Heightmap(object):
+    """Z heightmap over the XY area of the stock.
+    Every cell holds the height of the stock's top at its center, the stock is cut by lowering
+    the cells to the lower envelope of the tool moved along a path. This is exact for tools which
+    move along the cells of the map, the resolution limits the accuracy otherwise.
+    If the heights of the part are set with setModel() the cells cut below the part are gouges."""
+
+    def __init__(self, xmin, ymin, xmax, ymax, zmin, zmax, resolution):
+        self.resolution = float(resolution)
+        self.xmin = xmin
+        self.ymin = ymin
+        self.zmin = zmin
+        self.zmax = zmax
+        self.nx = max(int(math.ceil((xmax - xmin) / self.resolution)), 1)
+        self.ny = max(int(math.ceil((ymax - ymin) / self.resolution)), 1)
+        self.xs = xmin + (numpy.arange(self.nx) + 0.5) * self.resolution
+        self.ys = ymin + (numpy.arange(self.ny) + 0.5) * self.resolution
+        self.heights = numpy.empty((self.ny, self.nx))
+        self.heights.fill(zmax)
+        self.model = None
+
+    @classmethod
+    def fromBoundBox(cls, bb, resolution=None, cells=250000):
+        '''fromBoundBox(bb, resolution=None, cells=250000) ... heightmap over the bounding box bb,
+        if resolution is not given it is chosen for about the given number of cells'''
+        if resolution is None:
+            resolution = max(math.sqrt(bb.XLength * bb.YLength / cells), max(bb.XLength, bb.YLength) / cells, 1e-3)
+        return cls(bb.XMin, bb.YMin, bb.XMax, bb.YMax, bb.ZMin, bb.ZMax, resolution)
+
+    def cellArea(self):
+        return self.resolution * self.resolution
+
+    def window(self, xlo, xhi, ylo, yhi):
+        """the index slices of all cells whose centers are within the given rectangle, None if there are none"""
+        i0 = max(int(math.ceil((xlo - self.xmin) / self.resolution - 0.5)), 0)
+        i1 = min(int(math.floor((xhi - self.xmin) / self.resolution - 0.5)) + 1, self.nx)
+        j0 = max(int(math.ceil((ylo - self.ymin) / self.resolution - 0.5)), 0)
+        j1 = min(int(math.floor((yhi - self.ymin) / self.resolution - 0.5)) + 1, self.ny)
+        if i0 >= i1 or j0 >= j1:
+            return None
+        return (slice(j0, j1), slice(i0, i1))
+
+    def setModel(self, shape, deflection=None):
+        '''setModel(shape, deflection=None) ... set the heights of the top of shape at the cell centers,
+        the shape is tessellated with the given deflection, half the resolution by default'''
+        self.model = numpy.empty((self.ny, self.nx))
+        self.model.fill(-numpy.inf)
+        points, triangles = shape.tessellate(deflection or self.resolution / 2)
+        if not triangles:
+            return
+        points = numpy.array([(p.x, p.y, p.z) for p in points])
+        triangles = numpy.array(triangles, dtype=int)
+        for a, b, c in points[triangles]:
+            self.addModelTriangle(a, b, c)
+
+    def addModelTriangle(self, a, b, c):
+        area = (b[0] - a[0]) * (c[1] - a[1]) - (c[0] - a[0]) * (b[1] - a[1])
+        if abs(area) < 1e-12:
+            # vertical faces don't change the top
+            return
+        window = self.window(min(a[0], b[0], c[0]), max(a[0], b[0], c[0]), min(a[1], b[1], c[1]), max(a[1], b[1], c[1]))
+        if window is None:
+            return
+        x = self.xs[window[1]][numpy.newaxis, :]
+        y = self.ys[window[0]][:, numpy.newaxis]
+        # barycentric coordinates of the cell centers
+        wa = ((b[0] - x) * (c[1] - y) - (c[0] - x) * (b[1] - y)) / area
+        wb = ((c[0] - x) * (a[1] - y) - (a[0] - x) * (c[1] - y)) / area
+        wc = 1.0 - wa - wb
+        eps = -1e-9
+        inside = (wa >= eps) & (wb >= eps) & (wc >= eps)
+        z = numpy.where(inside, wa * a[2] + wb * b[2] + wc * c[2], -numpy.inf)
+        self.model[window] = numpy.maximum(self.model[window], z)
+
+    def cut(self, window, heights):
+        """lower the cells of window to heights, returns the removed volume"""
+        old = self.heights[window]
+        new = numpy.maximum(numpy.minimum(old, heights), self.zmin)
+        removed = float((old - new).sum()) * self.cellArea()
+        self.heights[window] = new
+        return removed
+
+    def cutAt(self, x, y, z, tool):
+        """cut the stock with the tool's tip at (x, y, z), returns the removed volume"""
+        reach = max(tool.radius, self.resolution / 2)
+        window = self.window(x - reach, x + reach, y - reach, y + reach)
+        if window is None:
+            return 0.0
+        dx = self.xs[window[1]][numpy.newaxis, :] - x
+        dy = self.ys[window[0]][:, numpy.newaxis] - y
+        return self.cut(window, z + tool.heights(numpy.hypot(dx, dy), reach))
+
+    def cutLine(self, p0, p1, tool):
+        """cut the stock along the straight move of the tool's tip from p0 to p1, returns the removed volume.
+        Horizontal moves are swept exactly, all other moves are approximated by placing the tool at
+        points along the move which are at most half a cell apart in XY."""
+        reach = max(tool.radius, self.resolution / 2)
+        dx = p1.x - p0.x
+        dy = p1.y - p0.y
+        dz = p1.z - p0.z
+        length = math.hypot(dx, dy)
+        if abs(dz) > 1e-9:
+            if length < 1e-9:
+                return self.cutAt(p0.x, p0.y, min(p0.z, p1.z), tool)
+            steps = int(math.ceil(length / (self.resolution / 2)))
+            removed = 0.0
+            for k in range(steps + 1):
+                t = float(k) / steps
+                removed += self.cutAt(p0.x + t * dx, p0.y + t * dy, p0.z + t * dz, tool)
+            return removed
+
+        # long moves are split, thus the windows don't cover much more than the sweep
+        pieces = max(int(math.ceil(length / (8 * reach + 32 * self.resolution))), 1)
+        removed = 0.0
+        for k in range(pieces):
+            ax = p0.x + dx * k / pieces
+            ay = p0.y + dy * k / pieces
+            bx = p0.x + dx * (k + 1) / pieces
+            by = p0.y + dy * (k + 1) / pieces
+            window = self.window(min(ax, bx) - reach, max(ax, bx) + reach, min(ay, by) - reach, max(ay, by) + reach)
+            if window is None:
+                continue
+            x = self.xs[window[1]][numpy.newaxis, :] - ax
+            y = self.ys[window[0]][:, numpy.newaxis] - ay
+            ux = bx - ax
+            uy = by - ay
+            ll = ux * ux + uy * uy
+            if ll > 0:
+                t = numpy.clip((x * ux + y * uy) / ll, 0.0, 1.0)
+            else:
+                t = 0.0
+            removed += self.cut(window, p0.z + tool.heights(numpy.hypot(x - t * ux, y - t * uy), reach))
+        return removed
+
+    def cutArc(self, p0, p1, center, clockwise, tool):
+        """cut the stock along an arc or helix in the XY plane around center, returns the removed volume.
+        The arc is split into straight moves which deviate less than a quarter of a cell from it."""
+        r = math.hypot(p0.x - center.x, p0.y - center.y)
+        a0 = math.atan2(p0.y - center.y, p0.x - center.x)
+        a1 = math.atan2(p1.y - center.y, p1.x - center.x)
+        sweep = a1 - a0
+        if clockwise:
+            if sweep >= -1e-9:
+                sweep -= 2 * math.pi
+        elif sweep <= 1e-9:
+            sweep += 2 * math.pi
+        tolerance = self.resolution / 4
+        if r > tolerance:
+            step = 2 * math.acos(1 - tolerance / r)
+        else:
+            step = math.pi / 2
+        segments = max(int(math.ceil(abs(sweep) / step)), 1)
+        removed = 0.0
+        last = p0
+        for k in range(1, segments + 1):
+            if k == segments:
+                p = p1
+            else:
+                a = a0 + sweep * k / segments
+                p = FreeCAD.Vector(center.x + r * math.cos(a), center.y + r * math.sin(a), p0.z + (p1.z - p0.z) * k / segments)
+            removed += self.cutLine(last, p, tool)
+            last = p
+        return removed
+
+    def gouges(self, tolerance=0.0):
+        """depth of the gouges, the part's height above the stock's top if it's more than tolerance,
+        0 otherwise. Requires the model heights."""
+        depth = self.model - self.heights
+        return numpy.where(depth > tolerance, depth, 0.0)
+
+    def remaining(self):
+        """height of the stock left above the part, or above the bottom of the stock where there is no part"""
+        if self.model is None:
+            return self.heights - self.zmin
+        return numpy.maximum(self.heights - numpy.maximum(self.model, self.zmin), 0.0)
+
+    def mesh(self, mask=None):
+        """mesh(mask=None) ... vertices and facets of the stock's top, the vertices are the cell
+        centers at their height, as (n, 3) array, the facets are (m, 3) index arrays of the
+        triangles between them. If mask is given only cells where it's True are meshed."""
+        x, y = numpy.meshgrid(self.xs, self.ys)
+        vertices = numpy.column_stack((x.ravel(), y.ravel(), self.heights.ravel()))
+        index = numpy.arange(self.nx * self.ny).reshape(self.ny, self.nx)
+        quads = numpy.ones((self.ny - 1, self.nx - 1), dtype=bool)
+        if mask is not None:
+            quads = mask[:-1, :-1] & mask[1:, :-1] & mask[:-1, 1:] & mask[1:, 1:]
+        a = index[:-1, :-1][quads]
+        b = index[:-1, 1:][quads]
+        c = index[1:, 1:][quads]
+        d = index[1:, :-1][quads]
+        facets = numpy.concatenate((numpy.column_stack((a, b, c)), numpy.column_stack((a, c, d))))
+        return vertices, facets
+
+
+def toMesh(vertices, facets):
+    '''toMesh(vertices, facets) ... Mesh.Mesh of the triangles of facets'''
+    import Mesh
+    return Mesh.Mesh([FreeCAD.Vector(x, y, z) for x, y, z in vertices[facets].reshape(-1, 3).tolist()])
+
+
+class OperationResult(object):
+    """Outcome of simulating one operation: the removed volume, the cells it gouged, which weren't
+    gouged before, as boolean array and the tool positions of rapid moves which cut the stock."""
+
+    def __init__(self, name):
+        self.name = name
+        self.removed = 0.0
+        self.gouged = None
+        self.rapidCuts = []
+
+    def hasGouges(self):
+        return self.gouged is not None and bool(self.gouged.any())
+
+
+def isStock(obj):
+    '''isStock(obj) ... True if obj is a stock object of PathStock, which can't be imported without the GUI'''
+    return hasattr(obj, 'Shape') and all(hasattr(obj, p) for p in ['Length_Allowance', 'Width_Allowance', 'Height_Allowance'])
+
+
+def jobStockBoundBox(job):
+    '''jobStockBoundBox(job) ... bounding box of the stock of job, the stock is searched in the group of job
+    and then among the stocks of the job's base object. The bounding box of the base object if there is
+    no stock, None if there is no base object either.'''
+    stock = [o for o in job.Group if isStock(o)]
+    if not stock and job.Base:
+        stock = [o for o in job.Base.InList if isStock(o) and o.Base == job.Base]
+    if stock:
+        return stock[0].Shape.BoundBox
+    if job.Base and hasattr(job.Base, 'Shape'):
+        return job.Base.Shape.BoundBox
+    return None
+
+
+class StockSimulator(object):
+    """Simulation of the stock removal of a sequence of operations on a Heightmap.
+    The heightmap before every operation is kept, if the operations are simulated again only the
+    ones from the first changed operation on are cut again."""
+
+    Rapids = ['G0', 'G00']
+    Moves = ['G1', 'G01']
+    Arcs = {'G2': True, 'G02': True, 'G3': False, 'G03': False}
+    Drills = ['G73', 'G81', 'G82', 'G83']
+
+    def __init__(self, heightmap, tolerance=0.01):
+        self.heightmap = heightmap
+        self.tolerance = tolerance
+        self.steps = []
+
+    @classmethod
+    def fromJob(cls, job, resolution=None, tolerance=0.01, stock=None):
+        '''fromJob(job, resolution=None, tolerance=0.01, stock=None) ... simulator with the part of job
+        as model over the bounding box stock, by default the bounding box of the stock of job'''
+        if stock is None:
+            stock = jobStockBoundBox(job)
+        if stock is None:
+            raise ValueError("job %s has neither a stock nor a base object" % job.Label)
+        heightmap = Heightmap.fromBoundBox(stock, resolution)
+        if job.Base and hasattr(job.Base, 'Shape'):
+            heightmap.setModel(job.Base.Shape)
+        return cls(heightmap, tolerance)
+
+    def operationKey(self, op, tool):
+        return (op.Name, tool.key(), op.Path.toGCode())
+
+    def simulate(self, operations):
+        '''simulate(operations) ... cut the stock with the (operation, ToolShape) pairs and
+        return their OperationResults, operations unchanged since the last call are not cut again'''
+        keys = [self.operationKey(op, tool) for op, tool in operations]
+        start = 0
+        while start < min(len(keys), len(self.steps)) and self.steps[start][0] == keys[start]:
+            start += 1
+        if start < len(self.steps):
+            self.heightmap.heights = self.steps[start][1]
+            del self.steps[start:]
+        position = self.steps[-1][2] if self.steps else None
+        for (op, tool), key in zip(operations[start:], keys[start:]):
+            before = self.heightmap.heights.copy()
+            result = OperationResult(op.Name)
+            position = self.cutCommands(op.Path.Commands, tool, result, position)
+            if self.heightmap.model is not None:
+                gouged = self.heightmap.gouges(self.tolerance) > 0
+                result.gouged = gouged & ~(self.heightmap.model - before > self.tolerance)
+            PathLog.debug("%s: removed %.2f", op.Name, result.removed)
+            self.steps.append((key, before, position, result))
+        return [step[3] for step in self.steps]
+
+    def cutCommands(self, commands, tool, result, position=None):
+        '''cutCommands(commands, tool, result, position=None) ... cut the stock along commands,
+        starting at position, and return the position of the tool after them. If position is None
+        the first move just positions the tool.'''
+        heightmap = self.heightmap
+        minRemoved = self.tolerance * heightmap.cellArea()
+        for cmd in commands:
+            name = cmd.Name
+            if name in self.Rapids or name in self.Moves or name in self.Arcs:
+                params = cmd.Parameters
+                if position is None:
+                    position = FreeCAD.Vector(params.get('X', 0), params.get('Y', 0), params.get('Z', heightmap.zmax))
+                    continue
+                p = FreeCAD.Vector(params.get('X', position.x), params.get('Y', position.y), params.get('Z', position.z))
+                if name in self.Arcs:
+                    center = FreeCAD.Vector(position.x + params.get('I', 0), position.y + params.get('J', 0), position.z)
+                    removed = heightmap.cutArc(position, p, center, self.Arcs[name], tool)
+                else:
+                    removed = heightmap.cutLine(position, p, tool)
+                result.removed += removed
+                if name in self.Rapids and removed > minRemoved:
+                    result.rapidCuts.append(p)
+                position = p
+            elif name in self.Drills:
+                params = cmd.Parameters
+                x = params.get('X', position.x if position else 0)
+                y = params.get('Y', position.y if position else 0)
+                z = params.get('Z', heightmap.zmin)
+                result.removed += heightmap.cutAt(x, y, z, tool)
+                retract = params.get('R', z)
+                position = FreeCAD.Vector(x, y, max(retract, position.z) if position else retract)
+        return position
+
+
+def jobOperations(job):
+    '''jobOperations(job) ... the (operation, ToolShape) pairs of the active operations of job, in
+    the order they are post processed'''
+    operations = []
+    for obj in job.Group:
+        if not hasattr(obj, 'Path') or hasattr(obj, 'Tool'):
+            continue
+        if hasattr(obj, 'Active') and not obj.Active:
+            continue
+        tc = PathUtil.toolControllerForOp(obj)
+        if tc is None:
+            PathLog.warning("%s has no tool controller, it is not simulated", obj.Label)
+            continue
+        operations.append((obj, ToolShape(tc.Tool)))
+    return operations
@@ -195,10 +195,7 @@ def helix_cut(center, r_out, r_in, dr, zmax, zmin, dz, safe_z, tool_diameter, vf
 
 
 def features_by_centers(base, features):
-    try:
-        from scipy.spatial import KDTree
-    except ImportError:
-        from PathScripts.kdtree import KDTree
+    from PathScripts.kdtree import cKDTree
 
     features = sorted(features,
                       key=lambda feature: getattr(base.Shape, feature).Surface.Radius,
@@ -207,7 +204,7 @@ def features_by_centers(base, features):
     coordinates = [(cylinder.Surface.Center.x, cylinder.Surface.Center.y) for cylinder in
                    [getattr(base.Shape, feature) for feature in features]]
 
-    tree = KDTree(coordinates)
+    tree = cKDTree(coordinates)
     seen = {}
 
     by_centers = {}
@@ -0,0 +1,336 @@
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *                                                                         *
+# *   Copyright (c) 2026 agent <agent@local>                                *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+
+import math
+import numpy
+import time
+
+import PathScripts.PathLog as PathLog
+
+from PathScripts.kdtree import cKDTree
+
+__title__ = "Path Job Order"
+__author__ = "agent"
+__url__ = "http://www.freecadweb.org"
+__doc__ = "Ordering of drilling and helix jobs to reduce the rapid moves between their locations."
+
+#PathLog.setLevel(PathLog.Level.DEBUG, PathLog.thisModule())
+
+
+class LocationGrid(object):
+    """Uniform grid over the XY coordinates of locations.
+    The locations can be removed from the grid one by one, the search only returns the
+    remaining ones. The cells are sized to hold about two locations each."""
+
+    def __init__(self, points):
+        self.points = points
+        xs = [p[0] for p in points]
+        ys = [p[1] for p in points]
+        self.xmin = min(xs)
+        self.ymin = min(ys)
+        width = max(xs) - self.xmin
+        height = max(ys) - self.ymin
+        area = max(width * height, max(width, height) ** 2 / max(len(points), 1), 1e-12)
+        self.size = math.sqrt(2.0 * area / len(points))
+        self.columns = int(width / self.size) + 1
+        self.rows = int(height / self.size) + 1
+        self.cells = {}
+        for i, p in enumerate(points):
+            self.cells.setdefault(self.cellOf(p), []).append(i)
+        self.count = len(points)
+
+    def cellOf(self, p):
+        return (min(max(int((p[0] - self.xmin) / self.size), 0), self.columns - 1),
+                min(max(int((p[1] - self.ymin) / self.size), 0), self.rows - 1))
+
+    def remove(self, i):
+        cell = self.cellOf(self.points[i])
+        self.cells[cell].remove(i)
+        if not self.cells[cell]:
+            del self.cells[cell]
+        self.count -= 1
+
+    def ring(self, cell, r):
+        """all cells at Chebyshev distance r of cell"""
+        cx, cy = cell
+        if r == 0:
+            yield cell
+            return
+        for x in range(cx - r, cx + r + 1):
+            yield (x, cy - r)
+            yield (x, cy + r)
+        for y in range(cy - r + 1, cy + r):
+            yield (cx - r, y)
+            yield (cx + r, y)
+
+    def ringDistance(self, p, cell, r):
+        """lower bound of the distance of p to all points in ring r around the cell of p"""
+        return max(0.0, (r - 1) * self.size)
+
+    def search(self, p, weights, minWeight):
+        """(p, weights, minWeight) ... remaining location i with the smallest sum of the squared
+        distance to p and weights[i]. Ties are resolved by the smaller index."""
+        px, py = p
+        points = self.points
+        best = None
+        bestCost = None
+        cell = self.cellOf(p)
+        maxRing = max(self.columns, self.rows)
+        r = 0
+        while r <= maxRing:
+            if best is not None and self.ringDistance(p, cell, r) ** 2 + minWeight > bestCost:
+                break
+            if 8 * r > self.count:
+                # cheaper to look at all remaining locations than at the empty cells
+                cells = list(self.cells.values())
+                r = maxRing
+            else:
+                cells = [self.cells.get(ringCell, ()) for ringCell in self.ring(cell, r)]
+            for indices in cells:
+                for i in indices:
+                    x, y = points[i]
+                    c = (x - px) ** 2 + (y - py) ** 2 + weights[i]
+                    if best is None or c < bestCost or (c == bestCost and i < best):
+                        best, bestCost = i, c
+            r += 1
+        return best
+
+
+def distance(a, b):
+    return math.hypot(a[0] - b[0], a[1] - b[1])
+
+
+class JobOrder(object):
+    """Order of locations, for example drill holes, to keep the rapid moves between them short.
+    The locations are dicts, keys are the keys of the X and Y coordinates, for example ['x', 'y'].
+    sortNearestNeighbor() does the nearest neighbor ordering of sort_jobs(): starting at the
+    origin the next location is the one with the smallest sum of the squared distance and the
+    absolute values of the attractors.
+    improve() shortens the rapid moves of this order by 2-opt and Or-opt moves within a time
+    limit. The first location and the order of all locations with equal coordinates
+    are kept. Every decrease of the attractor weight from one location to the next is added to
+    the length of the rapid move, thus the improved order still goes from the small to the
+    big attractor values like the nearest neighbor order.
+    The rapid distance of the nearest neighbor order and of the improved order are kept in
+    seedDistance and distance."""
+
+    neighbors = 8
+    tolerance = 1e-9
+
+    def __init__(self, locations, keys, attractors=None):
+        self.locations = locations
+        self.keys = keys
+        self.attractors = attractors or [keys[0]]
+        self.points = [(float(location[keys[0]]), float(location[keys[1]])) for location in locations]
+        self.order = list(range(len(locations)))
+        self.seedDistance = 0.0
+        self.distance = 0.0
+
+    def weight(self, location):
+        w = 0
+        for k in self.attractors:
+            w += abs(location[k])
+        return w
+
+    def sortNearestNeighbor(self):
+        if not self.locations:
+            return self.order
+        weights = [self.weight(location) for location in self.locations]
+        minWeight = min(weights)
+        grid = LocationGrid(self.points)
+        current = (0.0, 0.0)
+        self.order = []
+        while grid.count:
+            nxt = grid.search(current, weights, minWeight)
+            grid.remove(nxt)
+            self.order.append(nxt)
+            current = self.points[nxt]
+        self.seedDistance = self.distance = self.rapidDistance()
+        return self.order
+
+    def rapidDistance(self, order=None):
+        if order is None:
+            order = self.order
+        return sum(distance(self.points[a], self.points[b]) for a, b in zip(order, order[1:]))
+
+    def improve(self, timeLimit=1.0):
+        """2-opt and Or-opt moves on the current order until no move shortens the rapid moves
+        or the time limit in seconds is reached"""
+        # all locations with equal coordinates are one stop of the tour, in the order of the
+        # current order, so the depth steps of a hole are never cut out of order
+        stops = []
+        stopAt = {}
+        for i in self.order:
+            point = self.points[i]
+            if point in stopAt:
+                stops[stopAt[point]].append(i)
+            else:
+                stopAt[point] = len(stops)
+                stops.append([i])
+        if len(stops) < 3:
+            return self.order
+        weights = [min(self.weight(self.locations[i]) for i in stop) for stop in stops]
+        tour = TwoOptTour([self.points[stop[0]] for stop in stops], weights, self.neighbors, self.tolerance)
+        tour.improve(time.time() + timeLimit)
+        self.order = [i for s in tour.tour.tolist() for i in stops[s]]
+        self.distance = self.rapidDistance()
+        return self.order
+
+    def getLocations(self):
+        return [self.locations[i] for i in self.order]
+
+
+class TwoOptTour(object):
+    """open tour over points with a fixed first point, improved by 2-opt and Or-opt moves
+    over the nearest neighbors of every point.
+    The cost of a move from a to b is their distance plus the decrease of the weight from a to b.
+    Reversing a part of the tour thus changes the cost of its moves by the weight of its last
+    point minus the weight of its first point."""
+
+    def __init__(self, points, weights, neighbors, tolerance):
+        self.points = points
+        self.weights = weights
+        self.tolerance = tolerance
+        self.count = len(points)
+        self.tour = numpy.arange(len(points))
+        self.pos = numpy.arange(len(points))
+        k = min(neighbors + 1, len(points))
+        distances, nearest = cKDTree(points).query(points, k=k)
+        self.neighbors = [[j for j in row if j != i and j < len(points)][:neighbors] for i, row in enumerate(nearest.tolist())]
+
+    def distance(self, a, b):
+        if a is None or b is None:
+            return 0.0
+        pa, pb = self.points[a], self.points[b]
+        return math.hypot(pa[0] - pb[0], pa[1] - pb[1])
+
+    def d(self, a, b):
+        """cost of the move from a to b"""
+        if a is None or b is None:
+            return 0.0
+        return self.distance(a, b) + max(0.0, self.weights[a] - self.weights[b])
+
+    def reversal(self, first, last):
+        """change of the cost of the moves between first and last if they are reversed"""
+        return self.weights[last] - self.weights[first]
+
+    def at(self, i):
+        if i < 0 or i >= self.count:
+            return None
+        return int(self.tour[i])
+
+    def reverse(self, i, j):
+        self.tour[i:j + 1] = self.tour[i:j + 1][::-1].copy()
+        self.pos[self.tour[i:j + 1]] = numpy.arange(i, j + 1)
+
+    def move(self, i, length, k, reverse):
+        """move the segment tour[i:i + length] behind tour[k]"""
+        segment = self.tour[i:i + length].copy()
+        if reverse:
+            segment = segment[::-1]
+        rest = numpy.concatenate((self.tour[:i], self.tour[i + length:]))
+        k = k if k < i else k - length
+        self.tour = numpy.concatenate((rest[:k + 1], segment, rest[k + 1:]))
+        lo = min(i, k + 1)
+        self.pos[self.tour[lo:]] = numpy.arange(lo, len(self.tour))
+
+    def twoOptDelta(self, i, j):
+        """change of the tour length by reversing tour[i:j + 1]"""
+        a, b, c, e = self.at(i - 1), self.at(i), self.at(j), self.at(j + 1)
+        return self.d(a, c) + self.d(b, e) - self.d(a, b) - self.d(c, e) + self.reversal(b, c)
+
+    def improveTwoOpt(self, a):
+        p = int(self.pos[a])
+        limit = max(self.d(self.at(p - 1), a), self.d(a, self.at(p + 1)))
+        for c in self.neighbors[a]:
+            if self.distance(a, c) >= limit:
+                break
+            q = int(self.pos[c])
+            lo, hi = min(p, q), max(p, q)
+            moves = []
+            if lo + 1 < hi:
+                moves.append((self.twoOptDelta(lo + 1, hi), lo + 1, hi))
+            if lo >= 1 and lo < hi - 1:
+                moves.append((self.twoOptDelta(lo, hi - 1), lo, hi - 1))
+            if moves:
+                delta, i, j = min(moves)
+                if delta < -self.tolerance:
+                    changed = [self.at(i - 1), self.at(i), self.at(j), self.at(j + 1)]
+                    self.reverse(i, j)
+                    return [s for s in changed if s is not None]
+        return []
+
+    def improveOrOpt(self, a):
+        p = int(self.pos[a])
+        if p == 0:
+            return []
+        d = self.d
+        best = None
+        for length in (1, 2, 3):
+            if p + length > self.count:
+                break
+            first, last = a, self.at(p + length - 1)
+            before, after = self.at(p - 1), self.at(p + length)
+            gain = d(before, first) + d(last, after) - d(before, after)
+            if gain <= self.tolerance:
+                continue
+            for end, other in ((first, last), (last, first)):
+                for c in self.neighbors[end]:
+                    if self.distance(end, c) >= gain:
+                        break
+                    q = int(self.pos[c])
+                    # c in front of end or c behind end, k is the position the segment is inserted behind
+                    for k, s, e in ((q, end, other), (q - 1, other, end)):
+                        if k < 0 or p - 1 <= k < p + length:
+                            continue
+                        u, v = self.at(k), self.at(k + 1)
+                        delta = d(u, s) + d(e, v) - d(u, v) - gain
+                        if s != first:
+                            delta += self.reversal(first, last)
+                        if delta < -self.tolerance and (best is None or delta < best[0]):
+                            best = (delta, length, k, s != first)
+        if best is None:
+            return []
+        delta, length, k, reverse = best
+        changed = [self.at(p - 1), self.at(p + length), self.at(k), self.at(k + 1)] + self.tour[p:p + length].tolist()
+        self.move(p, length, k, reverse)
+        return [s for s in changed if s is not None]
+
+    def improve(self, endTime):
+        queue = list(range(len(self.tour)))
+        queued = set(queue)
+        count = 0
+        while queue:
+            count += 1
+            if count % 64 == 0 and time.time() > endTime:
+                PathLog.debug("job order improvement stopped by the time limit")
+                break
+            a = queue.pop()
+            queued.discard(a)
+            changed = self.improveTwoOpt(a) or self.improveOrOpt(a)
+            for s in changed:
+                if s not in queued:
+                    queued.add(s)
+                    queue.append(s)
+        return self.tour
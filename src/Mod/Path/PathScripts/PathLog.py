@@ -23,8 +23,10 @@
 # ***************************************************************************
 
 import FreeCAD
+import functools
 import os
-import traceback
+import sys
+import time
 
 class Level:
     """Enumeration of log levels, used for setLevel and getLevel."""
@@ -46,6 +48,11 @@ _moduleLogLevel  = { }
 _useConsole = True
 _trackModule = { }
 _trackAll = False
+_maxLogLevel = _defaultLogLevel
+_profileModule = { }
+_profileAll = False
+_profileStats = { }
+_moduleOfFile = { }
 
 def logToConsole(yes):
     """(boolean) - if set to True (default behaviour) log messages are printed to the console. Otherwise they are printed to stdout."""
@@ -58,6 +65,7 @@ def setLevel(level, module = None):
        Otherwise the module specific log level is changed (use RESET to clear)."""
     global _defaultLogLevel
     global _moduleLogLevel
+    global _maxLogLevel
     if module:
         if level == Level.RESET:
             if _moduleLogLevel.get(module, -1) != -1:
@@ -70,6 +78,8 @@ def setLevel(level, module = None):
             _moduleLogLevel = { }
         else:
             _defaultLogLevel = level
+    # the highest level any module logs at, messages above it are dropped without looking at the caller
+    _maxLogLevel = max([_defaultLogLevel] + list(_moduleLogLevel.values()))
 
 def getLevel(module = None):
     """(module = None) - return the global (None) or module specific log level."""
@@ -81,15 +91,27 @@ def thisModule():
     """returns the module id of the caller, can be used for setLevel, getLevel and trackModule."""
     return _caller()[0]
 
-def _caller():
+def _moduleOf(file):
+    """internal function to map a source file to its module id."""
+    module = _moduleOfFile.get(file)
+    if module is None:
+        module = os.path.splitext(os.path.basename(file))[0]
+        _moduleOfFile[file] = module
+    return module
+
+def _caller(depth=2):
     """internal function to determine the calling module."""
-    file, line, func, text = traceback.extract_stack(limit=3)[0]
-    return os.path.splitext(os.path.basename(file))[0], line, func
+    frame = sys._getframe(depth)
+    return _moduleOf(frame.f_code.co_filename), frame.f_lineno, frame.f_code.co_name
 
-def _log(level, module_line_func, msg):
+def _log(level, msg, args):
     """internal function to do the logging"""
-    module, line, func = module_line_func
+    if level > _maxLogLevel:
+        return None
+    module, line, func = _caller(3)
     if getLevel(module) >= level:
+        if args:
+            msg = msg % args
         message = "%s.%s: %s" % (module, Level.toString(level), msg)
         if _useConsole:
             message += "\n"
@@ -106,21 +128,21 @@ def _log(level, module_line_func, msg):
         return message
     return None
 
-def debug(msg):
-    """(message)"""
-    return _log(Level.DEBUG, _caller(), msg)
-def info(msg):
-    """(message)"""
-    return _log(Level.INFO, _caller(), msg)
-def notice(msg):
-    """(message)"""
-    return _log(Level.NOTICE, _caller(), msg)
-def warning(msg):
-    """(message)"""
-    return _log(Level.WARNING, _caller(), msg)
-def error(msg):
-    """(message)"""
-    return _log(Level.ERROR, _caller(), msg)
+def debug(msg, *args):
+    """(message, *args) - if args are given the message is formatted with them, but only if it is logged."""
+    return _log(Level.DEBUG, msg, args)
+def info(msg, *args):
+    """(message, *args)"""
+    return _log(Level.INFO, msg, args)
+def notice(msg, *args):
+    """(message, *args)"""
+    return _log(Level.NOTICE, msg, args)
+def warning(msg, *args):
+    """(message, *args)"""
+    return _log(Level.WARNING, msg, args)
+def error(msg, *args):
+    """(message, *args)"""
+    return _log(Level.ERROR, msg, args)
 
 def trackAllModules(boolean):
     """(boolean) - if True all modules will be tracked, otherwise tracking is up to the module setting."""
@@ -155,6 +177,8 @@ def untrackModule(module = None):
 
 def track(*args):
     """(....) - call with arguments of current function you want logged if tracking is enabled."""
+    if not _trackAll and not _trackModule:
+        return None
     module, line, func = _caller()
     if _trackAll or _trackModule.get(module, None):
         message = "%s(%d).%s(%s)" % (module, line, func, ', '.join([str(arg) for arg in args]))
@@ -165,3 +189,63 @@ def track(*args):
         return message
     return None
 
+def profileAllModules(boolean):
+    """(boolean) - if True the calls of all profiled functions are timed, otherwise profiling is up to the module setting."""
+    global _profileAll
+    _profileAll = boolean
+
+def profileModule(module = None):
+    """(module = None) - start timing the profiled functions of given module, current module if not set."""
+    if not module:
+        module = _caller()[0]
+    _profileModule[module] = True
+
+def unprofileModule(module = None):
+    """(module = None) - stop timing the profiled functions of given module, current module if not set."""
+    if not module:
+        module = _caller()[0]
+    if _profileModule.get(module, None):
+        del _profileModule[module]
+
+def profile(func):
+    """decorator for functions whose calls are counted and timed if profiling is enabled for their module.
+       If it is not the profiled function costs one additional call and dictionary lookup."""
+    module = _moduleOf(func.__code__.co_filename)
+    name = "%s.%s" % (module, func.__name__)
+    @functools.wraps(func)
+    def profiled(*args, **kwargs):
+        if not _profileAll and not _profileModule.get(module, None):
+            return func(*args, **kwargs)
+        start = time.time()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            stats = _profileStats.get(name)
+            if stats is None:
+                stats = _profileStats[name] = [0, 0.0]
+            stats[0] += 1
+            stats[1] += time.time() - start
+    return profiled
+
+def profileStats(module = None):
+    """(module = None) - returns {'module.function': (calls, seconds)} of all profiled functions called so far, or just the ones of given module."""
+    prefix = module + '.' if module else ''
+    return dict((name, tuple(stats)) for name, stats in _profileStats.items() if name.startswith(prefix))
+
+def profileReport(module = None):
+    """(module = None) - logs the call counts and durations of the profiled functions, the slowest first, and returns the report."""
+    lines = ["%8d %10.4fs  %s" % (calls, seconds, name) for name, (calls, seconds) in sorted(profileStats(module).items(), key=lambda item: -item[1][1])]
+    message = "\n".join(["   calls       time  function"] + lines)
+    if _useConsole:
+        FreeCAD.Console.PrintMessage(message + "\n")
+    else:
+        print(message)
+    return message
+
+def resetProfile():
+    """Clears the statistics of the profiled functions and stops profiling all modules."""
+    global _profileAll
+    global _profileModule
+    _profileAll = False
+    _profileModule = { }
+    _profileStats.clear()
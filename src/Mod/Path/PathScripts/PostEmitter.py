@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *                                                                         *
+# *   Copyright (c) 2026 agent <agent@local>                                *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+
+from FreeCAD import Units
+
+__title__ = "Path Post Emitter"
+__author__ = "agent"
+__url__ = "http://www.freecadweb.org"
+__doc__ = "Streaming output of G-code for the post processors."
+
+
+class GCodeWriter(object):
+    '''Buffered output of a post processor.
+    The strings written are collected in a list which is joined and written to stream
+    every bufferSize strings. If keep is True the whole text is available with getvalue(),
+    this is required if the program is shown in the editor or returned by export().'''
+
+    def __init__(self, stream=None, keep=True, bufferSize=4096):
+        self.stream = stream
+        self.keep = keep or stream is None
+        self.bufferSize = bufferSize
+        self.buffer = []
+        self.text = []
+
+    def write(self, text):
+        self.buffer.append(text)
+        if len(self.buffer) >= self.bufferSize:
+            self.flush()
+
+    def writeLines(self, lines):
+        self.buffer.extend(lines)
+        if len(self.buffer) >= self.bufferSize:
+            self.flush()
+
+    def flush(self):
+        if not self.buffer:
+            return
+        chunk = ''.join(self.buffer)
+        self.buffer = []
+        if self.stream is not None:
+            self.stream.write(chunk)
+        if self.keep:
+            self.text.append(chunk)
+
+    def getvalue(self):
+        self.flush()
+        if len(self.text) > 1:
+            self.text = [''.join(self.text)]
+        return self.text[0] if self.text else ''
+
+
+def numberFormatter(decimals, prefix='', divisor=None):
+    '''numberFormatter(decimals, prefix='', divisor=None) ... returns a function which formats a
+    value with the given number of decimals, as format(value, '.Nf') does, after dividing it by
+    divisor. The prefix, typically the letter of the parameter, is part of the format string.'''
+    fmt = prefix.replace('%', '%%') + '%%.%df' % int(decimals)
+    if divisor is None:
+        return fmt.__mod__
+    return lambda value: fmt % (value / divisor)
+
+
+def integerFormatter(prefix=''):
+    '''integerFormatter(prefix='') ... returns a function which formats a value as str(int(value)) does.'''
+    return (prefix.replace('%', '%%') + '%d').__mod__
+
+
+def lengthFormatter(decimals, units, prefix=''):
+    '''lengthFormatter(decimals, units, prefix='') ... compiled version of PostUtils.fmt(),
+    values are converted to inches unless units is G21.'''
+    if units == 'G21':
+        return numberFormatter(decimals, prefix)
+    return numberFormatter(decimals, prefix, 25.4)
+
+
+def velocityFormatter(decimals, unitFormat, prefix=''):
+    '''velocityFormatter(decimals, unitFormat, prefix='') ... returns a function which converts a
+    feed rate to unitFormat, for example 'mm/min', and formats it with the given number of decimals.
+    The value is the one of Units.Quantity(value, Units.Velocity).getValueAs(unitFormat).'''
+    return numberFormatter(decimals, prefix, Units.Quantity(unitFormat).Value)
+
+
+def walkPaths(obj):
+    '''walkPaths(obj) ... generator over obj and all objects of its Group, recursively, in the
+    order the post processors used to visit them. Objects with a Group are compounds.'''
+    stack = [obj]
+    while stack:
+        obj = stack.pop()
+        yield obj
+        if hasattr(obj, "Group"):
+            stack.extend(reversed(obj.Group))
+
+
+class GCodeEmitter(object):
+    '''Conversion of Path objects into G-code, one line per command.
+    This is what parse() of the linuxcnc like post processors does: the line starts with the
+    name of the command, unless modal is set and it's the same as the one before, followed by
+    the parameters in the order of params, each formatted by its function in formatters.
+    The words are separated by commandSpace and prefixed with a line number if lineNumbers is
+    set. Rapid moves don't get a feed rate unless rapidFeed is set.
+    Compounds and Path objects are introduced with compoundComment and pathComment if given,
+    toolChange is inserted before every M6.
+    Subclasses can change the words of a command by overriding commandWords().'''
+
+    rapids = ['G0', 'G00']
+
+    def __init__(self, writer, params, formatters, commandSpace=' ', modal=False, comments=True,
+                 lineNumbers=False, lineNumber=0, lineNumberIncrement=10, rapidFeed=False,
+                 toolChange='', toolChangeComment=None, compoundComment=None, pathComment=None):
+        self.writer = writer
+        self.params = params
+        self.formatters = formatters
+        self.commandSpace = commandSpace
+        self.modal = modal
+        self.comments = comments
+        self.lineNumbers = lineNumbers
+        self.lineNumber = lineNumber
+        self.lineNumberIncrement = lineNumberIncrement
+        self.rapidFeed = rapidFeed
+        self.toolChange = toolChange
+        self.toolChangeComment = toolChangeComment
+        self.compoundComment = compoundComment
+        self.pathComment = pathComment
+
+    def linenumber(self):
+        if self.lineNumbers:
+            self.lineNumber += self.lineNumberIncrement
+            return "N" + str(self.lineNumber) + " "
+        return ""
+
+    def emit(self, line):
+        '''emit(line) ... write line, terminated by a newline, with a line number'''
+        self.writer.write(self.linenumber() + line)
+
+    def emitBlock(self, text):
+        '''emitBlock(text) ... write all lines of text, each with a line number'''
+        for line in text.splitlines(True):
+            self.writer.write(self.linenumber() + line)
+
+    def emitComment(self, fmt, obj):
+        if self.comments and fmt is not None:
+            self.emit(fmt % obj.Label)
+
+    def commandWords(self, name, parameters):
+        '''commandWords(name, parameters) ... list of the formatted parameters of a command'''
+        formatters = self.formatters
+        if 'F' in parameters and not self.rapidFeed and name in self.rapids:
+            return [formatters[param](parameters[param]) for param in self.params if param in parameters and param != 'F']
+        return [formatters[param](parameters[param]) for param in self.params if param in parameters]
+
+    def emitCommands(self, commands):
+        '''emitCommands(commands) ... write the lines of commands'''
+        write = self.writer.write
+        space = self.commandSpace
+        lastcommand = None
+        for c in commands:
+            name = c.Name
+            words = self.commandWords(name, c.Parameters)
+            if not self.modal or name != lastcommand:
+                words.insert(0, name)
+            lastcommand = name
+
+            if name == 'M6':
+                if self.toolChangeComment is not None and self.comments:
+                    self.emit(self.toolChangeComment)
+                if self.toolChange:
+                    self.emitBlock(self.toolChange)
+            elif name == 'message':
+                if not self.comments or not words:
+                    continue
+                words.pop(0)
+
+            if words:
+                if self.lineNumbers:
+                    words.insert(0, self.linenumber())
+                line = space.join(words).strip()
+                if line:
+                    write(line + "\n")
+
+    def emitPath(self, obj):
+        '''emitPath(obj) ... write the lines of obj, or of all Path objects in it if it's a compound'''
+        for o in walkPaths(obj):
+            if hasattr(o, "Group"):
+                self.emitComment(self.compoundComment, o)
+            elif hasattr(o, "Path"):
+                # groups might contain non-path things like stock.
+                self.emitComment(self.pathComment, o)
+                self.emitCommands(o.Path.Commands)
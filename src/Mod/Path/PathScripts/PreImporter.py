@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *                                                                         *
+# *   Copyright (c) 2026 agent <agent@local>                                *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+
+import FreeCAD
+import Path
+import os
+import re
+
+import PathScripts.PathLog as PathLog
+
+__title__ = "Path Pre Importer"
+__author__ = "agent"
+__url__ = "http://www.freecadweb.org"
+__doc__ = "Streaming import of G-code files for the preprocessors."
+
+#PathLog.setLevel(PathLog.Level.DEBUG, PathLog.thisModule())
+
+# the digits of a G or M word at the beginning of a line
+Digits = re.compile(r'\d*')
+
+
+def readLines(filename, progress=None, chunkSize=1 << 20):
+    '''readLines(filename, progress=None, chunkSize=1 << 20) ... generator over the lines of filename,
+    without the line ends. The file is read in chunks of chunkSize characters, after every chunk
+    progress(fraction) is called with the fraction of the file read so far. If it returns False
+    reading stops.'''
+    size = max(os.path.getsize(filename), 1)
+    read = 0
+    rest = ''
+    with open(filename) as f:
+        while True:
+            chunk = f.read(chunkSize)
+            if not chunk:
+                break
+            read += len(chunk)
+            lines = (rest + chunk).split('\n')
+            rest = lines.pop()
+            for line in lines:
+                yield line
+            if progress is not None and progress(min(float(read) / size, 1.0)) is False:
+                return
+    yield rest
+
+
+def commandOf(line):
+    '''commandOf(line) ... the G or M word a line starts with, for example G1 for "G1X10"'''
+    return line[0].upper() + Digits.match(line, 1).group()
+
+
+def normalize(lines, commands=('G', 'M'), discard=('(', '%', '#'), semicolonComments=False):
+    '''normalize(lines, commands=('G', 'M'), discard=('(', '%', '#'), semicolonComments=False) ...
+    generator over the G-code of lines, each line terminated by a newline.
+    Empty lines, line numbers and lines starting with one of discard are removed. Lines starting
+    with one of commands are kept, the others get the G or M word of the last command prepended,
+    thus every line of the output starts with a command.
+    If semicolonComments is set comments starting with ; are converted to bracketed ones.'''
+    lastline = None
+    lastcommand = None
+    for l in lines:
+        # remove any leftover trailing and preceding spaces
+        l = l.strip()
+        if not l:
+            # discard empty lines
+            continue
+        if l[0].upper() in ["N"]:
+            # remove line numbers
+            l = l.split(" ", 1)
+            if len(l) < 2:
+                continue
+            l = l[1]
+        if semicolonComments and ";" in l:
+            # replace ; comments with ()
+            l = l.replace(";", "(") + ")"
+        if l[0] in discard:
+            # discard comment and other non strictly gcode lines
+            continue
+        if l[0].upper() in commands:
+            # found a G or M command: we store it
+            yield l + "\n"
+            lastline = l
+            lastcommand = None
+        elif lastline is not None:
+            # no G or M command: we repeat the last one
+            if lastcommand is None:
+                lastcommand = commandOf(lastline)
+            yield lastcommand + " " + l + "\n"
+
+
+class PathImporter(object):
+    '''Creates Path::Feature objects in a document from G-code text.
+    The text added is converted into Path.Commands every batchSize additions, thus the whole
+    program is never held as one string. If commandsPerPath is set a new Path object is started
+    whenever the current one has at least that many commands, split() starts one explicitly.'''
+
+    def __init__(self, doc, commandsPerPath=None, batchSize=10000, name="Path"):
+        self.doc = doc
+        self.commandsPerPath = commandsPerPath
+        self.batchSize = min(batchSize, commandsPerPath) if commandsPerPath else batchSize
+        self.name = name
+        self.batch = []
+        self.path = Path.Path()
+        self.objects = []
+
+    def add(self, gcode):
+        '''add(gcode) ... add G-code text, one or more lines terminated by a newline'''
+        self.batch.append(gcode)
+        if len(self.batch) >= self.batchSize:
+            self.flush()
+
+    def flush(self):
+        if self.batch:
+            self.path.addCommands(Path.Path(''.join(self.batch)).Commands)
+            self.batch = []
+            if self.commandsPerPath and self.path.Size >= self.commandsPerPath:
+                self.split()
+
+    def split(self):
+        '''split() ... put the commands so far into a Path object, unless there are none'''
+        self.flush()
+        if self.path.Size:
+            self.addObject()
+
+    def addObject(self):
+        obj = self.doc.addObject("Path::Feature", self.name)
+        obj.Path = self.path
+        self.objects.append(obj)
+        self.path = Path.Path()
+        PathLog.debug("%s: %d commands", obj.Name, obj.Path.Size)
+
+    def finish(self, empty=False):
+        '''finish(empty=False) ... put the remaining commands into a Path object and return all
+        Path objects created. If empty is set and there are none an empty Path object is created.'''
+        self.split()
+        if empty and not self.objects:
+            self.addObject()
+        return self.objects
+
+
+class ImportProgress(object):
+    '''progress callback for readLines() which moves a Base.ProgressIndicator with 100 steps,
+    if the user aborts the progress indicator the reading is canceled'''
+
+    def __init__(self, title):
+        from FreeCAD import Base
+        self.progressBar = Base.ProgressIndicator()
+        self.progressBar.start(title, 100)
+        self.percent = 0
+        self.canceled = False
+
+    def update(self, fraction):
+        try:
+            while self.percent < int(fraction * 100):
+                self.percent += 1
+                self.progressBar.next(True)
+        except Exception:
+            self.canceled = True
+            return False
+        return True
+
+    def stop(self):
+        self.progressBar.stop()
+
+
+def importFile(filename, doc, preprocess, commandsPerPath=None, empty=True):
+    '''importFile(filename, doc, preprocess, commandsPerPath=None, empty=True) ... import the G-code
+    file filename into doc and return the Path objects created.
+    preprocess(lines) is a generator over the lines of the file, it yields the G-code text for
+    them or None to start a new Path object. See PathImporter for commandsPerPath and empty.'''
+    progress = ImportProgress("Importing " + os.path.basename(filename) + " ...")
+    importer = PathImporter(doc, commandsPerPath)
+    try:
+        for gcode in preprocess(readLines(filename, progress.update)):
+            if gcode is None:
+                importer.split()
+            else:
+                importer.add(gcode)
+    finally:
+        progress.stop()
+    if progress.canceled:
+        FreeCAD.Console.PrintWarning("Import of %s was canceled.\n" % filename)
+    return importer.finish(empty)
@@ -40,7 +40,7 @@ from heapq import heappush, heappop
 
 __all__ = ['minkowski_distance_p', 'minkowski_distance',
            'distance_matrix',
-           'Rectangle', 'KDTree']
+           'Rectangle', 'KDTree', 'ArrayKDTree', 'cKDTree']
 
 
 def minkowski_distance_p(x, y, p=2):
@@ -110,8 +110,8 @@ class Rectangle(object):
     """
     def __init__(self, maxes, mins):
         """Construct a hyperrectangle."""
-        self.maxes = np.maximum(maxes,mins).astype(np.float)
-        self.mins = np.minimum(maxes,mins).astype(np.float)
+        self.maxes = np.maximum(maxes,mins).astype(float)
+        self.mins = np.minimum(maxes,mins).astype(float)
         self.m, = self.maxes.shape
 
     def __repr__(self):
@@ -510,17 +510,17 @@ class KDTree(object):
         retshape = np.shape(x)[:-1]
         if retshape != ():
             if k is None:
-                dd = np.empty(retshape,dtype=np.object)
-                ii = np.empty(retshape,dtype=np.object)
+                dd = np.empty(retshape,dtype=object)
+                ii = np.empty(retshape,dtype=object)
             elif k > 1:
-                dd = np.empty(retshape+(k,),dtype=np.float)
+                dd = np.empty(retshape+(k,),dtype=float)
                 dd.fill(np.inf)
-                ii = np.empty(retshape+(k,),dtype=np.int)
+                ii = np.empty(retshape+(k,),dtype=int)
                 ii.fill(self.n)
             elif k == 1:
-                dd = np.empty(retshape,dtype=np.float)
+                dd = np.empty(retshape,dtype=float)
                 dd.fill(np.inf)
-                ii = np.empty(retshape,dtype=np.int)
+                ii = np.empty(retshape,dtype=int)
                 ii.fill(self.n)
             else:
                 raise ValueError("Requested %s nearest neighbors; acceptable numbers are integers greater than or equal to one, or None")
@@ -549,9 +549,9 @@ class KDTree(object):
                 else:
                     return np.inf, self.n
             elif k > 1:
-                dd = np.empty(k,dtype=np.float)
+                dd = np.empty(k,dtype=float)
                 dd.fill(np.inf)
-                ii = np.empty(k,dtype=np.int)
+                ii = np.empty(k,dtype=int)
                 ii.fill(self.n)
                 for j in range(len(hits)):
                     dd[j], ii[j] = hits[j]
@@ -632,7 +632,7 @@ class KDTree(object):
             return self.__query_ball_point(x, r, p, eps)
         else:
             retshape = x.shape[:-1]
-            result = np.empty(retshape, dtype=np.object)
+            result = np.empty(retshape, dtype=object)
             for c in np.ndindex(retshape):
                 result[c] = self.__query_ball_point(x[c], r, p=p, eps=eps)
             return result
@@ -891,6 +891,271 @@ class KDTree(object):
             raise ValueError("r must be either a single value or a one-dimensional array of values")
 
 
+class ArrayKDTree(object):
+    """
+    kd-tree with the nodes in flat arrays and batched queries
+
+    The tree is built by the same sliding midpoint rule as `KDTree`, but the
+    nodes are rows of a few arrays instead of Python objects and every node
+    keeps the bounding box of its points. The points of a leaf are a range
+    of `indices`. A query for many points walks the tree once for all of
+    them: the points of every leaf are compared to all query points which
+    can still have a neighbor in this leaf with one array operation, thus
+    the Python work depends on the number of nodes, not on the number of
+    query points.
+
+    The query methods have the signatures and return values of
+    `scipy.spatial.cKDTree`, which is used instead if SciPy is installed,
+    see `cKDTree` of this module.
+
+    Parameters
+    ----------
+    data : (N,K) array_like
+        The data points to be indexed. The array is copied as float array.
+    leafsize : int, optional
+        The number of points at which the algorithm switches over to
+        brute-force.  Has to be positive. The brute-force scans are
+        array operations, thus the leaves are larger than the ones of
+        `KDTree`.
+
+    Examples
+    --------
+    >>> from PathScripts import kdtree
+    >>> x, y = np.mgrid[0:5, 2:8]
+    >>> tree = kdtree.ArrayKDTree(np.c_[x.ravel(), y.ravel()])
+    >>> tree.query([[0, 0], [2.1, 2.9]])
+    (array([ 2.        ,  0.14142136]), array([ 0, 13]))
+
+    """
+    def __init__(self, data, leafsize=64):
+        self.data = np.array(data, dtype=float)
+        if self.data.ndim != 2:
+            raise ValueError("data must be of shape (n, m)")
+        self.n, self.m = self.data.shape
+        self.leafsize = int(leafsize)
+        if self.leafsize < 1:
+            raise ValueError("leafsize must be at least 1")
+        if self.n:
+            self.maxes = np.amax(self.data, axis=0)
+            self.mins = np.amin(self.data, axis=0)
+        else:
+            self.maxes = np.zeros(self.m)
+            self.mins = np.zeros(self.m)
+        self.__build()
+
+    def __build(self):
+        # node arrays, lists while building: split dimension and value, children (-1 for leaves),
+        # range of the points in indices and the bounding box of the points
+        split_dim, split, less, greater, start, end, node_mins, node_maxes = [], [], [], [], [], [], [], []
+        self.indices = np.arange(self.n)
+        stack = [(-1, False, 0, self.n)]
+        while stack:
+            parent, is_greater, lo, hi = stack.pop()
+            node = len(start)
+            if parent >= 0:
+                (greater if is_greater else less)[parent] = node
+            idx = self.indices[lo:hi]
+            data = self.data[idx]
+            mins = np.amin(data, axis=0) if hi > lo else self.mins
+            maxes = np.amax(data, axis=0) if hi > lo else self.maxes
+            split_dim.append(-1)
+            split.append(0.0)
+            less.append(-1)
+            greater.append(-1)
+            start.append(lo)
+            end.append(hi)
+            node_mins.append(mins)
+            node_maxes.append(maxes)
+            if hi - lo <= self.leafsize:
+                continue
+            d = np.argmax(maxes - mins)
+            maxval = maxes[d]
+            minval = mins[d]
+            if maxval == minval:
+                # all points are identical
+                continue
+            values = data[:, d]
+            # sliding midpoint rule, see KDTree
+            s = (maxval + minval) / 2
+            is_less = values <= s
+            if not is_less.any():
+                s = np.amin(values)
+                is_less = values <= s
+            if is_less.all():
+                s = np.amax(values)
+                is_less = values < s
+            split_dim[node] = d
+            split[node] = s
+            count = int(is_less.sum())
+            self.indices[lo:hi] = np.concatenate((idx[is_less], idx[~is_less]))
+            stack.append((node, True, lo + count, hi))
+            stack.append((node, False, lo, lo + count))
+        self.split_dim = np.array(split_dim, dtype=int)
+        self.split = np.array(split, dtype=float)
+        self.less = np.array(less, dtype=int)
+        self.greater = np.array(greater, dtype=int)
+        self.start = np.array(start, dtype=int)
+        self.end = np.array(end, dtype=int)
+        self.node_mins = np.array(node_mins, dtype=float).reshape(-1, self.m)
+        self.node_maxes = np.array(node_maxes, dtype=float).reshape(-1, self.m)
+
+    def __min_distance_p(self, node, x, p):
+        """p-th power of the distance of the points x to the bounding box of node"""
+        side_distances = np.maximum(0, np.maximum(x - self.node_maxes[node], self.node_mins[node] - x))
+        if p == np.inf:
+            return np.amax(side_distances, axis=-1)
+        elif p == 1:
+            return np.sum(side_distances, axis=-1)
+        return np.sum(side_distances ** p, axis=-1)
+
+    def __leaves(self, x):
+        """the leaf of every point of x, all points walk down the tree at once"""
+        node = np.zeros(len(x), dtype=int)
+        inner = np.nonzero(self.less[node] >= 0)[0]
+        while len(inner):
+            n = node[inner]
+            is_less = x[inner, self.split_dim[n]] <= self.split[n]
+            node[inner] = np.where(is_less, self.less[n], self.greater[n])
+            inner = inner[self.less[node[inner]] >= 0]
+        return node
+
+    def __traverse(self, x, bound, epsfac, p, visit, skip=None):
+        """call visit(leaf, query indices) for every leaf which can have points within the bound of
+        some of the points x, bound is an array of the p-th power distance bounds of the points x
+        which is read again after every visit, skip is a leaf for every query which is not visited"""
+        stack = [(0, np.arange(len(x)))]
+        while stack:
+            node, queries = stack.pop()
+            queries = queries[self.__min_distance_p(node, x[queries], p) <= bound[queries] * epsfac]
+            if not len(queries):
+                continue
+            if self.less[node] < 0:
+                if skip is not None:
+                    queries = queries[skip[queries] != node]
+                if len(queries):
+                    visit(node, queries)
+            else:
+                stack.append((self.greater[node], queries))
+                stack.append((self.less[node], queries))
+
+    def query(self, x, k=1, eps=0, p=2, distance_upper_bound=np.inf):
+        """
+        Query the kd-tree for the k nearest neighbors of all points of x
+
+        The parameters and the return values are the ones of `KDTree.query`,
+        but k has to be an integer. Missing neighbors are indicated with
+        infinite distances and the index self.n.
+        """
+        x = np.asarray(x, dtype=float)
+        if np.shape(x)[-1] != self.m:
+            raise ValueError("x must consist of vectors of length %d but has shape %s" % (self.m, np.shape(x)))
+        if p < 1:
+            raise ValueError("Only p-norms with 1<=p<=infinity permitted")
+        if k is None or k < 1:
+            raise ValueError("Requested %s nearest neighbors; acceptable numbers are integers greater than or equal to one" % k)
+        retshape = np.shape(x)[:-1]
+        x = x.reshape(-1, self.m)
+        if eps == 0:
+            epsfac = 1
+        elif p == np.inf:
+            epsfac = 1 / (1 + eps)
+        else:
+            epsfac = 1 / (1 + eps) ** p
+        if p != np.inf and distance_upper_bound != np.inf:
+            distance_upper_bound = distance_upper_bound ** p
+        best_d = np.empty((len(x), k))
+        best_d.fill(np.inf)
+        best_i = np.empty((len(x), k), dtype=int)
+        best_i.fill(self.n)
+        # bound: p-th power distance of the k-th neighbor found so far
+        bound = np.empty(len(x))
+        bound.fill(distance_upper_bound)
+
+        def visit(leaf, queries):
+            idx = self.indices[self.start[leaf]:self.end[leaf]]
+            ds = minkowski_distance_p(x[queries, np.newaxis, :], self.data[np.newaxis, idx, :], p)
+            ds[ds >= distance_upper_bound] = np.inf
+            d = np.concatenate((best_d[queries], ds), axis=1)
+            i = np.concatenate((best_i[queries], np.broadcast_to(idx, ds.shape)), axis=1)
+            if d.shape[1] > k:
+                nearest = np.argpartition(d, k - 1, axis=1)[:, :k]
+                rows = np.arange(len(queries))[:, np.newaxis]
+                d = d[rows, nearest]
+                i = i[rows, nearest]
+            i[np.isinf(d)] = self.n
+            best_d[queries] = d
+            best_i[queries] = i
+            bound[queries] = np.minimum(np.amax(d, axis=1), distance_upper_bound)
+
+        if self.n and len(x):
+            # the leaf of every point first, thus the bounds are small for the rest of the tree
+            leaves = self.__leaves(x)
+            order = np.argsort(leaves, kind='mergesort')
+            leaf_starts = np.nonzero(np.r_[True, leaves[order][1:] != leaves[order][:-1]])[0]
+            for queries in np.split(order, leaf_starts[1:]):
+                visit(leaves[queries[0]], queries)
+            self.__traverse(x, bound, epsfac, p, visit, leaves)
+        order = np.argsort(best_d, axis=1, kind='mergesort')
+        rows = np.arange(len(x))[:, np.newaxis]
+        best_d = best_d[rows, order]
+        best_i = best_i[rows, order]
+        if p != np.inf and p != 1:
+            best_d = best_d ** (1. / p)
+        if k == 1:
+            return best_d[:, 0].reshape(retshape), best_i[:, 0].reshape(retshape)
+        return best_d.reshape(retshape + (k,)), best_i.reshape(retshape + (k,))
+
+    def query_ball_point(self, x, r, p=2., eps=0):
+        """
+        Find all points within distance r of point(s) x
+
+        The parameters and the return values are the ones of
+        `KDTree.query_ball_point`, the neighbors are sorted by their index.
+        """
+        x = np.asarray(x, dtype=float)
+        if x.shape[-1] != self.m:
+            raise ValueError("Searching for a %d-dimensional point in a "
+                             "%d-dimensional KDTree" % (x.shape[-1], self.m))
+        retshape = x.shape[:-1]
+        x = x.reshape(-1, self.m)
+        r_p = r if p == np.inf or p == 1 else r ** p
+        bound = np.empty(len(x))
+        bound.fill(r_p)
+        epsfac = 1 / (1 + eps) if p == np.inf else 1 / (1 + eps) ** p
+        pairs = []
+
+        def visit(leaf, queries):
+            idx = self.indices[self.start[leaf]:self.end[leaf]]
+            ds = minkowski_distance_p(x[queries, np.newaxis, :], self.data[np.newaxis, idx, :], p)
+            q, j = np.nonzero(ds <= r_p)
+            pairs.append((queries[q], idx[j]))
+
+        if self.n and len(x):
+            self.__traverse(x, bound, epsfac, p, visit)
+        if pairs:
+            queries = np.concatenate([q for q, j in pairs])
+            neighbors = np.concatenate([j for q, j in pairs])
+            order = np.lexsort((neighbors, queries))
+            queries = queries[order]
+            neighbors = neighbors[order]
+        else:
+            queries = neighbors = np.zeros(0, dtype=int)
+        bounds = np.searchsorted(queries, np.arange(len(x) + 1))
+        neighbors = neighbors.tolist()
+        if retshape == ():
+            return neighbors
+        result = np.empty(len(x), dtype=object)
+        for c in range(len(x)):
+            result[c] = neighbors[bounds[c]:bounds[c + 1]]
+        return result.reshape(retshape)
+
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:
+    cKDTree = ArrayKDTree
+
+
 def distance_matrix(x,y,p=2,threshold=1000000):
     """
     Compute the distance matrix.
@@ -933,7 +1198,7 @@ def distance_matrix(x,y,p=2,threshold=1000000):
     if m*n*k <= threshold:
         return minkowski_distance(x[:,np.newaxis,:],y[np.newaxis,:,:],p)
     else:
-        result = np.empty((m,n),dtype=np.float)  # FIXME: figure out the best dtype
+        result = np.empty((m,n),dtype=float)  # FIXME: figure out the best dtype
         if m < n:
             for i in range(m):
                 result[i,:] = minkowski_distance(x[i],y,p)
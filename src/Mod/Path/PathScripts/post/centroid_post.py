@@ -27,6 +27,7 @@ TOOLTIP=''' example post for Centroid CNC mill'''
 import FreeCAD
 import datetime
 now = datetime.datetime.now()
+from PathScripts import PostEmitter
 from PathScripts import PostUtils
 
 
@@ -87,18 +88,26 @@ def export(selection,filename,argstring):
     if myMachine is None:
         print("No machine found in this selection")
 
-    gcode =''
-    gcode+= HEADER % (FreeCAD.ActiveDocument.FileName)
-    gcode+= SAFETYBLOCK
-    gcode+= UNITS+'\n'
+    gfile = pythonopen(filename,"wb")
+    # the program is written to the file while it is generated
+    gcode = PostEmitter.GCodeWriter(gfile, keep=SHOW_EDITOR)
+    gcode.write(HEADER % (FreeCAD.ActiveDocument.FileName))
+    gcode.write(SAFETYBLOCK)
+    gcode.write(UNITS+'\n')
 
     lastcommand = None
-    gcode+= COMMENT+ selection[0].Description +'\n'
+    gcode.write(COMMENT+ selection[0].Description +'\n')
 
     gobjects = []
     for g in selection[0].Group:
         gobjects.append(g)
 
+    formatters = dict((param, PostEmitter.lengthFormatter(AXIS_DECIMALS, UNITS, param)) for param in params)
+    formatters['F'] = PostEmitter.lengthFormatter(FEED_DECIMALS, UNITS, 'F')
+    formatters['H'] = PostEmitter.integerFormatter('H')
+    formatters['S'] = PostEmitter.lengthFormatter(SPINDLE_DECIMALS, 'G21', 'S') #rpm is unitless-therefore I had to 'fake it out' by using metric units which don't get converted from entered value
+    formatters['T'] = PostEmitter.integerFormatter('T')
+
     for obj in gobjects:
         for c in obj.Path.Commands:
             outstring = []
@@ -111,32 +120,21 @@ def export(selection,filename,argstring):
             if MODAL == True:
                 if command == lastcommand:
                     outstring.pop(0)
-            if c.Parameters >= 1:
-                for param in params:
-                    if param in c.Parameters:
-                        if param == 'F':
-                            outstring.append(param + PostUtils.fmt(c.Parameters['F'], FEED_DECIMALS,UNITS))
-                        elif param == 'H':
-                            outstring.append(param + str(int(c.Parameters['H'])))
-                        elif param == 'S':
-                            outstring.append(param + PostUtils.fmt(c.Parameters['S'], SPINDLE_DECIMALS,'G21')) #rpm is unitless-therefore I had to 'fake it out' by using metric units which don't get converted from entered value
-                        elif param == 'T':
-                            outstring.append(param + str(int(c.Parameters['T'])))
-                        else:
-                            outstring.append(param + PostUtils.fmt(c.Parameters[param],AXIS_DECIMALS,UNITS))
+            parameters = c.Parameters
+            for param in params:
+                if param in parameters:
+                    outstring.append(formatters[param](parameters[param]))
             outstr = str(outstring)
             outstr =outstr.replace('[','')
             outstr =outstr.replace(']','')
             outstr =outstr.replace("'",'')
             outstr =outstr.replace(",",'')
-            gcode+= outstr + '\n'
+            gcode.write(outstr + '\n')
             lastcommand = c.Name
-    gcode+= TOOLRETURN
-    gcode+= SAFETYBLOCK
-    gcode+= FOOTER
-    if SHOW_EDITOR:
-        PostUtils.editor(gcode)
-    gfile = pythonopen(filename,"wb")
-    gfile.write(gcode)
+    gcode.write(TOOLRETURN)
+    gcode.write(SAFETYBLOCK)
+    gcode.write(FOOTER)
+    gcode.flush()
     gfile.close()
-
+    if SHOW_EDITOR:
+        PostUtils.editor(gcode.getvalue())
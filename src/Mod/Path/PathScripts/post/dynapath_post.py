@@ -59,6 +59,7 @@ linuxcnc_post.export(object,"/path/to/file.ncc","")
 
 import datetime
 now = datetime.datetime.now()
+from PathScripts import PostEmitter
 from PathScripts import PostUtils
 
 #These globals set common customization preferences
@@ -112,13 +113,13 @@ if open.__module__ == '__builtin__':
 
 def export(objectslist,filename,argstring):
     global UNITS
+    global LINENR
     for obj in objectslist:
         if not hasattr(obj,"Path"):
             print("the object " + obj.Name + " is not a path. Please select only path and Compounds.")
             return
 
     print("postprocessing...")
-    gcode = ""
 
     #Find the machine.
     #The user my have overridden post processor defaults in the GUI.  Make sure we're using the current values in the Machine Def.
@@ -134,130 +135,72 @@ def export(objectslist,filename,argstring):
     if myMachine is None:
         print("No machine found in this selection")
 
+    #the program is written to the file while it is generated, unless it goes through the editor
+    gfile = None
+    if not SHOW_EDITOR:
+        gfile = pythonopen(filename,"wb")
+    writer = PostEmitter.GCodeWriter(gfile, keep=False)
+    gcode = emitter(writer)
+
     # write header
     if OUTPUT_HEADER:
-        gcode += linenumber() + "(Exported by FreeCAD)\n"
-        gcode += linenumber() + "(Post Processor: " + __name__ +")\n"
-        gcode += linenumber() + "(Output Time:"+str(now)+")\n"
+        gcode.emit("(Exported by FreeCAD)\n")
+        gcode.emit("(Post Processor: " + __name__ +")\n")
+        gcode.emit("(Output Time:"+str(now)+")\n")
 
     #Write the preamble
-    if OUTPUT_COMMENTS: gcode += linenumber() + "(begin preamble)\n"
-    for line in PREAMBLE.splitlines(True):
-        gcode += linenumber() + line
-    gcode += linenumber() + UNITS + "\n"
+    if OUTPUT_COMMENTS: gcode.emit("(begin preamble)\n")
+    gcode.emitBlock(PREAMBLE)
+    gcode.emit(UNITS + "\n")
 
     for obj in objectslist:
 
         #do the pre_op
-        if OUTPUT_COMMENTS: gcode += linenumber() + "(begin operation: " + obj.Label + ")\n"
-        for line in PRE_OPERATION.splitlines(True):
-            gcode += linenumber() + line
+        if OUTPUT_COMMENTS: gcode.emit("(begin operation: " + obj.Label + ")\n")
+        gcode.emitBlock(PRE_OPERATION)
 
-        gcode += parse(obj)
+        gcode.emitPath(obj)
 
         #do the post_op
-        if OUTPUT_COMMENTS: gcode += linenumber() + "(finish operation: " + obj.Label + ")\n"
-        for line in POST_OPERATION.splitlines(True):
-            gcode += linenumber() + line
+        if OUTPUT_COMMENTS: gcode.emit("(finish operation: " + obj.Label + ")\n")
+        gcode.emitBlock(POST_OPERATION)
 
     #do the post_amble
 
-    if OUTPUT_COMMENTS: gcode += "(begin postamble)\n"
-    for line in POSTAMBLE.splitlines(True):
-        gcode += linenumber() + line
+    if OUTPUT_COMMENTS: writer.write("(begin postamble)\n")
+    gcode.emitBlock(POSTAMBLE)
+    LINENR = gcode.lineNumber
 
     if SHOW_EDITOR:
-        dia = PostUtils.GCodeEditorDialog()
-        dia.editor.setText(gcode)
-        result = dia.exec_()
-        if result:
-            final = dia.editor.toPlainText()
-        else:
-            final = gcode
+        final = PostUtils.editor(writer.getvalue())
+        gfile = pythonopen(filename,"wb")
+        gfile.write(final)
     else:
-        final = gcode
-
-    print("done postprocessing.")
-
-    gfile = pythonopen(filename,"wb")
-    gfile.write(final)
+        writer.flush()
     gfile.close()
 
+    print("done postprocessing.")
 
-def linenumber():
-    global LINENR
-    if OUTPUT_LINE_NUMBERS == True:
-        LINENR += 1
-        return "N" + str(LINENR) + " "
-    return ""
-
-def parse(pathobj):
-    out = ""
-    lastcommand = None
 
+def emitter(writer):
     #params = ['X','Y','Z','A','B','I','J','K','F','S'] #This list control the order of parameters
     params = ['X','Y','Z','A','B','I','J','F','S','T','Q','R','L'] #linuxcnc doesn't want K properties on XY plane  Arcs need work.
+    formatters = dict((param, PostEmitter.numberFormatter(3, param)) for param in params)
+    for param in ['F', 'S', 'T']:
+        formatters[param] = PostEmitter.numberFormatter(0, param)
+    return PostEmitter.GCodeEmitter(writer, params, formatters, COMMAND_SPACE, MODAL, OUTPUT_COMMENTS,
+                                    OUTPUT_LINE_NUMBERS, LINENR, 1, rapidFeed=True,
+                                    toolChange=TOOL_CHANGE, toolChangeComment="(begin toolchange)\n",
+                                    compoundComment="(compound: %s)\n", pathComment="(Path: %s)\n")
 
-    if hasattr(pathobj,"Group"): #We have a compound or project.
-        if OUTPUT_COMMENTS: out += linenumber() + "(compound: " + pathobj.Label + ")\n"
-        for p in pathobj.Group:
-            out += parse(p)
-        return out
-    else: #parsing simple path
-
-        if not hasattr(pathobj,"Path"): #groups might contain non-path things like stock.
-            return out
-
-        if OUTPUT_COMMENTS: out += linenumber() + "(Path: " + pathobj.Label + ")\n"
-
-        for c in pathobj.Path.Commands:
-            outstring = []
-            command = c.Name
-            outstring.append(command)
-            # if modal: only print the command if it is not the same as the last one
-            if MODAL == True:
-                if command == lastcommand:
-                    outstring.pop(0)
-
-
-            # Now add the remaining parameters in order
-            for param in params:
-                if param in c.Parameters:
-                    if param == 'F':
-                        outstring.append(param + format(c.Parameters['F'], '.0f'))
-                    elif param == 'S':
-                        outstring.append(param + format(c.Parameters[param], '.0f'))
-                    elif param == 'T':
-                        outstring.append(param + format(c.Parameters['T'], '.0f'))
-                    else:
-                        outstring.append(param + format(c.Parameters[param], '.3f'))
-
-            # store the latest command
-            lastcommand = command
-
-            # Check for Tool Change:
-            if command == 'M6':
-                if OUTPUT_COMMENTS: out += linenumber() + "(begin toolchange)\n"
-                for line in TOOL_CHANGE.splitlines(True):
-                    out += linenumber() + line
-
-            if command == "message":
-                if OUTPUT_COMMENTS == False:
-                    out = []
-                else:
-                    outstring.pop(0) #remove the command
-
-            #prepend a line number and append a newline
-            if len(outstring) >= 1:
-                if OUTPUT_LINE_NUMBERS:
-                    outstring.insert(0,(linenumber()))
-
-                #append the line to the final output
-                for w in outstring:
-                    out += w + COMMAND_SPACE
-                out = out.strip() + "\n"
-
-        return out
+
+def parse(pathobj):
+    global LINENR
+    writer = PostEmitter.GCodeWriter()
+    gcode = emitter(writer)
+    gcode.emitPath(pathobj)
+    LINENR = gcode.lineNumber
+    return writer.getvalue()
 
 print(__name__ + " gcode postprocessor loaded.")
 
@@ -32,8 +32,11 @@ from GCode.
 '''
 
 import os
-import Path
 import FreeCAD
+from PathScripts import PreImporter
+
+# the import is split into Path objects of about this many commands, None for a single Path object
+COMMANDS_PER_PATH = None
 
 # to distinguish python built-in open function from the one declared below
 if open.__module__ == '__builtin__':
@@ -49,50 +52,19 @@ def open(filename):
 
 def insert(filename, docname):
     "called when freecad imports a file"
-    gfile = pythonopen(filename)
-    gcode = gfile.read()
-    gfile.close()
-    gcode = parse(gcode)
     doc = FreeCAD.getDocument(docname)
-    obj = doc.addObject("Path::Feature", "Path")
-    path = Path.Path(gcode)
-    obj.Path = path
+    PreImporter.importFile(filename, doc, preprocess, COMMANDS_PER_PATH)
+
+
+def preprocess(lines):
+    "preprocess(lines): generator over the parsed output of lines"
+    return PreImporter.normalize(lines)
+
 
 def parse(inputstring):
     "parse(inputstring): returns a parsed output string"
     print("preprocessing...")
-    
-    # split the input by line
-    lines = inputstring.split("\n")
-    output = ""
-    lastcommand = None
-    
-    for l in lines:
-        # remove any leftover trailing and preceding spaces
-        l = l.strip()
-        if not l:
-            # discard empty lines
-            continue
-        if l[0].upper() in ["N"]:
-            # remove line numbers
-            l = l.split(" ",1)[1]
-        if l[0] in ["(","%","#"]:
-            # discard comment and other non strictly gcode lines
-            continue
-        if l[0].upper() in ["G","M"]:
-            # found a G or M command: we store it
-            output += l + "\n"
-            last = l[0].upper()
-            for c in l[1:]:
-                if not c.isdigit():
-                    break
-                else:
-                    last += c
-            lastcommand = last
-        elif lastcommand:
-            # no G or M command: we repeat the last one
-            output += lastcommand + " " + l + "\n"
-            
+    output = ''.join(preprocess(inputstring.split("\n")))
     print("done preprocessing.")
     return output
 
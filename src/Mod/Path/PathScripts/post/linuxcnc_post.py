@@ -44,6 +44,7 @@ Arguments for linuxcnc:
 import FreeCAD
 from FreeCAD import Units
 import datetime
+from PathScripts import PostEmitter
 from PathScripts import PostUtils
 from PathScripts import PathUtils
 
@@ -69,6 +70,11 @@ CORNER_MIN = {'x': 0, 'y': 0, 'z': 0}
 CORNER_MAX = {'x': 500, 'y': 300, 'z': 300}
 PRECISION=4
 
+# params = ['X','Y','Z','A','B','I','J','K','F','S'] #This list control
+# the order of parameters
+# linuxcnc doesn't want K properties on XY plane  Arcs need work.
+PARAMS = ['X', 'Y', 'Z', 'A', 'B', 'I', 'J', 'F', 'S', 'T', 'Q', 'R', 'L', 'H']
+
 # Preamble text will appear at the beginning of the GCODE output file.
 PREAMBLE = '''G17 G90
 '''
@@ -126,6 +132,7 @@ def export(objectslist, filename, argstring):
     processArguments(argstring)
     global UNITS
     global UNIT_FORMAT
+    global LINENR
 
     for obj in objectslist:
         if not hasattr(obj, "Path"):
@@ -133,20 +140,25 @@ def export(objectslist, filename, argstring):
             return
 
     print("postprocessing...")
-    gcode = ""
+
+    # the program is written to the file while it is generated, unless it goes through the editor
+    gfile = None
+    if not SHOW_EDITOR and not filename == '-':
+        gfile = pythonopen(filename, "wb")
+    writer = PostEmitter.GCodeWriter(gfile)
+    gcode = emitter(writer)
 
     # write header
     if OUTPUT_HEADER:
-        gcode += linenumber() + "(Exported by FreeCAD)\n"
-        gcode += linenumber() + "(Post Processor: " + __name__ + ")\n"
-        gcode += linenumber() + "(Output Time:" + str(now) + ")\n"
+        gcode.emit("(Exported by FreeCAD)\n")
+        gcode.emit("(Post Processor: " + __name__ + ")\n")
+        gcode.emit("(Output Time:" + str(now) + ")\n")
 
     # Write the preamble
     if OUTPUT_COMMENTS:
-        gcode += linenumber() + "(begin preamble)\n"
-    for line in PREAMBLE.splitlines(True):
-        gcode += linenumber() + line
-    gcode += linenumber() + UNITS + "\n"
+        gcode.emit("(begin preamble)\n")
+    gcode.emitBlock(PREAMBLE)
+    gcode.emit(UNITS + "\n")
 
     for obj in objectslist:
 
@@ -165,43 +177,37 @@ def export(objectslist, filename, argstring):
             else:
                UNITS = "G20"
                UNIT_FORMAT = 'in/min'
+            gcode.formatters = formatters()
 
         # do the pre_op
         if OUTPUT_COMMENTS:
-            gcode += linenumber() + "(begin operation: %s)\n" % obj.Label
-            gcode += linenumber() + "(machine: %s, %s)\n" % (myMachine, UNIT_FORMAT)
-        for line in PRE_OPERATION.splitlines(True):
-            gcode += linenumber() + line
+            gcode.emit("(begin operation: %s)\n" % obj.Label)
+            gcode.emit("(machine: %s, %s)\n" % (myMachine, UNIT_FORMAT))
+        gcode.emitBlock(PRE_OPERATION)
 
-        gcode += parse(obj)
+        gcode.emitPath(obj)
 
         # do the post_op
         if OUTPUT_COMMENTS:
-            gcode += linenumber() + "(finish operation: %s)\n" % obj.Label
-        for line in POST_OPERATION.splitlines(True):
-            gcode += linenumber() + line
+            gcode.emit("(finish operation: %s)\n" % obj.Label)
+        gcode.emitBlock(POST_OPERATION)
 
     # do the post_amble
 
     if OUTPUT_COMMENTS:
-        gcode += "(begin postamble)\n"
-    for line in POSTAMBLE.splitlines(True):
-        gcode += linenumber() + line
+        writer.write("(begin postamble)\n")
+    gcode.emitBlock(POSTAMBLE)
+    LINENR = gcode.lineNumber
+    final = writer.getvalue()
+    if gfile is not None:
+        gfile.close()
 
     if SHOW_EDITOR:
-        dia = PostUtils.GCodeEditorDialog()
-        dia.editor.setText(gcode)
-        result = dia.exec_()
-        if result:
-            final = dia.editor.toPlainText()
-        else:
-            final = gcode
-    else:
-        final = gcode
+        final = PostUtils.editor(final)
 
     print("done postprocessing.")
 
-    if not filename == '-':
+    if SHOW_EDITOR and not filename == '-':
         gfile = pythonopen(filename, "wb")
         gfile.write(final)
         gfile.close()
@@ -209,90 +215,27 @@ def export(objectslist, filename, argstring):
     return final
 
 
-def linenumber():
-    global LINENR
-    if OUTPUT_LINE_NUMBERS is True:
-        LINENR += 10
-        return "N" + str(LINENR) + " "
-    return ""
+def formatters():
+    '''the formatters of the parameters for PRECISION and UNIT_FORMAT'''
+    precision = int(PRECISION)
+    fmt = dict((param, PostEmitter.numberFormatter(precision, param)) for param in PARAMS)
+    fmt['F'] = PostEmitter.velocityFormatter(precision, UNIT_FORMAT, 'F')
+    fmt['T'] = PostEmitter.integerFormatter('T')
+    return fmt
+
+
+def emitter(writer):
+    return PostEmitter.GCodeEmitter(writer, PARAMS, formatters(), COMMAND_SPACE, MODAL, OUTPUT_COMMENTS,
+                                    OUTPUT_LINE_NUMBERS, LINENR, 10, toolChange=TOOL_CHANGE)
+
 
 def parse(pathobj):
-    global PRECISION
-    out = ""
-    lastcommand = None
-    precision_string = '.' + str(PRECISION) +'f'
-
-    # params = ['X','Y','Z','A','B','I','J','K','F','S'] #This list control
-    # the order of parameters
-    # linuxcnc doesn't want K properties on XY plane  Arcs need work.
-    params = ['X', 'Y', 'Z', 'A', 'B', 'I', 'J', 'F', 'S', 'T', 'Q', 'R', 'L', 'H']
-
-    if hasattr(pathobj, "Group"):  # We have a compound or project.
-        # if OUTPUT_COMMENTS:
-        #     out += linenumber() + "(compound: " + pathobj.Label + ")\n"
-        for p in pathobj.Group:
-            out += parse(p)
-        return out
-    else:  # parsing simple path
-
-        # groups might contain non-path things like stock.
-        if not hasattr(pathobj, "Path"):
-            return out
-
-        # if OUTPUT_COMMENTS:
-        #     out += linenumber() + "(" + pathobj.Label + ")\n"
-
-        for c in pathobj.Path.Commands:
-            outstring = []
-            command = c.Name
-            outstring.append(command)
-            # if modal: only print the command if it is not the same as the
-            # last one
-            if MODAL is True:
-                if command == lastcommand:
-                    outstring.pop(0)
-
-            # Now add the remaining parameters in order
-            for param in params:
-                if param in c.Parameters:
-                    if param == 'F':
-                        if c.Name not in ["G0", "G00"]: #linuxcnc doesn't use rapid speeds
-                            speed = Units.Quantity(c.Parameters['F'], FreeCAD.Units.Velocity)
-                            outstring.append(
-                                param + format(float(speed.getValueAs(UNIT_FORMAT)), precision_string) )
-                    elif param == 'T':
-                        outstring.append(param + str(int(c.Parameters['T'])))
-                    else:
-                        outstring.append(
-                            param + format(c.Parameters[param], precision_string))
-
-            # store the latest command
-            lastcommand = command
-
-            # Check for Tool Change:
-            if command == 'M6':
-                # if OUTPUT_COMMENTS:
-                #     out += linenumber() + "(begin toolchange)\n"
-                for line in TOOL_CHANGE.splitlines(True):
-                    out += linenumber() + line
-
-            if command == "message":
-                if OUTPUT_COMMENTS is False:
-                    out = []
-                else:
-                    outstring.pop(0)  # remove the command
-
-            # prepend a line number and append a newline
-            if len(outstring) >= 1:
-                if OUTPUT_LINE_NUMBERS:
-                    outstring.insert(0, (linenumber()))
-
-                # append the line to the final output
-                for w in outstring:
-                    out += w + COMMAND_SPACE
-                out = out.strip() + "\n"
-
-        return out
+    global LINENR
+    writer = PostEmitter.GCodeWriter()
+    gcode = emitter(writer)
+    gcode.emitPath(pathobj)
+    LINENR = gcode.lineNumber
+    return writer.getvalue()
 
 
 print(__name__ + " gcode postprocessor loaded.")
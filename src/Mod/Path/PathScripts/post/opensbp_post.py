@@ -1,5 +1,6 @@
 from __future__ import print_function
 import datetime
+from PathScripts import PostEmitter
 from PathScripts import PostUtils
 
 # ***************************************************************************
@@ -74,6 +75,8 @@ if open.__module__ == '__builtin__':
 
 CurrentState = {}
 
+coordinate = PostEmitter.numberFormatter(4)
+
 
 def export(objectslist, filename, argstring):
     global CurrentState
@@ -90,58 +93,57 @@ def export(objectslist, filename, argstring):
         'JSXY': 0, 'JSZ': 0, 'MSXY': 0, 'MSZ': 0
     }
     print("postprocessing...")
-    gcode = ""
+
+    # the program is written to the file while it is generated, unless it
+    # goes through the editor
+    gfile = None
+    if not SHOW_EDITOR:
+        gfile = pythonopen(filename, "wb")
+    gcode = PostEmitter.GCodeWriter(gfile, keep=False)
 
     # write header
     if OUTPUT_HEADER:
-        gcode += linenumber() + "'Exported by FreeCAD\n"
-        gcode += linenumber() + "'Post Processor: " + __name__ + "\n"
-        gcode += linenumber() + "'Output Time:" + str(now) + "\n"
+        gcode.write(linenumber() + "'Exported by FreeCAD\n")
+        gcode.write(linenumber() + "'Post Processor: " + __name__ + "\n")
+        gcode.write(linenumber() + "'Output Time:" + str(now) + "\n")
 
     # Write the preamble
     if OUTPUT_COMMENTS:
-        gcode += linenumber() + "(begin preamble)\n"
+        gcode.write(linenumber() + "(begin preamble)\n")
     for line in PREAMBLE.splitlines(True):
-        gcode += linenumber() + line
+        gcode.write(linenumber() + line)
 
     for obj in objectslist:
 
         # do the pre_op
         if OUTPUT_COMMENTS:
-            gcode += linenumber() + "(begin operation: " + obj.Label + ")\n"
+            gcode.write(linenumber() + "(begin operation: " + obj.Label + ")\n")
         for line in PRE_OPERATION.splitlines(True):
-            gcode += linenumber() + line
+            gcode.write(linenumber() + line)
 
-        gcode += parse(obj)
+        emitPath(obj, gcode)
 
         # do the post_op
         if OUTPUT_COMMENTS:
-            gcode += linenumber() + "(finish operation: " + obj.Label + ")\n"
+            gcode.write(linenumber() + "(finish operation: " + obj.Label + ")\n")
         for line in POST_OPERATION.splitlines(True):
-            gcode += linenumber() + line
+            gcode.write(linenumber() + line)
 
     # do the post_amble
     if OUTPUT_COMMENTS:
-        gcode += "(begin postamble)\n"
+        gcode.write("(begin postamble)\n")
     for line in POSTAMBLE.splitlines(True):
-        gcode += linenumber() + line
+        gcode.write(linenumber() + line)
 
     if SHOW_EDITOR:
-        dia = PostUtils.GCodeEditorDialog()
-        dia.editor.setText(gcode)
-        result = dia.exec_()
-        if result:
-            final = dia.editor.toPlainText()
-        else:
-            final = gcode
+        final = PostUtils.editor(gcode.getvalue())
+        gfile = pythonopen(filename, "wb")
+        gfile.write(final)
     else:
-        final = gcode
+        gcode.flush()
 
     print("done postprocessing.")
 
-    # Write the output
-    gfile = pythonopen(filename, "wb")
-    gfile.write(final)
     gfile.close()
 
 
@@ -149,18 +151,19 @@ def move(command):
     global CurrentState
 
     txt = ""
+    parameters = command.Parameters
 
     # if 'F' in command.Parameters:
     #     txt += feedrate(command)
 
     axis = ""
     for p in ['X', 'Y', 'Z']:
-        if p in command.Parameters:
-            if command.Parameters[p] != CurrentState[p]:
+        if p in parameters:
+            if parameters[p] != CurrentState[p]:
                 axis += p
 
-    if 'F' in command.Parameters:
-        speed = command.Parameters['F']
+    if 'F' in parameters:
+        speed = parameters['F']
         if speed != CurrentState['F']:
             if command.Name in ['G1', 'G01']:  # move
                 movetype = "MS"
@@ -181,40 +184,40 @@ def move(command):
 
     if axis == "X":
         txt += pref + "X"
-        txt += "," + format(command.Parameters["X"], '.4f')
+        txt += "," + coordinate(parameters["X"])
         txt += "\n"
     elif axis == "Y":
         txt += pref + "Y"
-        txt += "," + format(command.Parameters["Y"], '.4f')
+        txt += "," + coordinate(parameters["Y"])
         txt += "\n"
     elif axis == "Z":
         txt += pref + "Z"
-        txt += "," + format(command.Parameters["Z"], '.4f')
+        txt += "," + coordinate(parameters["Z"])
         txt += "\n"
     elif axis == "XY":
         txt += pref + "2"
-        txt += "," + format(command.Parameters["X"], '.4f')
-        txt += "," + format(command.Parameters["Y"], '.4f')
+        txt += "," + coordinate(parameters["X"])
+        txt += "," + coordinate(parameters["Y"])
         txt += "\n"
     elif axis == "XZ":
         txt += pref + "X"
-        txt += "," + format(command.Parameters["X"], '.4f')
+        txt += "," + coordinate(parameters["X"])
         txt += "\n"
         txt += pref + "Z"
-        txt += "," + format(command.Parameters["Z"], '.4f')
+        txt += "," + coordinate(parameters["Z"])
         txt += "\n"
     elif axis == "XYZ":
         txt += pref + "3"
-        txt += "," + format(command.Parameters["X"], '.4f')
-        txt += "," + format(command.Parameters["Y"], '.4f')
-        txt += "," + format(command.Parameters["Z"], '.4f')
+        txt += "," + coordinate(parameters["X"])
+        txt += "," + coordinate(parameters["Y"])
+        txt += "," + coordinate(parameters["Z"])
         txt += "\n"
     elif axis == "YZ":
         txt += pref + "Y"
-        txt += "," + format(command.Parameters["Y"], '.4f')
+        txt += "," + coordinate(parameters["Y"])
         txt += "\n"
         txt += pref + "Z"
-        txt += "," + format(command.Parameters["Z"], '.4f')
+        txt += "," + coordinate(parameters["Z"])
         txt += "\n"
     elif axis == "":
         print("warning: skipping duplicate move.")
@@ -227,15 +230,16 @@ def move(command):
 
 
 def arc(command):
+    parameters = command.Parameters
     if command.Name == 'G2':  # CW
         dirstring = "1"
     else:  # G3 means CCW
         dirstring = "-1"
     txt = "CG,,"
-    txt += format(command.Parameters['X'], '.4f') + ","
-    txt += format(command.Parameters['Y'], '.4f') + ","
-    txt += format(command.Parameters['I'], '.4f') + ","
-    txt += format(command.Parameters['J'], '.4f') + ","
+    txt += coordinate(parameters['X']) + ","
+    txt += coordinate(parameters['Y']) + ","
+    txt += coordinate(parameters['I']) + ","
+    txt += coordinate(parameters['J']) + ","
     txt += "T" + ","
     txt += dirstring
     txt += "\n"
@@ -257,7 +261,7 @@ def tool_change(command):
 
 def comment(command):
     print("a comment")
-    return
+    return ""
 
 
 def spindle(command):
@@ -290,34 +294,32 @@ scommands = {
 }
 
 
-def parse(pathobj):
+def emitPath(pathobj, gcode):
     global CurrentState
 
-    output = ""
-    params = ['X', 'Y', 'Z', 'A', 'B', 'I', 'J', 'K', 'F', 'S', 'T']
-    # Above list controls the order of parameters
-
-    if hasattr(pathobj, "Group"):  # We have a compound or project.
-        if OUTPUT_COMMENTS:
-            output += linenumber() + "(compound: " + pathobj.Label + ")\n"
-        for p in pathobj.Group:
-            output += parse(p)
-    else:  # parsing simple path
+    for obj in PostEmitter.walkPaths(pathobj):
+        if hasattr(obj, "Group"):  # We have a compound or project.
+            if OUTPUT_COMMENTS:
+                gcode.write(linenumber() + "(compound: " + obj.Label + ")\n")
         # groups might contain non-path things like stock.
-        if not hasattr(pathobj, "Path"):
-            return output
-        if OUTPUT_COMMENTS:
-            output += linenumber() + "(Path: " + pathobj.Label + ")\n"
-        for c in pathobj.Path.Commands:
-            command = c.Name
-            if command in scommands:
-                output += scommands[command](c)
-                if c.Parameters:
-                    CurrentState.update(c.Parameters)
-            else:
-                print("I don't know what the hell the command: ",end='')
-                print(command + " means.  Maybe I should support it.")
-    return output
+        elif hasattr(obj, "Path"):
+            if OUTPUT_COMMENTS:
+                gcode.write(linenumber() + "(Path: " + obj.Label + ")\n")
+            for c in obj.Path.Commands:
+                command = c.Name
+                if command in scommands:
+                    gcode.write(scommands[command](c))
+                    if c.Parameters:
+                        CurrentState.update(c.Parameters)
+                else:
+                    print("I don't know what the hell the command: ",end='')
+                    print(command + " means.  Maybe I should support it.")
+
+
+def parse(pathobj):
+    gcode = PostEmitter.GCodeWriter()
+    emitPath(pathobj, gcode)
+    return gcode.getvalue()
 
 
 def linenumber():
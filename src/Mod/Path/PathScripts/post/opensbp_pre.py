@@ -48,11 +48,15 @@ Many other OpenSBP commands not handled
 '''
 from __future__ import print_function
 import FreeCAD
-import os, Path
+import os
+from PathScripts import PreImporter
 
 AXIS = 'X','Y','Z','A','B'  #OpenSBP always puts multiaxis move parameters in this order
 SPEEDS = 'XY','Z','A','B'
 
+# every path is split into Path objects of about this many commands, None to keep them whole
+COMMANDS_PER_PATH = None
+
 # to distinguish python built-in open function from the one declared below
 if open.__module__ == '__builtin__':
     pythonopen = open
@@ -67,26 +71,34 @@ def open(filename):
 
 def insert(filename,docname):
     "called when freecad imports a file"
-    "This insert expects parse to return a list of strings"
-    "each string will become a separate path"
-    gfile = pythonopen(filename)
-    gcode = gfile.read()
-    gfile.close()
-    gcode = parse(gcode)
+    "every path in the file becomes a separate Path object"
     doc = FreeCAD.getDocument(docname)
-    for subpath in gcode:
-        obj = doc.addObject("Path::Feature","Path")
-        path = Path.Path(subpath)
-        obj.Path = path
+    PreImporter.importFile(filename, doc, preprocess, COMMANDS_PER_PATH, False)
 
 
 def parse(inputstring):
     "parse(inputstring): returns a list of parsed output string"
     print("preprocessing...")
-    # split the input by line
-    lines = inputstring.split("\n")
     return_output = []
     output = ""
+    for gcode in preprocess(inputstring.split("\n")):
+        if gcode is None:
+            return_output.append(output)
+            output = ""
+        else:
+            output += gcode
+    if output:
+        return_output.append(output)
+        print("done preprocessing.")
+
+    return return_output
+
+
+def preprocess(lines):
+    "preprocess(lines): generator over the parsed output of lines, None starts a new path"
+    # the output of a path is held back until it has at least one move command
+    pending = []
+    hasMove = False
     last = {'X':None,'Y':None,'Z':None,'A':None,'B':None}
     lastrapidspeed = {'XY':"50", 'Z':"50", 'A':"50", 'B':"50" }  #set default rapid speeds
     lastfeedspeed = {'XY':"50", 'Z':"50", 'A':"50", 'B':"50" } #set default feed speed
@@ -102,11 +114,12 @@ def parse(inputstring):
             # discard comment and other non strictly gcode lines
             if l[0:9] == "'New Path":
                 # starting new path
-                if any (x in output for x in movecommand): #make sure the path has at least one move command.
-                    return_output.append(output)
-                    output = ""
+                if hasMove: #make sure the path has at least one move command.
+                    yield None
+                    hasMove = False
             continue
 
+        output = ""
         words = [a.strip() for a in l.split(",")]
         words[0] = words[0].upper()
         if words[0] in ["J2","J3","J4","J5","M2","M3","M4","M5"]: #multi-axis jogs and moves
@@ -145,7 +158,7 @@ def parse(inputstring):
 
             last[words[0][1]] = words[1]
             output += s
-            for key, val in last.iteritems():
+            for key, val in last.items():
                 if val is not None:
                     output += key + str(val) + " F" + speed + "\n"
 
@@ -198,12 +211,17 @@ def parse(inputstring):
                 last["X"] = words[2]
                 last["Y"] = words[3]
 
-    #Make sure all appended paths have at least one move command.
-    if any (x in output for x in movecommand):
-        return_output.append(output)
-        print("done preprocessing.")
-
-    return return_output
+        if output:
+            if hasMove:
+                yield output
+            elif any (x in output for x in movecommand):
+                hasMove = True
+                for gcode in pending:
+                    yield gcode
+                pending = []
+                yield output
+            else:
+                pending.append(output)
 
 print(__name__ + " gcode preprocessor loaded.")
 
@@ -40,6 +40,7 @@ parameters, like e.g. suppress the units in the header and at every hop.
 ''' example post for Maho M 600E mill'''
 import FreeCAD
 import time
+from PathScripts import PostEmitter
 from PathScripts import PostUtils
 import math
 
@@ -314,11 +315,13 @@ def export(selection, filename, argstring):
     if myMachine is None:
         print("No machine found in this selection")
 
-    gcode = ''
-    gcode += mkHeader(selection)
-    gcode += linenumberify(GCODE_HEADER)
+    gfile = pythonopen(filename, "wb")
+    # the program is written to the file while it is generated
+    gcode = PostEmitter.GCodeWriter(gfile, keep=SHOW_EDITOR)
+    gcode.write(mkHeader(selection))
+    gcode.write(linenumberify(GCODE_HEADER))
     if UNITS_INCLUDED:
-        gcode += linenumberify(mapGCode(UNITS))
+        gcode.write(linenumberify(mapGCode(UNITS)))
 
     lastcommand = None
 
@@ -327,12 +330,19 @@ def export(selection, filename, argstring):
         if g.Name != 'Machine':  # filtering out gcode home position from Machine object
             gobjects.append(g)
 
+    axis = PostEmitter.lengthFormatter(AXIS_DECIMALS, UNITS)
+    feed = PostEmitter.lengthFormatter(FEED_DECIMALS, UNITS)
+    # rpm is unitless-therefore I had to 'fake it out' by using metric units
+    # which don't get converted from entered value
+    spindle = PostEmitter.lengthFormatter(SPINDLE_DECIMALS, 'G21')
+
     for obj in gobjects:
         if hasattr(obj, 'Comment'):
-            gcode += linenumberify('(' + obj.Comment + ')')
+            gcode.write(linenumberify('(' + obj.Comment + ')'))
         for c in obj.Path.Commands:
             outstring = []
             command = c.Name
+            parameters = c.Parameters
 
             if (command != UNITS or UNITS_INCLUDED):
                 if command[0] == '(':
@@ -347,53 +357,50 @@ def export(selection, filename, argstring):
 # #\better:   append iff MODAL == False )
 #                   if command == lastcommand: )
 #                       outstring.pop(0!#\ )
-                if c.Parameters >= 1:
+                if parameters:
                     for param in params:
-                        if param in c.Parameters:
-                            if (param in MODALPARAMS) and (modalParamsDict[str(param)] == c.Parameters[str(param)]):
+                        if param in parameters:
+                            if (param in MODALPARAMS) and (modalParamsDict[str(param)] == parameters[str(param)]):
                                 # do nothing or append white space
                                 outstring.append('  ')
                             elif param == 'F':
                                 outstring.append(
-                                    param + PostUtils.fmt(c.Parameters['F'], FEED_DECIMALS, UNITS))
+                                    param + feed(parameters['F']))
                             elif param == 'H':
                                 outstring.append(
-                                    param + str(int(c.Parameters['H'])))
+                                    param + str(int(parameters['H'])))
                             elif param == 'S':
-                                # rpm is unitless-therefore I had to 'fake it
-                                # out' by using metric units which don't get
-                                # converted from entered value
                                 outstring.append(
-                                    param + PostUtils.fmt(c.Parameters['S'], SPINDLE_DECIMALS, 'G21'))
+                                    param + spindle(parameters['S']))
                             elif param == 'T':
                                 outstring.append(
-                                    param + str(int(c.Parameters['T'])))
+                                    param + str(int(parameters['T'])))
                             elif param == 'I' and (command == 'G2' or command == 'G3'):
                                 # this is the special case for circular paths,
                                 # where relative coordinates have to be changed
                                 # to absolute
-                                i = c.Parameters['I']
+                                i = parameters['I']
                                 # calculate the radius r
-                                j = c.Parameters['J']
+                                j = parameters['J']
                                 r = math.sqrt(i**2 + j**2)
-                                if USE_RADIUS_IF_POSSIBLE and angleUnder180(command, lastX, lastY, c.Parameters['X'], c.Parameters['Y'], i, j):
+                                if USE_RADIUS_IF_POSSIBLE and angleUnder180(command, lastX, lastY, parameters['X'], parameters['Y'], i, j):
                                     outstring.append(
-                                        'R' + PostUtils.fmt(r, AXIS_DECIMALS, UNITS))
+                                        'R' + axis(r))
                                 else:
                                     if RADIUS_COMMENT:
                                         outstring.append(
-                                            '(R' + PostUtils.fmt(r, AXIS_DECIMALS, UNITS) + ')')
+                                            '(R' + axis(r) + ')')
                                     if ABSOLUTE_CIRCLE_CENTER:
                                         i += lastX
                                     outstring.append(
-                                        param + PostUtils.fmt(i, AXIS_DECIMALS, UNITS))
+                                        param + axis(i))
                             elif param == 'J' and (command == 'G2' or command == 'G3'):
                                 # this is the special case for circular paths,
                                 # where incremental center has to be changed to
                                 # absolute center
-                                i = c.Parameters['I']
-                                j = c.Parameters['J']
-                                if USE_RADIUS_IF_POSSIBLE and angleUnder180(command, lastX, lastY, c.Parameters['X'], c.Parameters['Y'], i, j):
+                                i = parameters['I']
+                                j = parameters['J']
+                                if USE_RADIUS_IF_POSSIBLE and angleUnder180(command, lastX, lastY, parameters['X'], parameters['Y'], i, j):
                                     # R is handled with the I parameter, here:
                                     # do nothing at all, keep the structure as
                                     # with I command
@@ -404,19 +411,19 @@ def export(selection, filename, argstring):
                                     if SWAP_Y_Z:
                                         # we have to swap j and k as well
                                         outstring.append(
-                                            'K' + PostUtils.fmt(j, AXIS_DECIMALS, UNITS))
+                                            'K' + axis(j))
                                     else:
                                         outstring.append(
-                                            param + PostUtils.fmt(j, AXIS_DECIMALS, UNITS))
+                                            param + axis(j))
                             elif param == 'K' and (command == 'G2' or command == 'G3'):
                                 # this is the special case for circular paths,
                                 # where incremental center has to be changed to
                                 # absolute center
                                 outstring.append(
-                                    '(' + param + PostUtils.fmt(c.Parameters[param], AXIS_DECIMALS, UNITS) + ')')
-                                z = c.Parameters['Z']
-                                k = c.Parameters['K']
-                                if USE_RADIUS_IF_POSSIBLE and angleUnder180(command, lastX, lastY, c.Parameters['X'], c.Parameters['Y'], i, j):
+                                    '(' + param + axis(parameters[param]) + ')')
+                                z = parameters['Z']
+                                k = parameters['K']
+                                if USE_RADIUS_IF_POSSIBLE and angleUnder180(command, lastX, lastY, parameters['X'], parameters['Y'], i, j):
                                     # R is handled with the I parameter, here:
                                     # do nothing at all, keep the structure as
                                     # with I command
@@ -427,43 +434,42 @@ def export(selection, filename, argstring):
                                 if SWAP_Y_Z:
                                         # we have to swap j and k as well
                                     outstring.append(
-                                        'J' + PostUtils.fmt(j, AXIS_DECIMALS, UNITS))
+                                        'J' + axis(j))
                                 else:
                                     outstring.append(
-                                        param + PostUtils.fmt(j, AXIS_DECIMALS, UNITS))
+                                        param + axis(j))
                             elif param == 'Y' and SWAP_Y_Z:
                                 outstring.append(
-                                    'Z' + PostUtils.fmt(c.Parameters[param], AXIS_DECIMALS, UNITS))
+                                    'Z' + axis(parameters[param]))
                             elif param == 'Z' and SWAP_Y_Z:
                                 outstring.append(
-                                    'Y' + PostUtils.fmt(c.Parameters[param], AXIS_DECIMALS, UNITS))
+                                    'Y' + axis(parameters[param]))
                             else:
                                 outstring.append(
-                                    param + PostUtils.fmt(c.Parameters[param], AXIS_DECIMALS, UNITS))
+                                    param + axis(parameters[param]))
 
                             if param in MODALPARAMS:
-                                modalParamsDict[str(param)] = c.Parameters[
+                                modalParamsDict[str(param)] = parameters[
                                     param]
                     # save the last X, Y, Z values
-                    if 'X' in c.Parameters:
-                        lastX = c.Parameters['X']
-                    if 'Y' in c.Parameters:
-                        lastY = c.Parameters['Y']
-                    if 'Z' in c.Parameters:
-                        lastZ = c.Parameters['Z']
+                    if 'X' in parameters:
+                        lastX = parameters['X']
+                    if 'Y' in parameters:
+                        lastY = parameters['Y']
+                    if 'Z' in parameters:
+                        lastZ = parameters['Z']
                 outstr = str(outstring)
                 outstr = outstr.replace(']', '')
                 outstr = outstr.replace('[', '')
                 outstr = outstr.replace("'", '')
                 outstr = outstr.replace(",", '')
                 if LINENUMBERS:
-                    gcode += "N" + str(linenr) + " "
+                    gcode.write("N" + str(linenr) + " ")
                     linenr += LINENUMBER_INCREMENT
-                gcode += outstr + '\n'
+                gcode.write(outstr + '\n')
                 lastcommand = c.Name
-    gcode += linenumberify(GCODE_FOOTER)
-    if SHOW_EDITOR:
-        PostUtils.editor(gcode)
-    gfile = pythonopen(filename, "wb")
-    gfile.write(gcode)
+    gcode.write(linenumberify(GCODE_FOOTER))
+    gcode.flush()
     gfile.close()
+    if SHOW_EDITOR:
+        PostUtils.editor(gcode.getvalue())
@@ -37,6 +37,8 @@ http://paulbourke.net/dataformats/hpgl/
 import FreeCAD
 import Part
 import PostUtils
+import PathScripts.PathLog as PathLog
+from PathScripts import PostEmitter
 
 # to distinguish python built-in open function from the one declared below
 if open.__module__ == '__builtin__':
@@ -47,12 +49,11 @@ if open.__module__ == '__builtin__':
 def export(objectslist, filename, argstring):
     "Export objects as Roland Modela code."
 
-    code = ""
-    for obj in objectslist:
-        code += convertobject(obj)
-
     gfile = pythonopen(filename,"wb")
-    gfile.write(code)
+    # the code of every object is written to the file once it's converted
+    code = PostEmitter.GCodeWriter(gfile, keep=False, bufferSize=1)
+    for obj in objectslist:
+        code.write(convertobject(obj))
     gfile.close()
 
 def convertobject(obj):
@@ -142,7 +143,7 @@ def xyarc(args, state):
 
 def speed(xy=None, z=None, state={}):
     c = []
-    print(xy, z, state)
+    PathLog.debug("%s %s %s", xy, z, state)
     if xy is not None:
         xy = float(xy)
         if xy > 0.0 and xy != state['XYspeed']:
@@ -234,7 +235,7 @@ def parse(inputstring):
             continue
         parsed = PostUtils.stringsplit(line)
         command = parsed['command']
-        print('cmd', line)
+        PathLog.debug("cmd %s", line)
         try:
             if command:
                 code = convertgcode(command, parsed, state)
@@ -45,6 +45,7 @@ Arguments for smoothieboard:
 import FreeCAD
 from FreeCAD import Units
 import datetime
+from PathScripts import PostEmitter
 from PathScripts import PostUtils
 
 now = datetime.datetime.now()
@@ -133,13 +134,13 @@ def export(objectslist, filename, argstring):
     processArguments(argstring)
     global UNITS
     global IP_ADDR
+    global LINENR
     for obj in objectslist:
         if not hasattr(obj, "Path"):
             FreeCAD.Console.PrintError("the object " + obj.Name + " is not a path. Please select only path and Compounds.\n")
             return
 
     FreeCAD.Console.PrintMessage("postprocessing...\n")
-    gcode = ""
 
     # Find the machine.
     # The user my have overridden post processor defaults in the GUI.  Make
@@ -156,61 +157,59 @@ def export(objectslist, filename, argstring):
     if myMachine is None:
         FreeCAD.Console.PrintWarning("No machine found in this selection\n")
 
+    # the program is written to the file while it is generated, unless it
+    # goes through the editor or is sent to the board
+    gfile = None
+    if not SHOW_EDITOR and IP_ADDR is None and not filename == '-':
+        gfile = pythonopen(filename, "wb")
+    writer = PostEmitter.GCodeWriter(gfile)
+    gcode = emitter(writer)
+
     # write header
     if OUTPUT_HEADER:
-        gcode += linenumber() + "(Exported by FreeCAD)\n"
-        gcode += linenumber() + "(Post Processor: " + __name__ + ")\n"
-        gcode += linenumber() + "(Output Time:" + str(now) + ")\n"
+        gcode.emit("(Exported by FreeCAD)\n")
+        gcode.emit("(Post Processor: " + __name__ + ")\n")
+        gcode.emit("(Output Time:" + str(now) + ")\n")
 
     # Write the preamble
     if OUTPUT_COMMENTS:
-        gcode += linenumber() + "(begin preamble)\n"
-    for line in PREAMBLE.splitlines(True):
-        gcode += linenumber() + line
-    gcode += linenumber() + UNITS + "\n"
+        gcode.emit("(begin preamble)\n")
+    gcode.emitBlock(PREAMBLE)
+    gcode.emit(UNITS + "\n")
 
     for obj in objectslist:
 
         # do the pre_op
         if OUTPUT_COMMENTS:
-            gcode += linenumber() + "(begin operation: " + obj.Label + ")\n"
-        for line in PRE_OPERATION.splitlines(True):
-            gcode += linenumber() + line
+            gcode.emit("(begin operation: " + obj.Label + ")\n")
+        gcode.emitBlock(PRE_OPERATION)
 
-        gcode += parse(obj)
+        gcode.emitPath(obj)
 
         # do the post_op
         if OUTPUT_COMMENTS:
-            gcode += linenumber() + "(finish operation: " + obj.Label + ")\n"
-        for line in POST_OPERATION.splitlines(True):
-            gcode += linenumber() + line
+            gcode.emit("(finish operation: " + obj.Label + ")\n")
+        gcode.emitBlock(POST_OPERATION)
 
     # do the post_amble
 
     if OUTPUT_COMMENTS:
-        gcode += "(begin postamble)\n"
-    for line in POSTAMBLE.splitlines(True):
-        gcode += linenumber() + line
+        writer.write("(begin postamble)\n")
+    gcode.emitBlock(POSTAMBLE)
+    LINENR = gcode.lineNumber
+    final = writer.getvalue()
+    if gfile is not None:
+        gfile.close()
 
     if SHOW_EDITOR:
-        dia = PostUtils.GCodeEditorDialog()
-        dia.editor.setText(gcode)
-        result = dia.exec_()
-        if result:
-            final = dia.editor.toPlainText()
-        else:
-            final = gcode
-    else:
-        final = gcode
+        final = PostUtils.editor(final)
 
     if IP_ADDR is not None:
         sendToSmoothie(IP_ADDR, final, filename)
-    else:
-
-        if not filename == '-':
-            gfile = pythonopen(filename, "wb")
-            gfile.write(final)
-            gfile.close()
+    elif SHOW_EDITOR and not filename == '-':
+        gfile = pythonopen(filename, "wb")
+        gfile.write(final)
+        gfile.close()
 
     FreeCAD.Console.PrintMessage("done postprocessing.\n")
     return final
@@ -290,94 +289,39 @@ def sendToSmoothie(IP_ADDR, GCODE, fname):
     FreeCAD.Console.PrintMessage("Upload complete\n")
 
 
-def linenumber():
-    global LINENR
-    if OUTPUT_LINE_NUMBERS is True:
-        LINENR += 10
-        return "N" + str(LINENR) + " "
-    return ""
+class SmoothieEmitter(PostEmitter.GCodeEmitter):
+    '''adds the current spindle speed to every feed move'''
 
-def parse(pathobj):
-    out = ""
-    lastcommand = None
-    global SPINDLE_SPEED
+    def commandWords(self, name, parameters):
+        global SPINDLE_SPEED
+        words = PostEmitter.GCodeEmitter.commandWords(self, name, parameters)
+        if 'S' in parameters:
+            SPINDLE_SPEED = parameters['S']
+        if name in ['G1', 'G01', 'G2', 'G02', 'G3', 'G03']:
+            words.append('S' + str(SPINDLE_SPEED))
+        return words
 
+
+def emitter(writer):
     # params = ['X','Y','Z','A','B','I','J','K','F','S'] #This list control
     # the order of parameters
     # linuxcnc doesn't want K properties on XY plane  Arcs need work.
     params = ['X', 'Y', 'Z', 'A', 'B', 'I', 'J', 'F', 'S', 'T', 'Q', 'R', 'L']
+    formatters = dict((param, PostEmitter.numberFormatter(4, param)) for param in params)
+    formatters['F'] = PostEmitter.velocityFormatter(2, UNIT_FORMAT, 'F')
+    formatters['T'] = lambda value: 'T' + str(value)
+    formatters['S'] = lambda value: 'S' + str(value)
+    return SmoothieEmitter(writer, params, formatters, COMMAND_SPACE, MODAL, OUTPUT_COMMENTS,
+                           OUTPUT_LINE_NUMBERS, LINENR, 10, toolChange=TOOL_CHANGE)
+
 
-    if hasattr(pathobj, "Group"):  # We have a compound or project.
-        # if OUTPUT_COMMENTS:
-        #     out += linenumber() + "(compound: " + pathobj.Label + ")\n"
-        for p in pathobj.Group:
-            out += parse(p)
-        return out
-    else:  # parsing simple path
-
-        # groups might contain non-path things like stock.
-        if not hasattr(pathobj, "Path"):
-            return out
-
-        # if OUTPUT_COMMENTS:
-        #     out += linenumber() + "(" + pathobj.Label + ")\n"
-
-        for c in pathobj.Path.Commands:
-            outstring = []
-            command = c.Name
-            outstring.append(command)
-            # if modal: only print the command if it is not the same as the
-            # last one
-            if MODAL is True:
-                if command == lastcommand:
-                    outstring.pop(0)
-
-            # Now add the remaining parameters in order
-            for param in params:
-                if param in c.Parameters:
-                    if param == 'F':
-                        if c.Name not in ["G0", "G00"]: #linuxcnc doesn't use rapid speeds
-                            speed = Units.Quantity(c.Parameters['F'], FreeCAD.Units.Velocity)
-                            outstring.append(
-                                param + format(float(speed.getValueAs(UNIT_FORMAT)), '.2f') )
-                    elif param == 'T':
-                        outstring.append(param + str(c.Parameters['T']))
-                    elif param == 'S':
-                        outstring.append(param + str(c.Parameters['S']))
-                        SPINDLE_SPEED = c.Parameters['S']
-                    else:
-                        outstring.append(
-                            param + format(c.Parameters[param], '.4f'))
-            if command in ['G1', 'G01', 'G2', 'G02', 'G3', 'G03']:
-                outstring.append('S' + str(SPINDLE_SPEED))
-
-            # store the latest command
-            lastcommand = command
-
-            # Check for Tool Change:
-            if command == 'M6':
-                # if OUTPUT_COMMENTS:
-                #     out += linenumber() + "(begin toolchange)\n"
-                for line in TOOL_CHANGE.splitlines(True):
-                    out += linenumber() + line
-
-            if command == "message":
-                if OUTPUT_COMMENTS is False:
-                    out = []
-                else:
-                    outstring.pop(0)  # remove the command
-
-            # prepend a line number and append a newline
-            if len(outstring) >= 1:
-                if OUTPUT_LINE_NUMBERS:
-                    outstring.insert(0, (linenumber()))
-
-                # append the line to the final output
-                for w in outstring:
-                    out += w + COMMAND_SPACE 
-                out = out.strip() + "\n"
-
-        return out
+def parse(pathobj):
+    global LINENR
+    writer = PostEmitter.GCodeWriter()
+    gcode = emitter(writer)
+    gcode.emitPath(pathobj)
+    LINENR = gcode.lineNumber
+    return writer.getvalue()
 
 
 print(__name__ + " gcode postprocessor loaded.")
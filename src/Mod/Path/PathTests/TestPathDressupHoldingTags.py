@@ -75,3 +75,29 @@ class TestHoldingTags(PathTestBase):
         print(h)
         self.assertConeAt(tag.solid, Vector(0,0,-h * 0.01), 2.5, 0, h)
 
+
+    def test05(self):
+        """Verify tag solids are reused for equal tags at the same depth."""
+        tag = Tag(0, 0, 0, 5, 17, 60, 0, True)
+        tag.createSolidsAt(0, 0)
+        other = Tag(1, 0, 0, 5, 17, 60, 0, True)
+        other.createSolidsAt(0, 0)
+        self.assertTrue(other.solid is tag.solid)
+        self.assertRoughly(other.actualHeight, tag.actualHeight)
+        self.assertRoughly(other.top(), tag.top())
+        other = Tag(2, 0, 0, 5, 17, 60, 0, True)
+        other.createSolidsAt(1, 0)
+        self.assertFalse(other.solid is tag.solid)
+
+    def test06(self):
+        """Verify the tag index only returns tags the bounding box of an edge overlaps."""
+        tags = [Tag(i, x, y, 4, 2, 90, 0, x != 20) for i, (x, y) in enumerate([(0, 0), (10, 0), (20, 0), (10, 10)])]
+        for tag in tags:
+            tag.createSolidsAt(0, 1)
+        index = TagIndex(tags)
+        def candidates(p1, p2):
+            return index.candidates(Part.Edge(Part.LineSegment(p1, p2)))
+        self.assertEqual(candidates(Vector(-10, 0, 0), Vector(30, 0, 0)), [0, 1])
+        self.assertEqual(candidates(Vector(9, -5, 1), Vector(11, 15, 1)), [1, 3])
+        self.assertEqual(candidates(Vector(9, -5, 10), Vector(11, 15, 10)), [])
+        self.assertEqual(candidates(Vector(5, 5, 0), Vector(6, 6, 0)), [])
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *                                                                         *
+# *   Copyright (c) 2026 agent <agent@local>                                *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+
+
+import Path
+import math
+import numpy
+
+from FreeCAD import Vector
+from PathScripts.PathHeightmap import Heightmap, StockSimulator, ToolShape
+from PathTests.PathTestUtils import PathTestBase
+
+
+def tool(toolType, diameter, cornerRadius=0.0, angle=0.0):
+    t = Path.Tool()
+    t.ToolType = toolType
+    t.Diameter = diameter
+    t.CornerRadius = cornerRadius
+    t.CuttingEdgeAngle = angle
+    return ToolShape(t)
+
+
+class Operation(object):
+    """stand in for a Path operation"""
+    def __init__(self, name, gcode):
+        self.Name = name
+        self.Path = Path.Path(gcode)
+
+
+class Feature(object):
+    """stand in for the part and the stock of a job"""
+    def __init__(self, shape, base=None):
+        self.Shape = shape
+        self.Base = base
+        self.InList = []
+        if base:
+            self.Length_Allowance = self.Width_Allowance = self.Height_Allowance = 1.0
+            base.InList.append(self)
+
+
+class Job(object):
+    """stand in for a Path job"""
+    def __init__(self, group, base):
+        self.Label = 'Job'
+        self.Group = group
+        self.Base = base
+
+
+class TestPathHeightmap(PathTestBase):
+
+    def setUp(self):
+        self.heightmap = Heightmap(0, 0, 50, 40, -10, 0, 0.5)
+
+    def test00(self):
+        """Verify the tool outlines."""
+        r = numpy.array([0, 1, 2, 3, 4])
+        self.assertEqual(tool('EndMill', 6).heights(r).tolist(), [0, 0, 0, 0, numpy.inf])
+        ball = tool('BallEndMill', 6).heights(r)
+        for d, h in zip(r[:4], ball[:4]):
+            self.assertRoughly(h, 3 - math.sqrt(9 - d * d))
+        bull = tool('EndMill', 6, 1).heights(r)
+        self.assertRoughly(bull[2], 0)
+        self.assertRoughly(bull[3], 1)
+        cone = tool('Chamfer', 6, angle=90).heights(r)
+        for d, h in zip(r[:4], cone[:4]):
+            self.assertRoughly(h, d)
+
+    def test01(self):
+        """Verify a horizontal move cuts a slot of the tool's width and depth."""
+        endmill = tool('EndMill', 6)
+        removed = self.heightmap.cutLine(Vector(10, 20, -2), Vector(40, 20, -2), endmill)
+        h = self.heightmap.heights
+        y = self.heightmap.ys
+        x = self.heightmap.xs
+        inside = numpy.abs(y - 20) <= 3
+        self.assertTrue((h[inside][:, (x >= 10) & (x <= 40)] == -2).all())
+        self.assertTrue((h[~inside] == 0).all())
+        self.assertTrue((h[:, x < 7] == 0).all())
+        self.assertRoughly(removed, float(2 * (h < 0).sum()) * 0.25)
+        # the slot's area is about 30 * 6 + 9 * pi
+        self.assertTrue(abs(removed / 2 - (180 + 9 * math.pi)) < 10)
+
+    def test02(self):
+        """Verify plunges, ramps and arcs."""
+        ball = tool('BallEndMill', 4)
+        self.heightmap.cutLine(Vector(10, 10, 5), Vector(10, 10, -3), ball)
+        j, i = int(10 / 0.5), int(10 / 0.5)
+        self.assertRoughly(self.heightmap.heights[j - 1:j + 1, i - 1:i + 1].min(), -3 + 2 - math.sqrt(4 - 2 * 0.25 ** 2))
+        self.heightmap.cutLine(Vector(20, 5, 0), Vector(40, 5, -4), tool('EndMill', 2))
+        h = self.heightmap.heights[int(5 / 0.5)]
+        self.assertTrue(h[int(25 / 0.5)] > h[int(35 / 0.5)])
+        # the flat bottom of the tool is lower in front of the cell, the error of the sampling is the drop over a quarter cell
+        self.assertTrue(abs(h[int(30 / 0.5)] + (30.25 + math.sqrt(1 - 0.25 ** 2) - 20) / 5) <= 0.25 * 4 / 20)
+        self.heightmap.cutArc(Vector(35, 25, -1), Vector(25, 25, -1), Vector(30, 25, -1), False, tool('EndMill', 1))
+        self.assertEqual(self.heightmap.heights[int(30 / 0.5), int(30 / 0.5)], -1)
+        self.assertEqual(self.heightmap.heights[int(20 / 0.5), int(30 / 0.5)], 0)
+        self.assertEqual(self.heightmap.heights[int(25 / 0.5), int(30 / 0.5)], 0)
+
+    def test03(self):
+        """Verify gouges, rapid cuts and the incremental simulation of operations."""
+        self.heightmap.model = numpy.empty(self.heightmap.heights.shape)
+        self.heightmap.model.fill(-5)
+        simulator = StockSimulator(self.heightmap)
+        endmill = tool('EndMill', 4)
+        ops = [(Operation('face', "G0 X0 Y10 Z5\nG1 Z-1\nG1 X50\nG0 Z5\n"), endmill), (Operation('pocket', "G0 X10 Y30 Z5\nG1 Z-4\nG1 X40\nG0 Z5\n"), endmill)]
+        results = simulator.simulate(ops)
+        self.assertEqual([r.name for r in results], ['face', 'pocket'])
+        self.assertFalse(any(r.hasGouges() for r in results))
+        self.assertEqual(results[0].rapidCuts, [])
+        removed = results[1].removed
+        ops[1] = (Operation('pocket', "G0 X10 Y30 Z5\nG1 Z-6\nG0 X40\nG0 Z5\n"), endmill)
+        before = simulator.steps[0][1]
+        results = simulator.simulate(ops)
+        self.assertTrue(simulator.steps[0][1] is before)
+        self.assertFalse(results[0].hasGouges())
+        self.assertTrue(results[1].hasGouges())
+        self.assertEqual(len(results[1].rapidCuts), 1)
+        self.assertRoughly(results[1].removed, removed * 1.5)
+        self.assertTrue((self.heightmap.gouges() <= 1).all())
+        self.assertRoughly(self.heightmap.gouges().max(), 1)
+        self.assertRoughly(self.heightmap.remaining().max(), 5)
+
+    def test04(self):
+        """Verify the meshes of the stock's top."""
+        heightmap = Heightmap(0, 0, 3, 2, -1, 0, 1)
+        vertices, facets = heightmap.mesh()
+        self.assertEqual(vertices.shape, (6, 3))
+        self.assertEqual(facets.shape, (4, 3))
+        mask = numpy.array([[True, True, False], [True, True, True]])
+        vertices, facets = heightmap.mesh(mask)
+        self.assertEqual(facets.shape, (2, 3))
+        self.assertEqual(sorted(set(facets.ravel().tolist())), [0, 1, 3, 4])
+
+    def test05(self):
+        """Verify the heights of the model are the top of the part."""
+        import Part
+        self.heightmap.setModel(Part.makeBox(10, 20, 5, Vector(5, 5, -10)))
+        x, y = numpy.meshgrid(self.heightmap.xs, self.heightmap.ys)
+        inside = (x > 5) & (x < 15) & (y > 5) & (y < 25)
+        self.assertTrue((numpy.abs(self.heightmap.model[inside] + 5) < 1e-6).all())
+        self.assertTrue(numpy.isinf(self.heightmap.model[~inside]).all())
+        self.assertEqual(self.heightmap.gouges().max(), 0)
+        self.assertRoughly(self.heightmap.remaining()[inside].max(), 5)
+
+    def test06(self):
+        """Verify the simulator of a job is over its stock."""
+        import FreeCAD
+        import Part
+        base = Feature(Part.makeBox(10, 20, 5, Vector(5, 5, -10)))
+        stock = Feature(Part.makeBox(12, 22, 7, Vector(4, 4, -11)), base)
+        for job in (Job([stock], base), Job([], base)):
+            heightmap = StockSimulator.fromJob(job, 0.5).heightmap
+            self.assertEqual((heightmap.xmin, heightmap.ymin, heightmap.zmin, heightmap.zmax), (4, 4, -11, -4))
+            self.assertEqual((heightmap.nx, heightmap.ny), (24, 44))
+            self.assertRoughly(heightmap.model.max(), -5)
+        job = Job([], None)
+        self.assertRaises(ValueError, StockSimulator.fromJob, job, 0.5)
+        heightmap = StockSimulator.fromJob(job, 0.5, stock=FreeCAD.BoundBox(0, 0, -3, 10, 8, 0)).heightmap
+        self.assertEqual((heightmap.nx, heightmap.ny, heightmap.zmin), (20, 16, -3))
+        self.assertTrue(heightmap.model is None)
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *                                                                         *
+# *   Copyright (c) 2026 agent <agent@local>                                *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+
+import random
+
+from PathScripts.PathJobOrder import JobOrder
+from PathTests.PathTestUtils import PathTestBase
+
+
+def nearestNeighborOrder(locations, keys, attractors):
+    """straight forward nearest neighbor ordering, as sort_jobs did it"""
+    def cost(location, current):
+        return sum((location[k] - current.get(k, 0)) ** 2 for k in keys) + sum(abs(location[k]) for k in attractors)
+    remaining = list(range(len(locations)))
+    order = []
+    current = {}
+    while remaining:
+        best = min(remaining, key=lambda i: (cost(locations[i], current), i))
+        remaining.remove(best)
+        order.append(best)
+        current = locations[best]
+    return order
+
+
+class TestPathJobOrder(PathTestBase):
+
+    def setUp(self):
+        random.seed(4711)
+        self.locations = [{'x': random.randint(0, 200), 'y': random.randint(0, 100), 'z': random.choice([0, -2])} for i in range(300)]
+        # some jobs on the same location with a different depth
+        self.locations += [dict(location, z=-5) for location in self.locations[:30]]
+
+    def test00(self):
+        """Verify the nearest neighbor order with and without attractors."""
+        for attractors in (['x'], ['x', 'z']):
+            order = JobOrder(self.locations, ['x', 'y'], attractors)
+            self.assertEqual(order.sortNearestNeighbor(), nearestNeighborOrder(self.locations, ['x', 'y'], attractors))
+            self.assertRoughly(order.seedDistance, order.rapidDistance())
+
+    def test01(self):
+        """Verify the improved order is shorter and keeps the first location and the order of equal locations."""
+        order = JobOrder(self.locations, ['x', 'y'], ['x', 'z'])
+        seed = list(order.sortNearestNeighbor())
+        order.improve(10.0)
+        self.assertEqual(sorted(order.order), list(range(len(self.locations))))
+        self.assertEqual(order.order[0], seed[0])
+        self.assertTrue(order.distance < order.seedDistance)
+        self.assertRoughly(order.distance, order.rapidDistance())
+        for a, b in zip(seed, seed[1:]):
+            if (self.locations[a]['x'], self.locations[a]['y']) == (self.locations[b]['x'], self.locations[b]['y']):
+                self.assertEqual(order.order.index(b), order.order.index(a) + 1)
+
+    def test02(self):
+        """Verify degenerated location lists."""
+        self.assertEqual(JobOrder([], ['x', 'y']).sortNearestNeighbor(), [])
+        order = JobOrder([{'x': 1, 'y': 1}, {'x': 1, 'y': 1}], ['x', 'y'])
+        order.sortNearestNeighbor()
+        self.assertEqual(order.improve(1.0), [0, 1])
+        locations = [{'x': x, 'y': 0} for x in (3, 1, 2, 5, 4)]
+        order = JobOrder(locations, ['x', 'y'])
+        order.sortNearestNeighbor()
+        order.improve(1.0)
+        self.assertEqual([location['x'] for location in order.getLocations()], [1, 2, 3, 4, 5])
+
+    def test03(self):
+        """Verify the depth steps of a hole stay in order if the nearest neighbor order interleaves them."""
+        holes = [(random.randint(0, 200), random.randint(0, 100)) for i in range(40)]
+        locations = [{'x': x, 'y': y, 'z': -step, 'step': step} for step in range(4) for (x, y) in holes]
+        order = JobOrder(locations, ['x', 'y'], ['x', 'z'])
+        seed = order.sortNearestNeighbor()
+        stops = [(locations[a]['x'], locations[a]['y']) for a in seed]
+        self.assertTrue(len([a for a, b in zip(stops, stops[1:]) if a != b]) >= len(holes))
+        order.improve(10.0)
+        self.assertEqual(sorted(order.order), list(range(len(locations))))
+        for hole in holes:
+            steps = [locations[i]['step'] for i in order.order if (locations[i]['x'], locations[i]['y']) == hole]
+            self.assertEqual(steps, [0, 1, 2, 3])
+
+    def test04(self):
+        """Verify the improved order keeps the order of the attractor values."""
+        # the nearest neighbor order follows z back and forth in x, the shortest order would not
+        locations = [{'x': [0, 10][i % 2] + i // 2, 'y': 0, 'z': -1000 * i} for i in range(10)]
+        order = JobOrder(locations, ['x', 'y'], ['z'])
+        self.assertEqual(order.sortNearestNeighbor(), list(range(10)))
+        order.improve(10.0)
+        self.assertEqual(order.order, list(range(10)))
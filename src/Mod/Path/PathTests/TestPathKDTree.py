@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *                                                                         *
+# *   Copyright (c) 2026 agent <agent@local>                                *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+
+import numpy
+
+from PathScripts.kdtree import ArrayKDTree, KDTree
+from PathTests.PathTestUtils import PathTestBase
+
+
+class TestPathKDTree(PathTestBase):
+
+    def setUp(self):
+        numpy.random.seed(4711)
+        self.data = numpy.random.rand(2000, 2) * 100
+        # some duplicates and points on a grid
+        self.data[:50] = self.data[50:100]
+        self.data[100:200] = numpy.mgrid[0:10, 0:10].reshape(2, -1).T * 10
+        self.x = numpy.random.rand(300, 2) * 110 - 5
+
+    def bruteForce(self, x, p):
+        diff = numpy.abs(self.data[numpy.newaxis, :, :] - x[:, numpy.newaxis, :])
+        if p == numpy.inf:
+            return numpy.amax(diff, axis=-1)
+        return numpy.sum(diff ** p, axis=-1) ** (1. / p)
+
+    def test00(self):
+        """Verify the nearest neighbors against a brute force search."""
+        tree = ArrayKDTree(self.data, leafsize=8)
+        for p in (1, 2, numpy.inf):
+            distances = numpy.sort(self.bruteForce(self.x, p), axis=1)
+            d, i = tree.query(self.x, p=p)
+            self.assertEqual(d.shape, (len(self.x),))
+            self.assertTrue(numpy.allclose(d, distances[:, 0]))
+            self.assertTrue(numpy.allclose(self.bruteForce(self.x, p)[numpy.arange(len(self.x)), i], d))
+            d, i = tree.query(self.x, k=3, p=p)
+            self.assertEqual(d.shape, (len(self.x), 3))
+            self.assertTrue(numpy.allclose(d, distances[:, :3]))
+
+    def test01(self):
+        """Verify the upper bound and missing neighbors."""
+        tree = ArrayKDTree(self.data[:5])
+        d, i = tree.query(self.x[:10], k=7, distance_upper_bound=20)
+        self.assertTrue(numpy.all(numpy.isinf(d[:, 5:])))
+        self.assertTrue(numpy.all(i[:, 5:] == 5))
+        self.assertTrue(numpy.all(d[i < 5] < 20))
+        d, i = ArrayKDTree(numpy.zeros((0, 2))).query([1, 2])
+        self.assertTrue(numpy.isinf(d))
+        self.assertEqual(i, 0)
+
+    def test02(self):
+        """Verify the ball queries against a brute force search and the KDTree."""
+        tree = ArrayKDTree(self.data, leafsize=8)
+        distances = self.bruteForce(self.x, 2)
+        result = tree.query_ball_point(self.x, 4.5)
+        self.assertEqual(result.shape, (len(self.x),))
+        for c, neighbors in enumerate(result):
+            self.assertEqual(neighbors, numpy.nonzero(distances[c] <= 4.5)[0].tolist())
+        self.assertEqual(tree.query_ball_point(self.x[0], 4.5), result[0])
+        self.assertEqual(tree.query_ball_point(self.x[0], 4.5), sorted(KDTree(self.data).query_ball_point(self.x[0], 4.5)))
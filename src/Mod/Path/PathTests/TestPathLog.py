@@ -33,6 +33,7 @@ class TestPathLog(unittest.TestCase):
     def setUp(self):
         PathLog.setLevel(PathLog.Level.RESET)
         PathLog.untrackAllModules()
+        PathLog.resetProfile()
 
     def callerFile(self):
         return PathLog._caller()[0]
@@ -190,6 +191,64 @@ class TestPathLog(unittest.TestCase):
         self.assertTrue(msg.startswith(self.MODULE))
         self.assertTrue(msg.endswith('test61(this, None, 1, 18.25)'))
 
+    def test40(self):
+        """Verify messages are formatted with their arguments only if they are logged."""
+        class Formatted(object):
+            count = 0
+            def __str__(self):
+                Formatted.count += 1
+                return 'formatted'
+        self.assertIsNone(PathLog.debug('%s and %d', Formatted(), 7))
+        self.assertEqual(Formatted.count, 0)
+        PathLog.setLevel(PathLog.Level.DEBUG, self.MODULE)
+        self.assertEqual(PathLog.debug('%s and %d', Formatted(), 7).strip(), "%s.DEBUG: formatted and 7" % self.MODULE)
+        self.assertEqual(Formatted.count, 1)
+        self.assertEqual(PathLog.info('100%').strip(), "%s.INFO: 100%%" % self.MODULE)
+
+    def test41(self):
+        """Verify a module log level above the global one is honored."""
+        PathLog.setLevel(PathLog.Level.ERROR)
+        PathLog.setLevel(PathLog.Level.DEBUG, self.MODULE)
+        self.assertIsNotNone(PathLog.debug('something'))
+        PathLog.setLevel(PathLog.Level.RESET, self.MODULE)
+        self.assertIsNone(PathLog.debug('something'))
+        self.assertIsNone(PathLog.warning('something'))
+        PathLog.setLevel(PathLog.Level.DEBUG, 'SomeOtherModule')
+        self.assertIsNone(PathLog.debug('something'))
+
+    def test70(self):
+        """Verify profiled functions are only timed if profiling is enabled for their module."""
+        @PathLog.profile
+        def profiled(a, b=1):
+            """docstring"""
+            return a + b
+        self.assertEqual(profiled.__name__, 'profiled')
+        self.assertEqual(profiled.__doc__, 'docstring')
+        self.assertEqual(profiled(1), 2)
+        self.assertEqual(PathLog.profileStats(), {})
+        PathLog.profileModule()
+        self.assertEqual(profiled(1, b=2), 3)
+        self.assertEqual(profiled(2), 3)
+        PathLog.unprofileModule()
+        profiled(3)
+        stats = PathLog.profileStats(self.MODULE)
+        self.assertEqual(list(stats), ["%s.profiled" % self.MODULE])
+        self.assertEqual(stats["%s.profiled" % self.MODULE][0], 2)
+        self.assertEqual(PathLog.profileStats('SomeOtherModule'), {})
+
+    def test71(self):
+        """Verify profileAllModules and the report."""
+        @PathLog.profile
+        def failing():
+            raise ValueError()
+        PathLog.profileAllModules(True)
+        self.assertRaises(ValueError, failing)
+        self.assertEqual(PathLog.profileStats()["%s.failing" % self.MODULE][0], 1)
+        self.assertTrue("%s.failing" % self.MODULE in PathLog.profileReport())
+        PathLog.resetProfile()
+        self.assertEqual(PathLog.profileStats(), {})
+
     def testzz(self):
         """Restoring environment after tests."""
         PathLog.setLevel(PathLog.Level.RESET)
+        PathLog.resetProfile()
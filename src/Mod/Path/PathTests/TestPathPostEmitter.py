@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *                                                                         *
+# *   Copyright (c) 2026 agent <agent@local>                                *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+
+import FreeCAD
+import Path
+import io
+import random
+import time
+
+from FreeCAD import Units
+from PathScripts import PostEmitter
+from PathScripts import PostUtils
+from PathScripts.PathPostProcessor import PostProcessor
+from PathTests.PathTestUtils import PathTestBase
+
+PARAMS = ['X', 'Y', 'Z', 'A', 'B', 'I', 'J', 'F', 'S', 'T', 'Q', 'R', 'L', 'H']
+
+
+def legacyParse(commands, modal, lineNumbers, precision, unitFormat):
+    """the string concatenation of linuxcnc_post.parse() the emitter replaces"""
+    linenr = [100]
+
+    def linenumber():
+        if lineNumbers:
+            linenr[0] += 10
+            return "N" + str(linenr[0]) + " "
+        return ""
+
+    out = ""
+    lastcommand = None
+    precision_string = '.' + str(precision) + 'f'
+    for c in commands:
+        outstring = [c.Name]
+        if modal and c.Name == lastcommand:
+            outstring.pop(0)
+        for param in PARAMS:
+            if param in c.Parameters:
+                if param == 'F':
+                    if c.Name not in ["G0", "G00"]:
+                        speed = Units.Quantity(c.Parameters['F'], FreeCAD.Units.Velocity)
+                        outstring.append(param + format(float(speed.getValueAs(unitFormat)), precision_string))
+                elif param == 'T':
+                    outstring.append(param + str(int(c.Parameters['T'])))
+                else:
+                    outstring.append(param + format(c.Parameters[param], precision_string))
+        lastcommand = c.Name
+        if len(outstring) >= 1:
+            if lineNumbers:
+                outstring.insert(0, (linenumber()))
+            for w in outstring:
+                out += w + " "
+            out = out.strip() + "\n"
+    return out
+
+
+def syntheticCommands(count, seed=4711):
+    """count moves of a pocket like job, with some tool changes and spindle commands"""
+    rnd = random.Random(seed)
+    commands = []
+    for i in range(count):
+        if i % 10000 == 0:
+            commands.append(Path.Command('M6', {'T': float(i % 7 + 1)}))
+            commands.append(Path.Command('M3', {'S': 10000.0}))
+        name = rnd.choice(['G0', 'G1', 'G1', 'G1', 'G2', 'G3'])
+        params = {'X': rnd.uniform(-100, 100), 'Y': rnd.uniform(-100, 100), 'Z': rnd.uniform(-10, 0)}
+        if name != 'G0':
+            params['F'] = rnd.choice([5.0, 10.0, 12.5])
+        if name in ['G2', 'G3']:
+            params['I'] = rnd.uniform(-5, 5)
+            params['J'] = rnd.uniform(-5, 5)
+        commands.append(Path.Command(name, params))
+    return commands
+
+
+class SyntheticPath(object):
+    """just enough of a Path object for the post processors"""
+
+    def __init__(self, label, commands):
+        self.Label = label
+        self.Name = label
+        self.Path = self
+        self.Commands = commands
+        self.InList = []
+
+
+def benchmark(count=5000000, post='linuxcnc', filename='-'):
+    """benchmark(count=5000000, post='linuxcnc', filename='-') ... run the post processor on a
+    synthetic job of count commands and print the time it takes, for example from the python console:
+        from PathTests import TestPathPostEmitter
+        TestPathPostEmitter.benchmark()"""
+    start = time.time()
+    obj = SyntheticPath('Benchmark', syntheticCommands(count))
+    FreeCAD.Console.PrintMessage("%d commands created in %.2fs\n" % (len(obj.Commands), time.time() - start))
+    processor = PostProcessor.load(post)
+    processor.script.SHOW_EDITOR = False
+    start = time.time()
+    gcode = processor.export([obj], filename, '--no-show-editor')
+    FreeCAD.Console.PrintMessage("%s_post: %d lines in %.2fs\n" % (post, gcode.count('\n') if gcode else 0, time.time() - start))
+
+
+class TestPathPostEmitter(PathTestBase):
+
+    def test00(self):
+        """Verify the compiled formatters format like format() and PostUtils.fmt()."""
+        values = [0.0, -0.0, 1.0, -3.25, 0.00005, 1.23445, 12.34565, 1234.5678901, -0.000049, 7]
+        for value in values:
+            for decimals in [0, 2, 4]:
+                self.assertEqual(PostEmitter.numberFormatter(decimals, 'X')(value), 'X' + format(value, '.%df' % decimals))
+                for units in ['G20', 'G21']:
+                    self.assertEqual(PostEmitter.lengthFormatter(decimals, units)(value), PostUtils.fmt(value, decimals, units))
+                for unitFormat in ['mm/min', 'in/min']:
+                    speed = Units.Quantity(value, FreeCAD.Units.Velocity)
+                    self.assertEqual(PostEmitter.velocityFormatter(decimals, unitFormat)(value), format(float(speed.getValueAs(unitFormat)), '.%df' % decimals))
+            self.assertEqual(PostEmitter.integerFormatter('T')(value), 'T' + str(int(value)))
+
+    def test01(self):
+        """Verify the emitter writes the lines of the legacy linuxcnc parse()."""
+        commands = syntheticCommands(2000)
+        for modal in [False, True]:
+            for lineNumbers in [False, True]:
+                for precision, unitFormat in [(4, 'mm/min'), (2, 'in/min')]:
+                    formatters = dict((param, PostEmitter.numberFormatter(precision, param)) for param in PARAMS)
+                    formatters['F'] = PostEmitter.velocityFormatter(precision, unitFormat, 'F')
+                    formatters['T'] = PostEmitter.integerFormatter('T')
+                    writer = PostEmitter.GCodeWriter()
+                    emitter = PostEmitter.GCodeEmitter(writer, PARAMS, formatters, modal=modal, lineNumbers=lineNumbers, lineNumber=100)
+                    emitter.emitPath(SyntheticPath('Path', commands))
+                    self.assertEqual(writer.getvalue(), legacyParse(commands, modal, lineNumbers, precision, unitFormat))
+
+    def test02(self):
+        """Verify the writer streams the text and keeps it only if requested."""
+        lines = ["G1 X%d\n" % i for i in range(1000)]
+        for keep in [True, False]:
+            stream = io.StringIO() if str is not bytes else io.BytesIO()
+            writer = PostEmitter.GCodeWriter(stream, keep=keep, bufferSize=64)
+            for line in lines[:500]:
+                writer.write(line)
+            self.assertEqual(stream.getvalue(), ''.join(lines[:448]))
+            writer.writeLines(lines[500:])
+            writer.flush()
+            self.assertEqual(stream.getvalue(), ''.join(lines))
+            self.assertEqual(writer.getvalue(), ''.join(lines) if keep else '')
+
+    def test03(self):
+        """Verify the Path objects of a compound are visited in order."""
+        a = SyntheticPath('a', [])
+        b = SyntheticPath('b', [])
+        c = SyntheticPath('c', [])
+        inner = SyntheticPath('inner', [])
+        inner.Group = [b, c]
+        job = SyntheticPath('job', [])
+        job.Group = [a, inner, SyntheticPath('d', [])]
+        self.assertEqual([o.Label for o in PostEmitter.walkPaths(job)], ['job', 'a', 'inner', 'b', 'c', 'd'])
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *                                                                         *
+# *   Copyright (c) 2026 agent <agent@local>                                *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+
+
+import FreeCAD
+import os
+import tempfile
+
+from PathScripts import PreImporter
+from PathTests.PathTestUtils import PathTestBase
+
+
+def legacyNormalize(inputstring):
+    """the preprocessing of example_pre.parse() normalize replaces"""
+    output = ""
+    lastcommand = None
+    for l in inputstring.split("\n"):
+        l = l.strip()
+        if not l:
+            continue
+        if l[0].upper() in ["N"]:
+            l = l.split(" ", 1)[1]
+        if l[0] in ["(", "%", "#"]:
+            continue
+        if l[0].upper() in ["G", "M"]:
+            output += l + "\n"
+            last = l[0].upper()
+            for c in l[1:]:
+                if not c.isdigit():
+                    break
+                else:
+                    last += c
+            lastcommand = last
+        elif lastcommand:
+            output += lastcommand + " " + l + "\n"
+    return output
+
+
+class TestPathPreImporter(PathTestBase):
+
+    gcode = "%\n(test)\nN10 G0 Z5\nX1 Y2\n\nN20 G01 X3 F100\n  Y4  \nM3 S1000\n\nX1\n#1=2\nM5\nN30 G2 X0 Y0 I1 J1\nX2"
+
+    def setUp(self):
+        self.doc = FreeCAD.newDocument("TestPathPreImporter")
+
+    def tearDown(self):
+        FreeCAD.closeDocument("TestPathPreImporter")
+
+    def test00(self):
+        """Verify normalize repeats the last command and removes line numbers and comments."""
+        self.assertEqual(''.join(PreImporter.normalize(self.gcode.split("\n"))), legacyNormalize(self.gcode))
+        self.assertEqual(list(PreImporter.normalize(["X1", "N10", "G1 X1", "Y2"])), ["G1 X1\n", "G1 Y2\n"])
+        lines = ["G1 X1 ; first", "X2", "; comment"]
+        self.assertEqual(list(PreImporter.normalize(lines, ('G', 'M', '('), (), True)), ["G1 X1 ( first)\n", "G1 X2\n", "( comment)\n"])
+
+    def test01(self):
+        """Verify readLines returns the lines of a file read in small chunks and reports the progress."""
+        fd, filename = tempfile.mkstemp(suffix='.nc')
+        with os.fdopen(fd, 'w') as f:
+            f.write(self.gcode)
+        try:
+            fractions = []
+            lines = list(PreImporter.readLines(filename, lambda f: fractions.append(f), 7))
+            self.assertEqual(lines, self.gcode.split("\n"))
+            self.assertEqual(fractions, sorted(fractions))
+            self.assertRoughly(fractions[-1], 1.0)
+            lines = list(PreImporter.readLines(filename, lambda f: False, 7))
+            self.assertEqual(lines, ["%"])
+        finally:
+            os.remove(filename)
+
+    def test02(self):
+        """Verify the commands are added in batches and split into Path objects."""
+        gcode = list(PreImporter.normalize(self.gcode.split("\n")))
+        importer = PreImporter.PathImporter(self.doc, batchSize=3)
+        for line in gcode:
+            importer.add(line)
+        objects = importer.finish()
+        self.assertEqual(len(objects), 1)
+        self.assertEqual([c.Name for c in objects[0].Path.Commands], [l.split()[0] for l in gcode])
+
+        importer = PreImporter.PathImporter(self.doc, commandsPerPath=4)
+        for line in gcode:
+            importer.add(line)
+        objects = importer.finish()
+        self.assertEqual([o.Path.Size for o in objects], [4, 4, 1])
+
+        importer = PreImporter.PathImporter(self.doc)
+        importer.split()
+        self.assertEqual(importer.finish(), [])
+        self.assertEqual(len(PreImporter.PathImporter(self.doc).finish(True)), 1)
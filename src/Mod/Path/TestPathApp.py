@@ -31,4 +31,9 @@ from PathTests.TestPathGeom  import TestPathGeom
 from PathTests.TestPathUtil  import TestPathUtil
 from PathTests.TestPathDepthParams        import depthTestCases
 from PathTests.TestPathDressupHoldingTags import TestHoldingTags
+from PathTests.TestPathJobOrder           import TestPathJobOrder
+from PathTests.TestPathKDTree             import TestPathKDTree
+from PathTests.TestPathPostEmitter        import TestPathPostEmitter
+from PathTests.TestPathPreImporter        import TestPathPreImporter
+from PathTests.TestPathHeightmap          import TestPathHeightmap
 